@@ -0,0 +1,306 @@
+"""
+ap_assembler/build.py — Parallel multi-module build driver.
+
+Each module's DEF → GEN → ObjectWriter pipeline is independent of every
+other module's, so a system build assembles its modules in a process pool.
+Every module writes <name>.hex (Verilog $readmemh) and <name>.lst to the
+output directory; with -c the listing ends with the module's concordance.
+With -l the modules are also linked (linker.py) into one image, written as
+one hex file with its load map beside it.
+
+SYSTEM libraries are tokenised and run through the DEF pass once, in the
+parent, and saved as one symbol table image (symbol_image.py).  Each
+worker maps the image when it starts and gives every module a copy of the
+table, so no worker lexes or defines a library again; the procedure
+statements are decoded from the shared mapping as modules call them.
+
+Usage:
+  python -m ap_assembler.build [-j JOBS] [-o DIR] [-s LIBRARY]...
+                               [-m MANIFEST] [--cache DIR] [-c] [-l HEX]
+                               [SOURCE ...]
+
+A manifest lists one source file per line, relative to the manifest;
+blank lines and lines starting with '*' or '#' are ignored.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from typing import List, Optional, Sequence, Tuple
+
+from .concordance import Concordance
+from .def_pass import AssemblyError, DefPass
+from .gen_pass import GenPass
+from .hex_output import write_verilog_hex
+from .lexer import tokenize_file
+from .linker import LinkedImage, Linker, ObjectModule, object_module
+from .listing_writer import ListingWriter
+from .object_writer import ObjectWriter
+from .stmt_cache import StatementCache
+from .symbol_image import FORMAT_VERSION, read_image, write_image
+from .symbol_table import SymbolTable
+
+
+# ---------------------------------------------------------------------------
+# One module
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ModuleResult:
+    """Outcome of assembling one module."""
+    source:     str
+    hex_path:   str
+    listing:    str
+    statements: int
+    errors:     int
+    seconds:    float
+    module:     Optional[ObjectModule] = None    # for linking
+
+    @property
+    def stmts_per_sec(self) -> float:
+        return self.statements / self.seconds if self.seconds else 0.0
+
+
+def module_name(source: str) -> str:
+    """The output name of *source*: its file name without the extension."""
+    return os.path.splitext(os.path.basename(source))[0]
+
+
+def tokenize(filename: str, cache: Optional[StatementCache] = None):
+    """The statements of *filename*, through *cache* if given."""
+    if cache is not None:
+        return cache.tokenize_file(filename)
+    return list(tokenize_file(filename))
+
+
+def assemble_module(source: str, out_dir: str,
+                    base: Optional[SymbolTable] = None,
+                    cache: Optional[StatementCache] = None,
+                    concordance: bool = False,
+                    link: bool = False) -> ModuleResult:
+    """
+    Assemble *source* into *out_dir*, starting from a copy of *base* (the
+    SYSTEM library table) if given.  With *concordance* the module's
+    cross-reference follows the listing; with *link* the result carries
+    the module's object code for the linker.
+    """
+    t0 = time.perf_counter()
+    stmts = tokenize(source, cache)
+    sym = base.copy() if base is not None else SymbolTable()
+    conc = Concordance() if concordance else None
+    def_errors = DefPass(stmts, sym, conc).run()
+
+    name = module_name(source)
+    hex_path = os.path.join(out_dir, name + '.hex')
+    listing  = os.path.join(out_dir, name + '.lst')
+    obj = ObjectWriter()
+    with open(listing, 'w', encoding='ascii', errors='replace') as f:
+        lst = ListingWriter(dest=f)
+        gen_errors = GenPass(stmts, sym, obj, lst, conc).run()
+        lst.finish()
+        if conc is not None:
+            f.write('\n')
+            conc.write(f, sym)
+    write_verilog_hex(obj, hex_path)
+    return ModuleResult(source, hex_path, listing, len(stmts),
+                        len(def_errors) + len(gen_errors),
+                        time.perf_counter() - t0,
+                        object_module(obj, sym, name) if link else None)
+
+
+# ---------------------------------------------------------------------------
+# SYSTEM libraries
+# ---------------------------------------------------------------------------
+
+class LibraryError(Exception):
+    """The DEF pass over the SYSTEM libraries reported errors."""
+
+    def __init__(self, errors: List[Tuple[str, AssemblyError]]) -> None:
+        super().__init__(f'{len(errors)} errors in SYSTEM libraries')
+        self.errors = errors    # (library path, error)
+
+
+def prepare_libraries(libraries: Sequence[str], directory: str,
+                      cache: Optional[StatementCache] = None) -> Optional[str]:
+    """
+    Run the DEF pass over *libraries*, in order, into one SymbolTable and
+    save it as an image in *directory*.  The image is named by the
+    libraries' contents and the image format, so an unchanged set is found
+    there and reused.
+    Returns the image path, or None when there are no libraries.  Raises
+    LibraryError, without writing an image, if any library had errors.
+    """
+    if not libraries:
+        return None
+    digest = hashlib.sha256()
+    for lib in libraries:
+        with open(lib, 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    path = os.path.join(directory, f'{digest.hexdigest()}.s{FORMAT_VERSION}')
+    if not os.path.exists(path):
+        sym = SymbolTable()
+        errors = [(lib, err) for lib in libraries
+                  for err in DefPass(tokenize(lib, cache), sym).run()]
+        if errors:
+            raise LibraryError(errors)
+        write_image(path, sym)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Worker processes
+# ---------------------------------------------------------------------------
+
+_base:  Optional[SymbolTable]    = None   # this worker's library table
+_cache: Optional[StatementCache] = None
+
+
+def _init_worker(image: Optional[str], cache_dir: Optional[str]) -> None:
+    global _base, _cache
+    _base  = read_image(image) if image else None
+    _cache = StatementCache(cache_dir) if cache_dir else None
+
+
+def _assemble_in_worker(source: str, out_dir: str, concordance: bool,
+                        link: bool) -> ModuleResult:
+    return assemble_module(source, out_dir, _base, _cache, concordance, link)
+
+
+# ---------------------------------------------------------------------------
+# Build
+# ---------------------------------------------------------------------------
+
+def build(sources: Sequence[str], out_dir: str,
+          libraries: Sequence[str] = (), jobs: Optional[int] = None,
+          cache_dir: Optional[str] = None,
+          concordance: bool = False,
+          link: bool = False) -> List[ModuleResult]:
+    """
+    Assemble every module in *sources* into *out_dir*, *jobs* at a time
+    (default: one per CPU; 1 assembles in this process).  Results are in
+    the order of *sources*.
+
+    The library image is kept in *cache_dir*, with the statement cache,
+    if one is given; otherwise it lasts only for this build.  Raises
+    LibraryError, before any module is assembled, if a library has errors.
+    """
+    names = [module_name(s) for s in sources]
+    duplicates = sorted({n for n in names if names.count(n) > 1})
+    if duplicates:
+        raise ValueError(f"modules share output names: {', '.join(duplicates)}")
+    os.makedirs(out_dir, exist_ok=True)
+    cache = StatementCache(cache_dir) if cache_dir else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        image = prepare_libraries(libraries, cache_dir or tmp, cache)
+        if jobs == 1:
+            base = read_image(image) if image else None
+            return [assemble_module(s, out_dir, base, cache, concordance,
+                                    link)
+                    for s in sources]
+        with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                                 initargs=(image, cache_dir)) as pool:
+            return list(pool.map(_assemble_in_worker, sources,
+                                 repeat(out_dir), repeat(concordance),
+                                 repeat(link)))
+
+
+def link_modules(results: Sequence[ModuleResult],
+                 hex_path: str) -> LinkedImage:
+    """
+    Link the modules of a build(link=True) in order into one image and
+    write it to *hex_path*, with the load map in the same name + '.map'.
+    """
+    linker = Linker()
+    for r in results:
+        linker.add_module(r.module)
+    image = linker.link()
+    write_verilog_hex(image.to_object(), hex_path)
+    with open(os.path.splitext(hex_path)[0] + '.map', 'w') as f:
+        f.write(image.render_map())
+        f.write('\n')
+    return image
+
+
+def read_manifest(path: str) -> List[str]:
+    """The source files listed in the manifest *path*."""
+    base = os.path.dirname(path)
+    with open(path) as f:
+        return [os.path.join(base, line.strip()) for line in f
+                if line.strip() and line.lstrip()[0] not in '*#']
+
+
+# ---------------------------------------------------------------------------
+# Command line
+# ---------------------------------------------------------------------------
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m ap_assembler.build',
+        description='Assemble many AP modules in parallel')
+    parser.add_argument('sources', nargs='*', help='module source files')
+    parser.add_argument('-m', '--manifest', action='append', default=[],
+                        help='file listing module sources, one per line')
+    parser.add_argument('-s', '--system', action='append', default=[],
+                        metavar='LIBRARY',
+                        help='SYSTEM library defined before every module')
+    parser.add_argument('-o', '--out', default='build',
+                        help='output directory (default build)')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='statement and library image cache directory')
+    parser.add_argument('-c', '--concordance', action='store_true',
+                        help='end each listing with a cross-reference')
+    parser.add_argument('-l', '--link', metavar='HEX',
+                        help='also link the modules into one image in HEX')
+    args = parser.parse_args(argv)
+
+    sources = list(args.sources)
+    for manifest in args.manifest:
+        sources.extend(read_manifest(manifest))
+    if not sources:
+        parser.error('no source files')
+    for path in sources + args.system:
+        if not os.path.isfile(path):
+            parser.error(f'{path}: no such file')
+
+    t0 = time.perf_counter()
+    try:
+        results = build(sources, args.out, args.system, args.jobs,
+                        args.cache, args.concordance, link=bool(args.link))
+    except LibraryError as e:
+        for lib, err in e.errors:
+            print(f"  {lib}: {err}")
+        print(f"  {e}; nothing assembled")
+        return 1
+    image = link_modules(results, args.link) if args.link else None
+    wall = time.perf_counter() - t0
+
+    for r in results:
+        print(f"  {module_name(r.source):<20s} {r.statements:>8d} stmts  "
+              f"{r.errors:>4d} errors  {r.seconds:8.3f} s  "
+              f"{r.stmts_per_sec:>10.0f} stmts/s")
+    total = sum(r.statements for r in results)
+    print(f"  {len(results)} modules, {total} stmts in {wall:.3f} s wall "
+          f"({total / wall:.0f} stmts/s)")
+    if image is not None:
+        print(f"  linked {len(image.data)} bytes, {image.relocations} "
+              f"relocations into {args.link}")
+        for err in image.errors:
+            print(f"  link error: {err}")
+        if image.errors:
+            return 1
+    return 1 if any(r.errors for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""
+ap_assembler/concordance.py — Phase 4: Concordance (cross-reference listing).
+
+The Python equivalent of APCNC.  A Concordance handed to the DEF and GEN
+passes records, for every statement they execute, the symbols its label
+defines and the symbols its command, label and argument fields refer to;
+render() then lists every symbol alphabetically with the lines that define
+it (marked '*') and the lines that refer to it:
+
+    conc = Concordance()
+    DefPass(stmts, sym, conc).run()
+    GenPass(stmts, sym, obj, lst, conc).run()
+    print(conc.render(sym))
+
+Only executed statements are recorded: lines skipped by DO, ELSE or GOTO
+are not, and the lines of a procedure body are recorded each time it is
+called.  Local symbols are listed under their names with the globals.
+
+Reference store
+---------------
+Each symbol name gets a number the first time it is seen.  A reference is
+one entry in each of three parallel arrays — symbol number, line number,
+and a flag byte (definition, GEN pass) — so the store costs a few bytes
+per reference and recording one is an append.  The symbols a statement
+defines and refers to are worked out from its tokens once, then appended
+again whenever the statement runs.  render() numbers the names in
+alphabetical order, packs each reference into one integer key, and sorts
+the keys once.
+
+A pass given no Concordance records nothing and pays one test per
+statement.
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import IO, Dict, List, Optional, Tuple
+
+from .expression import _INTRINSICS
+from .lexer import Statement, TT
+from .symbol_table import PASS_GEN, SymbolTable
+from .value import ValueKind
+
+
+# Symbols that the evaluator answers itself whatever the symbol table holds;
+# the names in _INTRINSICS are functions when followed by '('
+_SPECIAL = frozenset({'$', '$$', '%', '%%', 'META', 'NAME'})
+
+# Flag bits of one reference
+DEFINITION = 1
+GEN        = 2
+
+_SYMBOL = TT.SYMBOL
+
+# Flag byte → the same flags in the GEN pass
+_IN_GEN = bytes(f | GEN for f in range(256))
+
+# Line numbers are packed into sort keys below the symbol's rank
+_LINE_BITS = 32
+
+# References per output line in render()
+_PER_LINE = 10
+
+
+# ---------------------------------------------------------------------------
+# ConcordanceEntry
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ConcordanceEntry:
+    """
+    One symbol of the cross-reference.
+
+    name       : symbol name
+    defined    : lines that define the symbol, ascending
+    referenced : lines that refer to the symbol, ascending
+    """
+    name:       str
+    defined:    List[int] = field(default_factory=list)
+    referenced: List[int] = field(default_factory=list)
+
+
+# ---------------------------------------------------------------------------
+# Concordance
+# ---------------------------------------------------------------------------
+
+class Concordance:
+    """Symbol definitions and references recorded during an assembly."""
+
+    def __init__(self) -> None:
+        self._numbers: Dict[str, int] = {}      # name → symbol number
+        self._names:   List[str]      = []      # symbol number → name
+        self._symbols = array('I')              # one entry per reference
+        self._lines   = array('I')
+        self._flags   = array('B')
+        # id(stmt) → (stmt, call, symbols, DEF-pass flags, GEN-pass flags);
+        # the statement is kept so that its id is not reused
+        self._scanned: Dict[int, Tuple[Statement, bool, array,
+                                       bytes, bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._symbols)
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def record(self, stmt: Statement, pass_: int, call: bool = False,
+               in_body: bool = False) -> None:
+        """
+        Record the symbols *stmt* defines and refers to, in pass *pass_*.
+        *call* is True when its command is a procedure name, which is then
+        a reference too; *in_body* when it runs inside a procedure body.
+        """
+        scan = self._scanned.get(id(stmt))
+        if scan is None or scan[1] != call:
+            scan = self._scanned[id(stmt)] = self._scan(stmt, call, in_body)
+        symbols = scan[2]
+        if symbols:
+            self._symbols.extend(symbols)
+            self._lines.extend(repeat(stmt.line_no, len(symbols)))
+            self._flags.frombytes(scan[4] if pass_ == PASS_GEN else scan[3])
+
+    def _number(self, name: str) -> int:
+        number = self._numbers.get(name)
+        if number is None:
+            number = self._numbers[name] = len(self._names)
+            self._names.append(name)
+        return number
+
+    def _scan(self, stmt: Statement, call: bool, in_body: bool):
+        names: List[str] = []
+        defined = False
+
+        # The label's symbol is defined (a procedure call passes it to the
+        # body as LF, which defines it); names in its subscripts are used.
+        # An LF label in a body is the caller's, recorded at the call.
+        label = stmt.label_args[0] if stmt.label_args else ()
+        if label and label[0].type is _SYMBOL:
+            name = label[0].value
+            if name not in _SPECIAL and not (name == 'LF' and in_body):
+                names.append(name)
+                defined = True
+            label = label[1:]
+        if call:
+            names.append(stmt.base)
+        for toks in (label, *stmt.mod_args, *stmt.args):
+            for k, tok in enumerate(toks):
+                if tok.type is not _SYMBOL or tok.value in _SPECIAL:
+                    continue
+                if tok.value in _INTRINSICS and k + 1 < len(toks) \
+                        and toks[k + 1].type is TT.LPAREN:
+                    continue
+                names.append(tok.value)
+
+        numbers = self._numbers
+        symbols = array('I', [numbers[n] if n in numbers else self._number(n)
+                              for n in names])
+        flags = bytes(len(names))
+        if defined:
+            flags = bytes((DEFINITION,)) + flags[1:]
+        return stmt, call, symbols, flags, flags.translate(_IN_GEN)
+
+    # ------------------------------------------------------------------
+    # Cross-reference
+    # ------------------------------------------------------------------
+
+    def entries(self, pass_: Optional[int] = None) -> List[ConcordanceEntry]:
+        """
+        Every recorded symbol in alphabetical order, with the lines that
+        define and refer to it.  A line is listed once however often it
+        ran.  With *pass_* only that pass's references are included;
+        otherwise both passes'.
+        """
+        names = self._names
+        order = sorted(range(len(names)), key=names.__getitem__)
+        rank  = [0] * len(names)
+        for r, number in enumerate(order):
+            rank[number] = r
+
+        if pass_ is None:
+            want = None
+        else:
+            want = GEN if pass_ == PASS_GEN else 0
+        keys = [(rank[s] << _LINE_BITS | line) << 1 | (f & DEFINITION)
+                for s, line, f in zip(self._symbols, self._lines, self._flags)
+                if want is None or f & GEN == want]
+        keys.sort()
+
+        result: List[ConcordanceEntry] = []
+        entry: Optional[ConcordanceEntry] = None
+        last = -1
+        for key in keys:
+            if key == last:
+                continue
+            last = key
+            r = key >> (_LINE_BITS + 1)
+            if entry is None or entry.name != names[order[r]]:
+                entry = ConcordanceEntry(names[order[r]])
+                result.append(entry)
+            line = key >> 1 & (1 << _LINE_BITS) - 1
+            (entry.defined if key & DEFINITION else entry.referenced) \
+                .append(line)
+        return result
+
+    def render(self, sym: Optional[SymbolTable] = None,
+               pass_: Optional[int] = None) -> str:
+        """
+        The cross-reference listing.  Each symbol's value is shown from
+        *sym* if given: 8 hex digits, or section and byte offset for an
+        address.
+        """
+        parts = ['CONCORDANCE', RULE, HEADER, RULE]
+        for e in self.entries(pass_):
+            lines = ([f'{n}*' for n in e.defined]
+                     + [str(n) for n in e.referenced])
+            rows = [lines[k:k + _PER_LINE]
+                    for k in range(0, len(lines), _PER_LINE)] or [[]]
+            value = _format_value(sym, e.name) if sym is not None else ''
+            parts.append(f'{e.name:<{_W_NAME}}  {value:<{_W_VALUE}}  '
+                         + _refs(rows[0]))
+            for row in rows[1:]:
+                parts.append(f"{'':<{_W_NAME}}  {'':<{_W_VALUE}}  "
+                             + _refs(row))
+        parts.append(RULE)
+        return '\n'.join(parts)
+
+    def write(self, dest: IO[str], sym: Optional[SymbolTable] = None,
+              pass_: Optional[int] = None) -> None:
+        """Write the rendered cross-reference to a file-like object."""
+        dest.write(self.render(sym, pass_))
+        dest.write('\n')
+
+
+# ---------------------------------------------------------------------------
+# Formatting
+# ---------------------------------------------------------------------------
+
+_W_NAME  = 12
+_W_VALUE = 9     # "SS OOOOOO"
+
+HEADER = f"{'Symbol':<{_W_NAME}}  {'Value':<{_W_VALUE}}  Lines (* = defined)"
+RULE   = '-' * 80
+
+
+def _refs(row: List[str]) -> str:
+    return ' '.join(f'{n:>7}' for n in row).rstrip()
+
+
+def _format_value(sym: SymbolTable, name: str) -> str:
+    entry = sym.lookup(name)
+    if entry is None:
+        return ''
+    if entry.proc_body is not None:
+        return 'PROC'
+    v = entry.value
+    if v.kind == ValueKind.ABSOLUTE:
+        return f'{v.int_val & 0xFFFFFFFF:08X}'
+    if v.kind == ValueKind.RELOCATABLE:
+        return f'{v.csect:02X} {v.int_val & 0xFFFFFF:06X}'
+    if v.kind == ValueKind.UNDEFINED:
+        return 'UNDEF'
+    if v.kind == ValueKind.LIST:
+        return f'LIST/{len(v.items)}'
+    return v.kind.name[:_W_VALUE]
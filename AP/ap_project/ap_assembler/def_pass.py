@@ -44,7 +44,8 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Callable, Dict, List, Optional, Tuple
 
-from .do_control import DoFrame, find_else_fin, find_pend, find_label
+from .concordance import Concordance
+from .do_control import BlockIndex, DoFrame
 from .expression import evaluate_arg
 from .lexer import ArgTokenizer, Statement, TT, Token
 from .procedure import ProcedureBody, CallFrame
@@ -188,15 +189,22 @@ class DefPass:
         sym   = SymbolTable()
         dp    = DefPass(stmts, sym)
         errors = dp.run()
+
+    A *concordance* given to the pass records the symbols each executed
+    statement defines and refers to.
     """
 
-    def __init__(self, stmts: List[Statement], sym: SymbolTable):
+    def __init__(self, stmts: List[Statement], sym: SymbolTable,
+                 concordance: Optional[Concordance] = None):
         self.stmts:    List[Statement]  = stmts
         self.sym:      SymbolTable      = sym
+        self.concordance = concordance
         self.errors:   List[AssemblyError] = []
+        self._line_errors: Dict[int, List[str]] = {}   # line_no → messages
         self.pos:      int              = 0       # current statement index
         self._do_stack: List[DoFrame]  = []       # active DO frames
         self._call_stack: List[CallFrame] = []    # procedure call stack
+        self._block_index: Dict[Tuple[int, int], BlockIndex] = {}
 
     # ------------------------------------------------------------------
     # Public entry point
@@ -222,31 +230,62 @@ class DefPass:
     # ------------------------------------------------------------------
 
     def _dispatch(self, stmt: Statement) -> None:
-        """Parse the command field and call the appropriate handler."""
-        cmd = stmt.command
-        if not cmd:
+        """Call the handler for the statement's (pre-parsed) command."""
+        if not stmt.command:
             return
 
-        # Split "CMD,modifier" → base="CMD", modifier="..."
-        base, _, modifier = cmd.partition(',')
-        base = base.upper()
+        # The lexer split "CMD,modifier" into stmt.base / stmt.modifier;
+        # the handler name is looked up once and kept on the statement.
+        method_name = stmt.handler
+        if method_name is None:
+            method_name = stmt.handler = _HANDLER_MAP.get(stmt.base, '')
 
         # Check for CNAME/FNAME procedure call BEFORE the handler map.
         # This check runs in both DefPass and GenPass (no override needed).
-        if base not in _HANDLER_MAP:
-            entry = self.sym.lookup(base)
+        if not method_name:
+            entry = self.sym.lookup(stmt.base)
             if entry is not None and entry.proc_body is not None:
+                if self.concordance is not None:
+                    self.concordance.record(stmt, self.sym.current_pass, True,
+                                            bool(self._call_stack))
                 self._call_procedure(stmt, entry.proc_body)
                 return
 
-        # Look up the method name, then resolve it on *self* so that
-        # subclass overrides (GenPass) are found through Python's MRO.
-        method_name = _HANDLER_MAP.get(base)
-        if method_name is not None:
-            getattr(self, method_name)(stmt, modifier)
+        if self.concordance is not None:
+            self.concordance.record(stmt, self.sym.current_pass, False,
+                                    bool(self._call_stack))
+
+        # Resolve the method name on *self* so that subclass overrides
+        # (GenPass) are found through Python's MRO.
+        if method_name:
+            getattr(self, method_name)(stmt, stmt.modifier)
         else:
             self._handle_instruction(stmt)
 
+    def _blocks(self) -> BlockIndex:
+        """The BlockIndex of the statement list being executed.
+
+        Inside a procedure only the body is indexed: its list may be a
+        whole library image, and reading all of it would decode every
+        statement on the first call.  Each list or body is indexed once
+        however often its DO/GOTO/PROC lines run.
+        """
+        frame = self._call_stack[-1] if self._call_stack else None
+        if frame is not None and frame.body.stmts is self.stmts:
+            key = (id(self.stmts), frame.body.body_start)
+        else:
+            key = (id(self.stmts), 0)
+            frame = None
+        index = self._block_index.get(key)
+        if index is None:
+            if frame is None:
+                index = BlockIndex(self.stmts)
+            else:
+                index = BlockIndex(self.stmts, frame.body.body_start,
+                                   frame.body.pend_index + 1)
+            self._block_index[key] = index
+        return index
+
     # ------------------------------------------------------------------
     # Expression evaluation helpers
     # ------------------------------------------------------------------
@@ -269,21 +308,15 @@ class DefPass:
             return default
         return Value.blank()
 
-    def _eval_modifier_expr(self, modifier: str,
-                            line_no: int = 0) -> Optional[Value]:
+    def _eval_modifier_expr(self, stmt: Statement) -> Optional[Value]:
         """
-        Tokenise and evaluate *modifier* (a raw string from the command field)
-        as a single expression.  Returns None if the string is empty or
-        cannot be tokenised.
+        Evaluate the first command-field modifier of *stmt* (already
+        tokenised by the lexer) as a single expression.  Returns None if
+        the statement has no modifier.
         """
-        if not modifier:
+        if not stmt.mod_args:
             return None
-        from .lexer import ArgTokenizer
-        tok_lists = ArgTokenizer(modifier.strip(), line_no=line_no,
-                                 start_col=0).tokenize()
-        if not tok_lists:
-            return None
-        return self._eval(tok_lists[0])
+        return self._eval(stmt.mod_args[0])
 
     def _eval_index_str(self, raw: str, line_no: int = 0) -> int:
         """
@@ -368,8 +401,7 @@ class DefPass:
             stmt = self.stmts[self.pos]
             if stmt.is_comment or stmt.command is None:
                 continue
-            base = stmt.command.partition(',')[0].upper()
-            if base == 'PEND':
+            if stmt.base == 'PEND':
                 if stmt.args:
                     frame.fname_result = self._eval(stmt.args[0])
                 break
@@ -490,7 +522,10 @@ class DefPass:
     # ------------------------------------------------------------------
 
     def _err(self, line_no: int, msg: str, severity: int = 2) -> None:
-        self.errors.append(AssemblyError(line_no, msg, severity))
+        err = AssemblyError(line_no, msg, severity)
+        self.errors.append(err)
+        # Indexed by line as raised, so the GEN listing need not rescan
+        self._line_errors.setdefault(line_no, []).append(str(err))
 
     def _warn(self, line_no: int, msg: str) -> None:
         self._err(line_no, msg, severity=1)
@@ -868,7 +903,7 @@ class DefPass:
         """
         if not stmt.label:
             # Unlabelled CNAME — skip to matching PEND (error at source level)
-            pend_idx = find_pend(self.stmts, self.pos + 1)
+            pend_idx = self._blocks().pend(self.pos)
             self.pos = pend_idx
             return
 
@@ -881,7 +916,7 @@ class DefPass:
             s = self.stmts[i]
             if s.is_comment or s.command is None:
                 continue
-            base = s.command.partition(',')[0].upper()
+            base = s.base
 
             if base == 'PROC':
                 proc_idx = i
@@ -912,7 +947,7 @@ class DefPass:
                     self.sym.define(sib.label, Value.absolute(0))
             return
 
-        pend_idx = find_pend(self.stmts, proc_idx + 1)
+        pend_idx = self._blocks().pend(proc_idx)
 
         # Register every sibling with its own name_value but the shared body.
         for sib, sib_is_fname in siblings:
@@ -946,7 +981,7 @@ class DefPass:
 
         At source level, treat as: skip to matching PEND (error body).
         """
-        end = find_pend(self.stmts, self.pos + 1)
+        end = self._blocks().pend(self.pos)
         self.pos = end
 
     def _handle_pend(self, stmt: Statement, modifier: str) -> None:
@@ -994,7 +1029,7 @@ class DefPass:
         v = self._eval_arg(stmt, 0, Value.absolute(0))
         n = self._require_int(v, stmt, 0)
 
-        else_idx, fin_idx = find_else_fin(self.stmts, self.pos + 1)
+        else_idx, fin_idx = self._blocks().else_fin(self.pos)
 
         if n <= 0:
             # Skip body; jump to ELSE section (or past FIN if no ELSE)
@@ -1116,7 +1151,7 @@ class DefPass:
         """
         k = 1
         if modifier:
-            k_val = self._eval_modifier_expr(modifier, stmt.line_no)
+            k_val = self._eval_modifier_expr(stmt)
             if k_val is not None and k_val.kind == ValueKind.ABSOLUTE:
                 k = k_val.int_val
 
@@ -1129,7 +1164,7 @@ class DefPass:
         if idx < len(stmt.args) and stmt.args[idx]:
             tok = stmt.args[idx][0]
             if tok.type == TT.SYMBOL:
-                target = find_label(self.stmts, tok.value, self.pos)
+                target = self._blocks().label(tok.value, self.pos)
                 if target >= 0:
                     self.pos = target - 1   # -1 because loop will +1
                     return
@@ -1173,8 +1208,8 @@ class DefPass:
         Argument lists
         --------------
         oprnd_args (AF) : call_stmt.args  — the operand field
-        cmd_args   (CF) : the command modifier tokenised into arg lists
-        label_args (LF) : the label field re-tokenised, or []
+        cmd_args   (CF) : call_stmt.cmd_args — base name, then modifier args
+        label_args (LF) : call_stmt.label_args — the tokenised label, or []
 
         After pushing the frame, the main ``run()`` loop continues from
         body.body_start.  When PEND is reached, ``_handle_pend`` pops the
@@ -1185,21 +1220,11 @@ class DefPass:
                       "Procedure nesting exceeds maximum depth (31)")
             return
 
-        # Build CF arg lists: CF(1)=command base name, CF(2+)=modifier tokens.
-        # In AP, the command field "LW,1" has CF(1)='LW' and CF(2)=1.
-        base_cmd = call_stmt.command.partition(',')[0] if call_stmt.command else ''
-        modifier  = call_stmt.command.partition(',')[2] if call_stmt.command else ''
-        base_tok  = [Token(TT.SYMBOL, base_cmd.upper(), base_cmd,
-                           call_stmt.line_no, 0)]
-        mod_args  = ArgTokenizer(modifier, call_stmt.line_no, 0).tokenize()                     if modifier else []
-        cmd_args  = [base_tok] + mod_args
-
-        # Re-tokenise the label field into LF arg lists
-        if call_stmt.label:
-            label_args = ArgTokenizer(call_stmt.label,
-                                      call_stmt.line_no, 0).tokenize()
-        else:
-            label_args = []
+        # CF(1)=command base name, CF(2+)=modifier tokens: in AP the command
+        # field "LW,1" has CF(1)='LW' and CF(2)=1.  Both fields were
+        # tokenised once by the lexer.
+        cmd_args   = call_stmt.cmd_args
+        label_args = call_stmt.label_args
 
         # Eagerly evaluate argument lists using the CURRENT frame so that
         # AF/CF/LF references inside arguments are resolved at call time.
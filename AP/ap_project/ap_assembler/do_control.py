@@ -22,12 +22,20 @@ The label on a DO is a SET symbol that holds the current iteration count
 
 The label on DO1 is defined normally (EQU to current LC) and is not updated
 on each repeat.
+
+``find_else_fin``, ``find_pend`` and ``find_label`` scan the statement list
+from a given position.  ``BlockIndex`` answers the same three questions in
+constant time from a table built in one pass over the list; the passes use
+it so that a DO or GOTO inside a procedure body does not rescan the body on
+every call.  A procedure body is indexed on its own, so calling one macro
+from a library image does not decode the rest of the library.
 """
 
 from __future__ import annotations
 
+from bisect import bisect_left
 from dataclasses import dataclass, field
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from .lexer import Statement
 
@@ -86,7 +94,7 @@ def find_else_fin(stmts: List[Statement], start: int) -> Tuple[int, int]:
         stmt = stmts[i]
         if stmt.is_comment or stmt.command is None:
             continue
-        base = stmt.command.split(',')[0].upper()
+        base = stmt.base
 
         if base == 'DO':
             depth += 1
@@ -115,7 +123,7 @@ def find_pend(stmts: List[Statement], start: int) -> int:
         stmt = stmts[i]
         if stmt.is_comment or stmt.command is None:
             continue
-        base = stmt.command.split(',')[0].upper()
+        base = stmt.base
         if base in ('PROC', 'CNAME', 'FNAME'):
             depth += 1
         elif base == 'PEND':
@@ -139,3 +147,104 @@ def find_label(stmts: List[Statement], name: str, start: int = 0) -> int:
         if stmts[i].label == upper:
             return i
     return -1
+
+
+# ---------------------------------------------------------------------------
+# BlockIndex — DO/ELSE/FIN, PROC/PEND and label positions, built once
+# ---------------------------------------------------------------------------
+
+_OPENERS = ('PROC', 'CNAME', 'FNAME')
+
+
+class BlockIndex:
+    """
+    Structural index of one statement list, built in a single pass.
+
+      else_fin(i) == find_else_fin(stmts, i + 1)   for a DO at index i
+      pend(i)     == find_pend(stmts, i + 1)        for a PROC/CNAME/FNAME at i
+      label(name, start) == find_label(stmts, name, start)
+
+    The index keeps a reference to *stmts*; statement lists are not modified
+    after tokenisation, so it stays valid for the whole assembly.
+
+    With *start* and *stop* only ``stmts[start:stop]`` is read.  Indices stay
+    those of the whole list; a lookup the range cannot answer (a block left
+    open at *stop*, a label found only outside the range) falls back to the
+    scanning helper, so the answers are the same as for a full index.
+    """
+
+    def __init__(self, stmts: List[Statement], start: int = 0,
+                 stop: Optional[int] = None) -> None:
+        self.stmts = stmts
+        self._do:     Dict[int, Tuple[int, int]] = {}
+        self._pend:   Dict[int, int]             = {}
+        self._labels: Dict[str, List[int]]       = {}
+
+        n = len(stmts)
+        stop = n if stop is None else min(stop, n)
+        self._start, self._stop = start, stop
+        do_stack:   List[List[int]]        = []   # [do_idx, else_idx]
+        proc_stack: List[Tuple[int, int]]  = []   # (opener_idx, threshold)
+        depth = 0     # openers minus PENDs before the current statement
+
+        for i in range(start, stop):
+            stmt = stmts[i]
+            if stmt.label is not None:
+                self._labels.setdefault(stmt.label, []).append(i)
+            if stmt.is_comment or stmt.command is None:
+                continue
+            base = stmt.base
+
+            if base == 'DO':
+                do_stack.append([i, -1])
+            elif base == 'ELSE':
+                if do_stack and do_stack[-1][1] == -1:
+                    do_stack[-1][1] = i
+            elif base == 'FIN':
+                if do_stack:
+                    do_idx, else_idx = do_stack.pop()
+                    self._do[do_idx] = (else_idx, i)
+            elif base in _OPENERS:
+                # find_pend from i+1 stops at the first PEND reached with
+                # at most one unmatched opener since i+1.
+                proc_stack.append((i, depth + 2))
+                depth += 1
+            elif base == 'PEND':
+                while proc_stack and depth <= proc_stack[-1][1]:
+                    self._pend[proc_stack.pop()[0]] = i
+                depth -= 1
+
+        if stop < n:
+            return      # blocks still open may close beyond the range
+        # Malformed source: unclosed blocks run to the end of the list
+        for do_idx, else_idx in do_stack:
+            self._do[do_idx] = (else_idx, max(do_idx + 1, n - 1))
+        for opener, _ in proc_stack:
+            self._pend[opener] = max(opener + 1, n - 1)
+
+    def else_fin(self, do_idx: int) -> Tuple[int, int]:
+        """``(else_idx, fin_idx)`` for the DO at *do_idx*."""
+        found = self._do.get(do_idx)
+        if found is None:
+            return find_else_fin(self.stmts, do_idx + 1)
+        return found
+
+    def pend(self, opener_idx: int) -> int:
+        """Index of the PEND closing the PROC/CNAME/FNAME at *opener_idx*."""
+        found = self._pend.get(opener_idx)
+        if found is None:
+            return find_pend(self.stmts, opener_idx + 1)
+        return found
+
+    def label(self, name: str, start: int = 0) -> int:
+        """First statement labelled *name* at or after *start*, wrapping once."""
+        found = self._labels.get(name.upper())
+        if self._start > 0 or self._stop < len(self.stmts):
+            k = bisect_left(found, start) if found else 0
+            if self._start <= start and k < len(found or ()):
+                return found[k]
+            return find_label(self.stmts, name, start)
+        if not found:
+            return -1
+        k = bisect_left(found, start % len(self.stmts))
+        return found[k] if k < len(found) else found[0]
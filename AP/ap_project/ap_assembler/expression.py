@@ -47,7 +47,7 @@ from __future__ import annotations
 
 from typing import List, Optional, Tuple
 
-from .lexer import TT, Token
+from .lexer import TT, Token, TokenList
 from .value import (
     Value, ValueKind, Resolution,
     AssemblerError,
@@ -92,6 +92,126 @@ from .symbol_table import SymbolTable
 # Addressing functions that receive one argument
 _ADDR_FUNCS = frozenset({'BA', 'HA', 'WA', 'DA', 'ABSVAL'})
 
+# Proc-only intrinsics that are recognised but not yet implemented
+_STUB_INTRINSICS = frozenset({
+    'S:KEYS', 'S:NUMC', 'S:PT', 'S:UT', 'S:IFR', 'S:LFR', 'S:AAD', 'S:RAD',
+    'S:EXT', 'S:SUM', 'S:LIST', 'S:D', 'S:C', 'S:INT', 'S:FS', 'S:FL',
+    'S:FX', 'S:FR', 'S:DPI',
+})
+
+# Every NAME(...) form handled inside the evaluator rather than by symbol
+# lookup (an FNAME of the same name still takes precedence)
+_INTRINSICS = _ADDR_FUNCS | _STUB_INTRINSICS | frozenset({
+    'CS', 'S:UFV', 'NUM', 'SCOR', 'TCOR', 'S:S', 'AF', 'CF', 'LF', 'AFA',
+    'NAME',
+})
+
+# Argument fields a bare NUM(...) counts in the call frame
+_FRAME_FIELDS = frozenset({'AF', 'AFA', 'CF', 'LF'})
+
+
+# ---------------------------------------------------------------------------
+# Intrinsic semantics
+# ---------------------------------------------------------------------------
+#
+# The interpreter's ``_eval_*`` methods and the compiler's closures parse an
+# intrinsic's arguments in their own way and call these for the result.
+
+def _cs_value(v: Value) -> Value:
+    """``CS(v)`` — the control section number of a relocatable, else 0."""
+    if v.kind == ValueKind.RELOCATABLE:
+        return Value.absolute(v.csect)
+    return Value.absolute(0)
+
+
+def _ufv(v: Value) -> Value:
+    """``S:UFV(v)`` — *v*, with an undefined value read as 0."""
+    if v.kind == ValueKind.UNDEFINED:
+        return Value.absolute(0)
+    return v
+
+
+def _frame_count(field: str, frame) -> Value:
+    """Bare ``NUM(AF)`` / ``NUM(CF)`` / ``NUM(LF)`` — slots in *frame*."""
+    if field == 'CF':
+        return Value.absolute(frame.num_cf())
+    if field == 'LF':
+        return Value.absolute(len(frame.label_args))
+    return Value.absolute(frame.num_af())
+
+
+def _num_count(v: Value, frame) -> Value:
+    """``NUM(v)`` — list length, 1 for a scalar, the AF count for a blank."""
+    if v.kind == ValueKind.LIST:
+        return Value.absolute(len(v.items))
+    if v.kind in (ValueKind.BLANK, ValueKind.UNDEFINED):
+        # Bare AF with no frame: 0; with frame: argument count
+        if frame is not None:
+            return Value.absolute(frame.num_af())
+        return Value.absolute(0)
+    if v.kind == ValueKind.ABSOLUTE:
+        return Value.absolute(1)   # scalar = 1 element
+    return Value.absolute(0)
+
+
+def _scor_index(first: Value, matches: List[Value]) -> Value:
+    """``SCOR`` — 1-based position of *first* in *matches*, or 0.
+
+    Blank entries never match.
+    """
+    if first.kind not in (ValueKind.ABSOLUTE, ValueKind.CHARSTR):
+        return Value.absolute(0)
+    for i, candidate in enumerate(matches, start=1):
+        if candidate.kind == ValueKind.BLANK:
+            continue
+        if candidate.kind == first.kind and candidate.int_val == first.int_val:
+            return Value.absolute(i)
+        # Also match CHARSTR vs raw symbol name comparisons
+        if (candidate.kind == ValueKind.CHARSTR
+                and first.kind == ValueKind.CHARSTR
+                and candidate.raw == first.raw):
+            return Value.absolute(i)
+    return Value.absolute(0)
+
+
+def _ss_select(args: List[Value]) -> Value:
+    """Fallback ``S:S(cond, t, f)`` — *t* if *cond* is true, else *f*."""
+    args = args + [Value.blank()] * (3 - len(args))
+    cond, true_val, false_val = args[0], args[1], args[2]
+    # Condition is true if non-zero absolute, or RELOCATABLE/EXTERNAL
+    if cond.kind == ValueKind.ABSOLUTE:
+        return true_val if cond.int_val != 0 else false_val
+    if cond.kind in (ValueKind.BLANK, ValueKind.UNDEFINED):
+        return false_val
+    return true_val   # RELOCATABLE etc. treated as true
+
+
+def _frame_arg(field: str, idx_val: Value, frame, sym: SymbolTable,
+               line_no: int) -> Value:
+    """``AF(n)`` / ``CF(n)`` / ``LF(n)`` / ``AFA(n)`` — the n-th argument of
+    *field* in *frame*, evaluated; a blank index gives all of ``AF``."""
+    if frame is None:
+        return Value.undefined()
+
+    if idx_val.kind == ValueKind.BLANK:
+        # AF with no index: evaluate all args as a list
+        if field == 'AF':
+            items = [evaluate_arg(a, sym, line_no, frame)[0]
+                     for a in frame.oprnd_args]
+            return Value.list_val(items) if items else Value.blank()
+        return Value.blank()
+
+    n = idx_val.int_val if idx_val.kind == ValueKind.ABSOLUTE else 1
+    if field in ('AF', 'AFA'):
+        toks = frame.get_af(n)
+    elif field == 'CF':
+        toks = frame.get_cf(n)
+    else:  # LF
+        toks = frame.get_lf(n)
+    if not toks:
+        return Value.blank()
+    return evaluate_arg(toks, sym, line_no, frame)[0]
+
 
 # ---------------------------------------------------------------------------
 # Expression evaluator
@@ -160,18 +280,14 @@ class ExpressionEvaluator:
 
         if first.type == TT.LIT_EQ:
             self._consume()
-            inner = self._parse_or()
-            return Value(kind=ValueKind.ABSOLUTE,
-                         int_val=0,
-                         raw=('literal', inner))  # placeholder; real literal handling in gen pass
+            # The GEN pass places the literal and patches the reference
+            return Value.literal(self._parse_or())
 
         if first.type == TT.LIT_L:
             self._consume()   # consume L(
             inner = self._parse_or()
             self._expect(TT.RPAREN)
-            return Value(kind=ValueKind.ABSOLUTE,
-                         int_val=0,
-                         raw=('literal', inner))
+            return Value.literal(inner)
 
         return self._parse_or()
 
@@ -464,15 +580,11 @@ class ExpressionEvaluator:
             self._consume()          # consume L(
             inner = self._parse_or()
             self._expect(TT.RPAREN)
-            # Return a placeholder; the literal pool is built in the gen pass
-            return Value(kind=ValueKind.ABSOLUTE, int_val=0,
-                         raw=('literal', inner))
+            return Value.literal(inner)
 
         if tok.type == TT.LIT_EQ:
             self._consume()
-            inner = self._parse_or()
-            return Value(kind=ValueKind.ABSOLUTE, int_val=0,
-                         raw=('literal', inner))
+            return Value.literal(self._parse_or())
 
         # --- Symbol reference (includes addressing functions and % / %%) --
         if tok.type == TT.SYMBOL:
@@ -543,21 +655,7 @@ class ExpressionEvaluator:
             if (_entry is not None
                     and _entry.proc_body is not None
                     and _entry.proc_body.is_fname):
-                _arg_lists = []
-                while True:
-                    _tok = self._peek()
-                    if _tok is None or _tok.type == TT.RPAREN:
-                        break
-                    _arg_toks = self._collect_arg_tokens()
-                    _arg_lists.append(_arg_toks)
-                    _nxt = self._peek()
-                    if _nxt is not None and _nxt.type == TT.COMMA:
-                        self._consume()
-                    elif _nxt is None or _nxt.type == TT.RPAREN:
-                        break
-                    else:
-                        self._consume()   # no progress — skip to avoid loop
-                self._expect(TT.RPAREN)
+                _arg_lists = self._collect_arg_lists()
                 return self._executor._exec_fname(
                     _entry.proc_body, _arg_lists, self._frame, self._line_no)
 
@@ -576,9 +674,7 @@ class ExpressionEvaluator:
         if upper == 'CS':
             arg = self._parse_or()
             self._expect(TT.RPAREN)
-            if arg.kind == ValueKind.RELOCATABLE:
-                return Value.absolute(arg.csect)
-            return Value.absolute(0)
+            return _cs_value(arg)
 
         # --- S:UFV() — evaluate suppressing UNDEFINED errors ---------------
         # AP: ``UFVINTRINSIC`` (apdgctt.txt ~line 5590), dispatched via SC7%JUMP.
@@ -590,10 +686,7 @@ class ExpressionEvaluator:
         if upper == 'S:UFV':
             arg = self._parse_or()
             self._expect(TT.RPAREN)
-            # If the result is UNDEFINED, treat as 0 (forward-value semantics)
-            if arg.kind == ValueKind.UNDEFINED:
-                return Value.absolute(0)
-            return arg
+            return _ufv(arg)
 
         # --- NUM() — argument count ----------------------------------------
         # AP: ``NUMINTRINSIC`` (apdgctt.txt ~line 5308), dispatched via SC7%JUMP.
@@ -646,32 +739,13 @@ class ExpressionEvaluator:
         # (external reference), S:SUM/S:LIST (structure builders), S:D/S:C/S:INT
         # (type coercions), S:FS/S:FL/S:FX/S:FR/S:DPI (float conversions).
         # All dispatched via SC7%JUMP (~line 5291).  Not yet implemented.
-        if upper in ('S:KEYS', 'S:NUMC', 'S:PT', 'S:UT', 'S:IFR',
-                      'S:LFR', 'S:AAD', 'S:RAD', 'S:EXT', 'S:SUM',
-                      'S:LIST', 'S:D', 'S:C', 'S:INT', 'S:FS', 'S:FL',
-                      'S:FX', 'S:FR', 'S:DPI'):
+        if upper in _STUB_INTRINSICS:
             self._skip_to_rparen()
             return Value.undefined()
 
         # --- FNAME call: SYMBOL(args) where SYMBOL is a function procedure ---
         # Collect the argument token lists (comma-separated inside the parens).
-        arg_lists = []
-        while True:
-            tok = self._peek()
-            if tok is None or tok.type == TT.RPAREN:
-                break   # end of stream or closing paren — stop collecting
-            arg_toks = self._collect_arg_tokens()
-            arg_lists.append(arg_toks)
-            nxt = self._peek()
-            if nxt is not None and nxt.type == TT.COMMA:
-                self._consume()
-            elif nxt is None or nxt.type == TT.RPAREN:
-                break   # nothing left or closing paren reached
-            else:
-                # Unexpected token — _collect_arg_tokens made no progress;
-                # consume it to avoid an infinite loop.
-                self._consume()
-        self._expect(TT.RPAREN)
+        arg_lists = self._collect_arg_lists()
 
         entry = self._sym.lookup(name)
         if entry is None:
@@ -693,18 +767,6 @@ class ExpressionEvaluator:
     # Procedure intrinsic helpers
     # ------------------------------------------------------------------
 
-    def _eval_arg_toks(self, tok_lists: list) -> Value:
-        """Evaluate the first token list in *tok_lists* and return its Value.
-
-        Helper used internally when AF/AFA returns a list of argument token
-        lists and we need to reduce one to a Value.
-        """
-        if not tok_lists:
-            return Value.blank()
-        v, _ = evaluate_arg(tok_lists[0], self._sym,
-                             line_no=self._line_no, call_frame=self._frame)
-        return v
-
     def _eval_arg_intrinsic(self, upper: str) -> Value:
         """Evaluate ``AF(n)``, ``CF(n)``, ``LF(n)``, or bare ``AFA``.
 
@@ -723,39 +785,10 @@ class ExpressionEvaluator:
 
         Outside an active procedure frame all forms return ``Value.undefined()``.
         """
-        # Collect the subscript index if present
-        idx_val = self._parse_or()
-        # Handle optional second subscript for AF(n) within NUM-count forms
-        while self._peek() is not None and self._peek().type == TT.COMMA:
-            self._consume()
-            self._parse_or()   # discard extra subscripts for now
-        self._expect(TT.RPAREN)
-
-        if self._frame is None:
-            return Value.undefined()
-
-        if idx_val.kind == ValueKind.BLANK:
-            # AF with no index: evaluate all args as a list
-            if upper == 'AF':
-                items = [self._eval_arg_toks([a])
-                         for a in self._frame.oprnd_args]
-                return Value.list_val(items) if items else Value.blank()
-            return Value.blank()
-
-        n = idx_val.int_val if idx_val.kind == ValueKind.ABSOLUTE else 1
-
-        if upper in ('AF', 'AFA'):
-            toks = self._frame.get_af(n)
-        elif upper == 'CF':
-            toks = self._frame.get_cf(n)
-        else:  # LF
-            toks = self._frame.get_lf(n)
-
-        if not toks:
-            return Value.blank()
-        v, _ = evaluate_arg(toks, self._sym,
-                             line_no=self._line_no, call_frame=self._frame)
-        return v
+        # Extra subscripts (AF(n, m) within NUM-count forms) are discarded
+        idx_val = self._parse_args()[0]
+        return _frame_arg(upper, idx_val, self._frame, self._sym,
+                          self._line_no)
 
     def _eval_num(self) -> Value:
         """``NUM(expr)`` — count the items in an expression.
@@ -778,46 +811,17 @@ class ExpressionEvaluator:
         the AP encoding where ``AF`` alone is a special encoded token, not a
         symbol+subscript pair.
         """
-        # Peek: is the argument a bare AF / CF / LF (no subscript)?
-        # These are frame-specific; outside a procedure they return 0.
-        if self._frame is not None:
-            tok = self._peek()
-            if tok is not None and tok.type == TT.SYMBOL:
-                upper = tok.value.upper()
-                next_tok = self._tokens[self._pos + 1]                     if self._pos + 1 < len(self._tokens) else None
-                if upper in ('AF', 'AFA') and (
-                        next_tok is None or next_tok.type == TT.RPAREN):
-                    self._consume()
-                    self._expect(TT.RPAREN)
-                    return Value.absolute(self._frame.num_af())
-                if upper == 'CF' and (
-                        next_tok is None or next_tok.type == TT.RPAREN):
-                    self._consume()
-                    self._expect(TT.RPAREN)
-                    return Value.absolute(self._frame.num_cf())
-                if upper == 'LF' and (
-                        next_tok is None or next_tok.type == TT.RPAREN):
-                    self._consume()
-                    self._expect(TT.RPAREN)
-                    return Value.absolute(len(self._frame.label_args))
-
-        # General case: evaluate the inner expression
-        inner = self._parse_or()
-        while self._peek() is not None and self._peek().type == TT.COMMA:
+        # A bare AF / CF / LF (no subscript) counts the frame's slots;
+        # outside a procedure it is evaluated as a symbol like any other.
+        field = self._bare_frame_field()
+        if field is not None and self._frame is not None:
             self._consume()
-            self._parse_or()
-        self._expect(TT.RPAREN)
+            self._expect(TT.RPAREN)
+            return _frame_count(field, self._frame)
 
-        if inner.kind == ValueKind.LIST:
-            return Value.absolute(len(inner.items))
-        if inner.kind in (ValueKind.BLANK, ValueKind.UNDEFINED):
-            # Bare AF with no frame: 0; with frame: argument count
-            if self._frame is not None:
-                return Value.absolute(self._frame.num_af())
-            return Value.absolute(0)
-        if inner.kind == ValueKind.ABSOLUTE:
-            return Value.absolute(1)   # scalar = 1 element
-        return Value.absolute(0)
+        # General case: evaluate the inner expression
+        inner = self._parse_args()[0]
+        return _num_count(inner, self._frame)
 
     def _eval_scor(self) -> Value:
         """``SCOR(x, k1, k2, ..., kn)`` — search list, return 1-based position.
@@ -836,32 +840,9 @@ class ExpressionEvaluator:
         returns the index of the condition-code keyword, which then becomes
         the bit-field value OR'd into the branch instruction word.
         """
-        first = self._parse_or()   # the value to search for
-        matches = []
-        while self._peek() is not None and self._peek().type == TT.COMMA:
-            self._consume()   # eat the comma
-            # A blank argument is two consecutive commas — peek ahead
-            nxt = self._peek()
-            if nxt is not None and nxt.type in (TT.COMMA, TT.RPAREN):
-                matches.append(Value.blank())
-            else:
-                matches.append(self._parse_or())
-        self._expect(TT.RPAREN)
-
-        if first.kind not in (ValueKind.ABSOLUTE, ValueKind.CHARSTR):
-            return Value.absolute(0)
-
-        for i, candidate in enumerate(matches, start=1):
-            if candidate.kind == ValueKind.BLANK:
-                continue
-            if candidate.kind == first.kind and candidate.int_val == first.int_val:
-                return Value.absolute(i)
-            # Also match CHARSTR vs raw symbol name comparisons
-            if (candidate.kind == ValueKind.CHARSTR
-                    and first.kind == ValueKind.CHARSTR
-                    and candidate.raw == first.raw):
-                return Value.absolute(i)
-        return Value.absolute(0)
+        first, keys = self._parse_scor_args()
+        return _scor_index(first, [Value.blank() if k is None else k
+                                   for k in keys])
 
     def _eval_ss(self) -> Value:
         """Fallback stub for ``S:S`` when no FNAME body is available.
@@ -881,26 +862,49 @@ class ExpressionEvaluator:
         use ``t`` is the desired true-branch value at position 2 when cond=0).
         In practice, always prefer the FNAME path by loading ap-ilnotese first.
         """
-        args = []
-        # First arg
-        args.append(self._parse_or())
+        return _ss_select(self._parse_args())
+
+    # ------------------------------------------------------------------
+    # Argument parsing
+    # ------------------------------------------------------------------
+
+    def _parse_args(self) -> list:
+        """Comma-separated expressions up to and including the RPAREN."""
+        args = [self._parse_or()]
         while self._peek() is not None and self._peek().type == TT.COMMA:
             self._consume()
             args.append(self._parse_or())
         self._expect(TT.RPAREN)
+        return args
 
-        # Pad to 3
-        while len(args) < 3:
-            args.append(Value.blank())
-
-        cond, true_val, false_val = args[0], args[1], args[2]
+    def _parse_scor_args(self) -> Tuple[object, list]:
+        """``SCOR`` arguments: the value sought and the keys, up to and
+        including the RPAREN.
 
-        # Condition is true if non-zero absolute, or RELOCATABLE/EXTERNAL
-        if cond.kind == ValueKind.ABSOLUTE:
-            return true_val if cond.int_val != 0 else false_val
-        if cond.kind in (ValueKind.BLANK, ValueKind.UNDEFINED):
-            return false_val
-        return true_val   # RELOCATABLE etc. treated as true
+        A blank key (two consecutive commas, or a comma before the RPAREN)
+        is returned as ``None``.
+        """
+        first = self._parse_or()
+        keys = []
+        while self._peek() is not None and self._peek().type == TT.COMMA:
+            self._consume()
+            nxt = self._peek()
+            if nxt is not None and nxt.type in (TT.COMMA, TT.RPAREN):
+                keys.append(None)
+            else:
+                keys.append(self._parse_or())
+        self._expect(TT.RPAREN)
+        return first, keys
+
+    def _bare_frame_field(self) -> Optional[str]:
+        """The name at the cursor if it is a bare ``AF``/``AFA``/``CF``/``LF``
+        closing a ``NUM(`` argument, else None."""
+        tok, next_tok = self._peek(), self._peek(1)
+        if (tok is not None and tok.type == TT.SYMBOL
+                and (next_tok is None or next_tok.type == TT.RPAREN)
+                and tok.value.upper() in _FRAME_FIELDS):
+            return tok.value.upper()
+        return None
 
     def _skip_to_rparen(self) -> None:
         """Consume tokens up to and including the matching RPAREN.
@@ -919,6 +923,30 @@ class ExpressionEvaluator:
             elif tok.type == TT.RPAREN:
                 depth -= 1
 
+    def _collect_arg_lists(self) -> List[List[Token]]:
+        """Collect the comma-separated argument token lists of ``NAME(...)``.
+
+        Called with the LPAREN already consumed; consumes up to and
+        including the closing RPAREN.
+        """
+        arg_lists = []
+        while True:
+            tok = self._peek()
+            if tok is None or tok.type == TT.RPAREN:
+                break   # end of stream or closing paren — stop collecting
+            arg_lists.append(self._collect_arg_tokens())
+            nxt = self._peek()
+            if nxt is not None and nxt.type == TT.COMMA:
+                self._consume()
+            elif nxt is None or nxt.type == TT.RPAREN:
+                break   # nothing left or closing paren reached
+            else:
+                # Unexpected token — _collect_arg_tokens made no progress;
+                # consume it to avoid an infinite loop.
+                self._consume()
+        self._expect(TT.RPAREN)
+        return arg_lists
+
     def _collect_arg_tokens(self) -> List[Token]:
         """Collect tokens for one FNAME argument, respecting paren depth.
 
@@ -932,7 +960,7 @@ class ExpressionEvaluator:
         must re-discover argument boundaries when invoking FNAME bodies inline
         from within expression evaluation.
         """
-        toks: List[Token] = []
+        toks: List[Token] = TokenList()
         depth = 0
         while self._pos < len(self._tokens):
             tok = self._peek()
@@ -951,6 +979,366 @@ class ExpressionEvaluator:
         return toks
 
 
+# ---------------------------------------------------------------------------
+# Compiled expressions
+# ---------------------------------------------------------------------------
+#
+# The same argument token lists are evaluated again and again: once in the
+# DEF pass, again in the GEN pass, on every DO iteration and on every call
+# of the procedure whose body holds them.  ``compile_arg`` parses a token
+# list once into a tree of closures; evaluating the tree only fetches the
+# current symbol values and applies the operators.  A compiled form is kept
+# on its TokenList, so every evaluation of a Statement's argument (or of a
+# call site's AF/CF/LF list) shares one, and it is freed with the statement.
+
+class _Uncompilable(Exception):
+    """The parse of a token list would depend on symbol-table state."""
+
+
+class _EvalContext:
+    """Run-time inputs of a compiled expression."""
+
+    __slots__ = ('sym', 'frame', 'executor', 'line_no')
+
+    def __init__(self, sym: SymbolTable, frame, executor, line_no: int):
+        self.sym      = sym
+        self.frame    = frame
+        self.executor = executor
+        self.line_no  = line_no
+
+
+def _blank(c: _EvalContext) -> Value:
+    return Value.blank()
+
+
+def _literal(inner):
+    return lambda c: Value.literal(inner(c))
+
+
+def _int_op(op: str, lhs, rhs):
+    return lambda c: _int_binop(op, lhs(c), rhs(c))
+
+
+def _add_op(sign: int, lhs, rhs):
+    return lambda c: _add_values(lhs(c), rhs(c), sign)
+
+
+_OR_OPS      = {TT.XOR_OP: '||', TT.OR_OP: '|'}
+_AND_OPS     = {TT.AND_OP: '&'}
+_COMPARE_OPS = {TT.EQ_OP: '=', TT.NEQ_OP: '~=', TT.GTE_OP: '>=',
+                TT.LTE_OP: '<=', TT.GT_OP: '>', TT.LT_OP: '<'}
+_ADD_OPS     = {TT.PLUS: +1, TT.MINUS: -1}
+_MUL_OPS     = {TT.SCALE: '**', TT.MULTIPLY: '*', TT.COVDIV: '//',
+                TT.DIVIDE: '/'}
+
+_TYPED_CONSTANTS = {TT.PKDEC: Value.pkdec, TT.CHARSTR: Value.charstr,
+                    TT.FX: Value.fx, TT.FS: Value.fs, TT.FL: Value.fl}
+
+
+class _ExpressionCompiler(ExpressionEvaluator):
+    """
+    Parses a token list with the ExpressionEvaluator grammar, but returns a
+    closure ``fn(context) -> Value`` from each ``_parse_*`` method instead
+    of a Value.
+
+    The closures evaluate operands and apply operators in exactly the order
+    the interpreter does, so symbol creation, FNAME calls and
+    ``AssemblerError`` happen at the same points.  The two run-time
+    decisions the interpreter makes while parsing — whether ``NAME(...)``
+    is an FNAME, and whether ``NUM(AF)`` sees a call frame — are compiled
+    as tests inside the closure.
+    """
+
+    def __init__(self, tokens: List[Token]):
+        super().__init__(tokens, None)
+
+    def compile(self):
+        """Return the closure for the whole argument (cf. ``evaluate``)."""
+        first = self._peek()
+        if first is None or first.type == TT.BLANK_ARG:
+            return _blank
+        if first.type == TT.INDIRECT:
+            self._consume()
+            return self._parse_or()
+        if first.type == TT.LIT_EQ:
+            self._consume()
+            return _literal(self._parse_or())
+        if first.type == TT.LIT_L:
+            self._consume()
+            inner = self._parse_or()
+            self._expect(TT.RPAREN)
+            return _literal(inner)
+        return self._parse_or()
+
+    # ------------------------------------------------------------------
+    # Operator levels
+    # ------------------------------------------------------------------
+
+    def _binary(self, operand, ops: dict, combine):
+        lhs = operand()
+        while True:
+            tok = self._peek()
+            if tok is None or tok.type not in ops:
+                return lhs
+            self._consume()
+            lhs = combine(ops[tok.type], lhs, operand())
+
+    def _parse_or(self):
+        return self._binary(self._parse_and, _OR_OPS, _int_op)
+
+    def _parse_and(self):
+        return self._binary(self._parse_compare, _AND_OPS, _int_op)
+
+    def _parse_compare(self):
+        return self._binary(self._parse_add, _COMPARE_OPS, _int_op)
+
+    def _parse_add(self):
+        return self._binary(self._parse_mul, _ADD_OPS, _add_op)
+
+    def _parse_mul(self):
+        return self._binary(self._parse_unary, _MUL_OPS, _int_op)
+
+    def _parse_unary(self):
+        tok = self._peek()
+        if tok is None:
+            return _blank
+        if tok.type == TT.MINUS:
+            self._consume()
+            operand = self._parse_unary()
+            return lambda c: _negate(operand(c))
+        if tok.type == TT.COMPLEMENT:
+            self._consume()
+            operand = self._parse_unary()
+            return lambda c: _complement(operand(c))
+        if tok.type == TT.PLUS:
+            self._consume()
+            return self._parse_unary()
+        return self._parse_primary()
+
+    # ------------------------------------------------------------------
+    # Primaries
+    # ------------------------------------------------------------------
+
+    def _parse_primary(self):
+        tok = self._peek()
+        if tok is None:
+            return _blank
+        self._consume()
+        tt, value = tok.type, tok.value
+
+        if tt in (TT.INT, TT.HEX, TT.OCT):
+            v = Value.absolute(value)       # Values are never modified
+            return lambda c: v
+
+        if tt in _TYPED_CONSTANTS:
+            make = _TYPED_CONSTANTS[tt]
+            return lambda c: make(value)
+
+        if tt == TT.LPAREN:
+            first = self._parse_or()
+            if self._peek() is not None and self._peek().type == TT.COMMA:
+                items = [first]
+                while self._peek() is not None and self._peek().type == TT.COMMA:
+                    self._consume()
+                    items.append(self._parse_or())
+                self._expect(TT.RPAREN)
+                return lambda c: Value.list_val([f(c) for f in items])
+            self._expect(TT.RPAREN)
+            return first
+
+        if tt == TT.LIT_L:
+            inner = self._parse_or()
+            self._expect(TT.RPAREN)
+            return _literal(inner)
+
+        if tt == TT.LIT_EQ:
+            return _literal(self._parse_or())
+
+        if tt == TT.SYMBOL:
+            name = value
+            next_tok = self._peek()
+            if next_tok is not None and next_tok.type == TT.LPAREN:
+                return self._parse_function_or_subscript(name)
+            if name == '%':
+                return lambda c: c.sym.dollar_value()
+            if name == '%%':
+                return lambda c: c.sym.dollar_dollar_value()
+            if name == 'META':
+                return lambda c: Value.absolute(0)
+            if name == 'NAME':
+                return lambda c: (c.frame.body.name_value
+                                  if c.frame is not None
+                                  else c.sym.lookup_or_create(name).value)
+            return lambda c: c.sym.lookup_or_create(name).value
+
+        return _blank
+
+    def _parse_function_or_subscript(self, name: str):
+        """
+        ``NAME(args)``.  An FNAME body always wins, so for an intrinsic name
+        the closure first checks the symbol table for an FNAME of that name;
+        both readings must end at the same token or the argument is left to
+        the interpreter.
+        """
+        upper = name.upper()
+        self._consume()  # consume LPAREN
+        start = self._pos
+        arg_lists = self._collect_arg_lists()
+
+        if upper not in _INTRINSICS:
+            def call_or_subscript(c):
+                entry = c.sym.lookup(name)
+                if entry is None:
+                    c.sym.lookup_or_create(name)
+                    return Value.undefined()
+                if (entry.proc_body is not None and entry.proc_body.is_fname
+                        and c.executor is not None):
+                    return c.executor._exec_fname(entry.proc_body, arg_lists,
+                                                  c.frame, c.line_no)
+                indices = [evaluate_arg(a, c.sym, c.line_no, c.frame)[0]
+                           for a in arg_lists]
+                return _subscript(entry.value, indices)
+            return call_or_subscript
+
+        fname_end = self._pos
+        self._pos = start
+        intrinsic = self._compile_intrinsic(upper)
+        if self._pos != fname_end:
+            raise _Uncompilable(name)
+
+        def call_or_intrinsic(c):
+            if c.executor is not None:
+                entry = c.sym.lookup(name)
+                if (entry is not None and entry.proc_body is not None
+                        and entry.proc_body.is_fname):
+                    return c.executor._exec_fname(entry.proc_body, arg_lists,
+                                                  c.frame, c.line_no)
+            return intrinsic(c)
+        return call_or_intrinsic
+
+    def _compile_intrinsic(self, upper: str):
+        """Closure for an intrinsic (cf. ``_parse_function_or_subscript``)."""
+        if upper in _ADDR_FUNCS:
+            arg = self._parse_or()
+            self._expect(TT.RPAREN)
+            return lambda c: apply_address_function(upper, arg(c))
+
+        if upper == 'CS':
+            arg = self._parse_or()
+            self._expect(TT.RPAREN)
+            return lambda c: _cs_value(arg(c))
+
+        if upper == 'S:UFV':
+            arg = self._parse_or()
+            self._expect(TT.RPAREN)
+            return lambda c: _ufv(arg(c))
+
+        if upper == 'NUM':
+            return self._compile_num()
+
+        if upper == 'SCOR':
+            return self._compile_scor()
+
+        if upper == 'TCOR':
+            self._skip_to_rparen()
+            return lambda c: Value.absolute(0)
+
+        if upper == 'S:S':
+            args = self._parse_args()
+            return lambda c: _ss_select([f(c) for f in args])
+
+        if upper in ('AF', 'CF', 'LF', 'AFA'):
+            return self._compile_arg_intrinsic(upper)
+
+        if upper == 'NAME':
+            self._skip_to_rparen()
+            return lambda c: (c.frame.body.name_value if c.frame is not None
+                              else Value.blank())
+
+        # _STUB_INTRINSICS
+        self._skip_to_rparen()
+        return lambda c: Value.undefined()
+
+    def _compile_arg_intrinsic(self, upper: str):
+        """``AF(n)`` / ``CF(n)`` / ``LF(n)`` / ``AFA(n)``."""
+        index, *extra = self._parse_args()
+
+        def arg_field(c):
+            idx_val = index(c)
+            for f in extra:
+                f(c)
+            return _frame_arg(upper, idx_val, c.frame, c.sym, c.line_no)
+        return arg_field
+
+    def _compile_num(self):
+        """``NUM(expr)``; bare ``AF``/``CF``/``LF`` count the frame's slots."""
+        field = self._bare_frame_field()
+        inner, *extra = self._parse_args()
+
+        def num(c):
+            if field is not None and c.frame is not None:
+                return _frame_count(field, c.frame)
+            v = inner(c)
+            for f in extra:
+                f(c)
+            return _num_count(v, c.frame)
+        return num
+
+    def _compile_scor(self):
+        """``SCOR(x, k1, ..., kn)``; blank keys never match."""
+        first, keys = self._parse_scor_args()
+
+        def scor(c):
+            x = first(c)
+            return _scor_index(x, [Value.blank() if k is None else k(c)
+                                   for k in keys])
+        return scor
+
+
+class CompiledExpr:
+    """
+    One argument-position token list, parsed once.
+
+    ``evaluate`` takes the same inputs as ``ExpressionEvaluator`` and
+    returns the same Value.  A token list the compiler cannot represent is
+    evaluated by the interpreter instead.
+    """
+
+    __slots__ = ('tokens', '_fn')
+
+    def __init__(self, tokens: List[Token]):
+        self.tokens = tokens
+        try:
+            self._fn = _ExpressionCompiler(tokens).compile()
+        except _Uncompilable:
+            self._fn = None
+
+    @property
+    def is_compiled(self) -> bool:
+        return self._fn is not None
+
+    def evaluate(self, sym: SymbolTable, line_no: int = 0,
+                 call_frame=None, executor=None) -> Value:
+        if self._fn is None:
+            return ExpressionEvaluator(self.tokens, sym, line_no,
+                                       call_frame=call_frame,
+                                       executor=executor).evaluate()
+        return self._fn(_EvalContext(sym, call_frame, executor, line_no))
+
+
+def compile_arg(tokens: List[Token]) -> CompiledExpr:
+    """
+    Return the CompiledExpr for *tokens*, compiling it on first use.  A
+    TokenList keeps its compiled form; any other list is compiled afresh.
+    """
+    ce = getattr(tokens, 'compiled', None)
+    if ce is None:
+        ce = CompiledExpr(tokens)
+        if type(tokens) is TokenList:
+            tokens.compiled = ce
+    return ce
+
+
 # ---------------------------------------------------------------------------
 # Convenience function
 # ---------------------------------------------------------------------------
@@ -961,7 +1349,8 @@ def evaluate_arg(tokens: List[Token], sym: SymbolTable,
                  executor=None) -> Tuple[Value, List[str]]:
     """Evaluate a single argument-position token list.
 
-    Top-level convenience wrapper around ``ExpressionEvaluator``.
+    Top-level convenience wrapper: the token list is compiled on first use
+    (``compile_arg``) and the compiled form kept on it is evaluated.
 
     AP: corresponds to calling ``EV1OPRNDEXP`` or ``EV%CLN%OPRND``
     (apdgctt.txt ~line 4557) for a single expression.
@@ -977,10 +1366,8 @@ def evaluate_arg(tokens: List[Token], sym: SymbolTable,
     assembler errors (division by zero, truncation) are returned as strings
     rather than raised, so partial results can still be used.
     """
-    ev = ExpressionEvaluator(tokens, sym, line_no, call_frame=call_frame,
-                             executor=executor)
     try:
-        v = ev.evaluate()
+        v = compile_arg(tokens).evaluate(sym, line_no, call_frame, executor)
     except AssemblerError as exc:
         return Value.undefined(), [str(exc)]
-    return v, ev.errors
+    return v, []
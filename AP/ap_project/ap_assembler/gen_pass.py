@@ -24,10 +24,30 @@ repetition produces its own listing line — matching the original behaviour.
 Byte representation of values
 ------------------------------
 * ABSOLUTE integer     → big-endian, sign-extended to ``nbytes``
-* RELOCATABLE address  → raw byte offset as an integer (relocation deferred)
+* RELOCATABLE address  → raw byte offset as an integer, plus a Relocation
+                         (in a GEN field: the offset in the value's units)
+* EXTERNAL / sum of addresses in several sections
+                       → zeros, plus a Relocation per symbol or section
 * CHARSTR 'text'       → ASCII bytes, left-justified, NUL-padded
 * PKDEC / FX / FS / FL → placeholder zeros (full encoding deferred)
 * UNDEFINED / BLANK    → zeros
+* literal =v / L(v)    → zeros, patched with the word address of v's entry
+                         in the literal pool once the pool is placed
+
+Literal pool
+------------
+Literal values are collected in ``self.literals`` (literal_pool.py), each
+distinct value once.  After END, or the last statement, the pool is
+assembled word-aligned into the current section, each entry listed on a
+line of its own, and every field that refers to a literal is patched with
+its entry's word address, and given a Relocation by the pool's section.
+
+Relocations
+-----------
+Every field that holds an address in a relocatable section, or an
+external symbol, gets a ``Relocation`` in the ObjectWriter so that the
+linker (linker.py) can rewrite it once the sections are laid out.
+Addresses in the absolute section (ASECT) are final and are not recorded.
 
 GEN bit-field packing
 ---------------------
@@ -39,14 +59,15 @@ preceding field, with the first field at the MSB of the first word.
 from __future__ import annotations
 
 import struct
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from .concordance import Concordance
 from .def_pass import DefPass, AssemblyError
-from .do_control import find_else_fin, find_pend, find_label
 from .expression import evaluate_arg
 from .lexer import Statement, TT, Token
 from .listing_writer import ListingWriter
-from .object_writer import ObjectWriter
+from .literal_pool import LiteralPool, literal_size
+from .object_writer import ObjectWriter, Relocation
 from .symbol_table import CsectKind, SymbolTable, PASS_GEN
 from .value import Value, ValueKind, Resolution
 
@@ -71,8 +92,9 @@ class GenPass(DefPass):
                  stmts:   List[Statement],
                  sym:     SymbolTable,
                  obj:     ObjectWriter,
-                 lst:     ListingWriter) -> None:
-        super().__init__(stmts, sym)
+                 lst:     ListingWriter,
+                 concordance: Optional[Concordance] = None) -> None:
+        super().__init__(stmts, sym, concordance)
         self._obj: ObjectWriter  = obj
         self._lst: ListingWriter = lst
 
@@ -80,6 +102,15 @@ class GenPass(DefPass):
         self._gen_bytes:  bytearray       = bytearray()
         self._list_value: Optional[int]   = None   # for EQU/SET display
 
+        # Literals, and the (entry, bit offset, width) of each literal
+        # reference in the bytes about to be emitted
+        self.literals: LiteralPool = LiteralPool()
+        self._literal_refs: List[Tuple[int, int, int]] = []
+
+        # Relocations of the bytes about to be emitted; byte_offset 0 is
+        # their first byte
+        self._relocs: List[Relocation] = []
+
     # ------------------------------------------------------------------
     # Public entry point
     # ------------------------------------------------------------------
@@ -101,6 +132,7 @@ class GenPass(DefPass):
                 # Comment or blank: add to listing without hex/address
                 self._lst.add_comment(stmt.line_no, stmt.source)
             self.pos += 1
+        self._place_literals()
         return self.errors
 
     # ------------------------------------------------------------------
@@ -123,6 +155,8 @@ class GenPass(DefPass):
         # Reset per-statement accumulators
         self._gen_bytes  = bytearray()
         self._list_value = None
+        self._literal_refs.clear()
+        self._relocs.clear()
 
         # Execute (may modify self._gen_bytes / self._list_value)
         super()._dispatch(stmt)
@@ -130,9 +164,8 @@ class GenPass(DefPass):
         # Determine hex display value
         hex_val = self._listing_hex()
 
-        # Attach any errors generated during this statement
-        errs = [str(e) for e in self.errors
-                if e.line_no == stmt.line_no]
+        # Attach the errors raised so far for this source line
+        errs = list(self._line_errors.get(stmt.line_no, ()))
 
         self._lst.add_line(
             line_no = stmt.line_no,
@@ -153,7 +186,19 @@ class GenPass(DefPass):
         execution LC, advance the LC, and accumulate bytes for the listing.
         """
         cs = self.sym.current_section
+        if self._literal_refs:
+            for entry, bit_offset, width in self._literal_refs:
+                self.literals.refer(entry, cs.number, cs.exec_lc,
+                                    bit_offset, width)
+            self._literal_refs.clear()
         self._obj.emit(cs.number, cs.exec_lc, data, cs.name)
+        if self._relocs:
+            sec = self._obj.get_section(cs.number)
+            if not sec.is_dummy:
+                for r in self._relocs:
+                    r.byte_offset += cs.exec_lc
+                    sec.add_reloc(r)
+            self._relocs = []
         self.sym.advance_lc(len(data))
         self._gen_bytes.extend(data)
 
@@ -166,6 +211,89 @@ class GenPass(DefPass):
             return first4.hex().upper()
         return None
 
+    # ------------------------------------------------------------------
+    # Literal pool
+    # ------------------------------------------------------------------
+
+    def _refer_literal(self, v: Value, bit_offset: int, width: int) -> None:
+        """
+        Add the literal *v* refers to to the pool, and note that the next
+        bytes emitted hold its address in a *width*-bit field *bit_offset*
+        bits from their start.
+        """
+        inner = v.raw[1]
+        if inner.kind in (ValueKind.LIST, ValueKind.COMPLEX_SUM) \
+                or inner.is_literal():
+            self._err(self._line_no(), "Literal must be a single value")
+            return
+        self._literal_refs.append((self.literals.add(inner),
+                                   bit_offset, width))
+
+    def _line_no(self) -> int:
+        """Line number of the statement being executed."""
+        if 0 <= self.pos < len(self.stmts):
+            return self.stmts[self.pos].line_no
+        return 0
+
+    def _place_literals(self) -> None:
+        """
+        Assemble the literal pool at the current location, as APEND does
+        at END, and patch every reference to it.  A DSECT has no object
+        bytes, so when one is current the pool goes at the end of the last
+        section that is not a DSECT.
+        """
+        if not self.literals:
+            return
+        cs = self.sym.current_section
+        if cs.kind == CsectKind.DSECT:
+            cs = next(s for s in reversed(self.sym.all_sections())
+                      if s.kind != CsectKind.DSECT)
+            self.sym.switch_to_section(cs.number)
+        self.sym.align_lc(4)
+        self.literals.place(cs.number, cs.exec_lc)
+        for v in self.literals.values:
+            lc = cs.exec_lc
+            self._gen_bytes = bytearray()
+            size = literal_size(v)
+            if v.kind == ValueKind.CHARSTR:
+                data = (v.raw or '').encode('ascii', errors='replace')
+                self._emit(data.ljust(size, b'\x00'))
+            else:
+                self._emit(self._value_to_bytes(v, size))
+            self._lst.add_line(line_no=0, hex_val=self._listing_hex(),
+                               section=cs.number, offset=lc,
+                               source='         LITERAL')
+        self.literals.patch(self._obj)
+
+    # ------------------------------------------------------------------
+    # Relocations
+    # ------------------------------------------------------------------
+
+    def _refer_address(self, v: Value, bit_offset: int, width: int,
+                       resolution: Resolution) -> None:
+        """
+        Note that the next bytes emitted hold the address *v* in a
+        *width*-bit field *bit_offset* bits from their start, in
+        *resolution* units.  Absolute addresses need no relocation.
+        """
+        relocs = self._relocs
+        if v.kind == ValueKind.RELOCATABLE:
+            if v.csect != 0:
+                relocs.append(Relocation(0, bit_offset, width, v.csect,
+                                         v.int_val, 1, resolution))
+        elif v.kind == ValueKind.EXTERNAL:
+            relocs.append(Relocation(0, bit_offset, width, 0, 0, 1,
+                                     resolution, v.name))
+        elif v.kind == ValueKind.COMPLEX_SUM:
+            constant = sum(ad.sign * ad.offset for ad in v.addends
+                           if ad.csect == 0)
+            for ad in v.addends:
+                if ad.csect != 0:
+                    relocs.append(Relocation(0, bit_offset, width, ad.csect,
+                                             ad.sign * ad.offset + constant,
+                                             ad.sign, resolution))
+                    constant = 0
+
     # ------------------------------------------------------------------
     # Value → bytes conversion
     # ------------------------------------------------------------------
@@ -180,6 +308,10 @@ class GenPass(DefPass):
         if nbytes <= 0:
             return b''
 
+        if v.raw is not None and v.is_literal():
+            self._refer_literal(v, 0, nbytes * 8)
+            return bytes(nbytes)
+
         if v.kind == ValueKind.ABSOLUTE:
             n = v.int_val
             # Sign-extend to nbytes using two's complement
@@ -188,10 +320,15 @@ class GenPass(DefPass):
             return n.to_bytes(nbytes, 'big', signed=False)[-nbytes:]
 
         if v.kind == ValueKind.RELOCATABLE:
-            # Emit raw byte offset; full relocation deferred to linker
+            # Emit raw byte offset; the linker adds the section's address
+            self._refer_address(v, 0, nbytes * 8, Resolution.BYTE)
             n = v.int_val & 0xFFFF_FFFF
             return n.to_bytes(4, 'big')[-nbytes:]
 
+        if v.kind in (ValueKind.EXTERNAL, ValueKind.COMPLEX_SUM):
+            self._refer_address(v, 0, nbytes * 8, Resolution.BYTE)
+            return b'\x00' * nbytes
+
         if v.kind == ValueKind.CHARSTR:
             raw = (v.raw or '').encode('ascii', errors='replace')
             raw = raw[:nbytes].ljust(nbytes, b'\x00')
@@ -227,11 +364,25 @@ class GenPass(DefPass):
             else:
                 val = Value.absolute(0)
 
-            raw_int = (val.int_val if val.kind == ValueKind.ABSOLUTE else 0)
+            kind = val.kind
+            if kind == ValueKind.ABSOLUTE:
+                raw_int = val.int_val
+            elif kind == ValueKind.RELOCATABLE:
+                raw_int = val.resolution.from_byte_offset(val.int_val)
+            else:
+                raw_int = 0
             mask    = (1 << width) - 1
             raw_int &= mask
 
             bit_cursor -= width
+            if kind == ValueKind.ABSOLUTE:
+                if val.raw is not None and val.is_literal():
+                    self._refer_literal(
+                        val, total_words * 32 - bit_cursor - width, width)
+            elif kind in (ValueKind.RELOCATABLE, ValueKind.EXTERNAL,
+                          ValueKind.COMPLEX_SUM):
+                self._refer_address(val, total_words * 32 - bit_cursor - width,
+                                    width, val.resolution)
             result |= raw_int << bit_cursor
 
         return result.to_bytes(total_words * 4, 'big')
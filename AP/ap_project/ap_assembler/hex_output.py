@@ -51,7 +51,8 @@ Unresolved relocations
 The assembler may produce relocatable values (symbol + section-relative
 offset) that a linker would normally patch.  These are emitted as their
 raw integer offset values.  A comment line summarises the number of
-unresolved relocation entries if any exist.
+unresolved relocation entries if any exist.  To resolve them, link the
+modules (linker.py) and write ``LinkedImage.to_object()`` instead.
 """
 
 from __future__ import annotations
@@ -0,0 +1,265 @@
+"""
+ap_assembler/incremental.py — Incremental reassembly from DEF-pass checkpoints.
+
+In an edit–assemble loop most of the source is unchanged between runs, yet
+DefPass starts again from statement 0.  IncrementalAssembler keeps copies of
+the DEF-pass state taken at regular statement intervals during the last
+assembly, and on the next one resumes DEF from the last checkpoint before
+the first statement that differs.  The GEN pass always runs in full: the
+symbol values it sees come from the end of DEF, which the edit may change.
+
+A checkpoint at statement p is only taken when the state there cannot
+depend on statements at or after p:
+
+  * the pass is at top level — main statement list, no DO frame, no
+    procedure call;
+  * no statement at or after p has been read, whether executed or looked
+    at (DO1 and CNAME scan ahead); and
+  * no DO/ELSE/FIN, PROC/PEND or GOTO lookup has returned an index at or
+    after p.  A GOTO that wraps around or fails depends on every statement.
+
+Once anything has depended on a statement beyond the current position, no
+checkpoint is taken until the pass has passed that statement.  The
+resumed result is therefore identical to a clean run.
+
+Statements are compared by value, so a source held as SourceRef (which
+compares by identity) never matches; tokenise with text sources.  The
+unchanged statements before and after the edit are replaced by their
+objects from the previous assembly, so GEN finds their arguments already
+compiled.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .def_pass import AssemblyError, DefPass
+from .do_control import BlockIndex
+from .gen_pass import GenPass
+from .lexer import Statement
+from .listing_writer import ListingWriter
+from .object_writer import ObjectWriter
+from .symbol_table import PASS_DEF, SymbolTable
+
+
+CHECKPOINT_INTERVAL = 2000   # statements between DEF-pass checkpoints
+
+
+# ---------------------------------------------------------------------------
+# Checkpoint
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Checkpoint:
+    """DEF-pass state just before statement *pos* is executed."""
+    pos:         int
+    sym:         SymbolTable
+    errors:      List[AssemblyError]
+    line_errors: Dict[int, List[str]]
+
+
+# ---------------------------------------------------------------------------
+# Reading ahead
+# ---------------------------------------------------------------------------
+
+class _WatchedStatements(list):
+    """The main statement list, recording the furthest index the pass read."""
+
+    def __init__(self, stmts: Sequence[Statement]) -> None:
+        super().__init__(stmts)
+        self.furthest = -1
+
+    def see(self, i: int) -> None:
+        if i > self.furthest:
+            self.furthest = i
+
+    def __getitem__(self, i):
+        if isinstance(i, int):
+            self.see(i if i >= 0 else len(self) + i)
+        else:
+            self.see(len(self))
+        return list.__getitem__(self, i)
+
+    def __iter__(self):
+        self.see(len(self))
+        return list.__iter__(self)
+
+
+class _WatchedIndex:
+    """A BlockIndex over the main list that reports how far each lookup saw."""
+
+    def __init__(self, index: BlockIndex, watched: _WatchedStatements) -> None:
+        self._index   = index
+        self._watched = watched
+
+    def else_fin(self, do_idx: int) -> Tuple[int, int]:
+        else_idx, fin_idx = self._index.else_fin(do_idx)
+        self._watched.see(max(else_idx, fin_idx))
+        return else_idx, fin_idx
+
+    def pend(self, opener_idx: int) -> int:
+        found = self._index.pend(opener_idx)
+        self._watched.see(found)
+        return found
+
+    def label(self, name: str, start: int = 0) -> int:
+        found = self._index.label(name, start)
+        # Not found, or found only by wrapping: every statement mattered
+        self._watched.see(found if found >= start else len(self._watched))
+        return found
+
+
+# ---------------------------------------------------------------------------
+# CheckpointingDefPass
+# ---------------------------------------------------------------------------
+
+class CheckpointingDefPass(DefPass):
+    """
+    A DefPass that records Checkpoints as it goes, and can start from one.
+
+    Usage::
+
+        dp = CheckpointingDefPass(stmts, sym)
+        errors = dp.run()
+        dp.checkpoints          # states at roughly every *interval* stmts
+    """
+
+    def __init__(self, stmts: List[Statement], sym: SymbolTable,
+                 interval: int = CHECKPOINT_INTERVAL) -> None:
+        self._watched = _WatchedStatements(stmts)
+        super().__init__(self._watched, sym)
+        self.interval = interval
+        self.checkpoints: List[Checkpoint] = []
+        self._main_index: Optional[BlockIndex] = None
+
+    def _blocks(self):
+        if self.stmts is not self._watched:
+            return super()._blocks()
+        if self._main_index is None:
+            self._main_index = BlockIndex(list.copy(self._watched))
+        return _WatchedIndex(self._main_index, self._watched)
+
+    def _at_checkpoint(self) -> bool:
+        return (self.stmts is self._watched and not self._do_stack
+                and not self._call_stack
+                and self._watched.furthest < self.pos)
+
+    def _take_checkpoint(self) -> None:
+        self.checkpoints.append(Checkpoint(
+            pos         = self.pos,
+            sym         = self.sym.copy(),
+            errors      = list(self.errors),
+            line_errors = {k: list(v) for k, v in self._line_errors.items()},
+        ))
+
+    def _restore(self, cp: Checkpoint) -> None:
+        """Start from *cp*, taken by the pass over an earlier version."""
+        sym = cp.sym.copy()
+        # Procedure bodies defined before the checkpoint lie wholly inside
+        # the unchanged prefix; point them at the new statement list.
+        for scope in (sym._globals, *sym._locals):
+            for entry in scope.values():
+                body = entry.proc_body
+                if (body is not None
+                        and isinstance(body.stmts, _WatchedStatements)):
+                    entry.proc_body = dataclasses.replace(body,
+                                                          stmts=self._watched)
+        # DefPass methods refer to self.sym; the caller's table is filled in
+        self.sym.__dict__.update(sym.__dict__)
+        self.errors = list(cp.errors)
+        self._line_errors = {k: list(v) for k, v in cp.line_errors.items()}
+        self.pos = cp.pos
+        self._watched.furthest = cp.pos - 1
+
+    def run(self, resume: Optional[Checkpoint] = None) -> List[AssemblyError]:
+        """
+        Execute the DEF pass, from the start or from *resume*: a checkpoint
+        of an earlier version whose statements before it are unchanged.
+        """
+        self.sym._pass = PASS_DEF
+        self.pos = 0
+        if resume is not None:
+            self._restore(resume)
+            self.checkpoints.append(resume)
+        next_at = self.pos + self.interval
+        while self.pos < len(self.stmts):
+            if self.pos >= next_at and self._at_checkpoint():
+                self._take_checkpoint()
+                next_at = self.pos + self.interval
+            stmt = self.stmts[self.pos]
+            if not stmt.is_comment and stmt.command is not None:
+                self._dispatch(stmt)
+            self.pos += 1
+        return self.errors
+
+
+# ---------------------------------------------------------------------------
+# IncrementalAssembler
+# ---------------------------------------------------------------------------
+
+def first_change(old: Sequence[Statement], new: Sequence[Statement]) -> int:
+    """Index of the first statement that differs (the shorter length if none)."""
+    n = min(len(old), len(new))
+    for i in range(n):
+        if old[i] != new[i]:
+            return i
+    return n
+
+
+class IncrementalAssembler:
+    """
+    Assembles successive versions of one source, resuming the DEF pass
+    from the checkpoints of the previous assembly.
+
+    Usage::
+
+        asm = IncrementalAssembler()
+        sym, obj, lst, def_errors, gen_errors = asm.assemble(stmts)
+        ...edit...
+        sym, obj, lst, def_errors, gen_errors = asm.assemble(new_stmts)
+        asm.resumed_at          # statement DEF resumed from (0 = clean)
+    """
+
+    def __init__(self, interval: int = CHECKPOINT_INTERVAL) -> None:
+        self.interval = interval
+        self.resumed_at = 0
+        self._stmts: list = []           # statements of the last assembly
+        self._checkpoints: List[Checkpoint] = []
+
+    def assemble(self, stmts: List[Statement]) -> Tuple[
+            SymbolTable, ObjectWriter, ListingWriter,
+            List[AssemblyError], List[AssemblyError]]:
+        """Both passes over *stmts*; returns (sym, obj, lst, def_errors, gen_errors)."""
+        stmts = list(stmts)
+        old = self._stmts
+        changed = first_change(old, stmts)
+        # Keep the previous Statement objects wherever the source is
+        # unchanged, so their compiled arguments are found in the cache
+        i, j = len(old), len(stmts)
+        while i > changed and j > changed and old[i - 1] == stmts[j - 1]:
+            i -= 1
+            j -= 1
+        stmts[:changed] = old[:changed]
+        stmts[j:] = old[i:]
+        resume = None
+        for cp in self._checkpoints:
+            if cp.pos <= changed:
+                resume = cp
+
+        sym = SymbolTable()
+        dp = CheckpointingDefPass(stmts, sym, self.interval)
+        def_errors = dp.run(resume)
+        self.resumed_at = resume.pos if resume else 0
+
+        obj = ObjectWriter()
+        lst = ListingWriter()
+        gen_errors = GenPass(stmts, sym, obj, lst).run()
+
+        # Checkpoints before the resume point are still valid; dp's list
+        # starts with the resume checkpoint itself
+        self._stmts = stmts
+        self._checkpoints = [cp for cp in self._checkpoints
+                             if resume and cp.pos < resume.pos] + dp.checkpoints
+        return sym, obj, lst, def_errors, gen_errors
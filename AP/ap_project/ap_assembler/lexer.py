@@ -41,9 +41,10 @@ Within the argument field the tokenizer recognises:
 from __future__ import annotations
 
 import re
+import sys
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Iterator, List, Optional, Tuple
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
 
 
 # ---------------------------------------------------------------------------
@@ -103,7 +104,7 @@ class TT(Enum):
 # Token and Statement dataclasses
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Token:
     """A single token from the argument field (or label/command field)."""
     type:  TT
@@ -119,7 +120,17 @@ class Token:
         return f"Token({self.type.name}, {self.value!r}, line={self.line}, col={self.col})"
 
 
-@dataclass
+class TokenList(list):
+    """
+    The tokens of one argument position.  ``compiled`` holds the list's
+    CompiledExpr once it has been evaluated (expression.compile_arg), so
+    the compiled form is kept with the statement that owns the list and
+    freed with it.
+    """
+    __slots__ = ('compiled',)
+
+
+@dataclass(slots=True)
 class Statement:
     """One logical AP source statement (may span several physical lines)."""
     line_no:    int              # major line number (source file line)
@@ -131,9 +142,121 @@ class Statement:
                                  # list containing BLANK_ARG means that position
                                  # was explicitly blank.
     comment:    str              # raw comment text (after argument field)
-    source:     str              # joined source text of all physical lines
+    source:     Union[str, SourceRef]
+                                 # joined source text of all physical lines,
+                                 # or a SourceRef that reads it back on demand
     is_comment: bool             # True for whole-line comment (*...)
 
+    # Parsed once from command/label (below) so that the passes never split
+    # or re-tokenise these fields when a statement is executed again.
+    base:       str              = field(init=False, repr=False, compare=False)
+                                 # upper-case command name before the first ','
+    modifier:   str              = field(init=False, repr=False, compare=False)
+                                 # command text after the first ',' ('' if none)
+    mod_args:   List[List[Token]] = field(init=False, repr=False, compare=False)
+                                 # modifier tokenised into argument positions
+    label_args: List[List[Token]] = field(init=False, repr=False, compare=False)
+                                 # label field tokenised (LF of a procedure call)
+    handler:    Optional[str]    = field(default=None, init=False, repr=False,
+                                         compare=False)
+                                 # DefPass handler-method name for base, '' if
+                                 # none; None until the first dispatch resolves it
+    _cmd_args:  Optional[List[List[Token]]] = field(default=None, init=False,
+                                                    repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        base, _, self.modifier = (self.command or '').partition(',')
+        self.base = sys.intern(base.upper())
+        self.mod_args = (ArgTokenizer(self.modifier, self.line_no, 0).tokenize()
+                         if self.modifier else _NO_ARGS)
+        self.label_args = (ArgTokenizer(self.label, self.line_no, 0).tokenize()
+                           if self.label else _NO_ARGS)
+
+    @property
+    def cmd_args(self) -> List[List[Token]]:
+        """
+        CF of a procedure call: [[base symbol]] + mod_args ([] for a
+        comment/blank statement).  Built on first use, since only
+        procedure call sites need it.
+        """
+        if self._cmd_args is None:
+            self._cmd_args = (
+                [TokenList([Token(TT.SYMBOL, self.base, self.base,
+                                  self.line_no, 0)]),
+                 *self.mod_args] if self.command else _NO_ARGS)
+        return self._cmd_args
+
+
+# One empty argument list shared by every statement without a modifier,
+# label or arguments.  Statement token lists are never modified.
+_NO_ARGS: List[List[Token]] = []
+
+
+# ---------------------------------------------------------------------------
+# Source text by file offset
+# ---------------------------------------------------------------------------
+
+_LINE_END = re.compile(r'\r\n|\r|\n')
+
+
+class SourceFile:
+    """
+    Random access to a source file by character offset, so that statements
+    can refer to their text instead of each holding a copy of it.
+
+    Offsets are those of the text read with ``encoding='ascii',
+    errors='replace', newline=''``, which are also byte offsets: every byte
+    decodes to exactly one character.  The file is opened on first use and
+    stays open until close().
+    """
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self._fh: Optional[IO[bytes]] = None
+
+    def read(self, offset: int, length: int) -> str:
+        """Return *length* characters of source text starting at *offset*."""
+        if self._fh is None:
+            self._fh = open(self.filename, 'rb')
+        self._fh.seek(offset)
+        return self._fh.read(length).decode('ascii', errors='replace')
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+
+class SourceRef:
+    """
+    The source text of one statement, kept as a span of a SourceFile.
+
+    str() reads the physical lines back and rebuilds exactly the text the
+    Tokenizer would otherwise have stored in Statement.source.
+    """
+
+    __slots__ = ('file', 'offset', 'length', 'comment')
+
+    def __init__(self, file: SourceFile, offset: int, length: int,
+                 comment: bool) -> None:
+        self.file    = file
+        self.offset  = offset      # first character of the first physical line
+        self.length  = length      # characters up to the end of the last one
+        self.comment = comment     # whole-line comment: first line, rstripped
+
+    def __str__(self) -> str:
+        lines = _LINE_END.split(self.file.read(self.offset, self.length))
+        if len(lines) > 1 and lines[-1] == '':
+            lines.pop()             # the span ends with a line terminator
+        cols = SourceReader.USABLE_COLS
+        if self.comment:
+            return lines[0][:cols].rstrip()
+        return '\n'.join(line[:cols].ljust(cols) for line in lines)
+
+    def __repr__(self) -> str:
+        return (f"SourceRef({self.file.filename!r}, offset={self.offset}, "
+                f"length={self.length})")
+
 
 # ---------------------------------------------------------------------------
 # Character-class helpers  (mirrors CONVTBL in APNCD)
@@ -181,13 +304,14 @@ class SourceReader:
 
     USABLE_COLS = 72   # columns 1-72 are usable; 73-80 are sequence numbers
 
-    def __init__(self, lines: List[str], filename: str = '<source>'):
-        # Normalise: strip CR/LF, pad/trim to usable width
-        self._raw_lines: List[str] = [
-            line.rstrip('\r\n') for line in lines
-        ]
+    def __init__(self, lines: Iterable[str], filename: str = '<source>'):
+        # Physical lines are pulled from *lines* one at a time, so a file
+        # handle is read lazily rather than materialised up front.
+        self._lines     = iter(lines)
         self._filename  = filename
-        self._phys_idx  = 0      # index into _raw_lines
+        self._exhausted = False  # True once *lines* has no more lines
+        self._offset    = 0      # character offset of the next unread line
+        self._line_start = 0     # character offset of the current line
         self._col       = 0      # current column within the current logical line
         self._in_string = False  # True when inside a character-string literal
         self._line_no   = 0      # current major (physical) line number (1-based)
@@ -204,19 +328,30 @@ class SourceReader:
 
     def _advance_physical(self) -> bool:
         """Load the next physical line into _buf. Returns False at EOF."""
-        while self._phys_idx < len(self._raw_lines):
-            raw = self._raw_lines[self._phys_idx]
-            self._phys_idx += 1
-            self._line_no += 1
-            # Truncate to usable columns; the original used LASTIN=72 (0-based 71)
-            usable = raw[:self.USABLE_COLS]
-            # Pad to exactly USABLE_COLS so column accesses don't raise IndexError
-            self._buf = usable.ljust(self.USABLE_COLS)
-            self._col = 0
-            return True
-        # EOF
-        self._buf = ''
-        return False
+        raw = next(self._lines, None)
+        if raw is None:
+            # EOF
+            self._exhausted = True
+            self._line_start = self._offset
+            self._buf = ''
+            return False
+        self._line_start = self._offset
+        self._offset += len(raw)
+        self._line_no += 1
+        # Normalise: strip CR/LF, truncate to usable columns; the original
+        # used LASTIN=72 (0-based 71)
+        usable = raw.rstrip('\r\n')[:self.USABLE_COLS]
+        # Pad to exactly USABLE_COLS so column accesses don't raise IndexError
+        self._buf = usable.ljust(self.USABLE_COLS)
+        self._col = 0
+        return True
+
+    def next_line(self) -> Optional[str]:
+        """
+        Load the next physical line (a continuation) and return its padded
+        text, or None at EOF.
+        """
+        return self._buf if self._advance_physical() else None
 
     # ------------------------------------------------------------------
     # Public interface: get the next character
@@ -295,7 +430,15 @@ class SourceReader:
 
     def at_eof(self) -> bool:
         """True if all physical lines have been consumed."""
-        return self._phys_idx >= len(self._raw_lines) and self.at_eol()
+        return self._exhausted and self.at_eol()
+
+    def line_offset(self) -> int:
+        """Character offset of the current physical line in the source."""
+        return self._line_start
+
+    def tell(self) -> int:
+        """Character offset just past the current physical line."""
+        return self._offset
 
     def current_line_text(self) -> str:
         """The full text of the current physical line (for error messages)."""
@@ -473,7 +616,7 @@ class ArgTokenizer:
         chars = [first_char]
         while len(chars) < 63 and _is_alnum(self._peek()):
             chars.append(self._get())
-        name = ''.join(chars).upper()
+        name = sys.intern(''.join(chars).upper())
         return Token(TT.SYMBOL, name, name, self._line_no, col - 1)
 
     # ------------------------------------------------------------------
@@ -505,7 +648,7 @@ class ArgTokenizer:
                 self._skip_blanks()
                 # If nothing follows, the trailing comma creates a blank arg
                 if self._at_end():
-                    result.append([self._tok(TT.BLANK_ARG, None, '')])
+                    result.append(TokenList([self._tok(TT.BLANK_ARG, None, '')]))
             else:
                 # Unexpected character after argument — stop (rest is comment)
                 break
@@ -525,9 +668,10 @@ class ArgTokenizer:
         """
         self._skip_blanks()
         if self._at_end() or self._peek() == ',':
-            return [Token(TT.BLANK_ARG, None, '', self._line_no, self._col())]
+            return TokenList([Token(TT.BLANK_ARG, None, '', self._line_no,
+                                    self._col())])
 
-        tokens: List[Token] = []
+        tokens: List[Token] = TokenList()
 
         # Indirect-address prefix: *expression  (but not ** scale operator)
         if self._peek() == '*':
@@ -888,9 +1032,13 @@ class Tokenizer:
     The tokenizer preserves the source line text for diagnostic purposes.
     """
 
-    def __init__(self, lines: List[str], filename: str = '<source>'):
+    def __init__(self, lines: Iterable[str], filename: str = '<source>',
+                 source_file: Optional[SourceFile] = None):
         self._reader   = SourceReader(lines, filename)
         self._filename = filename
+        # With a SourceFile, Statement.source is a SourceRef into it rather
+        # than a copy of the text
+        self._source_file = source_file
 
     # ------------------------------------------------------------------
     # Public interface
@@ -914,10 +1062,12 @@ class Tokenizer:
         """
         line_no = self._reader.get_line_no()
         buf     = self._reader.current_line_text()
+        start   = self._reader.line_offset()
 
         # --- Comment line: first char is '*' --------------------------------
         if buf and buf[0] == '*':
             comment_text = buf.rstrip()
+            source = self._source(start, comment_text, True)
             self._reader.skip_to_eol()
             self._reader._advance_physical()
             return Statement(
@@ -925,9 +1075,9 @@ class Tokenizer:
                 update_no  = 0,
                 label      = None,
                 command    = None,
-                args       = [],
+                args       = _NO_ARGS,
                 comment    = comment_text,
-                source     = comment_text,
+                source     = source,
                 is_comment = True,
             )
 
@@ -954,6 +1104,7 @@ class Tokenizer:
         #    This may involve continuation lines.
         arg_text, extra_lines = self._collect_arg_field(buf, arg_start)
         source_lines.extend(extra_lines)
+        source = self._source(start, '\n'.join(source_lines), False)
 
         # Advance the reader past everything we consumed
         self._reader.skip_to_eol()
@@ -961,7 +1112,7 @@ class Tokenizer:
 
         # 4. Tokenize the argument field
         stripped_arg = arg_text.rstrip()
-        arg_lists: List[List[Token]] = []
+        arg_lists: List[List[Token]] = _NO_ARGS
         if stripped_arg:
             at = ArgTokenizer(stripped_arg, line_no, arg_start)
             arg_lists = at.tokenize()
@@ -973,10 +1124,21 @@ class Tokenizer:
             command    = cmd_text if cmd_text else None,
             args       = arg_lists,
             comment    = '',
-            source     = '\n'.join(source_lines),
+            source     = source,
             is_comment = False,
         )
 
+    def _source(self, start: int, text: str,
+                comment: bool) -> Union[str, SourceRef]:
+        """
+        Statement.source for a statement whose first physical line begins
+        at *start* and whose last is the reader's current line.
+        """
+        if self._source_file is None:
+            return text
+        return SourceRef(self._source_file, start,
+                         self._reader.tell() - start, comment)
+
     # ------------------------------------------------------------------
     # Field parsers
     # ------------------------------------------------------------------
@@ -1003,7 +1165,7 @@ class Tokenizer:
         i = 0
         while i < len(buf) and buf[i] not in (' ', '\t'):
             i += 1
-        label = buf[:i].upper()
+        label = sys.intern(buf[:i].upper())
         return label, i
 
     def _parse_command(self, buf: str, start: int) -> Tuple[Optional[str], int]:
@@ -1027,7 +1189,7 @@ class Tokenizer:
         j = i
         while j < len(buf) and buf[j] not in (' ', '\t'):
             j += 1
-        cmd = buf[i:j].upper()
+        cmd = sys.intern(buf[i:j].upper())
         return cmd if cmd else None, j
 
     def _collect_arg_field(self, buf: str, start: int) -> Tuple[str, List[str]]:
@@ -1058,11 +1220,8 @@ class Tokenizer:
                 # Line continuation: collect the rest from the next physical line
                 parts.append(stripped[:-1])   # drop the ';'
                 # Peek at the next line
-                if self._reader._phys_idx < len(self._reader._raw_lines):
-                    next_raw = self._reader._raw_lines[self._reader._phys_idx]
-                    self._reader._phys_idx += 1
-                    self._reader._line_no  += 1
-                    next_buf = next_raw[:SourceReader.USABLE_COLS].ljust(SourceReader.USABLE_COLS)
+                next_buf = self._reader.next_line()
+                if next_buf is not None:
                     extra.append(next_buf)
                     # Find where the continued argument starts (skip leading blanks)
                     k = 0
@@ -1082,17 +1241,23 @@ class Tokenizer:
 # Convenience function
 # ---------------------------------------------------------------------------
 
-def tokenize_file(filename: str) -> Iterator[Statement]:
+def tokenize_file(filename: str,
+                  source_file: Optional[SourceFile] = None) -> Iterator[Statement]:
     """
     Open an AP assembly source file and yield Statement objects.
 
+    Lines are read from the file as the statements are consumed.  Given a
+    SourceFile for *filename*, each Statement.source is a SourceRef into it
+    instead of a copy of the text, so holding every statement of a large
+    deck does not hold its source as well.
+
     >>> for stmt in tokenize_file('mysource.txt'):
     ...     print(stmt.line_no, stmt.command, stmt.label)
     """
-    with open(filename, 'r', encoding='ascii', errors='replace') as fh:
-        lines = fh.readlines()
-    tok = Tokenizer(lines, filename)
-    yield from tok.statements()
+    with open(filename, 'r', encoding='ascii', errors='replace',
+              newline='') as fh:
+        tok = Tokenizer(fh, filename, source_file)
+        yield from tok.statements()
 
 
 def tokenize_text(text: str, filename: str = '<string>') -> Iterator[Statement]:
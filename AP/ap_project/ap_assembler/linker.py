@@ -0,0 +1,391 @@
+"""
+ap_assembler/linker.py — In-memory linker.
+
+Links the object code of several assembled modules into one memory image
+for the hex writer or a simulator.  Each module is its ObjectWriter and
+the SymbolTable its passes built, reduced by object_module() to what the
+linker needs: section contents and sizes, relocations, and the module's
+DEF and REF/SREF symbols.
+
+    linker = Linker()
+    linker.add(obj_a, sym_a, 'alpha')
+    linker.add(obj_b, sym_b, 'beta')
+    image = linker.link()
+    write_verilog_hex(image.to_object(), 'system.hex')
+    image.load_into(memory)          # any object with load_bytes(addr, data)
+
+Layout
+------
+The image is memory from byte address 0.  ASECT contents keep their
+absolute addresses.  Every other section with contents is placed after
+them (or from *origin*) in module order, then section order, each on a
+doubleword boundary.  DSECTs hold no data: the dummy sections of every
+module with the same name share one zero-filled area, as large as the
+largest, placed after the rest.
+
+Symbols and relocations
+-----------------------
+A DEF symbol is exported with its address in the image, or its value if
+absolute; two modules may DEF a name only with the same value.  A REF
+that no module defines is an error; an unresolved SREF is zero.
+
+Each Relocation sets its field to (sign × base + addend) >> resolution,
+base being its section's address or its symbol's value.  The fields of a
+section are resolved together: the relocations of each field are summed,
+and every field that lies within one word is written into a word array
+of the image, converted once, rather than byte by byte.  The few fields
+that cross a word boundary are patched in the bytes afterwards.
+"""
+
+from __future__ import annotations
+
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .object_writer import ObjectWriter, Relocation, patch_field
+from .symbol_table import CsectKind, SymbolTable
+from .value import Value, ValueKind
+
+
+# Sections start on doubleword boundaries
+ALIGNMENT = 8
+
+_SWAP = sys.byteorder == 'little'
+
+
+# ---------------------------------------------------------------------------
+# Linker input
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ModuleSection:
+    """
+    One control section of an assembled module.
+
+    number : section number within the module (0 = ASECT)
+    size   : bytes of storage, including any reserved at the end
+    data   : contents from offset 0 (empty for a DSECT)
+    relocs : relocations of the contents
+    """
+    number: int
+    kind:   CsectKind
+    name:   str
+    size:   int
+    data:   bytes
+    relocs: List[Relocation] = field(default_factory=list)
+
+
+@dataclass
+class ObjectModule:
+    """
+    What the linker needs of one assembled module; picklable, so that
+    build workers can return it.
+
+    defs : DEF symbol → its Value
+    refs : REF/SREF symbol → 'ref' or 'sref'
+    """
+    name:     str
+    sections: List[ModuleSection]
+    defs:     Dict[str, Value] = field(default_factory=dict)
+    refs:     Dict[str, str]   = field(default_factory=dict)
+
+
+def object_module(obj: ObjectWriter, sym: SymbolTable,
+                  name: str = '') -> ObjectModule:
+    """The ObjectModule of an assembly's object code and symbol table."""
+    sections: List[ModuleSection] = []
+    for cs in sym.all_sections():
+        sec = obj.get_section(cs.number)
+        dummy = cs.kind == CsectKind.DSECT or (sec is not None
+                                               and sec.is_dummy)
+        data = bytes(sec.data) if sec is not None and not dummy else b''
+        relocs = list(sec.relocs) if sec is not None and not dummy else []
+        sections.append(ModuleSection(cs.number,
+                                      CsectKind.DSECT if dummy else cs.kind,
+                                      cs.name, max(cs.max_load_lc, len(data)),
+                                      data, relocs))
+    module = ObjectModule(name, sections)
+    for uname, entry in sym.all_globals().items():
+        if entry.is_def:
+            module.defs[uname] = entry.value
+        elif entry.is_ref:
+            module.refs[uname] = entry.external_type
+    return module
+
+
+# ---------------------------------------------------------------------------
+# Linker output
+# ---------------------------------------------------------------------------
+
+@dataclass
+class LinkError:
+    """A problem found while linking."""
+    module:  str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.module}: {self.message}" if self.module else self.message
+
+
+@dataclass
+class LinkedSection:
+    """Where one module's section was placed."""
+    module:  str
+    number:  int
+    kind:    CsectKind
+    name:    str
+    address: int       # byte address
+    size:    int
+
+
+@dataclass
+class LinkedImage:
+    """
+    The linked program.
+
+    data        : memory contents from byte address 0, big-endian
+    sections    : the load map, in address order
+    symbols     : DEF symbol → byte address (or value, if absolute)
+    relocations : relocations applied
+    errors      : unresolved or conflicting symbols
+    """
+    data:        bytearray
+    sections:    List[LinkedSection]
+    symbols:     Dict[str, int]
+    relocations: int
+    errors:      List[LinkError]
+
+    def to_object(self) -> ObjectWriter:
+        """The image as a one-section ObjectWriter, for the hex writer."""
+        obj = ObjectWriter()
+        obj.emit(1, 0, bytes(self.data), 'IMAGE')
+        return obj
+
+    def load_into(self, memory) -> None:
+        """Copy the image into a simulator memory (load_bytes(addr, data))."""
+        memory.load_bytes(0, self.data)
+
+    def render_map(self) -> str:
+        """The load map and the DEF symbols, for a listing."""
+        parts = ['LOAD MAP', RULE,
+                 f"{'Module':<16}  {'Sect':>4}  {'Name':<8}  {'Kind':<5}  "
+                 f"{'Address':<8}  {'Bytes':>8}", RULE]
+        for s in self.sections:
+            parts.append(f'{s.module:<16}  {s.number:>4}  {s.name:<8}  '
+                         f'{s.kind.value:<5}  {s.address:08X}  {s.size:>8}')
+        parts.append(RULE)
+        for name in sorted(self.symbols):
+            parts.append(f'{name:<16}  {self.symbols[name] & 0xFFFFFFFF:08X}')
+        if self.symbols:
+            parts.append(RULE)
+        return '\n'.join(parts)
+
+
+RULE = '-' * 60
+
+
+# ---------------------------------------------------------------------------
+# Linker
+# ---------------------------------------------------------------------------
+
+class Linker:
+    """Collects assembled modules and links them into a LinkedImage."""
+
+    def __init__(self) -> None:
+        self.modules: List[ObjectModule] = []
+
+    def add(self, obj: ObjectWriter, sym: SymbolTable,
+            name: str = '') -> ObjectModule:
+        """Add the module assembled into *obj* with symbol table *sym*."""
+        return self.add_module(object_module(obj, sym, name))
+
+    def add_module(self, module: ObjectModule) -> ObjectModule:
+        self.modules.append(module)
+        return module
+
+    def link(self, origin: Optional[int] = None) -> LinkedImage:
+        """
+        Lay out every module's sections, resolve the external symbols and
+        apply every relocation.  Relocatable sections start at *origin*
+        (default: after the ASECT contents).
+        """
+        errors: List[LinkError] = []
+        placed, bases, end = self._layout(origin, errors)
+        image = bytearray(end)
+        for s, sec in placed:
+            if sec.data:
+                image[s.address:s.address + len(sec.data)] = sec.data
+        symbols, absolute = self._symbols(bases, errors)
+
+        # Resolve every field: (byte address, bit offset, width, shift) → value
+        fields: Dict[Tuple[int, int, int, int], int] = {}
+        count = 0
+        for k, module in enumerate(self.modules):
+            module_bases = bases[k]
+            for sec in module.sections:
+                if not sec.relocs:
+                    continue
+                at = module_bases.get(sec.number)
+                if at is None:
+                    continue
+                count += len(sec.relocs)
+                _resolve(sec.relocs, at, module_bases, symbols, absolute,
+                         module, fields, errors)
+
+        _apply(image, fields)
+        return LinkedImage(image, [s for s, _ in placed], symbols, count,
+                           errors)
+
+    # ------------------------------------------------------------------
+    # Layout
+    # ------------------------------------------------------------------
+
+    def _layout(self, origin: Optional[int], errors: List[LinkError]):
+        """
+        The placed sections, each module's section number → address, and
+        the end of the image.
+        """
+        placed: List[Tuple[LinkedSection, ModuleSection]] = []
+        bases: List[Dict[int, int]] = [{0: 0} for _ in self.modules]
+
+        asect_end = 0
+        for module in self.modules:
+            for sec in module.sections:
+                if sec.number == 0 and sec.data:
+                    placed.append((LinkedSection(module.name, 0, sec.kind,
+                                                 sec.name, 0, len(sec.data)),
+                                   sec))
+                    asect_end = max(asect_end, len(sec.data))
+        if origin is None:
+            origin = _align(asect_end)
+        elif origin < asect_end:
+            errors.append(LinkError('', f"origin {origin:#x} is below the "
+                                        f"end of ASECT data {asect_end:#x}"))
+
+        address = origin
+        dummies: Dict[str, int] = {}        # DSECT name → size
+        for k, module in enumerate(self.modules):
+            for sec in module.sections:
+                if sec.number == 0:
+                    continue
+                if sec.kind == CsectKind.DSECT:
+                    dummies[sec.name] = max(dummies.get(sec.name, 0), sec.size)
+                else:
+                    address = _align(address)
+                    bases[k][sec.number] = address
+                    if sec.size:
+                        placed.append((LinkedSection(module.name, sec.number,
+                                                     sec.kind, sec.name,
+                                                     address, sec.size), sec))
+                        address += sec.size
+
+        dummy_at: Dict[str, int] = {}
+        for name, size in dummies.items():
+            address = _align(address)
+            dummy_at[name] = address
+            placed.append((LinkedSection('', 0, CsectKind.DSECT, name,
+                                         address, size),
+                           ModuleSection(0, CsectKind.DSECT, name, size, b'')))
+            address += size
+        for k, module in enumerate(self.modules):
+            for sec in module.sections:
+                if sec.kind == CsectKind.DSECT and sec.number != 0:
+                    bases[k][sec.number] = dummy_at[sec.name]
+
+        placed.sort(key=lambda p: p[0].address)
+        return placed, bases, _align(max(address, asect_end), 4)
+
+    # ------------------------------------------------------------------
+    # External symbols
+    # ------------------------------------------------------------------
+
+    def _symbols(self, bases: List[Dict[int, int]],
+                 errors: List[LinkError]):
+        """Each DEF symbol's address or value, and the names of the values."""
+        symbols: Dict[str, int] = {}
+        absolute: set = set()
+        for k, module in enumerate(self.modules):
+            for name, v in module.defs.items():
+                if v.kind == ValueKind.RELOCATABLE:
+                    value = bases[k].get(v.csect, 0) + v.int_val
+                elif v.kind == ValueKind.ABSOLUTE:
+                    value = v.int_val
+                    absolute.add(name)
+                else:
+                    errors.append(LinkError(module.name,
+                                            f"DEF {name} has no address or "
+                                            f"value"))
+                    continue
+                if name in symbols and symbols[name] != value:
+                    errors.append(LinkError(module.name,
+                                            f"{name} is already defined"))
+                    continue
+                symbols[name] = value
+        for module in self.modules:
+            for name, ext_type in module.refs.items():
+                if name not in symbols and ext_type == 'ref':
+                    errors.append(LinkError(module.name,
+                                            f"REF {name} is not defined"))
+        return symbols, absolute
+
+
+# ---------------------------------------------------------------------------
+# Relocation
+# ---------------------------------------------------------------------------
+
+def _align(address: int, boundary: int = ALIGNMENT) -> int:
+    return -(-address // boundary) * boundary
+
+
+def _resolve(relocs: List[Relocation], at: int, bases: Dict[int, int],
+             symbols: Dict[str, int], absolute: set, module: ObjectModule,
+             fields: Dict[Tuple[int, int, int, int], int],
+             errors: List[LinkError]) -> None:
+    """
+    Add each relocation of the section placed at *at* to the value of its
+    field in *fields*.
+    """
+    get = fields.get
+    for r in relocs:
+        shift = r.resolution.value
+        if r.symbol:
+            base = symbols.get(r.symbol, 0)
+            if r.symbol in absolute:
+                base <<= shift
+        else:
+            base = bases.get(r.section)
+            if base is None:
+                errors.append(LinkError(module.name,
+                                        f"relocation by unknown section "
+                                        f"{r.section}"))
+                continue
+        key = (at + r.byte_offset, r.bit_offset, r.width, shift)
+        fields[key] = get(key, 0) + r.sign * base + r.addend
+
+
+def _apply(image: bytearray,
+           fields: Dict[Tuple[int, int, int, int], int]) -> None:
+    """
+    Write every resolved field into *image*: through a word array for
+    fields within one word, then byte-wise for the rest.
+    """
+    words = array('I', image)
+    if _SWAP:
+        words.byteswap()
+    straddling = []
+    for (address, bit_offset, width, shift), value in fields.items():
+        bit = (address & 3) * 8 + bit_offset
+        if bit + width <= 32:
+            low  = 32 - bit - width
+            mask = ((1 << width) - 1) << low
+            k = address >> 2
+            words[k] = words[k] & ~mask | (value >> shift << low) & mask
+        else:
+            straddling.append((address, bit_offset, width, value >> shift))
+    if _SWAP:
+        words.byteswap()
+    image[:] = words.tobytes()
+    for address, bit_offset, width, value in straddling:
+        patch_field(image, address, bit_offset, width, value)
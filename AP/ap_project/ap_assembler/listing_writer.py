@@ -18,6 +18,10 @@ Error markers appear on lines immediately following the erroneous line:
 
 The original AP listing is 108 characters wide and uses EBCDIC.  This Python
 implementation produces readable ASCII, wide enough for typical terminal use.
+
+A ListingWriter either collects every line for render(), or, given a *dest*
+stream, writes each line out as soon as the next one is added (errors are
+still attached to the most recent line) and keeps only that one line.
 """
 
 from __future__ import annotations
@@ -78,11 +82,26 @@ class ListingWriter:
         lw.add_line(lineno=1, hex_val='00000005', section=1,
                     offset=0, source='A1  EQU  5')
         print(lw.render())
+
+    Streaming to a file as the lines are produced::
+
+        with open('prog.lst', 'w') as f:
+            lw = ListingWriter(dest=f)
+            GenPass(stmts, sym, obj, lw).run()
+            lw.finish()
+
+    The header is written with the first line flushed, so a TITLE must come
+    before the second listing line to appear in it.
     """
 
-    def __init__(self, title: str = 'AP ASSEMBLER LISTING') -> None:
+    def __init__(self, title: str = 'AP ASSEMBLER LISTING',
+                 dest: Optional[IO[str]] = None) -> None:
         self._title  = title
         self._lines: List[ListingLine] = []
+        self._dest   = dest     # streaming: lines before _lines[-1] go here
+        self._header_written = False
+        self._flushed_lines  = 0
+        self._flushed_errors = 0
 
     def set_title(self, title: str) -> None:
         """Update the listing title (from a TITLE directive)."""
@@ -102,24 +121,27 @@ class ListingWriter:
         Add one listing line.
 
         *hex_val* should be exactly 8 uppercase hex characters, or None.
+        *source* may be a lexer SourceRef; it is read back here.
         """
+        self._flush()
         self._lines.append(ListingLine(
             line_no = line_no,
             hex_val = hex_val,
             section = section,
             offset  = offset,
-            source  = source.rstrip('\n'),
+            source  = str(source).rstrip('\n'),
             errors  = errors or [],
         ))
 
     def add_comment(self, line_no: int, source: str) -> None:
         """Add a comment line (no hex, no address)."""
+        self._flush()
         self._lines.append(ListingLine(
             line_no = line_no,
             hex_val = None,
             section = 0,
             offset  = 0,
-            source  = source.rstrip('\n'),
+            source  = str(source).rstrip('\n'),
         ))
 
     def add_error(self, message: str, line_no: int = 0) -> None:
@@ -159,21 +181,57 @@ class ListingWriter:
 
         return f'{lineno_s}  {hex_s}  {addr_s}  {src}'
 
+    @classmethod
+    def _format_lines(cls, ll: ListingLine) -> List[str]:
+        """Render one ListingLine followed by its error lines."""
+        parts = [cls._format_line(ll)]
+        for err in ll.errors:
+            parts.append(f"{'':>{_W_LINENO}}  {'*ERR*':8s}  {'':9s}  {err}")
+        return parts
+
+    def _header(self) -> List[str]:
+        return [self._title, RULE, HEADER, RULE]
+
     def render(self) -> str:
         """Return the complete listing as a single string."""
-        parts = [
-            self._title,
-            RULE,
-            HEADER,
-            RULE,
-        ]
+        parts = self._header()
         for ll in self._lines:
-            parts.append(self._format_line(ll))
-            for err in ll.errors:
-                parts.append(f"{'':>{_W_LINENO}}  {'*ERR*':8s}  {'':9s}  {err}")
+            parts.extend(self._format_lines(ll))
         parts.append(RULE)
         return '\n'.join(parts)
 
+    # ------------------------------------------------------------------
+    # Streaming
+    # ------------------------------------------------------------------
+
+    def _write_parts(self, parts: List[str]) -> None:
+        if not self._header_written:
+            self._header_written = True
+            parts = self._header() + parts
+        self._dest.write('\n'.join(parts))
+        self._dest.write('\n')
+
+    def _flush(self) -> None:
+        """
+        Streaming mode: write out the held line before another is added.
+        Nothing can attach to it any more once it is no longer the last.
+        """
+        if self._dest is None or not self._lines:
+            return
+        ll = self._lines.pop()
+        self._flushed_lines  += 1
+        self._flushed_errors += len(ll.errors)
+        self._write_parts(self._format_lines(ll))
+
+    def finish(self) -> None:
+        """
+        Streaming mode: write the last line and the closing rule.  The
+        output is then identical to write() on a collecting ListingWriter.
+        *dest* is left open.
+        """
+        self._flush()
+        self._write_parts([RULE])
+
     def write(self, dest: IO[str]) -> None:
         """Write the rendered listing to a file-like object."""
         dest.write(self.render())
@@ -189,7 +247,8 @@ class ListingWriter:
     # ------------------------------------------------------------------
 
     def line_count(self) -> int:
-        return len(self._lines)
+        return self._flushed_lines + len(self._lines)
 
     def error_count(self) -> int:
-        return sum(len(ll.errors) for ll in self._lines)
+        return (self._flushed_errors +
+                sum(len(ll.errors) for ll in self._lines))
@@ -0,0 +1,138 @@
+"""
+ap_assembler/literal_pool.py — The literal pool.
+
+A literal (``=expr`` or ``L(expr)``) stands for the address of a word that
+holds the value of *expr*.  The GEN pass collects the literals of an
+assembly in a LiteralPool and, at END (as APEND does), assembles the pool
+into the control section in effect, word-aligned after the last statement.
+
+Each distinct value is stored once.  add() looks a value up by its kind,
+contents and resolution, so every ``=X'FF'`` in a program refers to the
+same pool word however many times it is written.
+
+A reference is assembled before the pool has an address.  The GEN pass
+emits zeros in its place and records where the field is — section, byte
+offset, bit offset and width — with refer(); patch() then writes each
+entry's word address into the fields that refer to it, and records a
+Relocation for each so that the linker adds the section's address.
+
+    pool  = LiteralPool()
+    entry = pool.add(Value.absolute(0xFF))      # 0, and 0 again next time
+    pool.refer(entry, section=1, byte_offset=8, bit_offset=15, width=17)
+    ...
+    pool.place(section=1, byte_offset=64)       # at END
+    pool.patch(obj)
+
+The pool follows every statement, so no symbol depends on its size and
+the DEF pass does not lay it out.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from .object_writer import ObjectWriter, Relocation
+from .value import Resolution, Value, ValueKind
+
+
+# ---------------------------------------------------------------------------
+# Entry sizes
+# ---------------------------------------------------------------------------
+
+def literal_size(v: Value) -> int:
+    """Bytes of pool space for the value *v*: whole words."""
+    if v.kind == ValueKind.CHARSTR:
+        return max(4, (len(v.raw or '') + 3) // 4 * 4)
+    if v.kind == ValueKind.FL:
+        return 8
+    return 4
+
+
+def _key(v: Value) -> Hashable:
+    """Identical literals: same kind, contents and resolution."""
+    return (v.kind, v.int_val, v.csect, v.resolution, v.raw, v.name)
+
+
+# ---------------------------------------------------------------------------
+# LiteralPool
+# ---------------------------------------------------------------------------
+
+class LiteralPool:
+    """
+    The distinct literal values of one assembly and the fields that refer
+    to them.
+
+    values  : the value of each entry, in order of first use
+    offsets : byte offset of each entry from the start of the pool
+    size    : bytes of pool space
+    section / byte_offset : where the pool is placed (None until place())
+    """
+
+    def __init__(self) -> None:
+        self.values:  List[Value] = []
+        self.offsets: List[int]   = []
+        self.size:    int         = 0
+        self.section:     Optional[int] = None
+        self.byte_offset: Optional[int] = None
+        self._entries: Dict[Hashable, int] = {}      # _key(value) → entry
+        # (entry, section, byte offset, bit offset, width) of each reference
+        self._refs: List[Tuple[int, int, int, int, int]] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, v: Value) -> int:
+        """The entry number holding *v*, adding one if none does."""
+        key = _key(v)
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = len(self.values)
+            self.values.append(v)
+            self.offsets.append(self.size)
+            self.size += literal_size(v)
+        return entry
+
+    def refer(self, entry: int, section: int, byte_offset: int,
+              bit_offset: int, width: int) -> None:
+        """
+        Record a *width*-bit field, *bit_offset* bits from the top of the
+        byte at *byte_offset* in *section*, that holds the address of
+        *entry*.
+        """
+        self._refs.append((entry, section, byte_offset, bit_offset, width))
+
+    def reference_count(self) -> int:
+        return len(self._refs)
+
+    # ------------------------------------------------------------------
+    # Placement
+    # ------------------------------------------------------------------
+
+    def place(self, section: int, byte_offset: int) -> None:
+        """Put the start of the pool at *byte_offset* in *section*."""
+        self.section     = section
+        self.byte_offset = byte_offset
+
+    def address(self, entry: int) -> Value:
+        """The address of *entry* once the pool is placed."""
+        return Value.relocatable(self.section,
+                                 self.byte_offset + self.offsets[entry])
+
+    def patch(self, obj: ObjectWriter) -> None:
+        """
+        Write each referenced entry's word address into the fields that
+        refer to it, and relocate them by the pool's section unless that is
+        the absolute section.  References in DSECTs have no bytes and are
+        skipped.
+        """
+        starts = [self.byte_offset + off for off in self.offsets]
+        words  = [Resolution.WORD.from_byte_offset(b) for b in starts]
+        pool_section = self.section
+        for entry, section, byte_offset, bit_offset, width in self._refs:
+            sec = obj.get_section(section)
+            if sec is not None and not sec.is_dummy:
+                sec.patch_field(byte_offset, bit_offset, width, words[entry])
+                if pool_section != 0:
+                    sec.add_reloc(Relocation(byte_offset, bit_offset, width,
+                                             pool_section, starts[entry], 1,
+                                             Resolution.WORD))
@@ -3,7 +3,8 @@ ap_assembler/object_writer.py — Object code collector.
 
 Accumulates the raw bytes generated during the GEN pass, organised by control
 section.  Each section grows a ``bytearray``; relocatable references are
-recorded separately as ``Relocation`` entries so a linker can patch them.
+recorded separately as ``Relocation`` entries so a linker (linker.py) can
+patch them.
 
 The original AP assembler wrote a Xerox binary object (BO) file in a
 specific loader format with control codes for load-origin, add-constant,
@@ -23,6 +24,8 @@ import struct
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
 
+from .value import Resolution
+
 
 # ---------------------------------------------------------------------------
 # Loader control codes (from APDGCOM)
@@ -36,6 +39,25 @@ CTRL_FWDHLD  = 16   # forward reference and hold
 CTRL_DEFEXT  = 10   # define external definition
 
 
+# ---------------------------------------------------------------------------
+# Bit fields
+# ---------------------------------------------------------------------------
+
+def patch_field(buf: bytearray, byte_offset: int, bit_offset: int,
+                width: int, value: int) -> None:
+    """
+    Replace the *width*-bit field that starts *bit_offset* bits from the
+    top of the byte at *byte_offset* in *buf* with the low bits of *value*.
+    """
+    first = byte_offset + bit_offset // 8
+    end   = byte_offset + (bit_offset + width + 7) // 8
+    shift = (end - first) * 8 - bit_offset % 8 - width
+    mask  = ((1 << width) - 1) << shift
+    old   = int.from_bytes(buf[first:end], 'big')
+    new   = old & ~mask | (value << shift) & mask
+    buf[first:end] = new.to_bytes(end - first, 'big')
+
+
 # ---------------------------------------------------------------------------
 # Relocation entry
 # ---------------------------------------------------------------------------
@@ -46,12 +68,19 @@ class Relocation:
     Describes one relocatable field within the generated data.
 
     byte_offset : byte offset within the section's data buffer
-    bit_offset  : bit offset of the field's MSB within the 32-bit word
-                  (0 = most significant bit; matches AP's LOB conventions)
+    bit_offset  : bit offset of the field's MSB from the top of the byte at
+                  byte_offset (0 = most significant bit; matches AP's LOB
+                  conventions)
     width       : field width in bits
     section     : control section number to add/subtract
     addend      : constant addend in byte units (the load-time base offset)
     sign        : +1 = add, -1 = subtract
+    resolution  : units the field holds the address in
+    symbol      : external symbol to add/subtract instead of a section
+
+    The linker sets the field to  (sign × base + addend) >> resolution,
+    where base is the load address of *section* or the value of *symbol*;
+    several relocations of one field are summed first.
     """
     byte_offset:  int
     bit_offset:   int
@@ -59,6 +88,8 @@ class Relocation:
     section:      int
     addend:       int
     sign:         int = 1
+    resolution:   Resolution = Resolution.BYTE
+    symbol:       str = ''
 
 
 # ---------------------------------------------------------------------------
@@ -103,6 +134,15 @@ class SectionData:
         """Write a 32-bit big-endian word at *offset*."""
         self.write_bytes(offset, struct.pack('>I', value & 0xFFFF_FFFF))
 
+    def patch_field(self, byte_offset: int, bit_offset: int, width: int,
+                    value: int) -> None:
+        """
+        Replace the *width*-bit field that starts *bit_offset* bits from
+        the top of the byte at *byte_offset* with the low bits of *value*.
+        The field must lie within the data already written.
+        """
+        patch_field(self.data, byte_offset, bit_offset, width, value)
+
     def add_reloc(self, reloc: Relocation) -> None:
         """Record a relocation entry."""
         self.relocs.append(reloc)
@@ -184,7 +224,9 @@ class ObjectWriter:
 
     def emit_reloc(self, section: int, byte_offset: int, bit_offset: int,
                    width: int, reloc_section: int, addend: int,
-                   sign: int = 1) -> None:
+                   sign: int = 1,
+                   resolution: Resolution = Resolution.BYTE,
+                   symbol: str = '') -> None:
         """Record a relocation entry in the given section."""
         sec = self.open_section(section)
         sec.add_reloc(Relocation(
@@ -194,6 +236,8 @@ class ObjectWriter:
             section      = reloc_section,
             addend       = addend,
             sign         = sign,
+            resolution   = resolution,
+            symbol       = symbol,
         ))
 
     # ------------------------------------------------------------------
@@ -0,0 +1,293 @@
+"""
+ap_assembler/stmt_cache.py — Persistent cache of tokenized statements.
+
+The original AP encoded each deck once into the binary X1 file and its
+later phases re-read that instead of the card images.  StatementCache does
+the same across runs: the Statement stream produced by the Tokenizer is
+stored on disk under the SHA-256 of the source bytes, so an unchanged file
+(or a SYSTEM library shared by many assemblies) is loaded back without
+going through the Tokenizer or ArgTokenizer again.
+
+File format (all integers big-endian)
+-------------------------------------
+  header   magic b'APX1', format version (u16), token-type fingerprint
+           (u64), statement count N (u32)
+  index    N + 1 offsets (u64) of the records, relative to the data area
+  data     one marshal-encoded record per statement
+
+A record holds every Statement field the Tokenizer fills in, with each
+Token as a (type index, value, raw, line, col) tuple.  Records hold only
+ints, floats, strings, bytes, bools and None, so they are written with
+marshal rather than pickle: loading a file someone else put in a shared
+cache directory cannot run code.  A file whose
+version or token-type fingerprint does not match is treated as a miss and
+rewritten, so changing either the record layout (bump FORMAT_VERSION) or
+the TT enum invalidates old entries.
+
+CachedStatements reads a cache file either through mmap or into memory,
+and decodes each Statement only when it is first indexed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import marshal
+import mmap
+import os
+import struct
+import sys
+from typing import Iterator, List, Optional, Sequence, Union
+
+from .lexer import TT, Statement, Token, TokenList, Tokenizer, _NO_ARGS
+
+
+FORMAT_VERSION = 2
+MAGIC = b'APX1'
+
+_HEADER = struct.Struct('>4sHQI')
+_OFFSET = struct.Struct('>Q')
+
+# Token types by position; the fingerprint changes whenever TT does
+_TT_BY_INDEX = list(TT)
+_TT_INDEX = {tt: i for i, tt in enumerate(_TT_BY_INDEX)}
+_TT_FINGERPRINT = int.from_bytes(
+    hashlib.sha256(','.join(tt.name for tt in TT).encode()).digest()[:8], 'big')
+
+
+# ---------------------------------------------------------------------------
+# Record encoding
+# ---------------------------------------------------------------------------
+
+def _encode_args(args: List[List[Token]]) -> list:
+    return [[(_TT_INDEX[t.type], t.value, t.raw, t.line, t.col) for t in arg]
+            for arg in args]
+
+
+def _decode_args(args: list) -> List[List[Token]]:
+    if not args:
+        return _NO_ARGS
+    result = []
+    for arg in args:
+        toks = TokenList()
+        for tt, value, raw, line, col in arg:
+            tt = _TT_BY_INDEX[tt]
+            if tt == TT.SYMBOL:
+                value = raw = sys.intern(value)
+            toks.append(Token(tt, value, raw, line, col))
+        result.append(toks)
+    return result
+
+
+def encode_statement(stmt: Statement) -> bytes:
+    """Serialise one Statement (its source as text) to a cache record."""
+    return marshal.dumps((
+        stmt.line_no, stmt.update_no, stmt.label, stmt.command,
+        _encode_args(stmt.args), stmt.comment, str(stmt.source),
+        stmt.is_comment, stmt.base, stmt.modifier,
+        _encode_args(stmt.mod_args), _encode_args(stmt.label_args),
+    ))
+
+
+def decode_statement(record: bytes) -> Statement:
+    """
+    Rebuild a Statement from a cache record.  The parsed command and label
+    fields come from the record, so nothing is tokenised again.
+    """
+    (line_no, update_no, label, command, args, comment, source, is_comment,
+     base, modifier, mod_args, label_args) = marshal.loads(record)
+    stmt = Statement.__new__(Statement)
+    stmt.line_no    = line_no
+    stmt.update_no  = update_no
+    stmt.label      = sys.intern(label) if label else label
+    stmt.command    = command
+    stmt.args       = _decode_args(args)
+    stmt.comment    = comment
+    stmt.source     = source
+    stmt.is_comment = is_comment
+    stmt.base       = sys.intern(base)
+    stmt.modifier   = modifier
+    stmt.mod_args   = _decode_args(mod_args)
+    stmt.label_args = _decode_args(label_args)
+    stmt.handler    = None
+    stmt._cmd_args  = None
+    return stmt
+
+
+def encode_statements(stmts: Sequence[Statement]) -> bytes:
+    """The cache file contents (header, index and records) for *stmts*."""
+    records = [encode_statement(s) for s in stmts]
+    offsets = [0]
+    for r in records:
+        offsets.append(offsets[-1] + len(r))
+    return b''.join((
+        _HEADER.pack(MAGIC, FORMAT_VERSION, _TT_FINGERPRINT, len(records)),
+        b''.join(_OFFSET.pack(o) for o in offsets),
+        b''.join(records),
+    ))
+
+
+def write_statements(path: str, stmts: Sequence[Statement]) -> None:
+    """
+    Write *stmts* to the cache file *path*.  The file is written under a
+    temporary name and renamed into place, so readers never see a partial
+    file.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(encode_statements(stmts))
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# CachedStatements — lazily decoded view of one cache file
+# ---------------------------------------------------------------------------
+
+class CacheFormatError(Exception):
+    """Raised when a cache file is truncated, foreign, or out of date."""
+
+
+class CachedStatements(Sequence[Statement]):
+    """
+    The statements of one cache file, decoded on first access.
+
+    Each Statement is decoded once and kept, so repeated indexing (DO
+    loops, GOTO, procedure bodies) returns the same object, as a list
+    would.  With *use_mmap* the file is mapped rather than read; close()
+    releases the mapping once every statement needed has been decoded.
+
+    *buffer* and *offset* read the statements from cache-file contents
+    embedded in a larger file (see symbol_image.py) instead of from *path*.
+    """
+
+    def __init__(self, path: Optional[str] = None, use_mmap: bool = True, *,
+                 buffer: Union[bytes, mmap.mmap, None] = None,
+                 offset: int = 0) -> None:
+        if buffer is not None:
+            self._buf: Union[bytes, mmap.mmap] = buffer
+        else:
+            with open(path, 'rb') as f:
+                if use_mmap and os.fstat(f.fileno()).st_size:
+                    self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    self._buf = f.read()
+        try:
+            self._count = self._check_header(offset, exact=buffer is None)
+        except CacheFormatError:
+            self.close()
+            raise
+        self._index = offset + _HEADER.size
+        self._data  = self._index + (self._count + 1) * _OFFSET.size
+        self._stmts: List[Optional[Statement]] = [None] * self._count
+
+    def _check_header(self, base: int, exact: bool) -> int:
+        if len(self._buf) < base + _HEADER.size:
+            raise CacheFormatError('truncated header')
+        magic, version, fingerprint, count = _HEADER.unpack_from(self._buf, base)
+        if magic != MAGIC:
+            raise CacheFormatError('not a statement cache file')
+        if version != FORMAT_VERSION or fingerprint != _TT_FINGERPRINT:
+            raise CacheFormatError(f'cache format {version} is out of date')
+        data = base + _HEADER.size + (count + 1) * _OFFSET.size
+        if len(self._buf) < data:
+            raise CacheFormatError('truncated index')
+        end, = _OFFSET.unpack_from(self._buf, data - _OFFSET.size)
+        if len(self._buf) < data + end or (exact and len(self._buf) != data + end):
+            raise CacheFormatError('truncated data')
+        return count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[k] for k in range(*i.indices(self._count))]
+        stmt = self._stmts[i]
+        if stmt is None:
+            if i < 0:
+                i += self._count
+            lo, hi = struct.unpack_from('>QQ', self._buf,
+                                        self._index + i * _OFFSET.size)
+            stmt = self._stmts[i] = decode_statement(
+                self._buf[self._data + lo:self._data + hi])
+        return stmt
+
+    def __iter__(self) -> Iterator[Statement]:
+        for i in range(self._count):
+            yield self[i]
+
+    def decoded_count(self) -> int:
+        """Number of statements decoded so far."""
+        return sum(s is not None for s in self._stmts)
+
+    def close(self) -> None:
+        """Release the mapping.  Statements already decoded stay usable."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+        self._buf = b''
+
+
+# ---------------------------------------------------------------------------
+# StatementCache — content-addressed directory of cache files
+# ---------------------------------------------------------------------------
+
+class StatementCache:
+    """
+    A directory of cache files, one per distinct source text.
+
+    Usage::
+
+        cache = StatementCache('.apcache')
+        stmts = cache.tokenize_file('prog.ap')     # cached on first use
+        DefPass(stmts, sym).run()
+
+    hits/misses count the lookups made through this object.
+    """
+
+    def __init__(self, directory: str, use_mmap: bool = True) -> None:
+        self.directory = directory
+        self.use_mmap  = use_mmap
+        self.hits   = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(data: bytes) -> str:
+        """The cache key of a source file's raw bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.x{FORMAT_VERSION}')
+
+    def get(self, key: str) -> Optional[CachedStatements]:
+        """The cached statements for *key*, or None on a miss."""
+        try:
+            return CachedStatements(self.path(key), self.use_mmap)
+        except (OSError, CacheFormatError):
+            return None
+
+    def put(self, key: str, stmts: Sequence[Statement]) -> None:
+        write_statements(self.path(key), stmts)
+
+    def tokenize_bytes(self, data: bytes,
+                       filename: str = '<source>') -> Sequence[Statement]:
+        """
+        Statements of the source *data*, from the cache if present;
+        otherwise tokenised (exactly as tokenize_file would) and stored.
+        """
+        key = self.key(data)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        text = io.StringIO(data.decode('ascii', errors='replace'), newline='')
+        stmts = list(Tokenizer(text, filename).statements())
+        self.put(key, stmts)
+        return stmts
+
+    def tokenize_file(self, filename: str) -> Sequence[Statement]:
+        """Statements of the source file *filename*; see tokenize_bytes."""
+        with open(filename, 'rb') as f:
+            data = f.read()
+        return self.tokenize_bytes(data, filename)
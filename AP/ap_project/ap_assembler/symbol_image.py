@@ -0,0 +1,202 @@
+"""
+ap_assembler/symbol_image.py — Saved symbol tables for SYSTEM libraries.
+
+A SYSTEM library is mostly CNAME/FNAME procedures and SET symbols, and
+every assembly that uses it runs its DEF pass again only to arrive at the
+same SymbolTable.  build_image() runs the library's DEF pass once and
+writes the resulting table to a binary image file; read_image() loads it
+back as the starting table for a later assembly:
+
+    build_image('sys.img', list(tokenize_file('system.ap')))
+    ...
+    sym = read_image('sys.img')
+    DefPass(stmts, sym).run()
+
+The image holds the whole table — globals, local scopes, control sections
+and location counters — together with the statement lists its procedure
+bodies run from.  Those are stored as embedded statement-cache data
+(stmt_cache.py) and read back as CachedStatements over the same mapping,
+so a procedure's statements are decoded only when it is first called.
+
+File format (all integers big-endian)
+-------------------------------------
+  header   magic b'APS1', format version (u16), statement list count K
+           (u32), table length T (u64)
+  index    K offsets (u64) of the statement lists, from the start of file
+  table    the pickled SymbolTable, T bytes; each procedure body refers to
+           its statement list by number.  Bump FORMAT_VERSION whenever the
+           attributes of SymbolTable or its entries change.
+  lists    K statement-cache images (stmt_cache.encode_statements)
+
+The table is a pickle, and unpickling can run code, so an image must come
+from a trusted directory: read_image() refuses a file owned by another
+user, and loads only the symbol-table classes from the table.  (The statement
+lists are marshal records and need no such care.)
+
+A restored table is an ordinary SymbolTable and is changed by the
+assembly that uses it.  To start several assemblies from one image, read
+it once and give each a SymbolTable.copy(); the copies share the
+procedure bodies and their statements.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import os
+import pickle
+import struct
+from typing import Dict, List, Sequence, Union
+
+from .def_pass import AssemblyError, DefPass
+from .lexer import Statement
+from .stmt_cache import CachedStatements, CacheFormatError, encode_statements
+from .symbol_table import SymbolTable
+
+
+FORMAT_VERSION = 4
+MAGIC = b'APS1'
+
+_HEADER = struct.Struct('>4sHIQ')
+_OFFSET = struct.Struct('>Q')
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+class _TablePickler(pickle.Pickler):
+    """Pickles a SymbolTable with procedure statement lists by number."""
+
+    def __init__(self, file) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.lists: List[Sequence[Statement]] = []
+        self._numbers: Dict[int, int] = {}     # id(list) → number
+
+    def persistent_id(self, obj):
+        if isinstance(obj, (list, CachedStatements)) and obj \
+                and isinstance(obj[0], Statement):
+            number = self._numbers.get(id(obj))
+            if number is None:
+                number = self._numbers[id(obj)] = len(self.lists)
+                self.lists.append(obj)
+            return number
+        return None
+
+
+def encode_image(sym: SymbolTable) -> bytes:
+    """The image file contents for *sym*."""
+    table = io.BytesIO()
+    pickler = _TablePickler(table)
+    pickler.dump(sym)
+    lists = [encode_statements(stmts) for stmts in pickler.lists]
+
+    offset = _HEADER.size + len(lists) * _OFFSET.size + table.tell()
+    offsets = []
+    for data in lists:
+        offsets.append(offset)
+        offset += len(data)
+    return b''.join((
+        _HEADER.pack(MAGIC, FORMAT_VERSION, len(lists), table.tell()),
+        b''.join(_OFFSET.pack(o) for o in offsets),
+        table.getvalue(),
+        *lists,
+    ))
+
+
+def write_image(path: str, sym: SymbolTable) -> None:
+    """
+    Write *sym* to the image file *path*, under a temporary name renamed
+    into place as stmt_cache.write_statements does.
+    """
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(encode_image(sym))
+    os.replace(tmp, path)
+
+
+def build_image(path: str, stmts: Sequence[Statement]) -> List[AssemblyError]:
+    """
+    Run the DEF pass over the library *stmts* and write the resulting
+    table to *path*.  Returns the DEF-pass errors; the image is written
+    only when there are none.
+    """
+    sym = SymbolTable()
+    errors = DefPass(stmts, sym).run()
+    if not errors:
+        write_image(path, sym)
+    return errors
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+# Every (module, name) global an image's table may refer to
+_TABLE_CLASSES = frozenset({
+    ('ap_assembler.symbol_table', 'SymbolTable'),
+    ('ap_assembler.symbol_table', 'SymbolEntry'),
+    ('ap_assembler.symbol_table', 'ControlSection'),
+    ('ap_assembler.symbol_table', 'CsectKind'),
+    ('ap_assembler.value',        'Value'),
+    ('ap_assembler.value',        'ValueKind'),
+    ('ap_assembler.value',        'Resolution'),
+    ('ap_assembler.value',        'Addend'),
+    ('ap_assembler.procedure',    'ProcedureBody'),
+})
+
+
+class _TableUnpickler(pickle.Unpickler):
+    def __init__(self, file, lists: List[CachedStatements]) -> None:
+        super().__init__(file)
+        self._lists = lists
+
+    def persistent_load(self, pid):
+        return self._lists[pid]
+
+    def find_class(self, module, name):
+        # Only the classes a table is built from; a dotted name would reach
+        # whatever those modules import
+        if (module, name) in _TABLE_CLASSES:
+            return super().find_class(module, name)
+        raise CacheFormatError(f'image refers to {module}.{name}')
+
+
+def read_image(path: str, use_mmap: bool = True) -> SymbolTable:
+    """
+    The SymbolTable saved in the image file *path*.  With *use_mmap* the
+    file is mapped, and stays mapped while the table's procedure bodies
+    are in use; otherwise it is read into memory.
+
+    The image must be trusted (see above).  Raises PermissionError if the
+    file is owned by another user, and CacheFormatError if it is not an
+    image of this version.
+    """
+    with open(path, 'rb') as f:
+        st = os.fstat(f.fileno())
+        if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+            raise PermissionError(f'{path}: image owned by another user')
+        if use_mmap and st.st_size:
+            buf: Union[bytes, mmap.mmap] = mmap.mmap(
+                f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = f.read()
+
+    if len(buf) < _HEADER.size:
+        raise CacheFormatError('truncated header')
+    magic, version, count, table_len = _HEADER.unpack_from(buf, 0)
+    if magic != MAGIC:
+        raise CacheFormatError('not a symbol table image')
+    if version != FORMAT_VERSION:
+        raise CacheFormatError(f'image format {version} is out of date')
+    table = _HEADER.size + count * _OFFSET.size
+    if len(buf) < table + table_len:
+        raise CacheFormatError('truncated table')
+
+    lists = [CachedStatements(buffer=buf, offset=offset)
+             for offset, in _OFFSET.iter_unpack(buf[_HEADER.size:table])]
+    sym = _TableUnpickler(io.BytesIO(buf[table:table + table_len]),
+                          lists).load()
+    if not isinstance(sym, SymbolTable):
+        raise CacheFormatError('image does not hold a SymbolTable')
+    return sym
@@ -31,9 +31,10 @@ Passes:
 
 from __future__ import annotations
 
+import copy
 from dataclasses import dataclass, field
 from enum import Enum, auto
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from .value import Value, ValueKind, Resolution, _s32
 
@@ -171,7 +172,15 @@ class SymbolTable:
     Internally keeps:
       _globals  : name → SymbolEntry  (global / non-local symbols)
       _locals   : list of dict frames for LOCAL scope stacks
+      _visible  : name → the entry that name resolves to now (innermost
+                  local, else global), so lookup costs one dict probe
+                  however deep the scope stack
+      _shadowed : per local frame, (name, entry it hid) for each name the
+                  frame added to _visible; popping the frame puts them back
       _sections : list of ControlSection objects (index = section number)
+      _section_index : (kind, name) → number of the first section of that
+                  kind and name.  USECT re-enters a section of any kind, so
+                  every named section is entered under (USECT, name) too
       _current_section : index of the active control section
       _pass     : current assembly pass (PASS_DEF or PASS_GEN)
 
@@ -182,10 +191,15 @@ class SymbolTable:
     def __init__(self) -> None:
         self._globals:  Dict[str, SymbolEntry] = {}
         self._locals:   List[Dict[str, SymbolEntry]] = [{}]  # scope stack
+        self._visible:  Dict[str, SymbolEntry] = {}
+        self._shadowed: List[List[Tuple[str, Optional[SymbolEntry]]]] = [[]]
         self._sections: List[ControlSection] = [
             ControlSection(0, CsectKind.ASECT, 'ASECT', Resolution.WORD),
             ControlSection(1, CsectKind.CSECT, '',      Resolution.WORD),
         ]
+        self._section_index: Dict[Tuple[CsectKind, str], int] = {}
+        for cs in self._sections:
+            self._index_section(cs)
         self._current:  int  = 1    # active control section number
         self._pass:     int  = PASS_DEF
 
@@ -201,8 +215,7 @@ class SymbolTable:
         """Reset location counters and switch to the generation pass."""
         self._pass = PASS_GEN
         for cs in self._sections:
-            cs.exec_lc = 0
-            cs.load_lc = 0
+            cs.exec_lc = cs.load_lc = 0
         self._current = 1
 
     # ------------------------------------------------------------------
@@ -225,27 +238,28 @@ class SymbolTable:
         Open a new control section, or re-enter an existing one by name.
         Returns the ControlSection object and makes it the active section.
         """
-        # USECT re-enters an existing named section
-        if kind == CsectKind.USECT and name:
-            for cs in self._sections:
-                if cs.name == name:
-                    self._current = cs.number
-                    return cs
-
-        # Check if we have seen this name as a CSECT/PSECT before
+        # USECT re-enters a named section of any kind; CSECT/PSECT re-enter
+        # one of the same kind
         if name:
-            for cs in self._sections:
-                if cs.name == name and cs.kind == kind:
-                    self._current = cs.number
-                    return cs
+            num = self._section_index.get((kind, name))
+            if num is not None:
+                self._current = num
+                return self._sections[num]
 
         # Brand-new section
         num = len(self._sections)
         cs = ControlSection(num, kind, name, resolution, protection=protection)
         self._sections.append(cs)
+        self._index_section(cs)
         self._current = num
         return cs
 
+    def _index_section(self, cs: ControlSection) -> None:
+        if cs.name:
+            self._section_index.setdefault((cs.kind, cs.name), cs.number)
+            self._section_index.setdefault((CsectKind.USECT, cs.name),
+                                           cs.number)
+
     def switch_to_section(self, number: int) -> ControlSection:
         """Switch the active section to the given number."""
         if 0 <= number < len(self._sections):
@@ -298,15 +312,26 @@ class SymbolTable:
 
     def lookup(self, name: str) -> Optional[SymbolEntry]:
         """
-        Look up a symbol.  Searches the local scope stack first, then globals.
-        Returns None if not found.
+        Look up a symbol: the innermost local scope defining it, else the
+        globals.  Returns None if not found.
         """
-        uname = name.upper()
-        # Search local scopes from innermost outward
-        for scope in reversed(self._locals):
-            if uname in scope:
-                return scope[uname]
-        return self._globals.get(uname)
+        # The lexer upper-cases and interns symbol names, so the common
+        # case is a single probe without upper()
+        entry = self._visible.get(name)
+        if entry is None and not name.isupper():
+            entry = self._visible.get(name.upper())
+        return entry
+
+    def _add_local(self, uname: str, entry: SymbolEntry) -> None:
+        """Add *entry* to the innermost local scope, shadowing *uname*."""
+        self._locals[-1][uname] = entry
+        self._shadowed[-1].append((uname, self._visible.get(uname)))
+        self._visible[uname] = entry
+
+    def _add_global(self, uname: str, entry: SymbolEntry) -> None:
+        """Add the global *entry*; a local of the same name still hides it."""
+        self._globals[uname] = entry
+        self._visible.setdefault(uname, entry)
 
     def lookup_or_create(self, name: str, is_local: bool = False) -> SymbolEntry:
         """
@@ -319,9 +344,9 @@ class SymbolTable:
         entry = SymbolEntry(name=uname, value=Value.undefined())
         entry.is_local = is_local
         if is_local and self._locals:
-            self._locals[-1][uname] = entry
+            self._add_local(uname, entry)
         else:
-            self._globals[uname] = entry
+            self._add_global(uname, entry)
         return entry
 
     def define(self, name: str, value: Value,
@@ -347,7 +372,7 @@ class SymbolTable:
             entry = self._locals[-1].get(uname)
             if entry is None:
                 entry = SymbolEntry(name=uname)
-                self._locals[-1][uname] = entry
+                self._add_local(uname, entry)
         else:
             # If the symbol already exists in the innermost local scope
             # (e.g. declared with LOCAL/OPEN earlier), update it there
@@ -358,7 +383,7 @@ class SymbolTable:
                 entry = self._globals.get(uname)
                 if entry is None:
                     entry = SymbolEntry(name=uname)
-                    self._globals[uname] = entry
+                    self._add_global(uname, entry)
 
         entry.value        = value
         entry.is_set       = is_set
@@ -388,11 +413,22 @@ class SymbolTable:
     def push_local_scope(self) -> None:
         """Push a new local scope frame (entered at PROC)."""
         self._locals.append({})
+        self._shadowed.append([])
 
     def pop_local_scope(self) -> None:
         """Pop the innermost local scope (at PEND)."""
         if len(self._locals) > 1:
             self._locals.pop()
+            visible = self._visible
+            for uname, hidden in reversed(self._shadowed.pop()):
+                # A global created while the frame hid the name is not in
+                # the record; outer local frames cannot change meanwhile
+                if hidden is None:
+                    hidden = self._globals.get(uname)
+                if hidden is None:
+                    del visible[uname]
+                else:
+                    visible[uname] = hidden
 
     def declare_local(self, name: str) -> SymbolEntry:
         """
@@ -410,7 +446,7 @@ class SymbolTable:
             if existing is not None:
                 return existing          # already declared — keep existing value
             entry = SymbolEntry(name=uname, value=Value.undefined(), is_local=True)
-            self._locals[-1][uname] = entry
+            self._add_local(uname, entry)
             return entry
         # No local scope active — fall back to a global entry
         entry = SymbolEntry(name=uname, value=Value.undefined(), is_local=True)
@@ -420,6 +456,35 @@ class SymbolTable:
     # Utility
     # ------------------------------------------------------------------
 
+    def copy(self) -> 'SymbolTable':
+        """
+        An independent copy of the table.  Entries and control sections are
+        copied; their Values (never modified in place) and procedure bodies
+        are shared.
+        """
+        def copy_entry(e: SymbolEntry) -> SymbolEntry:
+            c = object.__new__(SymbolEntry)     # copy.copy is several times slower
+            c.__dict__.update(e.__dict__)
+            return c
+
+        new = copy.copy(self)
+        new._globals  = {n: copy_entry(e) for n, e in self._globals.items()}
+        new._locals   = [{n: copy_entry(e) for n, e in scope.items()}
+                         for scope in self._locals]
+        new._rebuild_visible()
+        new._sections = [copy.copy(cs) for cs in self._sections]
+        new._section_index = dict(self._section_index)
+        return new
+
+    def _rebuild_visible(self) -> None:
+        """Recompute _visible and _shadowed from _globals and _locals."""
+        self._visible  = dict(self._globals)
+        self._shadowed = []
+        for scope in self._locals:
+            self._shadowed.append([(n, self._visible.get(n))
+                                   for n in scope])
+            self._visible.update(scope)
+
     def all_globals(self) -> Dict[str, SymbolEntry]:
         """Return a view of all global symbol entries."""
         return dict(self._globals)
@@ -9,6 +9,11 @@ The original AP assembler packed value information into 1–3 32-bit words
 with elaborate bit-fields.  Here we use Python dataclasses that carry the
 same semantic content in a readable form.
 
+Values are slotted and treated as immutable once built: the factories hand
+out shared instances for blank, undefined and small absolute values, and
+the addends/items containers are empty tuples until a COMPLEX_SUM or LIST
+needs a real list.
+
 Value kinds (mirroring the ET field of the original Expression Value Table):
   UNDEFINED    symbol referenced before definition
   ABSOLUTE     pure integer constant (no control section)
@@ -31,9 +36,9 @@ Resolution values (byte width of one "unit"):
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from enum import Enum, auto
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 
 # ---------------------------------------------------------------------------
@@ -79,7 +84,7 @@ class Resolution(Enum):
 # Addend — one component of a COMPLEX_SUM value
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Addend:
     """
     One term in a complex address expression.
@@ -100,7 +105,7 @@ class Addend:
 MASK32 = 0xFFFF_FFFF   # 32-bit mask
 
 
-@dataclass
+@dataclass(slots=True)
 class Value:
     """
     Represents the value of a symbol or expression in the AP assembler.
@@ -111,14 +116,20 @@ class Value:
     For COMPLEX_SUM:    addends is a list of Addend objects.
     For PKDEC/CHARSTR/FX/FS/FL: raw holds the original string content.
     For UNDEFINED/BLANK: all numeric fields are 0.
+    For a literal reference (=expr, L(expr)): ABSOLUTE 0 until the GEN
+    pass places the literal pool; raw is ('literal', value of expr).
+
+    A Value may be shared (see the factories below), so it is never
+    modified in place; build a new one instead.  The one exception is the
+    items list of a LIST value, which list_val() always creates afresh.
     """
     kind:        ValueKind           = ValueKind.UNDEFINED
     int_val:     int                 = 0         # ABSOLUTE value or RELOCATABLE byte offset
     csect:       int                 = 0         # control section number (RELOCATABLE)
     resolution:  Resolution          = Resolution.WORD
     raw:         object              = None      # constant body (str for PKDEC/CHARSTR/etc.)
-    addends:     List[Addend]        = field(default_factory=list)
-    items:       list                = field(default_factory=list)  # LIST elements
+    addends:     Sequence[Addend]    = ()        # COMPLEX_SUM terms (a list when present)
+    items:       Sequence            = ()        # LIST elements (a list when present)
     name:        str                 = ''        # EXTERNAL symbol name
     is_defined:  bool                = True      # False for UNDEFINED
 
@@ -129,8 +140,13 @@ class Value:
     @classmethod
     def absolute(cls, n: int, resolution: Resolution = Resolution.WORD) -> 'Value':
         """Create an absolute (non-relocatable) integer value."""
+        n = _s32(n)
+        if resolution is Resolution.WORD:
+            v = _SMALL_ABSOLUTES.get(n)
+            if v is not None:
+                return v
         return cls(kind=ValueKind.ABSOLUTE,
-                   int_val=_s32(n),
+                   int_val=n,
                    resolution=resolution)
 
     @classmethod
@@ -145,11 +161,13 @@ class Value:
     @classmethod
     def undefined(cls, resolution: Resolution = Resolution.WORD) -> 'Value':
         """Create an undefined-symbol placeholder."""
+        if resolution is Resolution.WORD:
+            return _UNDEFINED
         return cls(kind=ValueKind.UNDEFINED, is_defined=False, resolution=resolution)
 
     @classmethod
     def blank(cls) -> 'Value':
-        return cls(kind=ValueKind.BLANK)
+        return _BLANK
 
     @classmethod
     def list_val(cls, items: list) -> 'Value':
@@ -181,6 +199,11 @@ class Value:
     def fl(cls, body: str) -> 'Value':
         return cls(kind=ValueKind.FL, raw=body)
 
+    @classmethod
+    def literal(cls, inner: 'Value') -> 'Value':
+        """Create a reference to a literal-pool entry holding *inner*."""
+        return cls(kind=ValueKind.ABSOLUTE, raw=('literal', inner))
+
     # ------------------------------------------------------------------
     # Predicates
     # ------------------------------------------------------------------
@@ -198,6 +221,9 @@ class Value:
         return self.kind in (ValueKind.PKDEC, ValueKind.CHARSTR,
                               ValueKind.FX, ValueKind.FS, ValueKind.FL)
 
+    def is_literal(self) -> bool:
+        return self.kind == ValueKind.ABSOLUTE and self.raw is not None
+
     def is_scalar(self) -> bool:
         """True if the value can be used in arithmetic as a single number."""
         return self.kind in (ValueKind.ABSOLUTE, ValueKind.RELOCATABLE)
@@ -220,9 +246,11 @@ class Value:
         if self.kind not in (ValueKind.ABSOLUTE, ValueKind.RELOCATABLE,
                               ValueKind.COMPLEX_SUM):
             return self
-        new = Value(kind=self.kind, int_val=self.int_val, csect=self.csect,
-                    resolution=res, addends=list(self.addends))
-        return new
+        if self.kind == ValueKind.ABSOLUTE:
+            return Value.absolute(self.int_val, res)
+        return Value(kind=self.kind, int_val=self.int_val, csect=self.csect,
+                     resolution=res,
+                     addends=list(self.addends) if self.addends else ())
 
     def __repr__(self) -> str:
         if self.kind == ValueKind.ABSOLUTE:
@@ -237,6 +265,15 @@ class Value:
         return f"Value({self.kind.name}, {self.raw or self.int_val!r})"
 
 
+# Shared instances handed out by the factories.  Small absolutes cover the
+# AP truth values (-1, 0), counts, shifts, field widths and byte values.
+_BLANK     = Value(kind=ValueKind.BLANK)
+_UNDEFINED = Value(kind=ValueKind.UNDEFINED, is_defined=False)
+_SMALL_ABSOLUTES: Dict[int, Value] = {
+    n: Value(kind=ValueKind.ABSOLUTE, int_val=n) for n in range(-16, 257)
+}
+
+
 # ---------------------------------------------------------------------------
 # 32-bit integer helpers
 # ---------------------------------------------------------------------------
@@ -0,0 +1,483 @@
+#!/usr/bin/env python3
+"""
+AP assembler benchmarks.
+Times the DEF and GEN passes on generated sources and reports how the cost
+grows with source size; a pass that scales linearly shows a constant
+microseconds-per-statement figure as the size grows.
+
+Usage:
+  python ap_bench.py [-n STATEMENTS]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ap_assembler.concordance import Concordance
+from ap_assembler.def_pass import DefPass
+from ap_assembler.expression import compile_arg
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.incremental import IncrementalAssembler
+from ap_assembler.lexer import SourceFile, tokenize_file, tokenize_text
+from ap_assembler.linker import Linker, _apply
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.stmt_cache import StatementCache
+from ap_assembler.symbol_image import build_image, read_image
+from ap_assembler.object_writer import ObjectWriter, patch_field
+from ap_assembler.symbol_table import SymbolTable
+from ap_assembler.value import Value
+
+
+# ---------------------------------------------------------------------------
+# Workloads
+# ---------------------------------------------------------------------------
+def error_heavy_source(n):
+    """*n* statements; every other one raises an error in both passes."""
+    lines = []
+    for k in range(n // 2):
+        lines.append(f"L{k:<7d} DATA     {k}")
+        lines.append("         RES      C'AB'")
+    return '\n'.join(lines) + '\n'
+
+
+def deck_source(n):
+    """*n* statements of a typical deck: comments, EQUs and data words."""
+    lines = []
+    for k in range(n // 4):
+        lines.append(f"* block {k:<6d} {'-' * 40}")
+        lines.append(f"S{k:<7d} EQU      {k}*4")
+        lines.append(f"         DATA     S{k},X'{k & 0xFFFF:04X}',{k}")
+        lines.append(f"         GEN,16,16 S{k},{k & 0x7FFF}")
+    return '\n'.join(lines) + '\n'
+
+
+def library_source(n):
+    """A SYSTEM-style library of *n* CNAME procedures and SET symbols."""
+    lines = []
+    for k in range(n):
+        lines.append(f"OP{k:<6d} CNAME    X'{k & 0x7F:02X}'")
+        lines.append("         PROC")
+        lines.append("LF       GEN,8,4,20 NAME,AF(1),AF(2)")
+        lines.append("         PEND")
+        lines.append(f"K{k:<7d} SET      {k},{k * 2}")
+    return '\n'.join(lines) + '\n'
+
+
+def nested_source(depth, calls):
+    """
+    *calls* expansions of a procedure that calls itself *depth* deep.
+    Every level declares LOCALs and evaluates references to globals, so
+    each lookup of a global is made under up to *depth* local scopes.
+    """
+    lines = [f"G{k:<7d} EQU      {k}" for k in range(8)]
+    lines += [
+        "NEST     CNAME",
+        "         PROC",
+        "         LOCAL    T,U",
+        "T        SET      G0+G1+G2+G3+AF(1)",
+        "U        SET      G4*G5-G6+G7+T",
+        "         DO1      -(AF(1)>0)",
+        "         NEST     AF(1)-1",
+        "         PEND",
+    ]
+    lines += [f"         NEST     {depth - 1}"] * calls
+    return '\n'.join(lines) + '\n'
+
+
+def sections_source(n, sections):
+    """
+    *sections* named CSECTs, then *n* statements that re-enter them in turn
+    with USECT and place a word in each.
+    """
+    lines = []
+    for k in range(sections):
+        lines.append(f"S{k:<7d} CSECT")
+        lines.append("         DATA     0")
+    for k in range(n // 2):
+        lines.append(f"         USECT    S{k * 7 % sections}")
+        lines.append(f"         DATA     {k}")
+    return '\n'.join(lines) + '\n'
+
+
+def literal_source(n, distinct):
+    """
+    *n* statements each referring to one of *distinct* literal values, as a
+    word and through a 17-bit instruction address field.
+    """
+    lines = ["LW       CNAME    X'32'",
+             "         PROC",
+             "LF       GEN,8,4,3,17 NAME,AF(1),0,AF(2)",
+             "         PEND"]
+    for k in range(n // 2):
+        lines.append(f"         LW       {k % 16},=X'{k % distinct:X}'")
+        lines.append(f"         DATA     L({k % distinct})")
+    lines.append("         END")
+    return '\n'.join(lines) + '\n'
+
+
+def linked_source(n, module, modules):
+    """
+    Module *module* of *modules*: it DEFs one table and refers to the next
+    module's in *n* instruction address fields and data words, and to its
+    own labels.
+    """
+    lines = ["LW       CNAME    X'32'",
+             "         PROC",
+             "LF       GEN,8,4,3,17 NAME,AF(1),0,AF(2)",
+             "         PEND",
+             f"         DEF      T{module}",
+             f"         REF      T{(module + 1) % modules}",
+             f"T{module:<7d} DATA     0"]
+    for k in range(n // 2):
+        lines.append(f"L{k:<7d} LW       {k % 16},T{(module + 1) % modules}")
+        lines.append(f"         DATA     L{k}")
+    return '\n'.join(lines) + '\n'
+
+
+def assemble(stmts, lst=None):
+    sym = SymbolTable()
+    DefPass(stmts, sym).run()
+    lst = lst or ListingWriter()
+    errors = GenPass(stmts, sym, ObjectWriter(), lst).run()
+    return lst, errors
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+def bench_gen_errors(n):
+    """Both passes over error_heavy_source(n), with the listing."""
+    stmts = list(tokenize_text(error_heavy_source(n)))
+    t0 = time.perf_counter()
+    lst, errors = assemble(stmts)
+    dt = time.perf_counter() - t0
+    assert len(errors) == n // 2 and lst.error_count() == n // 2
+    return len(stmts), dt
+
+
+def assemble_file(path, listing, streamed):
+    """
+    Source file to listing file, either collected in memory (source copied
+    into every Statement, listing rendered at the end) or streamed (source
+    referenced by offset, listing written as GEN produces it).
+    """
+    src = SourceFile(path) if streamed else None
+    stmts = list(tokenize_file(path, src))
+    with open(listing, 'w', encoding='ascii', errors='replace') as f:
+        if streamed:
+            lst, _ = assemble(stmts, ListingWriter(dest=f))
+            lst.finish()
+            src.close()
+        else:
+            lst, _ = assemble(stmts)
+            lst.write(f)
+    return len(stmts)
+
+
+def bench_listing_memory(n, streamed):
+    """Peak traced memory of assemble_file() on deck_source(n)."""
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'deck.ap')
+        with open(path, 'w') as f:
+            f.write(deck_source(n))
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        count = assemble_file(path, os.path.join(d, 'deck.lst'), streamed)
+        dt = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return count, dt, peak
+
+
+def bench_object_sizes(n):
+    """
+    Traced bytes per Statement from tokenising deck_source(n), and per
+    Value from evaluating every argument of every statement (compiling
+    first, so that only the Values are counted).
+    """
+    src = deck_source(n)
+    tracemalloc.start()
+    stmts = list(tokenize_text(src))
+    stmt_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    sym = SymbolTable()
+    DefPass(stmts, sym).run()
+    args = [a for s in stmts for a in s.args]
+    compiled = [compile_arg(a) for a in args]
+    tracemalloc.start()
+    values = [ce.evaluate(sym) for ce in compiled]
+    value_bytes, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(stmts), stmt_bytes / len(stmts), len(values), value_bytes / len(values)
+
+
+def bench_stmt_cache(n):
+    """
+    tokenize_file() on deck_source(n) against StatementCache: the first
+    (miss) run, then a hit with every statement decoded.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'deck.ap')
+        with open(path, 'w') as f:
+            f.write(deck_source(n))
+        t0 = time.perf_counter()
+        count = len(list(tokenize_file(path)))
+        results.append(("tokenize_file", count, time.perf_counter() - t0))
+        cache = StatementCache(os.path.join(d, 'cache'))
+        t0 = time.perf_counter()
+        cache.tokenize_file(path)
+        results.append(("StatementCache, miss", count, time.perf_counter() - t0))
+        t0 = time.perf_counter()
+        stmts = cache.tokenize_file(path)
+        results.append(("StatementCache, hit", len(list(stmts)),
+                        time.perf_counter() - t0))
+        stmts.close()
+    return results
+
+
+def bench_incremental(n):
+    """
+    Reassembling deck_source(n) after a one-line edit 90% of the way in:
+    both passes from scratch, against IncrementalAssembler resuming DEF
+    from its last checkpoint before the edit.
+    """
+    lines = deck_source(n).splitlines(keepends=True)
+    k = len(lines) * 9 // 10 // 4 * 4 + 3     # a GEN line
+    edited = lines[:k] + ["         GEN,16,16 0,1\n"] + lines[k + 1:]
+
+    def versions():
+        # Fresh statements each time, so neither run finds the other's
+        # compiled arguments on them
+        return (list(tokenize_text(''.join(lines))),
+                list(tokenize_text(''.join(edited))))
+
+    before, after = versions()
+    assemble(before)
+    t0 = time.perf_counter()
+    assemble(after)
+    clean = time.perf_counter() - t0
+
+    before, after = versions()
+    asm = IncrementalAssembler()
+    asm.assemble(before)
+    t0 = time.perf_counter()
+    asm.assemble(after)
+    resumed = time.perf_counter() - t0
+    return len(after), clean, resumed, asm.resumed_at
+
+
+def bench_nested_lookup(depth, calls):
+    """
+    DEF pass over nested_source(depth, calls), and a lookup of a global
+    name under *depth* local scopes on its own.
+    """
+    stmts = list(tokenize_text(nested_source(depth, calls)))
+    DefPass(stmts, SymbolTable()).run()      # compile the arguments once
+    t0 = time.perf_counter()
+    DefPass(stmts, SymbolTable()).run()
+    dt = time.perf_counter() - t0
+
+    sym = SymbolTable()
+    sym.define('G', Value.absolute(1))
+    for k in range(depth):
+        sym.push_local_scope()
+        sym.declare_local(f'T{k}')
+    lookup, reps = sym.lookup, 100000
+    t0 = time.perf_counter()
+    for _ in range(reps):
+        lookup('G')
+    per_lookup = (time.perf_counter() - t0) / reps
+    return depth * calls, dt, per_lookup
+
+
+def bench_sections(n, sections):
+    """Both passes over sections_source(n, sections)."""
+    stmts = list(tokenize_text(sections_source(n, sections)))
+    t0 = time.perf_counter()
+    assemble(stmts)
+    return len(stmts), time.perf_counter() - t0
+
+
+def bench_concordance(n, on):
+    """
+    Both passes over deck_source(n), with or without a concordance, and
+    the time to render it.
+    """
+    stmts = list(tokenize_text(deck_source(n)))
+    assemble(stmts)                          # compile the arguments once
+    conc = Concordance() if on else None
+    t0 = time.perf_counter()
+    sym = SymbolTable()
+    DefPass(stmts, sym, conc).run()
+    GenPass(stmts, sym, ObjectWriter(), ListingWriter(), conc).run()
+    dt = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    if conc is not None:
+        conc.render(sym)
+    return len(stmts), dt, time.perf_counter() - t0
+
+
+def bench_literals(n, distinct):
+    """
+    Both passes over literal_source(n, distinct); the pool entries, the
+    references patched, and the bytes of object code.
+    """
+    stmts = list(tokenize_text(literal_source(n, distinct)))
+    t0 = time.perf_counter()
+    sym = SymbolTable()
+    DefPass(stmts, sym).run()
+    obj = ObjectWriter()
+    gen = GenPass(stmts, sym, obj, ListingWriter())
+    errors = gen.run()
+    dt = time.perf_counter() - t0
+    assert errors == []
+    return (len(stmts), dt, len(gen.literals), gen.literals.reference_count(),
+            obj.get_section(1).size)
+
+
+def bench_link(n, modules):
+    """
+    Linking *modules* modules of linked_source(n / modules): the whole
+    link, and writing its resolved fields through the word array against
+    byte by byte.
+    """
+    linker = Linker()
+    for m in range(modules):
+        stmts = list(tokenize_text(linked_source(n // modules, m, modules)))
+        sym, obj = SymbolTable(), ObjectWriter()
+        errors = DefPass(stmts, sym).run()
+        errors += GenPass(stmts, sym, obj, ListingWriter()).run()
+        assert errors == []
+        linker.add(obj, sym, f'M{m}')
+    t0 = time.perf_counter()
+    image = linker.link()
+    dt = time.perf_counter() - t0
+    assert not image.errors
+
+    at = {(s.module, s.number): s.address for s in image.sections}
+    fields = {}
+    for module in linker.modules:
+        for sec in module.sections:
+            for r in sec.relocs:
+                fields[(at[module.name, sec.number] + r.byte_offset,
+                        r.bit_offset, r.width, r.resolution.value)] = r.addend
+    data = bytearray(image.data)
+    t0 = time.perf_counter()
+    _apply(data, fields)
+    words = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for (address, bit_offset, width, shift), value in fields.items():
+        patch_field(data, address, bit_offset, width, value >> shift)
+    bytewise = time.perf_counter() - t0
+    return image.relocations, dt, len(fields), words, bytewise
+
+
+def bench_symbol_image(n):
+    """
+    Starting an assembly with library_source(n) defined: tokenising the
+    library and running its DEF pass, against reading its saved image.
+    """
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'lib.ap')
+        with open(path, 'w') as f:
+            f.write(library_source(n))
+        t0 = time.perf_counter()
+        stmts = list(tokenize_file(path))
+        DefPass(stmts, SymbolTable()).run()
+        from_source = time.perf_counter() - t0
+
+        image = os.path.join(d, 'lib.img')
+        build_image(image, stmts)
+        t0 = time.perf_counter()
+        sym = read_image(image)
+        from_image = time.perf_counter() - t0
+        assert sym.lookup(f'OP{n - 1}').proc_body is not None
+    return len(stmts), from_source, from_image
+
+
+def report(name, n, dt):
+    print(f"  {name:<28s} {n:>8d} stmts  {dt:8.3f} s  {dt / n * 1e6:8.1f} us/stmt")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AP assembler benchmarks')
+    parser.add_argument('-n', '--statements', type=int, default=20000,
+                        help='statements in the largest source (default 20000)')
+    args = parser.parse_args()
+
+    print("Error-heavy source (DEF + GEN + listing):")
+    for n in (args.statements // 4, args.statements // 2, args.statements):
+        report(f"{n // 2} errors", *bench_gen_errors(n))
+
+    print("Tokenising a source file:")
+    for name, n, dt in bench_stmt_cache(args.statements):
+        report(name, n, dt)
+
+    print("Reassembly after a one-line edit (DEF + GEN):")
+    n, clean, resumed, at = bench_incremental(args.statements)
+    report("clean", n, clean)
+    report(f"incremental, DEF from {at}", n, resumed)
+
+    print("Nested procedure expansion (DEF pass):")
+    for depth in (1, 10, 30):
+        n, dt, per_lookup = bench_nested_lookup(depth,
+                                                args.statements // (depth * 4))
+        print(f"  {f'depth {depth}':<28s} {n:>8d} calls  {dt:8.3f} s  "
+              f"{dt / n * 1e6:8.1f} us/call  {per_lookup * 1e9:6.0f} ns/lookup")
+
+    print("Switching control sections (DEF + GEN):")
+    for sections in (10, 100, 1000):
+        report(f"{sections} sections", *bench_sections(args.statements,
+                                                       sections))
+
+    print("Concordance (DEF + GEN, then render):")
+    for n in (args.statements // 2, args.statements):
+        for on in (False, True):
+            n_stmts, dt, render = bench_concordance(n, on)
+            report(f"{'on' if on else 'off'}", n_stmts, dt)
+            if on:
+                report("render", n_stmts, render)
+
+    print("Literal pool (DEF + GEN):")
+    for distinct in (16, 1000, args.statements // 2):
+        n, dt, entries, refs, size = bench_literals(args.statements, distinct)
+        report(f"{distinct} distinct", n, dt)
+        print(f"  {'':<28s} {entries:>8d} entries  {refs:>8d} refs  "
+              f"{size:>8d} B object")
+
+    print("Linking modules:")
+    for modules in (1, 10, 100):
+        relocs, dt, nfields, words, bytewise = bench_link(args.statements,
+                                                          modules)
+        print(f"  {f'{modules} modules':<28s} {relocs:>8d} relocs  "
+              f"{dt:8.3f} s  {dt / relocs * 1e6:8.2f} us/reloc")
+    for name, t in (('fields via word array', words),
+                    ('fields byte by byte', bytewise)):
+        print(f"  {name:<28s} {nfields:>8d} fields  {t:8.3f} s  "
+              f"{t / nfields * 1e6:8.2f} us/field")
+
+    print("Defining a SYSTEM library:")
+    n, from_source, from_image = bench_symbol_image(args.statements // 5)
+    report("tokenize + DEF pass", n, from_source)
+    report("read_image", n, from_image)
+
+    print("Object sizes (traced bytes):")
+    n_stmts, per_stmt, n_values, per_value = bench_object_sizes(args.statements)
+    print(f"  {'Statement':<28s} {n_stmts:>8d} objs  {per_stmt:8.0f} B each")
+    print(f"  {'Value':<28s} {n_values:>8d} objs  {per_value:8.0f} B each")
+
+    # tracemalloc slows everything down several times; a quarter is enough
+    print("Source file to listing file (peak traced memory):")
+    for streamed in (False, True):
+        n, dt, peak = bench_listing_memory(args.statements // 4, streamed)
+        name = 'streamed' if streamed else 'collected'
+        print(f"  {name:<28s} {n:>8d} stmts  {dt:8.3f} s  "
+              f"{peak / 2**20:8.1f} MB peak")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,189 @@
+"""
+tests/test_build.py — Tests for the parallel multi-module build driver.
+
+Covers:
+  1. Outputs match a single-module assembly, in a pool and in-process
+  2. SYSTEM libraries: one image, reused through the cache directory;
+     libraries with errors stop the build
+  3. Manifests, duplicate module names, the command line and concordances
+
+Run with:  python -m pytest tests/test_build.py -v
+"""
+
+import os
+
+import pytest
+from ap_assembler.build import (
+    LibraryError, build, main, module_name, prepare_libraries, read_manifest,
+)
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.hex_output import VerilogHexWriter
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.symbol_image import FORMAT_VERSION
+from ap_assembler.object_writer import ObjectWriter
+from ap_assembler.symbol_table import SymbolTable
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+LIBRARY = """\
+LW       CNAME    X'32'
+         PROC
+LF       GEN,8,8,16  NAME,AF(1),AF(2)
+         PEND
+BASE     SET      X'100'
+"""
+
+MODULES = {
+    'alpha': "         LW       1,BASE\n         DATA     1,2\n         END\n",
+    'beta':  "         LW       2,BASE+4\n         TEXT     'BETA'\n         END\n",
+    'gamma': "         RES      C'AB'\n         END\n",
+}
+
+
+def write_tree(tmp_path):
+    """Library and module sources under *tmp_path*; returns their paths."""
+    lib = tmp_path / 'system.ap'
+    lib.write_text(LIBRARY)
+    sources = []
+    for name, text in MODULES.items():
+        path = tmp_path / f'{name}.ap'
+        path.write_text(text)
+        sources.append(str(path))
+    return str(lib), sources
+
+
+def expected(name):
+    """Hex and listing text of module *name* assembled after the library."""
+    sym = SymbolTable()
+    DefPass(list(tokenize_text(LIBRARY)), sym).run()
+    stmts = list(tokenize_text(MODULES[name]))
+    DefPass(stmts, sym).run()
+    obj, lst = ObjectWriter(), ListingWriter()
+    GenPass(stmts, sym, obj, lst).run()
+    return VerilogHexWriter().render(obj), lst.render() + '\n'
+
+
+# ---------------------------------------------------------------------------
+# 1. Outputs
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_outputs_match_single_assembly(tmp_path, jobs):
+    lib, sources = write_tree(tmp_path)
+    out = tmp_path / 'out'
+    results = build(sources, str(out), [lib], jobs=jobs)
+    assert [module_name(r.source) for r in results] == list(MODULES)
+    for r in results:
+        hex_text, listing = expected(module_name(r.source))
+        assert open(r.hex_path).read() == hex_text
+        assert open(r.listing).read() == listing
+
+
+def test_results(tmp_path):
+    lib, sources = write_tree(tmp_path)
+    results = build(sources, str(tmp_path / 'out'), [lib], jobs=2)
+    assert [r.statements for r in results] == [3, 3, 2]
+    assert [r.errors for r in results] == [0, 0, 2]   # DEF and GEN
+    assert all(r.seconds > 0 and r.stmts_per_sec > 0 for r in results)
+
+
+# ---------------------------------------------------------------------------
+# 2. SYSTEM libraries
+# ---------------------------------------------------------------------------
+
+def test_library_image_reused(tmp_path):
+    lib, _ = write_tree(tmp_path)
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+    first = prepare_libraries([lib], str(cache))
+    mtime = os.stat(first).st_mtime_ns
+    assert prepare_libraries([lib], str(cache)) == first
+    assert os.stat(first).st_mtime_ns == mtime
+    (tmp_path / 'system.ap').write_text(LIBRARY + "MORE     SET      1\n")
+    assert prepare_libraries([lib], str(cache)) != first
+    assert prepare_libraries([], str(cache)) is None
+
+
+def test_library_errors(tmp_path, capsys):
+    lib, sources = write_tree(tmp_path)
+    (tmp_path / 'system.ap').write_text(LIBRARY + "Y        SET      1/0\n")
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+    with pytest.raises(LibraryError) as info:
+        prepare_libraries([lib], str(cache))
+    assert [path for path, _ in info.value.errors] == [lib]
+    capsys.readouterr()
+    for jobs in ('1', '2'):
+        assert main(['-j', jobs, '-o', str(tmp_path / 'out'), '--cache',
+                     str(cache), '-s', lib] + sources) == 1
+        report = capsys.readouterr().out
+        assert f'{lib}: [' in report and 'nothing assembled' in report
+    assert list(cache.glob(f'*.s{FORMAT_VERSION}')) == []
+    assert os.listdir(tmp_path / 'out') == []
+
+
+def test_cache_directory(tmp_path):
+    lib, sources = write_tree(tmp_path)
+    cache = tmp_path / 'cache'
+    for _ in range(2):
+        results = build(sources, str(tmp_path / 'out'), [lib], jobs=2,
+                        cache_dir=str(cache))
+        assert [r.errors for r in results] == [0, 0, 2]   # DEF and GEN
+    assert len(list(cache.glob(f'*.s{FORMAT_VERSION}'))) == 1
+    hex_text, _ = expected('beta')
+    assert open(results[1].hex_path).read() == hex_text
+
+
+# ---------------------------------------------------------------------------
+# 3. Manifests and the command line
+# ---------------------------------------------------------------------------
+
+def test_manifest(tmp_path):
+    _, sources = write_tree(tmp_path)
+    manifest = tmp_path / 'modules.txt'
+    manifest.write_text("* system build\n\nalpha.ap\n# beta.ap\ngamma.ap\n")
+    assert read_manifest(str(manifest)) == [sources[0], sources[2]]
+
+
+def test_duplicate_module_names(tmp_path):
+    _, sources = write_tree(tmp_path)
+    (tmp_path / 'sub').mkdir()
+    other = tmp_path / 'sub' / 'alpha.ap'
+    other.write_text(MODULES['alpha'])
+    with pytest.raises(ValueError, match='alpha'):
+        build(sources + [str(other)], str(tmp_path / 'out'), jobs=1)
+
+
+def test_main(tmp_path, capsys):
+    lib, sources = write_tree(tmp_path)
+    out = tmp_path / 'out'
+    status = main(['-j', '2', '-o', str(out), '-s', lib] + sources[:2])
+    assert status == 0
+    assert sorted(os.listdir(out)) == ['alpha.hex', 'alpha.lst',
+                                       'beta.hex', 'beta.lst']
+    report = capsys.readouterr().out
+    assert 'alpha' in report and 'stmts/s' in report
+    assert main(['-j', '1', '-o', str(out)] + sources) == 1
+
+
+def test_concordance_in_listing(tmp_path):
+    lib, sources = write_tree(tmp_path)
+    out = tmp_path / 'out'
+    assert main(['-j', '1', '-c', '-o', str(out), '-s', lib,
+                 sources[0]]) == 0
+    _, listing = expected('alpha')
+    text = open(out / 'alpha.lst').read()
+    assert text.startswith(listing)
+    xref = text[len(listing):].splitlines()
+    assert xref[1] == 'CONCORDANCE'
+    assert [row.split()[0] for row in xref[5:-1]] == ['BASE', 'LW']
+
+
+def test_main_missing_source(tmp_path):
+    with pytest.raises(SystemExit):
+        main([str(tmp_path / 'nothing.ap')])
@@ -0,0 +1,203 @@
+"""
+tests/test_compiled_expr.py — Tests for compiled (cached) expressions.
+
+Covers:
+  1. Compiled results match the ExpressionEvaluator interpreter
+  2. The compiled form kept on its TokenList, re-evaluated against the
+     current symbol table
+  3. Run-time decisions kept inside the compiled form (FNAME vs intrinsic,
+     NUM(AF) with and without a call frame)
+  4. Whole assemblies: DO loops and procedure calls reuse compiled args
+
+Run with:  python -m pytest tests/test_compiled_expr.py -v
+"""
+
+import pytest
+from ap_assembler.lexer import ArgTokenizer, TokenList, tokenize_text
+from ap_assembler.value import Value, ValueKind, AssemblerError
+from ap_assembler.expression import (
+    ExpressionEvaluator, CompiledExpr, compile_arg, evaluate_arg,
+)
+from ap_assembler.symbol_table import SymbolTable
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def tok(text):
+    """Tokenise an argument field and return its first argument's tokens."""
+    return ArgTokenizer(text, line_no=1, start_col=0).tokenize()[0]
+
+
+def make_sym():
+    sym = SymbolTable()
+    sym.define('A', Value.relocatable(1, 8))
+    sym.define('B', Value.absolute(7))
+    sym.define('L', Value.list_val([Value.absolute(1),
+                                    Value.list_val([Value.absolute(5)])]))
+    return sym
+
+
+def interpret(tokens, sym):
+    try:
+        return ExpressionEvaluator(tokens, sym).evaluate()
+    except AssemblerError as exc:
+        return str(exc)
+
+
+def compiled(tokens, sym):
+    try:
+        return CompiledExpr(tokens).evaluate(sym)
+    except AssemblerError as exc:
+        return str(exc)
+
+
+def assemble(source):
+    stmts = list(tokenize_text(source))
+    sym = SymbolTable()
+    DefPass(stmts, sym).run()
+    obj = ObjectWriter()
+    GenPass(stmts, sym, obj, ListingWriter()).run()
+    return sym, obj
+
+
+# ---------------------------------------------------------------------------
+# 1. Same results as the interpreter
+# ---------------------------------------------------------------------------
+
+EXPRESSIONS = [
+    "1+2*3", "-B**2", "~B&X'F0'", "B//2", "B/0", "A+4", "A-A", "4-A",
+    "A+B-%", "%%", "META|B", "B=7", "B~=7", "(B>1)+(B<=7)", "O'17'||5",
+    "C'AB'", "(1,2,(3,4))", "L(2)", "L(2,1)", "L(3)", "B(1)", "B(2)",
+    "BA(A)", "WA(%)", "DA(16)", "ABSVAL(A)", "CS(A)", "CS(B)",
+    "S:UFV(Q)", "S:UFV(B)+1", "NUM(L)", "NUM(B)", "NUM(Q)", "NUM(AF)",
+    "SCOR(2,1,,2)", "SCOR(C'X',C'Y',C'X')", "S:S(0,4,5)", "S:S(B,4)",
+    "AF(1)", "CF(1)", "NAME", "NAME(1)", "TCOR(1,2)", "S:PT(3)",
+    "UNDEF(1)", "*A", "*A+4", "=B", "L(B)+1", "=(1,2)",
+]
+
+
+@pytest.mark.parametrize("text", EXPRESSIONS)
+def test_matches_interpreter(text):
+    tokens = tok(text)
+    s1, s2 = make_sym(), make_sym()
+    assert compiled(tokens, s2) == interpret(tokens, s1)
+    # Symbols created on the way (forward references) match too
+    assert s2.all_globals() == s1.all_globals()
+
+
+def test_blank_argument():
+    assert CompiledExpr([]).evaluate(make_sym()).kind == ValueKind.BLANK
+
+
+def test_error_reported_by_evaluate_arg():
+    v, errs = evaluate_arg(tok("B/0"), make_sym())
+    assert v.kind == ValueKind.UNDEFINED
+    assert errs == ["Division by zero"]
+
+
+# ---------------------------------------------------------------------------
+# 2. Cache
+# ---------------------------------------------------------------------------
+
+def test_cache_returns_same_compiled_form():
+    tokens = tok("B+1")
+    assert compile_arg(tokens) is compile_arg(tokens)
+    assert compile_arg(tokens).is_compiled
+
+
+def test_cache_is_by_identity_not_content():
+    assert compile_arg(tok("B+1")) is not compile_arg(tok("B+1"))
+
+
+def test_compiled_form_kept_on_token_list():
+    tokens = tok("B+1")
+    assert type(tokens) is TokenList
+    assert compile_arg(tokens) is tokens.compiled
+    stmt, = tokenize_text("X  LW,1  Y\n")
+    for arg in stmt.args + stmt.mod_args + stmt.label_args + stmt.cmd_args:
+        assert type(arg) is TokenList
+
+
+def test_plain_list_not_kept():
+    tokens = list(tok("B+1"))
+    assert compile_arg(tokens) is not compile_arg(tokens)
+    assert evaluate_arg(tokens, make_sym())[0] == Value.absolute(8)
+
+
+def test_reevaluation_sees_current_symbols():
+    sym = make_sym()
+    tokens = tok("B*2+FWD")
+    v, _ = evaluate_arg(tokens, sym)
+    assert v.kind == ValueKind.UNDEFINED
+    sym.define('B', Value.absolute(10))
+    sym.define('FWD', Value.absolute(1))
+    v, _ = evaluate_arg(tokens, sym)
+    assert v == Value.absolute(21)
+
+
+def test_fresh_value_each_evaluation():
+    sym = make_sym()
+    tokens = tok("(1,2)")
+    first, _ = evaluate_arg(tokens, sym)
+    first.items.append(Value.absolute(3))
+    again, _ = evaluate_arg(tokens, sym)
+    assert len(again.items) == 2
+
+
+# ---------------------------------------------------------------------------
+# 3. Run-time decisions
+# ---------------------------------------------------------------------------
+
+def test_fname_named_like_intrinsic_wins():
+    # CS is an intrinsic, but once defined as an FNAME the body runs
+    sym, _ = assemble("""\
+CS       FNAME
+         PROC
+         PEND     AF(1)+100
+X        EQU      CS(5)
+         END
+""")
+    assert sym.lookup('X').value == Value.absolute(105)
+
+
+def test_num_af_depends_on_frame():
+    sym, _ = assemble("""\
+P        CNAME
+         PROC
+N        SET      NUM(AF)
+         PEND
+         P        1,2,3
+OUT      EQU      N
+         END
+""")
+    assert sym.lookup('OUT').value == Value.absolute(3)
+    # Outside a procedure NUM(AF) counts nothing
+    v, _ = evaluate_arg(tok("NUM(AF)"), SymbolTable())
+    assert v == Value.absolute(0)
+
+
+# ---------------------------------------------------------------------------
+# 4. Whole assemblies
+# ---------------------------------------------------------------------------
+
+def test_do_loop_and_procedure_calls():
+    _, obj = assemble("""\
+OP       CNAME    X'32'
+         PROC
+LF       GEN,8,8,16  NAME,AF(1),AF(2)*2
+         PEND
+I        SET      0
+         DO       3
+I        SET      I+1
+         OP       I,I+100
+         FIN
+         END
+""")
+    data = bytes(obj.get_section(1).data)
+    assert data == bytes([0x32, 1, 0, 202, 0x32, 2, 0, 204, 0x32, 3, 0, 206])
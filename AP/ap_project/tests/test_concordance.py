@@ -0,0 +1,191 @@
+"""
+tests/test_concordance.py — Tests for the Phase 4 concordance.
+
+Covers:
+  1. Definitions and references: labels, subscripts, procedure calls,
+     intrinsics and special symbols
+  2. Executed statements only: DO, GOTO, repetition, and each pass
+  3. The rendered cross-reference: order, values, wrapping
+  4. Passes without a concordance are unchanged
+
+Run with:  python -m pytest tests/test_concordance.py -v
+"""
+
+from ap_assembler.concordance import Concordance, ConcordanceEntry
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter
+from ap_assembler.symbol_table import PASS_DEF, PASS_GEN, SymbolTable
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def assemble(source: str, conc=None):
+    stmts = list(tokenize_text(source))
+    sym   = SymbolTable()
+    DefPass(stmts, sym, conc).run()
+    obj, lst = ObjectWriter(), ListingWriter()
+    GenPass(stmts, sym, obj, lst, conc).run()
+    return sym, obj, lst
+
+
+def xref(source: str, pass_=None):
+    """name → (defined, referenced) for *source*."""
+    conc = Concordance()
+    assemble(source, conc)
+    return {e.name: (e.defined, e.referenced) for e in conc.entries(pass_)}
+
+
+PROCS = """\
+WORD     CNAME    X'20'
+         PROC
+LF       GEN,8,24 NAME,AF(1)
+         PEND
+TWICE    FNAME
+         PROC
+         PEND     AF(1)*2
+"""
+
+
+# ---------------------------------------------------------------------------
+# 1. Definitions and references
+# ---------------------------------------------------------------------------
+
+class TestRecording:
+    def test_labels_and_arguments(self):
+        refs = xref("A        EQU      5\n"
+                    "B        DATA     A,A+C\n"
+                    "C        EQU      B\n")
+        assert refs == {'A': ([1], [2]), 'B': ([2], [3]), 'C': ([3], [2])}
+
+    def test_set_redefinition(self):
+        refs = xref("N        SET      0\n"
+                    "N        SET      N+1\n")
+        assert refs == {'N': ([1, 2], [2])}
+
+    def test_subscripted_label(self):
+        refs = xref("T        SET      1,2\n"
+                    "I        SET      1\n"
+                    "T(I+1)   SET      9\n")
+        assert refs['T'] == ([1, 3], [])
+        assert refs['I'] == ([2], [3])
+
+    def test_procedures(self):
+        refs = xref(PROCS + "HERE     WORD     TWICE(3)\n")
+        assert refs['WORD'] == ([1], [8])
+        assert refs['TWICE'] == ([5], [8])
+        assert refs['HERE'] == ([8], [])
+        # AF, LF and NAME inside the bodies are not symbols
+        assert set(refs) == {'WORD', 'TWICE', 'HERE'}
+
+    def test_special_symbols_skipped(self):
+        refs = xref("X        EQU      $\n"
+                    "Y        EQU      BA(X)+$$\n")
+        assert refs == {'X': ([1], [2]), 'Y': ([2], [])}
+
+    def test_intrinsic_name_as_symbol(self):
+        assert xref("CS       EQU      1\n"
+                    "         DATA     CS\n")['CS'] == ([1], [2])
+
+    def test_undefined_reference(self):
+        assert xref("         DATA     NOWHERE\n") == {'NOWHERE': ([], [1])}
+
+
+# ---------------------------------------------------------------------------
+# 2. Executed statements only
+# ---------------------------------------------------------------------------
+
+class TestExecuted:
+    def test_do_zero_skipped(self):
+        refs = xref("A        EQU      1\n"
+                    "         DO       0\n"
+                    "         DATA     A\n"
+                    "         FIN\n")
+        assert refs['A'] == ([1], [])
+
+    def test_goto_skipped(self):
+        refs = xref("A        EQU      1\n"
+                    "         GOTO     THERE\n"
+                    "         DATA     A\n"
+                    "THERE    DATA     A\n")
+        assert refs['A'] == ([1], [4])
+        assert refs['THERE'] == ([4], [2])
+
+    def test_repeated_lines_listed_once(self):
+        conc = Concordance()
+        assemble("N        SET      0\n"
+                 "         DO       5\n"
+                 "N        SET      N+1\n"
+                 "         FIN\n", conc)
+        assert conc.entries() == [ConcordanceEntry('N', [1, 3], [3])]
+        assert len(conc) == 2 * (1 + 5 * 2)      # both passes
+
+    def test_each_pass(self):
+        src = "         DATA     LATER\nLATER    EQU      1\n"
+        assert xref(src, PASS_DEF) == xref(src, PASS_GEN) == xref(src)
+        conc = Concordance()
+        DefPass(list(tokenize_text(src)), SymbolTable(), conc).run()
+        assert conc.entries(PASS_GEN) == []
+        assert conc.entries(PASS_DEF) == conc.entries()
+
+    def test_statements_scanned_once(self):
+        conc = Concordance()
+        assemble(PROCS + "         WORD     1\n" * 20, conc)
+        scanned = len(conc._scanned)
+        assemble(PROCS + "         WORD     1\n" * 20, conc)
+        assert len(conc._scanned) == 2 * scanned
+        assert scanned <= len((PROCS + "         WORD     1\n" * 20)
+                              .splitlines())
+
+
+# ---------------------------------------------------------------------------
+# 3. Rendering
+# ---------------------------------------------------------------------------
+
+class TestRender:
+    def test_alphabetical_with_values(self):
+        conc = Concordance()
+        sym, _, _ = assemble("ZED      EQU      X'1F'\n"
+                             "ALPHA    DATA     ZED\n"
+                             "         DATA     MISSING\n"
+                             "DATA2    CSECT\n" + PROCS, conc)
+        rows = conc.render(sym).splitlines()[4:-1]
+        assert [r.split()[0] for r in rows] == \
+            ['ALPHA', 'DATA2', 'MISSING', 'TWICE', 'WORD', 'ZED']
+        assert rows[0].split()[1:] == ['01', '000000', '2*']
+        assert rows[1].split()[1:] == ['02', '000000', '4*']
+        assert rows[2].split()[1:] == ['UNDEF', '3']
+        assert rows[4].split()[1:] == ['PROC', '5*']
+        assert rows[5].split()[1:] == ['0000001F', '1*', '2']
+
+    def test_without_symbol_table(self):
+        conc = Concordance()
+        assemble("A        EQU      1\n", conc)
+        assert conc.render().splitlines()[4].split() == ['A', '1*']
+
+    def test_long_reference_lists_wrap(self):
+        conc = Concordance()
+        sym, _, _ = assemble("A        EQU      1\n"
+                             + "         DATA     A\n" * 24, conc)
+        rows = conc.render(sym).splitlines()[4:-1]
+        assert len(rows) == 3
+        assert rows[0].split() == ['A', '00000001', '1*'] + \
+            [str(n) for n in range(2, 11)]
+        assert rows[2].split() == [str(n) for n in range(21, 26)]
+
+
+# ---------------------------------------------------------------------------
+# 4. Passes without a concordance
+# ---------------------------------------------------------------------------
+
+def test_output_unchanged():
+    src = PROCS + "N        SET      2\nHERE     WORD     TWICE(N)\n"
+    sym1, obj1, lst1 = assemble(src)
+    sym2, obj2, lst2 = assemble(src, Concordance())
+    assert lst1.render() == lst2.render()
+    assert bytes(obj1.get_section(1).data) == bytes(obj2.get_section(1).data)
+    assert sym1.all_globals().keys() == sym2.all_globals().keys()
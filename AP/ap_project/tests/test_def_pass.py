@@ -8,9 +8,13 @@ representative snippets from testtese.txt.
 Run with:  python -m pytest tests/test_def_pass.py -v
 """
 
+import random
+
 import pytest
 from ap_assembler.def_pass import DefPass
-from ap_assembler.do_control import find_else_fin, find_pend, find_label
+from ap_assembler.do_control import (
+    BlockIndex, find_else_fin, find_pend, find_label,
+)
 from ap_assembler.lexer import tokenize_text, Statement
 from ap_assembler.symbol_table import SymbolTable, CsectKind, PASS_DEF
 from ap_assembler.value import Value, ValueKind, Resolution
@@ -662,5 +666,77 @@ class TestDoControlHelpers:
         assert find_label(non_comment, 'Z') == -1
 
 
+class TestBlockIndex:
+    """BlockIndex must agree with the scanning helpers it replaces."""
+
+    LINES = ['  DO  1', '  ELSE', '  FIN', 'P  CNAME', 'F  FNAME', '  PROC',
+             '  PEND', '  RES  1', '* comment', 'A  EQU  1', 'B  EQU  2']
+
+    def _check(self, stmts, start=0, stop=None):
+        index = BlockIndex(stmts, start, stop)
+        for i in range(start, len(stmts) if stop is None else stop):
+            s = stmts[i]
+            base = (s.command or '').partition(',')[0].upper()
+            if not s.is_comment and base == 'DO':
+                assert index.else_fin(i) == find_else_fin(stmts, i + 1)
+            if not s.is_comment and base in ('PROC', 'CNAME', 'FNAME'):
+                assert index.pend(i) == find_pend(stmts, i + 1)
+        for name in ('A', 'B', 'Z'):
+            for start in range(len(stmts)):
+                assert index.label(name, start) == find_label(stmts, name, start)
+
+    def test_nested_do_with_else(self):
+        stmts = list(tokenize_text(
+            "  DO 1\n  DO 0\n  ELSE\n  FIN\n  ELSE\n  ELSE\n  FIN\n"))
+        index = BlockIndex(stmts)
+        assert index.else_fin(0) == (4, 6)
+        assert index.else_fin(1) == (2, 3)
+
+    def test_cname_proc_pend(self):
+        stmts = list(tokenize_text("F  CNAME\n  PROC\n  RES 1\n  PEND\n"))
+        index = BlockIndex(stmts)
+        assert index.pend(0) == 3
+        assert index.pend(1) == 3
+
+    def test_label_wraps_around(self):
+        stmts = list(tokenize_text("A  EQU 1\nB  EQU 2\nA  SET 3\n"))
+        index = BlockIndex(stmts)
+        assert index.label('a', 1) == 2
+        assert index.label('A', 0) == 0
+        assert index.label('B', 2) == 1
+        assert index.label('Z') == -1
+
+    def test_agrees_with_scans_on_random_nesting(self):
+        rng = random.Random(12)
+        for _ in range(200):
+            lines = [rng.choice(self.LINES) for _ in range(rng.randint(1, 25))]
+            self._check(list(tokenize_text('\n'.join(lines) + '\n')))
+
+    def test_range_agrees_with_scans(self):
+        rng = random.Random(19)
+        for _ in range(200):
+            lines = [rng.choice(self.LINES) for _ in range(rng.randint(1, 25))]
+            stmts = list(tokenize_text('\n'.join(lines) + '\n'))
+            start = rng.randrange(len(stmts))
+            self._check(stmts, start, rng.randint(start, len(stmts)))
+
+    def test_goto_in_procedure_body(self):
+        sym = run("""\
+P        CNAME
+         PROC
+N        SET      0
+LOOP     SET      N+1
+N        SET      LOOP
+         DO1      -(N<3)
+         GOTO     LOOP
+         PEND
+         P
+         P
+OUT      EQU      N
+         END
+""")
+        assert val(sym, 'OUT').int_val == 3
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -8,6 +8,8 @@ listing is populated correctly, and validates DO-loop repetition.
 Run with:  python -m pytest tests/test_gen_pass.py -v
 """
 
+import io
+
 import pytest
 from ap_assembler.def_pass import DefPass
 from ap_assembler.gen_pass import GenPass
@@ -601,5 +603,75 @@ class TestListingWriter:
         assert lw.line_count() == 2
 
 
+# ---------------------------------------------------------------------------
+# 13. Listing error attribution
+# ---------------------------------------------------------------------------
+
+class TestListingErrors:
+    def test_errors_attached_to_their_lines(self):
+        src = ''.join(f"L{k}  DATA  {k}\n  RES  C'AB'\n" for k in range(500))
+        _, _, lst, _, gen_errors = assemble(src)
+        assert len(gen_errors) == 500
+        for ll in lst._lines:
+            if ll.line_no % 2 == 0:
+                assert ll.errors == [f"[E] Line {ll.line_no}: "
+                                     "Integer constant required"]
+            else:
+                assert ll.errors == []
+
+    def test_repeated_line_lists_all_its_errors_so_far(self):
+        _, _, lst, _, _ = assemble("  DO  2\n  RES  C'AB'\n  FIN\n")
+        res_lines = [ll for ll in lst._lines if ll.line_no == 2]
+        assert [len(ll.errors) for ll in res_lines] == [1, 2]
+
+
+# ---------------------------------------------------------------------------
+# 14. Streamed listing
+# ---------------------------------------------------------------------------
+
+STREAM_SRC = """\
+* streamed listing
+         TITLE    'STREAMED'
+A        EQU      5
+         DO       2
+         DATA     A
+         RES      C'AB'
+         FIN
+         END
+"""
+
+
+class TestStreamedListing:
+    def test_same_text_as_collected(self):
+        _, _, lst, _, _ = assemble(STREAM_SRC)
+        collected = io.StringIO()
+        lst.write(collected)
+
+        stmts = list(tokenize_text(STREAM_SRC))
+        sym = SymbolTable()
+        DefPass(stmts, sym).run()
+        out = io.StringIO()
+        lw = ListingWriter(dest=out)
+        GenPass(stmts, sym, ObjectWriter(), lw).run()
+        lw.finish()
+        assert out.getvalue() == collected.getvalue()
+        assert out.getvalue().startswith('STREAMED\n')
+        assert (lw.line_count(), lw.error_count()) == \
+            (lst.line_count(), lst.error_count())
+
+    def test_holds_only_the_last_line(self):
+        out = io.StringIO()
+        lw = ListingWriter(dest=out)
+        for k in range(1, 4):
+            lw.add_line(k, None, 0, 0, f'L{k}')
+            assert len(lw._lines) == 1
+        assert 'L2' in out.getvalue() and 'L3' not in out.getvalue()
+        lw.add_error('late error')
+        lw.finish()
+        text = out.getvalue()
+        assert text.index('L3') < text.index('late error')
+        assert (lw.line_count(), lw.error_count()) == (3, 1)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
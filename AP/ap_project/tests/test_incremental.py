@@ -0,0 +1,254 @@
+"""
+tests/test_incremental.py — Tests for incremental reassembly.
+
+Covers:
+  1. first_change
+  2. Checkpoints: where they are taken, and where look-ahead prevents them
+  3. Resumed assemblies match a clean assembly byte for byte — edits
+     after procedures, inside procedures, around DO loops and GOTOs
+  4. Successive edits reuse checkpoints and Statements from earlier runs
+
+Run with:  python -m pytest tests/test_incremental.py -v
+"""
+
+import pytest
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.incremental import (
+    CheckpointingDefPass, IncrementalAssembler, first_change,
+)
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter
+from ap_assembler.symbol_table import SymbolTable
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def assemble(source: str):
+    """Clean run of both passes: (sym, obj, lst, def_errors, gen_errors)."""
+    stmts = list(tokenize_text(source))
+    sym   = SymbolTable()
+    def_errors = DefPass(stmts, sym).run()
+    obj = ObjectWriter()
+    lst = ListingWriter()
+    gen_errors = GenPass(stmts, sym, obj, lst).run()
+    return sym, obj, lst, def_errors, gen_errors
+
+
+def outputs(result):
+    """Everything an assembly produces, in comparable form."""
+    sym, obj, lst, def_errors, gen_errors = result
+    sections = {n: bytes(obj.get_section(n).data)
+                for n in range(sym.section_count())
+                if obj.get_section(n) is not None}
+    values = {n: e.value for n, e in sym.all_globals().items()}
+    return (sections, values, lst.render(),
+            [str(e) for e in def_errors], [str(e) for e in gen_errors])
+
+
+def check_edit(before: str, after: str, interval: int = 4):
+    """Assemble *before* then *after* incrementally; compare with clean."""
+    asm = IncrementalAssembler(interval)
+    assert outputs(asm.assemble(tokenize_text(before))) == \
+        outputs(assemble(before))
+    assert asm.resumed_at == 0
+    assert outputs(asm.assemble(tokenize_text(after))) == \
+        outputs(assemble(after))
+    return asm
+
+
+def data_lines(n: int, start: int = 0) -> str:
+    return ''.join(f"D{k:<7d} DATA     {k}\n" for k in range(start, start + n))
+
+
+PROCS = """\
+WORD     CNAME    X'20'
+         PROC
+LF       GEN,8,24 NAME,AF(1)
+         PEND
+TWICE    FNAME
+         PROC
+         PEND     AF(1)*2
+"""
+
+
+# ---------------------------------------------------------------------------
+# 1. first_change
+# ---------------------------------------------------------------------------
+
+class TestFirstChange:
+    def test_identical(self):
+        stmts = list(tokenize_text(data_lines(5)))
+        assert first_change(stmts, list(tokenize_text(data_lines(5)))) == 5
+
+    def test_edit(self):
+        a = list(tokenize_text(data_lines(5)))
+        b = list(tokenize_text(data_lines(3) + "X        DATA     9\n"
+                               + data_lines(1, 4)))
+        assert first_change(a, b) == 3
+
+    def test_append(self):
+        a = list(tokenize_text(data_lines(3)))
+        b = list(tokenize_text(data_lines(5)))
+        assert first_change(a, b) == 3
+
+    def test_executed_statements_still_match(self):
+        a = list(tokenize_text(data_lines(5)))
+        DefPass(a, SymbolTable()).run()      # fills in handler / cmd_args
+        assert first_change(a, list(tokenize_text(data_lines(5)))) == 5
+
+
+# ---------------------------------------------------------------------------
+# 2. Checkpoints
+# ---------------------------------------------------------------------------
+
+def checkpoints(source: str, interval: int = 4):
+    dp = CheckpointingDefPass(list(tokenize_text(source)), SymbolTable(),
+                              interval)
+    dp.run()
+    return [cp.pos for cp in dp.checkpoints]
+
+
+class TestCheckpoints:
+    def test_every_interval(self):
+        assert checkpoints(data_lines(20)) == [4, 8, 12, 16]
+
+    def test_state_is_a_copy(self):
+        dp = CheckpointingDefPass(list(tokenize_text(data_lines(10))),
+                                  SymbolTable(), 4)
+        dp.run()
+        cp = dp.checkpoints[0]
+        assert cp.sym.lookup('D3') is not None
+        assert cp.sym.lookup('D4') is None
+        assert dp.sym.lookup('D9') is not None
+
+    def test_none_inside_do_loop(self):
+        src = (data_lines(2) + "         DO       3\n"
+               + data_lines(6, 2) + "         FIN\n" + data_lines(4, 8))
+        positions = checkpoints(src)
+        assert all(p <= 2 or p > 9 for p in positions)
+        assert positions
+
+    def test_none_before_forward_goto_target(self):
+        src = (data_lines(2) + "         GOTO     THERE\n" + data_lines(8, 2)
+               + "THERE    DATA     99\n" + data_lines(8, 10))
+        positions = checkpoints(src)
+        assert all(p <= 2 or p > 11 for p in positions)
+        assert positions
+
+    def test_none_after_backward_goto(self):
+        src = ("N        SET      0\n" + "BACK     DATA     N\n"
+               + data_lines(6) + "N        SET      N+1\n"
+               + "         GOTO,2-N BACK\n" + data_lines(10, 6))
+        # The GOTO wraps to search from the top: nothing after depends on
+        # less than the whole source
+        dp = CheckpointingDefPass(list(tokenize_text(src)), SymbolTable(), 4)
+        dp.run()
+        assert dp.sym.lookup('N').value.int_val == 2
+        assert all(cp.pos <= 9 for cp in dp.checkpoints)
+
+    def test_none_after_missing_goto_label(self):
+        src = data_lines(6) + "         GOTO     NOWHERE\n" + data_lines(10, 6)
+        assert all(p <= 6 for p in checkpoints(src))
+
+
+# ---------------------------------------------------------------------------
+# 3. Resumed assemblies match clean ones
+# ---------------------------------------------------------------------------
+
+class TestResumedOutput:
+    def test_edit_near_end(self):
+        before = PROCS + data_lines(20) + "         WORD     TWICE(3)\n"
+        after  = PROCS + data_lines(20) + "         WORD     TWICE(4)\n"
+        asm = check_edit(before, after)
+        assert asm.resumed_at > 0
+
+    def test_procedures_called_after_resume(self):
+        before = (PROCS + data_lines(12) + "         WORD     1\n"
+                  + "X        EQU      TWICE(5)\n")
+        after  = (PROCS + data_lines(12) + "         WORD     2\n"
+                  + "X        EQU      TWICE(6)\n")
+        asm = check_edit(before, after)
+        assert asm.resumed_at > len(PROCS.splitlines())
+
+    def test_edit_inside_procedure(self):
+        before = PROCS + data_lines(12) + "         WORD     1\n"
+        after  = (PROCS.replace("AF(1)*2", "AF(1)*3") + data_lines(12)
+                  + "         WORD     TWICE(1)\n")
+        asm = check_edit(before, after)
+        assert asm.resumed_at <= 4
+
+    def test_edit_in_do_loop(self):
+        loop = ("I        SET      0\n" + "         DO       4\n"
+                + "I        SET      I+1\n" + "         DATA     I*{}\n"
+                + "         FIN\n")
+        before = data_lines(10) + loop.format(2) + data_lines(10, 10)
+        after  = data_lines(10) + loop.format(3) + data_lines(10, 10)
+        asm = check_edit(before, after)
+        assert 0 < asm.resumed_at <= 10
+
+    def test_forward_reference_changed_by_edit(self):
+        before = "         DATA     LATER\n" + data_lines(12) + "LATER    EQU      1\n"
+        after  = "         DATA     LATER\n" + data_lines(12) + "LATER    EQU      2\n"
+        check_edit(before, after)
+
+    def test_goto_target_moved(self):
+        before = (data_lines(6) + "         GOTO     T\n" + data_lines(6, 6)
+                  + "T        DATA     1\n" + data_lines(6, 12))
+        after  = (data_lines(6) + "         GOTO     T\n" + data_lines(3, 6)
+                  + "T        DATA     1\n" + data_lines(9, 9))
+        asm = check_edit(before, after)
+        assert asm.resumed_at <= 6
+
+    def test_errors_before_and_after_resume(self):
+        before = ("         RES      C'AB'\n" + data_lines(12)
+                  + "         DATA     UNDEF1\n")
+        after  = ("         RES      C'AB'\n" + data_lines(12)
+                  + "         DATA     UNDEF2\n")
+        asm = check_edit(before, after)
+        assert asm.resumed_at > 0
+
+    def test_insert_and_delete(self):
+        base = PROCS + data_lines(16)
+        check_edit(base, PROCS + data_lines(8) + "         WORD     7\n"
+                   + data_lines(8, 8))
+        check_edit(base, PROCS + data_lines(8) + data_lines(7, 9))
+
+    def test_unchanged_source(self):
+        src = PROCS + data_lines(16)
+        asm = check_edit(src, src)
+        assert asm.resumed_at > 0
+
+
+# ---------------------------------------------------------------------------
+# 4. Successive edits
+# ---------------------------------------------------------------------------
+
+def test_unchanged_statements_reused():
+    asm = IncrementalAssembler(4)
+    before = PROCS + data_lines(8) + "         WORD     1\n" + data_lines(8, 8)
+    after  = PROCS + data_lines(8) + "         WORD     2\n" + data_lines(8, 8)
+    asm.assemble(tokenize_text(before))
+    old = asm._stmts
+    asm.assemble(tokenize_text(after))
+    new = asm._stmts
+    k = len(PROCS.splitlines()) + 8
+    assert all(a is b for a, b in zip(old[:k], new[:k]))
+    assert new[k] is not old[k]
+    assert all(a is b for a, b in zip(old[k + 1:], new[k + 1:]))
+
+def test_successive_edits():
+    versions = [
+        PROCS + data_lines(30),
+        PROCS + data_lines(25) + "         WORD     TWICE(1)\n" + data_lines(4, 26),
+        PROCS + data_lines(10) + "         WORD     2\n"
+        + data_lines(14, 11) + "         WORD     TWICE(1)\n" + data_lines(4, 26),
+        PROCS + data_lines(20) + "         WORD     TWICE(9)\n",
+    ]
+    asm = IncrementalAssembler(4)
+    for src in versions:
+        assert outputs(asm.assemble(tokenize_text(src))) == \
+            outputs(assemble(src))
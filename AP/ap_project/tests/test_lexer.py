@@ -15,7 +15,8 @@ from typing import List
 import pytest
 
 from ap_assembler.lexer import (
-    TT, Token, Statement, Tokenizer, ArgTokenizer, tokenize_text
+    TT, Token, Statement, Tokenizer, ArgTokenizer, tokenize_text,
+    tokenize_file, SourceFile, SourceRef,
 )
 
 
@@ -786,3 +787,132 @@ class TestArgTokenizer:
         args = self._tok("FX'3.75B4'")
         assert args[0][0].type  == TT.FX
         assert args[0][0].value == '3.75B4'
+
+
+# ---------------------------------------------------------------------------
+# 21. Pre-parsed command and label fields
+# ---------------------------------------------------------------------------
+
+class TestParsedFields:
+    def test_base_and_modifier(self):
+        s = stmts("  gen,8,24  1,2")[0]
+        assert s.base == 'GEN'
+        assert s.modifier == '8,24'
+        assert [[t.value for t in a] for a in s.mod_args] == [[8], [24]]
+
+    def test_no_modifier(self):
+        s = stmts("  DATA  1")[0]
+        assert (s.base, s.modifier, s.mod_args) == ('DATA', '', [])
+
+    def test_cmd_args(self):
+        s = stmts("  Lw,1  X")[0]
+        assert [[(t.type, t.value) for t in a] for a in s.cmd_args] == \
+            [[(TT.SYMBOL, 'LW')], [(TT.INT, 1)]]
+        assert s.cmd_args[1] is s.mod_args[0]
+
+    def test_label_args(self):
+        s = stmts("IAN(I,J)  SET  1")[0]
+        assert [t.type for t in s.label_args[0]] == \
+            [TT.SYMBOL, TT.LPAREN, TT.SYMBOL, TT.COMMA, TT.SYMBOL, TT.RPAREN]
+        assert stmts("  SET  1")[0].label_args == []
+
+    def test_comment_statement(self):
+        s = list(tokenize_text("* note\n"))[0]
+        assert (s.base, s.mod_args, s.cmd_args, s.handler) == ('', [], [], None)
+
+    def test_parsed_fields_ignored_by_equality(self):
+        a, b = stmts("  DATA,4  1")[0], stmts("  DATA,4  1")[0]
+        assert a == b
+        a.handler = '_handle_data'
+        assert a == b
+
+
+# ---------------------------------------------------------------------------
+# 22. Lazy reading and source text by file offset
+# ---------------------------------------------------------------------------
+
+DECK = (
+    "* heading comment\r\n"
+    "A        EQU      5\r\n"
+    "\r\n"
+    "B        DATA     1,;\r\n"
+    "                  2,3                                                     SEQ00040\n"
+    "         TEXT     'x\xe9y'\n"
+    "         END"
+)
+
+
+class TestSourceRefs:
+    def write_deck(self, tmp_path):
+        path = tmp_path / 'deck.ap'
+        path.write_bytes(DECK.encode('latin-1'))
+        return str(path)
+
+    def test_reader_pulls_lines_on_demand(self):
+        pulled = []
+
+        def lines():
+            for line in ("A  EQU  1\n", "B  EQU  2\n", "C  EQU  3\n"):
+                pulled.append(line)
+                yield line
+
+        it = Tokenizer(lines()).statements()
+        assert next(it).label == 'A'
+        assert len(pulled) < 3
+
+    def test_file_matches_text(self, tmp_path):
+        path = self.write_deck(tmp_path)
+        with open(path, encoding='ascii', errors='replace') as f:
+            expected = list(tokenize_text(f.read()))
+        assert list(tokenize_file(path)) == expected
+
+    def test_refs_rebuild_source(self, tmp_path):
+        path = self.write_deck(tmp_path)
+        plain = list(tokenize_file(path))
+        src = SourceFile(path)
+        try:
+            refs = list(tokenize_file(path, src))
+            assert all(isinstance(s.source, SourceRef) for s in refs)
+            assert [str(s.source) for s in refs] == [s.source for s in plain]
+            assert [s.args for s in refs] == [s.args for s in plain]
+        finally:
+            src.close()
+
+    def test_continuation_spans_both_lines(self, tmp_path):
+        path = self.write_deck(tmp_path)
+        src = SourceFile(path)
+        try:
+            b = next(s for s in tokenize_file(path, src) if s.label == 'B')
+            text = str(b.source)
+            assert text.count('\n') == 1
+            assert 'SEQ' not in text
+            assert [len(line) for line in text.split('\n')] == [72, 72]
+        finally:
+            src.close()
+
+
+# ---------------------------------------------------------------------------
+# 23. Compact statements
+# ---------------------------------------------------------------------------
+
+class TestCompactStatements:
+    def test_slotted(self):
+        s = stmts("L  DATA  X")[0]
+        assert not hasattr(s, '__dict__')
+        assert not hasattr(s.args[0][0], '__dict__')
+
+    def test_names_interned(self):
+        a, b = stmts("  DATA  SYMBOLNAME\n  data  symbolname")
+        assert a.base is b.base
+        assert a.args[0][0].value is b.args[0][0].value
+        c, d = stmts("LABEL  DATA  LABEL\nlabel  DATA  1")
+        assert c.label is d.label is c.args[0][0].value
+
+    def test_empty_arg_lists_shared(self):
+        a, b = stmts("  END\n  END")
+        assert a.args is b.args and a.label_args is b.mod_args
+        assert a.args == []
+
+    def test_cmd_args_built_once(self):
+        s = stmts("  OP,1  2")[0]
+        assert s.cmd_args is s.cmd_args
@@ -0,0 +1,314 @@
+"""
+tests/test_linker.py — Tests for the in-memory linker.
+
+Covers:
+  1. Relocations recorded by the GEN pass and the literal pool
+  2. Layout: module order, alignment, ASECT, shared DSECTs, origin
+  3. External symbols: REF, SREF, absolute DEFs, errors
+  4. Field patching: word array against byte-wise, straddling fields,
+     sums of sections
+  5. Output: hex writer, simulator memory, load map, build -l
+
+Run with:  python -m pytest tests/test_linker.py -v
+"""
+
+import os
+import random
+
+from ap_assembler.build import main
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.hex_output import VerilogHexWriter
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.linker import Linker, _apply, object_module
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter, patch_field
+from ap_assembler.symbol_table import CsectKind, SymbolTable
+from ap_assembler.value import Resolution
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+LW = """\
+LW       CNAME    X'32'
+         PROC
+LF       GEN,8,4,3,17 NAME,AF(1),0,AF(2)
+         PEND
+"""
+
+
+def assemble(source: str):
+    stmts = list(tokenize_text(source))
+    sym   = SymbolTable()
+    errors = DefPass(stmts, sym).run()
+    obj = ObjectWriter()
+    errors += GenPass(stmts, sym, obj, ListingWriter()).run()
+    assert errors == []
+    return obj, sym
+
+
+def link(*sources, origin=None):
+    linker = Linker()
+    for k, src in enumerate(sources):
+        linker.add(*assemble(src), f'm{k}')
+    return linker.link(origin)
+
+
+def words(image, address=0, count=None):
+    data = bytes(image.data[address:])
+    n = len(data) // 4 if count is None else count
+    return [int.from_bytes(data[k * 4:k * 4 + 4], 'big') for k in range(n)]
+
+
+# ---------------------------------------------------------------------------
+# 1. Relocations recorded
+# ---------------------------------------------------------------------------
+
+class TestRecorded:
+    def test_data_and_gen_fields(self):
+        obj, _ = assemble(LW + "HERE     LW       1,HERE+4\n"
+                               "         DATA     HERE\n")
+        sec = obj.get_section(1)
+        # the GEN field holds the word offset, DATA the byte offset
+        assert bytes(sec.data) == bytes.fromhex('32100001 00000000')
+        r1, r2 = sec.relocs
+        assert (r1.byte_offset, r1.bit_offset, r1.width, r1.section,
+                r1.addend, r1.resolution) == (0, 15, 17, 1, 4,
+                                              Resolution.WORD)
+        assert (r2.byte_offset, r2.bit_offset, r2.width, r2.addend,
+                r2.resolution) == (4, 0, 32, 0, Resolution.BYTE)
+
+    def test_external_reference(self):
+        obj, _ = assemble("         REF      EXT\n"
+                          "         DATA     1,EXT\n")
+        (r,) = obj.get_section(1).relocs
+        assert (r.byte_offset, r.symbol, r.addend) == (4, 'EXT', 0)
+
+    def test_absolute_and_dummy_sections_not_relocated(self):
+        obj, _ = assemble("         ASECT\n"
+                          "         ORG      X'40'\n"
+                          "A        DATA     A\n"
+                          "D        DSECT\n"
+                          "         DATA     A\n")
+        assert bytes(obj.get_section(0).data[0x40:]) == b'\0\0\0\x40'
+        assert all(not s.relocs for s in obj.sections())
+
+    def test_literal_reference(self):
+        obj, _ = assemble(LW + "         DATA     0\n"
+                               "         LW       1,=7\n")
+        r = obj.get_section(1).relocs[-1]
+        assert (r.byte_offset, r.bit_offset, r.width, r.section,
+                r.addend, r.resolution) == (4, 15, 17, 1, 8, Resolution.WORD)
+
+    def test_object_module(self):
+        obj, sym = assemble("         DEF      A,K\n"
+                            "         REF      R\n"
+                            "         SREF     S\n"
+                            "K        EQU      5\n"
+                            "A        RES      3\n"
+                            "D        DSECT\n"
+                            "         RES      2\n")
+        m = object_module(obj, sym, 'mod')
+        assert m.name == 'mod'
+        assert set(m.defs) == {'A', 'K', 'D'}
+        assert m.refs == {'R': 'ref', 'S': 'sref'}
+        by_number = {s.number: s for s in m.sections}
+        assert by_number[1].size == 12 and by_number[1].data == bytes(12)
+        assert by_number[2].kind == CsectKind.DSECT
+        assert by_number[2].size == 8
+
+
+# ---------------------------------------------------------------------------
+# 2. Layout
+# ---------------------------------------------------------------------------
+
+class TestLayout:
+    def test_modules_in_order_on_doublewords(self):
+        image = link("A        DATA     1\n",
+                     "B        DATA     2,3,4\n"
+                     "S        CSECT\n"
+                     "         DATA     5\n")
+        assert [(s.module, s.number, s.address, s.size)
+                for s in image.sections] == [('m0', 1, 0, 4),
+                                             ('m1', 1, 8, 12),
+                                             ('m1', 2, 24, 4)]
+        assert words(image) == [1, 0, 2, 3, 4, 0, 5]
+
+    def test_relocated_addresses(self):
+        image = link("         DATA     9\n",
+                     LW + "HERE     LW       1,HERE+4\n"
+                          "         DATA     HERE\n")
+        assert words(image, 8) == [0x32100003, 8]
+
+    def test_asect_then_origin(self):
+        image = link("         ASECT\n"
+                     "         ORG      X'10'\n"
+                     "         DATA     X'AA'\n",
+                     "         DATA     X'BB'\n")
+        assert [s.address for s in image.sections] == [0, 0x18]
+        assert words(image, 0x10) == [0xAA, 0, 0xBB]
+        image = link("         DATA     X'BB'\n", origin=0x100)
+        assert words(image, 0x100) == [0xBB]
+        assert not image.errors
+
+    def test_origin_below_asect(self):
+        image = link("         ASECT\n"
+                     "         DATA     1,2\n", origin=4)
+        assert 'origin' in str(image.errors[0])
+
+    def test_dsects_shared_by_name(self):
+        dsect = ("         DEF      WORK\n"
+                 "         DATA     F1\n"
+                 "WORK     DSECT\n"
+                 "F0       RES      {}\n"
+                 "F1       RES      1\n")
+        image = link(dsect.format(1), dsect.format(3))
+        area = image.sections[-1]
+        assert (area.kind, area.name, area.address, area.size) == \
+            (CsectKind.DSECT, 'WORK', 16, 16)
+        assert image.symbols['WORK'] == 16
+        assert words(image, 0, 1) == [16 + 4]
+        assert words(image, 8, 1) == [16 + 12]
+        assert len(image.data) == 32 and not image.errors
+
+    def test_empty_section_has_an_address(self):
+        image = link("         DATA     S\n"
+                     "S        CSECT\n")
+        assert words(image) == [8, 0]
+
+
+# ---------------------------------------------------------------------------
+# 3. External symbols
+# ---------------------------------------------------------------------------
+
+class TestSymbols:
+    def test_ref_resolved_across_modules(self):
+        image = link(LW + "         REF      TABLE\n"
+                          "         LW       1,TABLE\n"
+                          "         DATA     TABLE\n",
+                     "         DEF      TABLE\n"
+                     "         DATA     0\n"
+                     "TABLE    DATA     1,2\n")
+        assert image.symbols['TABLE'] == 0xC
+        assert words(image, 0, 2) == [0x32100003, 0xC]
+        assert not image.errors
+
+    def test_absolute_def_not_scaled(self):
+        image = link(LW + "         REF      K\n"
+                          "         LW       1,K\n"
+                          "         DATA     K\n",
+                     "         DEF      K\n"
+                     "K        EQU      X'123'\n")
+        assert words(image) == [0x32100123, 0x123]
+
+    def test_sref_unresolved_is_zero(self):
+        image = link("         SREF     OPT\n"
+                     "         DATA     OPT\n")
+        assert words(image) == [0] and not image.errors
+
+    def test_unresolved_ref(self):
+        image = link("         REF      NONE\n"
+                     "         DATA     NONE\n")
+        assert [str(e) for e in image.errors] == ['m0: REF NONE is not defined']
+
+    def test_conflicting_defs(self):
+        src = "         DEF      X\nX        DATA     0\n"
+        image = link(src, src)
+        assert [str(e) for e in image.errors] == ['m1: X is already defined']
+        assert image.symbols['X'] == 0
+
+    def test_undefined_def(self):
+        image = link("         DEF      NOTHING\n")
+        assert 'NOTHING' in str(image.errors[0])
+
+
+# ---------------------------------------------------------------------------
+# 4. Field patching
+# ---------------------------------------------------------------------------
+
+def test_word_array_matches_bytewise():
+    rng = random.Random(25)
+    image = bytearray(rng.randbytes(256))
+    # Fields that do not overlap, so the order they are written in is moot
+    disjoint, used = {}, set()
+    for _ in range(200):
+        address = rng.randrange(0, 240)
+        bit_offset = rng.randrange(0, 16)
+        width = rng.randrange(1, 33)
+        bits = set(range(address * 8 + bit_offset,
+                         address * 8 + bit_offset + width))
+        if not bits & used:
+            used |= bits
+            disjoint[(address, bit_offset, width, rng.randrange(0, 4))] = \
+                rng.randrange(-2**20, 2**34)
+    expected = bytearray(image)
+    for (address, bit_offset, width, shift), value in disjoint.items():
+        patch_field(expected, address, bit_offset, width, value >> shift)
+    _apply(image, disjoint)
+    assert image == expected
+
+
+def test_straddling_field():
+    image = link("         DATA,16  0\n"
+                 "         DATA     S\n"
+                 "S        CSECT\n"
+                 "         DATA     0\n")
+    # the 32-bit field at byte 2 crosses a word boundary
+    assert bytes(image.data[2:6]) == (8).to_bytes(4, 'big')
+
+
+def test_difference_of_sections():
+    image = link("A        DATA     0\n"
+                 "S        CSECT\n"
+                 "B        DATA     B-A,A-B\n")
+    assert words(image, 8) == [8, (-8) & 0xFFFFFFFF]
+
+
+# ---------------------------------------------------------------------------
+# 5. Output
+# ---------------------------------------------------------------------------
+
+class FakeMemory:
+    def load_bytes(self, byte_addr, data):
+        self.loaded = (byte_addr, bytes(data))
+
+
+def test_hex_and_memory():
+    image = link("         DATA     X'11'\n", "         DATA     X'22'\n")
+    text = VerilogHexWriter().render(image.to_object())
+    assert text.splitlines()[-3:] == ['00000011', '00000000', '00000022']
+    assert 'unresolved' not in text
+    mem = FakeMemory()
+    image.load_into(mem)
+    assert mem.loaded == (0, bytes(image.data))
+
+
+def test_load_map():
+    image = link("         DEF      START\nSTART    DATA     1\n")
+    lines = image.render_map().splitlines()
+    assert lines[0] == 'LOAD MAP'
+    assert lines[4].split() == ['m0', '1', 'CSECT', '00000000', '4']
+    assert lines[6].split() == ['START', '00000000']
+
+
+def test_build_link(tmp_path, capsys):
+    (tmp_path / 'a.ap').write_text("         REF      B\n"
+                                   "         DATA     B\n")
+    (tmp_path / 'b.ap').write_text("         DEF      B\n"
+                                   "         DATA     1\n"
+                                   "B        DATA     2\n")
+    hex_path = tmp_path / 'system.hex'
+    sources = [str(tmp_path / 'a.ap'), str(tmp_path / 'b.ap')]
+    for jobs in ('1', '2'):
+        assert main(['-j', jobs, '-o', str(tmp_path / 'out'),
+                     '-l', str(hex_path)] + sources) == 0
+        assert hex_path.read_text().splitlines()[-4:] == \
+            ['0000000C', '00000000', '00000001', '00000002']
+    assert os.path.exists(tmp_path / 'system.map')
+    assert 'linked 16 bytes, 1 relocations' in capsys.readouterr().out
+    (tmp_path / 'b.ap').write_text("         DATA     1\n")
+    assert main(['-j', '1', '-o', str(tmp_path / 'out'),
+                 '-l', str(hex_path)] + sources) == 1
+    assert 'REF B is not defined' in capsys.readouterr().out
@@ -528,11 +528,12 @@ I     SET  I+1
         _, obj, _ = assemble(src)
         assert sec_bytes(obj) == b'\x00\x00\x00\x02'
 
-    def test_out_of_range_subscript_emits_zero(self):
-        # BLANK used in DATA: value.py blank() has int_val=0
+    def test_l_paren_is_the_literal_function(self):
+        # L( is always the literal function, even when L is a list:
+        # the word holds the address of the pool word holding 5
         src = "L  EQU  1,2\n  DATA  L(5)\n"
         _, obj, _ = assemble(src)
-        assert sec_bytes(obj) == b'\x00\x00\x00\x00'
+        assert sec_bytes(obj) == b'\x00\x00\x00\x01\x00\x00\x00\x05'
 
     def test_equ_list_listing_shows_first_element(self):
         _, _, lst = assemble("L  EQU  X'DEADBEEF',X'12345678'\n")
@@ -0,0 +1,198 @@
+"""
+tests/test_literal_pool.py — Tests for the literal pool.
+
+Covers:
+  1. LiteralPool: entries, sizes, deduplication, placement
+  2. SectionData.patch_field
+  3. The GEN pass: pool at END, patched DATA and GEN fields, listing
+  4. Errors and assemblies without literals
+
+Run with:  python -m pytest tests/test_literal_pool.py -v
+"""
+
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.literal_pool import LiteralPool, literal_size
+from ap_assembler.object_writer import ObjectWriter, SectionData
+from ap_assembler.symbol_table import SymbolTable
+from ap_assembler.value import Value, ValueKind
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def assemble(source: str):
+    stmts = list(tokenize_text(source))
+    sym   = SymbolTable()
+    errors = DefPass(stmts, sym).run()
+    obj, lst = ObjectWriter(), ListingWriter()
+    gen = GenPass(stmts, sym, obj, lst)
+    errors += gen.run()
+    return gen, obj, lst, errors
+
+
+def words(obj, section=1):
+    data = bytes(obj.get_section(section).data)
+    return [int.from_bytes(data[k:k + 4], 'big')
+            for k in range(0, len(data), 4)]
+
+
+LW = """\
+LW       CNAME    X'32'
+         PROC
+LF       GEN,8,4,20 NAME,AF(1),AF(2)
+         PEND
+"""
+
+
+# ---------------------------------------------------------------------------
+# 1. LiteralPool
+# ---------------------------------------------------------------------------
+
+class TestPool:
+    def test_sizes(self):
+        assert literal_size(Value.absolute(5)) == 4
+        assert literal_size(Value.charstr('A')) == 4
+        assert literal_size(Value.charstr('ABCDE')) == 8
+        assert literal_size(Value.charstr('')) == 4
+        assert literal_size(Value(kind=ValueKind.FL)) == 8
+
+    def test_identical_values_share_an_entry(self):
+        pool = LiteralPool()
+        assert pool.add(Value.absolute(0xFF)) == 0
+        assert pool.add(Value.charstr('HELLO')) == 1
+        assert pool.add(Value.absolute(0xFF)) == 0
+        assert pool.add(Value.charstr('HELLO')) == 1
+        assert pool.add(Value.absolute(0xFE)) == 2
+        assert len(pool) == 3
+        assert pool.offsets == [0, 4, 12]
+        assert pool.size == 16
+
+    def test_address_and_patch(self):
+        pool = LiteralPool()
+        a = pool.add(Value.absolute(1))
+        b = pool.add(Value.absolute(2))
+        obj = ObjectWriter()
+        obj.emit(1, 0, bytes(8))
+        pool.refer(b, 1, 0, 15, 17)
+        pool.refer(a, 1, 4, 0, 32)
+        pool.place(1, 0x40)
+        assert pool.address(b) == Value.relocatable(1, 0x44)
+        pool.patch(obj)
+        assert words(obj) == [0x11, 0x10]
+        assert pool.reference_count() == 2
+
+
+# ---------------------------------------------------------------------------
+# 2. patch_field
+# ---------------------------------------------------------------------------
+
+class TestPatchField:
+    def test_byte_aligned(self):
+        sec = SectionData(1)
+        sec.write_bytes(0, b'\xAA\xBB\xCC\xDD')
+        sec.patch_field(0, 8, 16, 0x1234)
+        assert bytes(sec.data) == b'\xAA\x12\x34\xDD'
+
+    def test_unaligned_keeps_neighbouring_bits(self):
+        sec = SectionData(1)
+        sec.write_bytes(0, b'\xFF\xFF\xFF\xFF')
+        sec.patch_field(0, 12, 20, 0)
+        assert bytes(sec.data) == b'\xFF\xF0\x00\x00'
+        sec.patch_field(1, 3, 3, 0b101)
+        assert bytes(sec.data) == b'\xFF\xF4\x00\x00'
+
+    def test_value_truncated_to_width(self):
+        sec = SectionData(1)
+        sec.write_bytes(0, bytes(2))
+        sec.patch_field(0, 4, 8, 0x1FF)
+        assert bytes(sec.data) == b'\x0F\xF0'
+
+
+# ---------------------------------------------------------------------------
+# 3. The GEN pass
+# ---------------------------------------------------------------------------
+
+class TestGenPass:
+    def test_repeated_literal_assembled_once(self):
+        gen, obj, _, errors = assemble(LW + "         LW       1,=X'FF'\n"
+                                             "         LW       2,=X'FF'\n"
+                                             "         END\n")
+        assert errors == []
+        assert words(obj) == [0x32100002, 0x32200002, 0xFF]
+        assert len(gen.literals) == 1
+        assert gen.literals.reference_count() == 2
+
+    def test_data_fields(self):
+        gen, obj, _, errors = assemble("         DATA     =C'HELLO',=255\n"
+                                       "         DATA,16  L(7)\n"
+                                       "         END\n")
+        assert errors == []
+        data = bytes(obj.get_section(1).data)
+        # pool starts at the next word: HELLO (2 words), 255, 7
+        assert data[:10] == bytes.fromhex('00000003 00000005 0006')
+        assert data[12:] == b'HELLO\0\0\0' + bytes.fromhex('000000FF 00000007')
+
+    def test_pool_in_current_section(self):
+        _, obj, _, _ = assemble("         DATA     1\n"
+                                "SEC      CSECT\n"
+                                "         DATA     =3\n"
+                                "         END\n")
+        assert words(obj, 1) == [1]
+        assert words(obj, 2) == [1, 3]
+
+    def test_pool_not_in_dsect(self):
+        _, obj, _, errors = assemble("         DATA     =5\n"
+                                     "SEC      CSECT\n"
+                                     "         DATA     =6\n"
+                                     "         USECT    SEC\n"
+                                     "D        DSECT\n"
+                                     "         RES      1\n"
+                                     "         END\n")
+        assert errors == []
+        assert words(obj, 1) == [1]
+        assert words(obj, 2) == [2, 5, 6]
+        assert [(r.byte_offset, r.section)
+                for r in obj.get_section(1).relocs] == [(0, 2)]
+        assert not obj.get_section(3).relocs
+
+    def test_pool_follows_end(self):
+        _, obj, _, _ = assemble("         DATA     =3\n"
+                                "         END\n"
+                                "         DATA     9\n")
+        assert words(obj) == [1, 3]
+
+    def test_literal_of_symbol(self):
+        _, obj, _, errors = assemble("K        EQU      X'1234'\n"
+                                     "         DATA     =K+1\n")
+        assert errors == []
+        assert words(obj) == [1, 0x1235]
+
+    def test_listing(self):
+        _, _, lst, _ = assemble("         DATA     =C'ABCDEFGH',=2\n")
+        text = lst.render()
+        rows = [l for l in text.splitlines() if 'LITERAL' in l]
+        assert [r.split()[:3] for r in rows] == [
+            ['41424344', '01', '000008'],
+            ['00000002', '01', '000010'],
+        ]
+
+
+# ---------------------------------------------------------------------------
+# 4. Errors and no literals
+# ---------------------------------------------------------------------------
+
+def test_list_literal_rejected():
+    gen, _, _, errors = assemble("         DATA     =(1,2)\n")
+    assert [e.message for e in errors] == ['Literal must be a single value']
+    assert len(gen.literals) == 0
+
+
+def test_no_literals_no_pool():
+    gen, obj, lst, _ = assemble("         DATA     1,2\n         END\n")
+    assert words(obj) == [1, 2]
+    assert 'LITERAL' not in lst.render()
+    assert gen.literals.size == 0
@@ -832,3 +832,44 @@ RESULT   EQU      GVAR
 """)
         assert sym_val(sym, 'GVAR').int_val == 55
         assert sym_val(sym, 'RESULT').int_val == 55
+
+
+# ---------------------------------------------------------------------------
+# 12. Pre-parsed call sites
+# ---------------------------------------------------------------------------
+
+class TestPreparsedCallSite:
+    SRC = """\
+OP       CNAME    0
+         PROC
+LF       DATA,8   CF(2)+AF(1)
+         PEND
+L1       OP,4     1
+L2       OP,8     2
+"""
+
+    def test_frame_uses_statement_token_lists(self):
+        stmts = list(tokenize_text(self.SRC))
+        dp = DefPass(stmts, SymbolTable())
+        frames = []
+        call = dp._call_procedure
+        def spy(call_stmt, body):
+            call(call_stmt, body)
+            frames.append((call_stmt, dp._call_stack[-1]))
+        dp._call_procedure = spy
+        dp.run()
+        assert len(frames) == 2
+        for call_stmt, frame in frames:
+            assert frame.cmd_args[1] is call_stmt.mod_args[0]
+            assert frame.label_args[0] is call_stmt.label_args[0]
+
+    def test_handler_resolved_once_per_statement(self):
+        stmts = list(tokenize_text(self.SRC))
+        _, obj, _ = assemble(self.SRC)
+        assert sec_bytes(obj) == bytes([5, 10])
+        sym = SymbolTable()
+        DefPass(stmts, sym).run()
+        by_base = {s.base: s.handler for s in stmts if s.command}
+        assert by_base['CNAME'] == '_handle_cname'
+        assert by_base['DATA'] == '_handle_data'
+        assert by_base['OP'] == ''      # procedure call, not a directive
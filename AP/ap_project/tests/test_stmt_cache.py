@@ -0,0 +1,193 @@
+"""
+tests/test_stmt_cache.py — Tests for the persistent statement cache.
+
+Covers:
+  1. Records round-trip every Statement field the Tokenizer fills in, and
+     are not pickles
+  2. CachedStatements: lazy decoding, mmap and in-memory reads
+  3. StatementCache: content keys, hits and misses, stale or damaged files
+  4. Assembling from cached statements
+
+Run with:  python -m pytest tests/test_stmt_cache.py -v
+"""
+
+import os
+import struct
+
+import pytest
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.lexer import tokenize_file, tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter
+from ap_assembler.symbol_table import SymbolTable
+from ap_assembler.stmt_cache import (
+    CachedStatements, CacheFormatError, StatementCache,
+    decode_statement, encode_statement, write_statements,
+)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+SOURCE = """\
+* cached deck
+OP       CNAME    X'32'
+         PROC
+LF       GEN,8,8,16  NAME,AF(1),AF(2)*2
+         PEND
+TAB(2)   SET      FX'1.5',FS'2.0',D'-12'
+I        SET      0
+         DO       3
+I        SET      I+1
+L        OP,4     I,I+100
+         FIN
+MSG      TEXT     'IT''S';
+                  ,C'OK'
+         DATA     *TAB,=5,L(7)
+         END
+"""
+
+
+def same_statement(a, b):
+    assert a == b
+    assert (a.base, a.modifier, a.mod_args, a.label_args, a.cmd_args) == \
+           (b.base, b.modifier, b.mod_args, b.label_args, b.cmd_args)
+
+
+def write_source(tmp_path, text=SOURCE, name='deck.ap'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+def assemble(stmts):
+    sym = SymbolTable()
+    DefPass(stmts, sym).run()
+    obj, lst = ObjectWriter(), ListingWriter()
+    errors = GenPass(stmts, sym, obj, lst).run()
+    return bytes(obj.get_section(1).data), lst.render(), errors
+
+
+# ---------------------------------------------------------------------------
+# 1. Records
+# ---------------------------------------------------------------------------
+
+def test_record_round_trip():
+    for stmt in tokenize_text(SOURCE):
+        same_statement(decode_statement(encode_statement(stmt)), stmt)
+
+
+class _Trap:
+    def __reduce__(self):
+        return (os.system, ('false',))
+
+
+def test_records_are_not_pickles():
+    import pickle
+    with pytest.raises(ValueError):
+        decode_statement(pickle.dumps(_Trap()))
+
+
+def test_decoded_statement_is_fresh():
+    stmt = list(tokenize_text(SOURCE))[1]
+    stmt.handler = '_handle_cname'
+    back = decode_statement(encode_statement(stmt))
+    assert back.handler is None
+
+
+# ---------------------------------------------------------------------------
+# 2. CachedStatements
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_lazy_decoding(tmp_path, use_mmap):
+    stmts = list(tokenize_text(SOURCE))
+    path = str(tmp_path / 'deck.x1')
+    write_statements(path, stmts)
+    cached = CachedStatements(path, use_mmap)
+    assert len(cached) == len(stmts)
+    assert cached.decoded_count() == 0
+    same_statement(cached[3], stmts[3])
+    same_statement(cached[-1], stmts[-1])
+    assert cached.decoded_count() == 2
+    assert cached[3] is cached[3]
+    assert list(cached) == stmts
+    cached.close()
+    assert cached[5] == stmts[5]        # decoded before close
+
+
+def test_empty_source(tmp_path):
+    path = str(tmp_path / 'empty.x1')
+    write_statements(path, [])
+    assert list(CachedStatements(path)) == []
+
+
+# ---------------------------------------------------------------------------
+# 3. StatementCache
+# ---------------------------------------------------------------------------
+
+def test_miss_then_hit(tmp_path):
+    cache = StatementCache(str(tmp_path / 'cache'))
+    path = write_source(tmp_path)
+    first = cache.tokenize_file(path)
+    again = cache.tokenize_file(path)
+    assert (cache.misses, cache.hits) == (1, 1)
+    assert isinstance(again, CachedStatements)
+    assert list(again) == list(first) == list(tokenize_file(path))
+
+
+def test_keyed_by_content(tmp_path):
+    cache = StatementCache(str(tmp_path / 'cache'))
+    a = write_source(tmp_path, name='a.ap')
+    b = write_source(tmp_path, name='b.ap')
+    cache.tokenize_file(a)
+    cache.tokenize_file(b)                  # same text, other name: a hit
+    assert (cache.misses, cache.hits) == (1, 1)
+    write_source(tmp_path, SOURCE.replace('I+100', 'I+200'), name='a.ap')
+    stmts = cache.tokenize_file(a)
+    assert cache.misses == 2
+    assert 'I+200' in stmts[9].source
+
+
+def test_stale_version_is_a_miss(tmp_path):
+    cache = StatementCache(str(tmp_path / 'cache'))
+    path = write_source(tmp_path)
+    cache.tokenize_file(path)
+    entry = cache.path(cache.key(open(path, 'rb').read()))
+    with open(entry, 'r+b') as f:
+        f.seek(4)
+        f.write(struct.pack('>H', 0))
+    with pytest.raises(CacheFormatError):
+        CachedStatements(entry)
+    assert list(cache.tokenize_file(path)) == list(tokenize_file(path))
+    assert cache.misses == 2
+    assert len(CachedStatements(entry)) > 0       # rewritten
+
+
+def test_truncated_file_is_a_miss(tmp_path):
+    cache = StatementCache(str(tmp_path / 'cache'))
+    path = write_source(tmp_path)
+    cache.tokenize_file(path)
+    entry = cache.path(cache.key(open(path, 'rb').read()))
+    size = os.path.getsize(entry)
+    with open(entry, 'r+b') as f:
+        f.truncate(size - 10)
+    cache.tokenize_file(path)
+    assert cache.misses == 2
+
+
+# ---------------------------------------------------------------------------
+# 4. Assembly
+# ---------------------------------------------------------------------------
+
+def test_assembly_from_cache_matches(tmp_path):
+    cache = StatementCache(str(tmp_path / 'cache'))
+    path = write_source(tmp_path)
+    cache.tokenize_file(path)
+    cached = cache.tokenize_file(path)
+    assert isinstance(cached, CachedStatements)
+    data, listing, errors = assemble(cached)
+    assert (data, listing) == assemble(list(tokenize_file(path)))[:2]
+    assert data[:4] == bytes([0x32, 1, 0, 202])
@@ -0,0 +1,252 @@
+"""
+tests/test_symbol_image.py — Tests for saved symbol table images.
+
+Covers:
+  1. Round trip: symbols, values, sections and procedure bodies
+  2. Assembling from an image matches assembling the library in front
+  3. Procedure statements decoded lazily; mmap and in-memory reads
+  4. Layered libraries, libraries with errors, damaged and untrusted files
+
+Run with:  python -m pytest tests/test_symbol_image.py -v
+"""
+
+import os
+import pickle
+import struct
+
+import pytest
+from ap_assembler.def_pass import DefPass
+from ap_assembler.gen_pass import GenPass
+from ap_assembler.lexer import tokenize_text
+from ap_assembler.listing_writer import ListingWriter
+from ap_assembler.object_writer import ObjectWriter
+from ap_assembler.stmt_cache import CachedStatements, CacheFormatError
+from ap_assembler.symbol_image import (
+    FORMAT_VERSION, build_image, encode_image, read_image, write_image,
+)
+from ap_assembler.symbol_table import SymbolTable
+from ap_assembler.value import Value, ValueKind
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+LIBRARY = """\
+* system library
+LW       CNAME    X'32'
+STW      CNAME    X'35'
+         PROC
+LF       GEN,8,8,16  NAME,AF(1),AF(2)
+         PEND
+DOUBLE   FNAME
+         PROC
+         PEND     AF(1)*2
+WORDS    SET      4
+TABLE    SET      (1,2,(3,4))
+         DEF      WORDS
+"""
+
+PROGRAM = """\
+         LW       1,WORDS*2
+         STW      2,TABLE(3,2)
+X        EQU      DOUBLE(21)
+         END
+"""
+
+
+def assemble(stmts, sym):
+    def_errors = DefPass(stmts, sym).run()
+    obj = ObjectWriter()
+    gen_errors = GenPass(stmts, sym, obj, ListingWriter()).run()
+    sec = obj.get_section(1)
+    return sym, bytes(sec.data) if sec else b'', def_errors + gen_errors
+
+
+def image(tmp_path, source=LIBRARY, name='sys.img'):
+    path = str(tmp_path / name)
+    assert build_image(path, list(tokenize_text(source))) == []
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 1. Round trip
+# ---------------------------------------------------------------------------
+
+class TestRoundTrip:
+    def test_symbols_and_values(self, tmp_path):
+        sym = read_image(image(tmp_path))
+        expected = SymbolTable()
+        DefPass(list(tokenize_text(LIBRARY)), expected).run()
+        for name, entry in expected.all_globals().items():
+            got = sym.lookup(name)
+            assert got.value == entry.value
+            assert (got.is_set, got.external_type, got.defined_pass) == \
+                (entry.is_set, entry.external_type, entry.defined_pass)
+        assert sym.lookup('TABLE').value == Value.list_val(
+            [Value.absolute(1), Value.absolute(2),
+             Value.list_val([Value.absolute(3), Value.absolute(4)])])
+
+    def test_sections(self, tmp_path):
+        lib = LIBRARY + "DATA     CSECT\n         RES      3\n"
+        sym = read_image(image(tmp_path, lib))
+        assert sym.section_count() == 3
+        assert sym.get_section(2).name == 'DATA'
+        assert sym.exec_lc() == 12
+
+    def test_procedure_bodies(self, tmp_path):
+        sym = read_image(image(tmp_path))
+        lw, stw = sym.lookup('LW').proc_body, sym.lookup('STW').proc_body
+        assert isinstance(lw.stmts, CachedStatements)
+        assert lw.stmts is stw.stmts
+        assert lw.name_value == Value.absolute(0x32)
+        assert stw.name_value == Value.absolute(0x35)
+        assert lw.stmts[lw.pend_index].base == 'PEND'
+
+
+# ---------------------------------------------------------------------------
+# 2. Assembling from an image
+# ---------------------------------------------------------------------------
+
+class TestAssembleFromImage:
+    def test_same_as_library_in_front(self, tmp_path):
+        _, together, errs = assemble(list(tokenize_text(LIBRARY + PROGRAM)),
+                                     SymbolTable())
+        sym, alone, errs2 = assemble(list(tokenize_text(PROGRAM)),
+                                     read_image(image(tmp_path)))
+        assert errs == errs2 == []
+        assert alone == together == bytes([0x32, 1, 0, 8, 0x35, 2, 0, 4])
+        assert sym.lookup('X').value == Value.absolute(42)
+
+    def test_copies_are_independent(self, tmp_path):
+        base = read_image(image(tmp_path))
+        first, _, _ = assemble(list(tokenize_text("WORDS SET 9\n")),
+                               base.copy())
+        second, _, _ = assemble(list(tokenize_text("Y EQU WORDS\n")),
+                                base.copy())
+        assert first.lookup('WORDS').value == Value.absolute(9)
+        assert second.lookup('Y').value == Value.absolute(4)
+        assert base.lookup('Y') is None
+
+
+# ---------------------------------------------------------------------------
+# 3. Lazy decoding
+# ---------------------------------------------------------------------------
+
+@pytest.mark.parametrize("use_mmap", [True, False])
+def test_only_called_procedures_decoded(tmp_path, use_mmap):
+    sym = read_image(image(tmp_path), use_mmap)
+    stmts = sym.lookup('LW').proc_body.stmts
+    assert stmts.decoded_count() == 0
+    assemble(list(tokenize_text("         LW       1,2\n")), sym)
+    assert 0 < stmts.decoded_count() < len(stmts)
+
+
+def test_procedure_blocks_indexed_alone(tmp_path):
+    # A DO inside one procedure of a large library reads that body only
+    filler = ''.join(f"F{k}       CNAME\n         PROC\n         PEND\n"
+                     for k in range(500))
+    path = str(tmp_path / 'big.img')
+    assert build_image(path, list(tokenize_text(filler + """\
+TWICE    CNAME
+         PROC
+         DO       2
+         DATA     AF(1)
+         FIN
+         PEND
+"""))) == []
+    sym = read_image(path)
+    stmts = sym.lookup('TWICE').proc_body.stmts
+    _, data, errs = assemble(list(tokenize_text("         TWICE    7\n")), sym)
+    assert errs == [] and data == bytes([0, 0, 0, 7] * 2)
+    assert stmts.decoded_count() < 10
+
+
+# ---------------------------------------------------------------------------
+# 4. Layers and damage
+# ---------------------------------------------------------------------------
+
+def test_layered_libraries(tmp_path):
+    sym = read_image(image(tmp_path))
+    DefPass(list(tokenize_text("""\
+LOAD2    CNAME
+         PROC
+         LW       AF(1),AF(2)
+         LW       AF(1)+1,AF(2)+1
+         PEND
+""")), sym).run()
+    path = str(tmp_path / 'both.img')
+    write_image(path, sym)
+    both = read_image(path)
+    assert both.lookup('LW').proc_body.stmts is not \
+        both.lookup('LOAD2').proc_body.stmts
+    _, data, errs = assemble(list(tokenize_text("         LOAD2    4,6\n")),
+                             both)
+    assert errs == []
+    assert data == bytes([0x32, 4, 0, 6, 0x32, 5, 0, 7])
+
+
+def test_library_with_errors_not_written(tmp_path):
+    path = tmp_path / 'bad.img'
+    errors = build_image(str(path), list(tokenize_text("Y  SET  1/0\n")))
+    assert errors and not path.exists()
+
+
+def test_image_of_another_user_refused(tmp_path, monkeypatch):
+    path = image(tmp_path)
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(path).st_uid + 1,
+                        raising=False)
+    with pytest.raises(PermissionError):
+        read_image(path)
+
+
+class _Trap:
+    def __reduce__(self):
+        return (os.system, ('false',))
+
+
+def test_image_loads_only_assembler_classes(tmp_path):
+    table = pickle.dumps(_Trap())
+    path = tmp_path / 'bad.img'
+    path.write_bytes(struct.pack('>4sHIQ', b'APS1', FORMAT_VERSION, 0,
+                                 len(table)) + table)
+    with pytest.raises(CacheFormatError, match='system'):
+        read_image(str(path))
+
+
+def test_image_dotted_global_refused(tmp_path):
+    # ap_assembler.stmt_cache imports io, so 'io.FileIO' is reachable from it
+    target = str(tmp_path / 'created')
+
+    def short(text):
+        return b'\x8c' + bytes([len(text)]) + text.encode()
+
+    table = (b'\x80\x04' + short('ap_assembler.stmt_cache') + short('io.FileIO')
+             + b'\x93' + short(target) + short('w') + b'\x86R.')
+    path = tmp_path / 'bad.img'
+    path.write_bytes(struct.pack('>4sHIQ', b'APS1', FORMAT_VERSION, 0,
+                                 len(table)) + table)
+    with pytest.raises(CacheFormatError, match='io.FileIO'):
+        read_image(str(path))
+    assert not os.path.exists(target)
+
+
+def test_sum_of_sections_round_trip(tmp_path):
+    sym = read_image(image(tmp_path, "A  RES 1\nS  CSECT\nB  RES 1\n"
+                                     "C  SET A+B\n"))
+    assert sym.lookup('C').value.kind == ValueKind.COMPLEX_SUM
+
+
+@pytest.mark.parametrize("damage", [
+    lambda b: b[:10],
+    lambda b: b[:-5],
+    lambda b: b'XXXX' + b[4:],
+    lambda b: b[:4] + b'\x00\x63' + b[6:],
+])
+def test_damaged_image(tmp_path, damage):
+    sym = SymbolTable()
+    DefPass(list(tokenize_text(LIBRARY)), sym).run()
+    path = tmp_path / 'bad.img'
+    path.write_bytes(damage(encode_image(sym)))
+    with pytest.raises(CacheFormatError):
+        read_image(str(path))
@@ -769,6 +769,142 @@ class TestSectionIntegration:
         assert sym.get_section(2).exec_lc == 100
         assert sym.exec_lc() == 200
 
+    def test_copy_is_independent(self):
+        sym = SymbolTable()
+        sym.define('A', abs_val(1), is_set=True)
+        sym.advance_lc(8)
+        snap = sym.copy()
+        sym.define('A', abs_val(2), is_set=True)
+        sym.define('B', abs_val(3))
+        sym.advance_lc(4)
+        assert snap.lookup('A').value == abs_val(1)
+        assert snap.lookup('B') is None
+        assert snap.exec_lc() == 8 and sym.exec_lc() == 12
+
+    def test_reentry_matches_kind(self):
+        sym = SymbolTable()
+        code = sym.open_section(CsectKind.CSECT, 'S')
+        data = sym.open_section(CsectKind.PSECT, 'S')
+        assert data is not code
+        assert sym.open_section(CsectKind.CSECT, 'S') is code
+        assert sym.open_section(CsectKind.PSECT, 'S') is data
+        assert sym.open_section(CsectKind.USECT, 'S') is code   # first named
+        assert sym.open_section(CsectKind.USECT, 'ASECT').number == 0
+        assert sym.open_section(CsectKind.CSECT, '') is not \
+            sym.open_section(CsectKind.CSECT, '')
+
+    def test_many_sections(self):
+        sym = SymbolTable()
+        for k in range(500):
+            sym.open_section(CsectKind.CSECT, f'S{k}')
+            sym.advance_lc(4 * k)
+        for k in (0, 250, 499):
+            assert sym.open_section(CsectKind.USECT, f'S{k}').number == k + 2
+            assert sym.exec_lc() == 4 * k
+        sym.begin_gen_pass()
+        assert all(cs.exec_lc == cs.load_lc == 0
+                   for cs in sym.all_sections())
+
+    def test_copy_has_own_section_index(self):
+        sym = SymbolTable()
+        snap = sym.copy()
+        sym.open_section(CsectKind.CSECT, 'ONLY')
+        assert snap.open_section(CsectKind.USECT, 'ONLY').number == 2
+        assert snap.section_count() == 3 and sym.section_count() == 3
+        assert snap.get_section(2).kind == CsectKind.USECT
+
+
+# ---------------------------------------------------------------------------
+# 13. Compact values — shared instances and lazy containers
+# ---------------------------------------------------------------------------
+
+class TestCompactValues:
+    def test_common_values_are_shared(self):
+        assert Value.blank() is Value.blank()
+        assert Value.undefined() is Value.undefined()
+        assert Value.absolute(-1) is Value.absolute(0xFFFFFFFF)
+        assert Value.absolute(255) is Value.absolute(255)
+
+    def test_other_values_are_fresh(self):
+        assert Value.absolute(100000) is not Value.absolute(100000)
+        assert Value.absolute(4, Resolution.BYTE) is not \
+            Value.absolute(4, Resolution.BYTE)
+        assert Value.undefined(Resolution.BYTE).resolution == Resolution.BYTE
+
+    def test_shared_values_equal_constructed_ones(self):
+        assert Value.absolute(7) == Value(kind=ValueKind.ABSOLUTE, int_val=7)
+        assert Value.absolute(7).apply_resolution(Resolution.WORD) == abs_val(7)
+        assert Value.absolute(7).apply_resolution(Resolution.BYTE) == \
+            Value(kind=ValueKind.ABSOLUTE, int_val=7, resolution=Resolution.BYTE)
+
+    def test_containers_only_when_needed(self):
+        assert Value.absolute(3).addends == () and Value.absolute(3).items == ()
+        v = _add_values(rel_val(1, 4), rel_val(2, 8))
+        assert v.kind == ValueKind.COMPLEX_SUM and isinstance(v.addends, list)
+        lst = Value.list_val([abs_val(1)])
+        assert isinstance(lst.items, list)
+        assert Value.list_val([]).items is not Value.list_val([]).items
+
+    def test_slotted(self):
+        assert not hasattr(Value.absolute(1), '__dict__')
+        assert not hasattr(Addend(1, 0, 0), '__dict__')
+
+
+# ---------------------------------------------------------------------------
+# 14. Scope lookup — one probe however deep the scope stack
+# ---------------------------------------------------------------------------
+
+class TestScopeLookup:
+    def setup_method(self):
+        self.sym = SymbolTable()
+
+    def test_deep_shadowing_unwinds(self):
+        self.sym.define('X', abs_val(0))
+        for k in range(1, 31):
+            self.sym.push_local_scope()
+            if k % 3 == 0:
+                self.sym.define('X', abs_val(k), is_local=True)
+        assert self.sym.lookup('X').value == abs_val(30)
+        for k in range(30, 0, -1):
+            assert self.sym.lookup('X').value == abs_val(k - k % 3)
+            self.sym.pop_local_scope()
+        assert self.sym.lookup('X').value == abs_val(0)
+
+    def test_global_created_while_shadowed(self):
+        self.sym.push_local_scope()
+        self.sym.declare_local('Y')
+        self.sym.push_local_scope()
+        self.sym.define('Y', abs_val(2), is_local=True)
+        self.sym.define('Z', abs_val(5))       # global, not shadowed
+        self.sym.pop_local_scope()
+        assert self.sym.lookup('Y').is_local
+        assert self.sym.lookup('Z').value == abs_val(5)
+        self.sym.pop_local_scope()
+        assert self.sym.lookup('Y') is None
+        self.sym.push_local_scope()
+        self.sym.declare_local('Z')
+        self.sym.define('Z', abs_val(6), is_local=True)
+        self.sym.lookup_or_create('Y')           # global created under a local
+        self.sym.pop_local_scope()
+        assert self.sym.lookup('Z').value == abs_val(5)
+        assert self.sym.lookup('Y') is self.sym.all_globals()['Y']
+
+    def test_case_insensitive(self):
+        self.sym.define('name', abs_val(1))
+        assert self.sym.lookup('NAME') is self.sym.lookup('Name')
+        assert self.sym.lookup('P#') is None
+
+    def test_copy_keeps_scopes(self):
+        self.sym.define('X', abs_val(1))
+        self.sym.push_local_scope()
+        self.sym.define('X', abs_val(2), is_local=True)
+        snap = self.sym.copy()
+        assert snap.lookup('X').value == abs_val(2)
+        assert snap.lookup('X') is not self.sym.lookup('X')
+        snap.pop_local_scope()
+        assert snap.lookup('X').value == abs_val(1)
+        assert self.sym.lookup('X').value == abs_val(2)
+
 
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
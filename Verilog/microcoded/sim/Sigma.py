@@ -1,6 +1,6 @@
 
-import time
 import sys
+from array import array
 
 OPCODES = ['?.00', '?.01', 'LCFI', '?.03', 'CAL1', 'CAL2', 'CAL3', 'CAL4', 'PLW', 'PSW', 'PLM', 'PSM', '?.0C',
            '?.0D', 'LPSD', 'XPSD', 'AD', 'CD', 'LD', 'MSP', '?.14', 'STD', '?.16', '?.17', 'SD', 'CLM', 'LCD',
@@ -46,6 +46,70 @@ class Memory(object):
         # print(f'Write word 0x{word:08x} to WA 0x{addr:x}, offset {offset}')
         self.memory[addr] = word
 
+class IATrace(object):
+    """
+    Fixed-depth ring of (instruction word address, instruction word) pairs.
+    When a stream file is given, every entry is also written to it as a
+    big-endian pair of 32-bit words, one ring-full at a time.
+    """
+    def __init__(self, depth=1024, filename=None):
+        if depth < 1:
+            raise ValueError(f'IA trace depth must be at least 1, not {depth}')
+        self.depth = depth
+        self.buf = array('I', [0]) * (2*depth)
+        self.pos = 0
+        self.wrapped = False
+        self.stream = open(filename, 'wb') if filename else None
+
+    def record(self, ia, word):
+        pos = self.pos
+        self.buf[pos] = ia
+        self.buf[pos+1] = word
+        pos += 2
+        if pos == len(self.buf):
+            self.flush(pos)
+            self.wrapped = True
+            pos = 0
+        self.pos = pos
+
+    def flush(self, end):
+        if self.stream:
+            chunk = self.buf[:end]
+            if sys.byteorder == 'little':
+                chunk.byteswap()
+            chunk.tofile(self.stream)
+
+    def close(self):
+        if self.stream:
+            self.flush(self.pos)
+            self.stream.close()
+            self.stream = None
+
+    def last(self, n):
+        """Return up to n most recent (ia, word) entries, oldest first."""
+        n = min(n, self.depth if self.wrapped else self.pos // 2)
+        result = []
+        pos = self.pos - 2*n
+        for i in range(n):
+            j = pos % len(self.buf)
+            result.append((self.buf[j], self.buf[j+1]))
+            pos += 2
+        return result
+
+    def dump(self, n=10):
+        for ia, c in self.last(n):
+            print(f'0x{ia:x}: 0x{c:08x} {OPCODES[(c >> 24) & 0x7f]}')
+
+def readTrace(filename):
+    """Yield (ia, word) pairs from a file written by IATrace."""
+    with open(filename, 'rb') as f:
+        data = array('I')
+        data.frombytes(f.read())
+    if sys.byteorder == 'little':
+        data.byteswap()
+    for i in range(0, len(data), 2):
+        yield data[i], data[i+1]
+
 class CardReader(object):
     def __init__(self, memory, filename):
         self.card = 0
@@ -83,7 +147,7 @@ class CardReader(object):
         return 0
 
 class CPU(object):
-    def __init__(self, memory, iops):
+    def __init__(self, memory, iops, trace_depth=1024, trace_file=None):
         self.a = 0
         self.c = 0
         self.cc = 0
@@ -99,12 +163,20 @@ class CPU(object):
         self.rr = [0]*16
         self.memory = memory
         self.iops = iops
-        self.ia_trace = []
+        self.ia_trace = IATrace(trace_depth, trace_file)
+        # Trace entries printed on a double trap, and on every trap if dump_on_trap
+        self.trace_dump = 10
+        self.dump_on_trap = False
         self.armed = [False]*128
         self.enabled = [False]*128
         self.active = [False]*128
         self.inTrap = False
         self.sense_switches = 0
+        # Instructions between polls of the clock interrupts (0x54, 0x55)
+        self.poll_interval = 1000
+        self.icount = 0
+        # Opcode -> handler; opcodes without a _NAME method trap
+        self.dispatch = [getattr(self, '_' + name, self._unimplemented) for name in OPCODES]
 
     def readB(self, addr):
         offset = addr & 3
@@ -137,22 +209,32 @@ class CPU(object):
             return
         self.memory.writeW(addr, value)
 
-    def run(self):
+    def run(self, max_instructions=None, op_counts=None):
+        # op_counts: optional list of 128 counters, incremented per opcode executed
         self.ende()
+        dispatch = self.dispatch
+        ende = self.ende
         opcount = 0
-        start_ns = time.time_ns()
-        while True:
-            if opcount % 1000000 == 0:
-                print('1000000 instructions executed: ctrl-C to terminate.')
-                self.debug()
-            self.execOne()
-            dt_ns = time.time_ns() - start_ns
-            if dt_ns > 2e6:
-                start_ns = time.time_ns()
-                self.interrupt(0x54)
-                self.interrupt(0x55)
-            self.ende()
-            opcount += 1
+        next_report = 0
+        next_poll = self.poll_interval
+        try:
+            while max_instructions is None or opcount < max_instructions:
+                if opcount == next_report:
+                    print('1000000 instructions executed: ctrl-C to terminate.')
+                    self.debug()
+                    next_report += 1000000
+                if op_counts is not None:
+                    op_counts[self.o] += 1
+                dispatch[self.o]()
+                opcount += 1
+                if opcount == next_poll:
+                    next_poll += self.poll_interval
+                    self.interrupt(0x54)
+                    self.interrupt(0x55)
+                ende()
+        finally:
+            self.icount += opcount
+        return opcount
 
     def interrupt(self, loc):
         if self.enabled[loc] and not self.active[loc]:
@@ -162,7 +244,9 @@ class CPU(object):
     def doTrap(self, loc):
         if self.inTrap:
             print(f'Double trap 0x{loc:x}, execution terminated.')
+            self.ia_trace.dump(self.trace_dump)
             self.debug()
+            self.ia_trace.close()
             sys.exit(0)
         p, q = self.p, self.q
         self.p = loc << 2
@@ -182,7 +266,7 @@ class CPU(object):
     
     def ende(self):
         self.c = self.readW(self.p)
-        self.ia_trace.append((self.p >> 2, self.c))
+        self.ia_trace.record(self.p >> 2, self.c)
         self.iword = self.c
         self.p += 4
         self.q = self.p >> 2
@@ -217,467 +301,303 @@ class CPU(object):
         self.p &= 0x7ffff
 
     def execOne(self):
-        if self.o == 0x00: # ?.00
-            self.trap(0x40)
-        elif self.o == 0x01: # ?.01
-            self.trap(0x40)
-        elif self.o == 0x02: # LCFI
-            if self.r & 2:
-                self.cc = (self.d >> 4) & 0xf
-                self.ff = self.d & 0x7
-        elif self.o == 0x03: # ?.03
-            self.trap(0x40)
-        elif self.o == 0x04: # CAL1
-            self.trap(0x40)
-        elif self.o == 0x05: # CAL2
-            self.trap(0x40)
-        elif self.o == 0x06: # CAL3
-            self.trap(0x40)
-        elif self.o == 0x07: # CAL4
-            self.trap(0x40)
-        elif self.o == 0x08: # PLW
-            self.trap(0x40)
-        elif self.o == 0x09: # PSW
-            self.trap(0x40)
-        elif self.o == 0x0a: # PLM
-            self.trap(0x40)
-        elif self.o == 0x0b: # PSM
-            self.trap(0x40)
-        elif self.o == 0x0c: # ?.0C
-            self.trap(0x40)
-        elif self.o == 0x0d: # ?.0D
-            self.trap(0x40)
-        elif self.o == 0x0e: # LPSD
-            # TODO Flags
-            dw0 = self.readW(self.p)
-            dw1 = self.readW(self.p + 4) & 0xffc0ffff
-            self.cc = (dw0 >> 28) & 0xf
-            self.ff = (dw0 >> 24) & 0x7
-            self.mask5 = (dw0 >> 19) & 0x1f
-            self.psd1 = dw1
-            self.q = dw0 & 0x1ffff
-            self.p = self.q << 2
-        elif self.o == 0x0f: # XPSD
-            self.writeW(self.p, (self.cc << 28) | (self.ff << 24) | (self.mask5 << 19) | (self.q & 0x1ffff))
-            self.writeW(self.p + 4, self.psd1)
-            dw0 = self.readW(self.p + 8)
-            dw1 = self.readW(self.p + 12)
-            self.cc = (dw0 >> 28) & 0xf
-            self.ff = (dw0 >> 24) & 0x7
-            self.mask5 = (dw0 >> 19) & 0x1f
-            self.psd1 = dw1
-            self.q = dw0 & 0x1ffff
-            self.p = self.q << 2
-        elif self.o == 0x10: # AD
-            self.trap(0x40)
-        elif self.o == 0x11: # CD
-            self.trap(0x40)
-        elif self.o == 0x12: # LD
-            self.trap(0x40)
-        elif self.o == 0x13: # MSP
-            self.trap(0x40)
-        elif self.o == 0x14: # ?.14
-            self.trap(0x40)
-        elif self.o == 0x15: # STD
-            self.trap(0x40)
-        elif self.o == 0x16: # ?.16
-            self.trap(0x40)
-        elif self.o == 0x17: # ?.17
-            self.trap(0x40)
-        elif self.o == 0x18: # SD
-            self.trap(0x40)
-        elif self.o == 0x19: # CLM
-            self.trap(0x40)
-        elif self.o == 0x1a: # LCD
-            self.trap(0x40)
-        elif self.o == 0x1b: # LAD
-            self.trap(0x40)
-        elif self.o == 0x1c: # FSL
-            self.trap(0x40)
-        elif self.o == 0x1d: # FAL
-            self.trap(0x40)
-        elif self.o == 0x1e: # FDL
-            self.trap(0x40)
-        elif self.o == 0x1f: # FML
-            self.trap(0x40)
-        elif self.o == 0x20: # AI
-            a0 = self.a & 0x80000000
-            b0 = self.d & 0x80000000
-            s = (self.a + self.d) & 0xffffffff
-            c0 = s & 0x80000000
-            self.cc &= 3
-            if ((a0 != 0 or b0 != 0) and ((a0 != 0 and b0 != 0) or
-                ((self.a & 0x7fffffff) + (self.d & 0x7fffffff) > 0x7fffffff))):
-                self.cc |= 8
-            if ((~(a0 ^ b0)) & (c0 ^ a0)) != 0:
-                self.cc |= 4
-            self.a = s
-            self.rr[self.r] = self.a
-            self.testa()
-        elif self.o == 0x21: # CI
-            s = self.a & self.d
-            self.cc &= 0xb
-            if s:
-                self.cc |= 4
-            self.a = self.a - self.d
-            self.testa()
-        elif self.o == 0x22: # LI
-            self.a = self.d
-            self.rr[self.r] = self.a
-            self.testa()
-        elif self.o == 0x23: # MI
-            self.trap(0x40)
-        elif self.o == 0x24: # SF
-            self.trap(0x40)
-        elif self.o == 0x25: # S
-            self.trap(0x40)
-        elif self.o == 0x26: # ?.26
-            self.trap(0x40)
-        elif self.o == 0x27: # ?.27
-            self.trap(0x40)
-        elif self.o == 0x28: # CVS
-            self.trap(0x40)
-        elif self.o == 0x29: # CVA
-            self.trap(0x40)
-        elif self.o == 0x2a: # LM
-            self.trap(0x40)
-        elif self.o == 0x2b: # STM
-            self.trap(0x40)
-        elif self.o == 0x2c: # ?.2C
-            self.trap(0x40)
-        elif self.o == 0x2d: # ?.2D
-            self.trap(0x40)
-        elif self.o == 0x2e: # WAIT
-            self.debug()
-            input("WAIT: press enter to continue...")
-            self.p = self.q << 2
-        elif self.o == 0x2f: # LRP
-            self.trap(0x40)
-        elif self.o == 0x30: # AW
-            s = self.a + self.readW(self.p)
-            self.a = s & 0xffffffff
-            self.rr[self.r] = self.a
-            self.cc &= 7
-            if s & 0xf00000000:
-                self.cc |= 8
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x31: # CW
-            self.d = self.readW(self.p)
-            s = self.a & self.d
-            self.cc &= 0xb
-            if s:
-                self.cc |= 4
-            s = (self.a - self.d) & 0xffffffff
-            self.a = s
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x32: # LW
-            self.a = self.readW(self.p)
-            self.rr[self.r] = self.a
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x33: # MTW
-            self.a = self.r
-            if self.a & 0x8:
-                self.a |= 0xfffffff0
-            self.d = self.readW(self.p)
-            s = self.a + self.d
-            su = (self.a & 0x7fffffff) + (self.d & 0x7fffffff)
-            self.cc &= 3
-            a0 = self.a & 0x80000000
-            b0 = self.d & 0x80000000
-            s0 = s & 0x80000000
-            if (~(a0 ^ b0)) & (s0 ^ a0):
-                self.cc |= 0x4
-            self.a = s & 0xffffffff
-            self.writeW(self.p, self.a)
-            if ((a0 | b0) & (a0 & b0)) | (su & 0x80000000):
-                self.cc |= 8
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x34: # ?.34
-            self.trap(0x40)
-        elif self.o == 0x35: # STW
-            self.writeW(self.p, self.a)
-            self.p = self.q << 2
-        elif self.o == 0x36: # DW
-            self.trap(0x40)
-        elif self.o == 0x37: # MW
-            self.trap(0x40)
-        elif self.o == 0x38: # SW
-            self.trap(0x40)
-        elif self.o == 0x39: # CLR
-            self.trap(0x40)
-        elif self.o == 0x3a: # LCW
-            self.trap(0x40)
-        elif self.o == 0x3b: # LAW
-            self.trap(0x40)
-        elif self.o == 0x3c: # FSS
-            self.trap(0x40)
-        elif self.o == 0x3d: # FAS
-            self.trap(0x40)
-        elif self.o == 0x3e: # FDS
-            self.trap(0x40)
-        elif self.o == 0x3f: # FMS
-            self.trap(0x40)
-        elif self.o == 0x40: # TTBS
-            self.trap(0x40)
-        elif self.o == 0x41: # TBS
-            self.trap(0x40)
-        elif self.o == 0x42: # ?.42
-            self.trap(0x40)
-        elif self.o == 0x43: # ?.43
-            self.trap(0x40)
-        elif self.o == 0x44: # ANLZ
-            self.trap(0x40)
-        elif self.o == 0x45: # CS
-            self.trap(0x40)
-        elif self.o == 0x46: # XW
-            self.trap(0x40)
-        elif self.o == 0x47: # STS
-            self.trap(0x40)
-        elif self.o == 0x48: # EOR
-            self.d = self.readW(self.p)
-            self.a = (self.a ^ self.d) & 0xffffffff
-            self.rr[self.r] = self.a
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x49: # OR
-            self.trap(0x40)
-        elif self.o == 0x4a: # LS
-            self.trap(0x40)
-        elif self.o == 0x4b: # AND
-            self.d = self.readW(self.p)
-            self.a = (self.a & self.d) & 0xffffffff
-            self.rr[self.r] = self.a
-            self.testa()
-            self.p = self.q << 2
-        elif self.o == 0x4c: # SIO
-            iop = self.iops[self.p >> 2]
-            # TODO registers other than zero mean something
-            self.cc = iop.startIO(self.rr[self.r])
-            self.p = self.q << 2
-        elif self.o == 0x4d: # TIO
-            iop = self.iops[self.p >> 2]
-            # TODO registers other than zero mean something
-            self.cc &= 1
-            self.cc |= iop.testIO(self.rr[self.r])
-            self.p = self.q << 2
-        elif self.o == 0x4e: # TDV
-            self.trap(0x40)
-        elif self.o == 0x4f: # HIO
-            self.trap(0x40)
-        elif self.o == 0x50: # AH
-            self.trap(0x40)
-        elif self.o == 0x51: # CH
-            self.trap(0x40)
-        elif self.o == 0x52: # LH
-            self.trap(0x40)
-        elif self.o == 0x53: # MTH
-            self.trap(0x40)
-        elif self.o == 0x54: # ?.54
-            self.trap(0x40)
-        elif self.o == 0x55: # STH
-            self.trap(0x40)
-        elif self.o == 0x56: # DH
-            self.trap(0x40)
-        elif self.o == 0x57: # MH
-            self.trap(0x40)
-        elif self.o == 0x58: # SH
-            self.trap(0x40)
-        elif self.o == 0x59: # ?.59
-            self.trap(0x40)
-        elif self.o == 0x5a: # LCH
-            self.trap(0x40)
-        elif self.o == 0x5b: # LAH
-            self.trap(0x40)
-        elif self.o == 0x5c: # ?.5C
-            self.trap(0x40)
-        elif self.o == 0x5d: # ?.5D
-            self.trap(0x40)
-        elif self.o == 0x5e: # ?.5E
-            self.trap(0x40)
-        elif self.o == 0x5f: # ?.5F
-            self.trap(0x40)
-        elif self.o == 0x60: # CBS
-            self.trap(0x40)
-        elif self.o == 0x61: # MBS
-            self.trap(0x40)
-        elif self.o == 0x62: # ?.62
-            self.trap(0x40)
-        elif self.o == 0x63: # EBS
-            self.trap(0x40)
-        elif self.o == 0x64: # BDR
-            self.a = (self.a - 1) & 0xffffffff
-            self.rr[self.r] = self.a
-            if not (self.a & 0x80000000 == 0 and self.a != 0):
-                self.p = self.q << 2
-        elif self.o == 0x65: # BIR
-            self.a = (self.a + 1) & 0xffffffff
-            self.rr[self.r] = self.a
-            if not self.a & 0x80000000:
-                self.p = self.q << 2
-        elif self.o == 0x66: # AWM
-            self.trap(0x40)
-        elif self.o == 0x67: # EXU
-            self.trap(0x40)
-        elif self.o == 0x68: # BCR
-            if (self.cc & self.r) != 0:
-                self.p = self.q << 2
-        elif self.o == 0x69: # BCS
-            if (self.cc & self.r) == 0:
-                self.p = self.q << 2
-        elif self.o == 0x6a: # BAL
-            self.rr[self.r] = self.q
-        elif self.o == 0x6b: # INT
-            self.trap(0x40)
-        elif self.o == 0x6c: # RD
-            # 0x0: Read sense switches
-            # 0x48: Read interrupt inhibits
-            # 0x49: Read snapshot sample register
-            # 0x1x0x: Read interrupt control mode 1
-            addr = (self.p >> 2) & 0xffff
-            if addr == 0:
-                self.cc = self.sense_switches
-                self.p = self.q << 2
-            elif addr == 0x48:
-                if self.r:
-                    self.rr[self.r] = (self.psd1 >> 24) & 7
-                self.p = self.q << 2
-            else:
-                self.trap(0x40)
-        elif self.o == 0x6d: # WD
-            # self.debug()
-            # TODO more interrupts
-            wa = self.p >> 2
-            code, group = (wa >> 8) & 7, wa & 0xf
-            if code == 1 and group == 0:
-                base = 0x52
-                mask = 0x8000
-                for i in range(12):
-                    if self.a & mask:
-                        # print(f'Disarm 0x{base+i:x}')
-                        self.armed[base + i] = False
-                        self.enabled[base + i] = False
-                        self.active[base + i] = False
-                    mask >>= 1
-            if code == 2 and group == 0:
-                base = 0x52
-                mask = 0x8000
-                for i in range(12):
-                    if self.a & mask:
-                        # print(f'Arm 0x{base+i:x}')
-                        self.armed[base + i] = True
-                        self.enabled[base + i] = True
-                        self.active[base + i] = False
-                    mask >>= 1
-            self.p = self.q << 2
-            if code == 3 and group == 0:
-                base = 0x52
-                mask = 0x8000
-                for i in range(12):
-                    if self.a & mask:
-                        # print(f'Disarm 0x{base+i:x}')
-                        self.armed[base + i] = False
-                        self.enabled[base + i] = False
-                        self.active[base + i] = False
-                    mask >>= 1
-            if code == 4 and group == 0:
-                base = 0x52
-                mask = 0x8000
-                for i in range(12):
-                    if self.a & mask:
-                        # print(f'Arm 0x{base+i:x}')
-                        self.armed[base + i] = True
-                        self.enabled[base + i] = True
-                        self.active[base + i] = False
-                    mask >>= 1
-            if wa & 0xfff8 == 0x0030:
-                print(f'0x{(self.q-1):x} Set int. inhibits')
-                mask = 4
-                psd_bit = 1 << 26
-                while mask:
-                    if wa & mask:
-                        self.psd1 |= psd_bit
-                    mask >>= 1
-                    psd_bit >>= 1
-            if wa & 0xfff8 == 0x0020:
-                print('Reset int. inhibits')
-                mask = 4
-                psd_bit = 1 << 26
-                while mask:
-                    if wa & mask:
-                        self.psd1 &= ~psd_bit
-                    mask >>= 1
-                    psd_bit >>= 1
-        elif self.o == 0x6e: # AIO
-            self.trap(0x40)
-        elif self.o == 0x6f: # MMC
-            self.trap(0x40)
-        elif self.o == 0x70: # LCF
-            byte = self.readB(self.p)
-            if self.r & 2:
-                self.cc = (byte >> 4) & 0xf
-                self.ff = byte & 0x7
+        self.dispatch[self.o]()
+
+    def _unimplemented(self):
+        self.trap(0x40)
+
+    def _LCFI(self):
+        if self.r & 2:
+            self.cc = (self.d >> 4) & 0xf
+            self.ff = self.d & 0x7
+
+    def _LPSD(self):
+        # TODO Flags
+        dw0 = self.readW(self.p)
+        dw1 = self.readW(self.p + 4) & 0xffc0ffff
+        self.cc = (dw0 >> 28) & 0xf
+        self.ff = (dw0 >> 24) & 0x7
+        self.mask5 = (dw0 >> 19) & 0x1f
+        self.psd1 = dw1
+        self.q = dw0 & 0x1ffff
+        self.p = self.q << 2
+
+    def _XPSD(self):
+        self.writeW(self.p, (self.cc << 28) | (self.ff << 24) | (self.mask5 << 19) | (self.q & 0x1ffff))
+        self.writeW(self.p + 4, self.psd1)
+        dw0 = self.readW(self.p + 8)
+        dw1 = self.readW(self.p + 12)
+        self.cc = (dw0 >> 28) & 0xf
+        self.ff = (dw0 >> 24) & 0x7
+        self.mask5 = (dw0 >> 19) & 0x1f
+        self.psd1 = dw1
+        self.q = dw0 & 0x1ffff
+        self.p = self.q << 2
+
+    def _AI(self):
+        a0 = self.a & 0x80000000
+        b0 = self.d & 0x80000000
+        s = (self.a + self.d) & 0xffffffff
+        c0 = s & 0x80000000
+        self.cc &= 3
+        if ((a0 != 0 or b0 != 0) and ((a0 != 0 and b0 != 0) or
+            ((self.a & 0x7fffffff) + (self.d & 0x7fffffff) > 0x7fffffff))):
+            self.cc |= 8
+        if ((~(a0 ^ b0)) & (c0 ^ a0)) != 0:
+            self.cc |= 4
+        self.a = s
+        self.rr[self.r] = self.a
+        self.testa()
+
+    def _CI(self):
+        s = self.a & self.d
+        self.cc &= 0xb
+        if s:
+            self.cc |= 4
+        self.a = self.a - self.d
+        self.testa()
+
+    def _LI(self):
+        self.a = self.d
+        self.rr[self.r] = self.a
+        self.testa()
+
+    def _WAIT(self):
+        self.debug()
+        input("WAIT: press enter to continue...")
+        self.p = self.q << 2
+
+    def _AW(self):
+        s = self.a + self.readW(self.p)
+        self.a = s & 0xffffffff
+        self.rr[self.r] = self.a
+        self.cc &= 7
+        if s & 0xf00000000:
+            self.cc |= 8
+        self.testa()
+        self.p = self.q << 2
+
+    def _CW(self):
+        self.d = self.readW(self.p)
+        s = self.a & self.d
+        self.cc &= 0xb
+        if s:
+            self.cc |= 4
+        s = (self.a - self.d) & 0xffffffff
+        self.a = s
+        self.testa()
+        self.p = self.q << 2
+
+    def _LW(self):
+        self.a = self.readW(self.p)
+        self.rr[self.r] = self.a
+        self.testa()
+        self.p = self.q << 2
+
+    def _MTW(self):
+        self.a = self.r
+        if self.a & 0x8:
+            self.a |= 0xfffffff0
+        self.d = self.readW(self.p)
+        s = self.a + self.d
+        su = (self.a & 0x7fffffff) + (self.d & 0x7fffffff)
+        self.cc &= 3
+        a0 = self.a & 0x80000000
+        b0 = self.d & 0x80000000
+        s0 = s & 0x80000000
+        if (~(a0 ^ b0)) & (s0 ^ a0):
+            self.cc |= 0x4
+        self.a = s & 0xffffffff
+        self.writeW(self.p, self.a)
+        if ((a0 | b0) & (a0 & b0)) | (su & 0x80000000):
+            self.cc |= 8
+        self.testa()
+        self.p = self.q << 2
+
+    def _STW(self):
+        self.writeW(self.p, self.a)
+        self.p = self.q << 2
+
+    def _EOR(self):
+        self.d = self.readW(self.p)
+        self.a = (self.a ^ self.d) & 0xffffffff
+        self.rr[self.r] = self.a
+        self.testa()
+        self.p = self.q << 2
+
+    def _AND(self):
+        self.d = self.readW(self.p)
+        self.a = (self.a & self.d) & 0xffffffff
+        self.rr[self.r] = self.a
+        self.testa()
+        self.p = self.q << 2
+
+    def _SIO(self):
+        iop = self.iops[self.p >> 2]
+        # TODO registers other than zero mean something
+        self.cc = iop.startIO(self.rr[self.r])
+        self.p = self.q << 2
+
+    def _TIO(self):
+        iop = self.iops[self.p >> 2]
+        # TODO registers other than zero mean something
+        self.cc &= 1
+        self.cc |= iop.testIO(self.rr[self.r])
+        self.p = self.q << 2
+
+    def _BDR(self):
+        self.a = (self.a - 1) & 0xffffffff
+        self.rr[self.r] = self.a
+        if not (self.a & 0x80000000 == 0 and self.a != 0):
             self.p = self.q << 2
-        elif self.o == 0x71: # CB
-            self.d = self.readB(self.p)
-            self.cc &= 8
-            if self.a & self.d:
-                self.cc |= 4
-            s = self.a - self.d
-            self.a = s
-            self.testa()
+
+    def _BIR(self):
+        self.a = (self.a + 1) & 0xffffffff
+        self.rr[self.r] = self.a
+        if not self.a & 0x80000000:
             self.p = self.q << 2
-        elif self.o == 0x72: # LB
-            self.a = self.readB(self.p)
-            self.rr[self.r] = self.a
-            self.testa()
+
+    def _BCR(self):
+        if (self.cc & self.r) != 0:
             self.p = self.q << 2
-        elif self.o == 0x73: # MTB
-            self.a = self.r
-            if self.a & 0x8:
-                self.a |= 0xf0
-            self.d = self.readB(self.p)
-            s = self.a + self.d
-            self.a = s & 0xff
-            self.writeB(self.p, self.a)
-            self.cc &= 3
-            if s & 0x100:
-                self.cc |= 8
-            self.testa()
+
+    def _BCS(self):
+        if (self.cc & self.r) == 0:
             self.p = self.q << 2
-        elif self.o == 0x74: # STFC
-            self.writeB(self.p, (self.cc << 4) | self.ff)
+
+    def _BAL(self):
+        self.rr[self.r] = self.q
+
+    def _RD(self):
+        # 0x0: Read sense switches
+        # 0x48: Read interrupt inhibits
+        # 0x49: Read snapshot sample register
+        # 0x1x0x: Read interrupt control mode 1
+        addr = (self.p >> 2) & 0xffff
+        if addr == 0:
+            self.cc = self.sense_switches
             self.p = self.q << 2
-        elif self.o == 0x75: # STB
-            self.writeB(self.p, self.a)
+        elif addr == 0x48:
+            if self.r:
+                self.rr[self.r] = (self.psd1 >> 24) & 7
             self.p = self.q << 2
-        elif self.o == 0x76: # PACK
-            self.trap(0x40)
-        elif self.o == 0x77: # UNPK
-            self.trap(0x40)
-        elif self.o == 0x78: # DS
-            self.trap(0x40)
-        elif self.o == 0x79: # DA
-            self.trap(0x40)
-        elif self.o == 0x7a: # DD
-            self.trap(0x40)
-        elif self.o == 0x7b: # DM
-            self.trap(0x40)
-        elif self.o == 0x7c: # DSA
-            self.trap(0x40)
-        elif self.o == 0x7d: # DC
-            self.trap(0x40)
-        elif self.o == 0x7e: # DL
-            self.trap(0x40)
-        elif self.o == 0x7f: # DST
+        else:
             self.trap(0x40)
 
+    def _WD(self):
+        # self.debug()
+        # TODO more interrupts
+        wa = self.p >> 2
+        code, group = (wa >> 8) & 7, wa & 0xf
+        if code == 1 and group == 0:
+            base = 0x52
+            mask = 0x8000
+            for i in range(12):
+                if self.a & mask:
+                    # print(f'Disarm 0x{base+i:x}')
+                    self.armed[base + i] = False
+                    self.enabled[base + i] = False
+                    self.active[base + i] = False
+                mask >>= 1
+        if code == 2 and group == 0:
+            base = 0x52
+            mask = 0x8000
+            for i in range(12):
+                if self.a & mask:
+                    # print(f'Arm 0x{base+i:x}')
+                    self.armed[base + i] = True
+                    self.enabled[base + i] = True
+                    self.active[base + i] = False
+                mask >>= 1
+        self.p = self.q << 2
+        if code == 3 and group == 0:
+            base = 0x52
+            mask = 0x8000
+            for i in range(12):
+                if self.a & mask:
+                    # print(f'Disarm 0x{base+i:x}')
+                    self.armed[base + i] = False
+                    self.enabled[base + i] = False
+                    self.active[base + i] = False
+                mask >>= 1
+        if code == 4 and group == 0:
+            base = 0x52
+            mask = 0x8000
+            for i in range(12):
+                if self.a & mask:
+                    # print(f'Arm 0x{base+i:x}')
+                    self.armed[base + i] = True
+                    self.enabled[base + i] = True
+                    self.active[base + i] = False
+                mask >>= 1
+        if wa & 0xfff8 == 0x0030:
+            print(f'0x{(self.q-1):x} Set int. inhibits')
+            mask = 4
+            psd_bit = 1 << 26
+            while mask:
+                if wa & mask:
+                    self.psd1 |= psd_bit
+                mask >>= 1
+                psd_bit >>= 1
+        if wa & 0xfff8 == 0x0020:
+            print('Reset int. inhibits')
+            mask = 4
+            psd_bit = 1 << 26
+            while mask:
+                if wa & mask:
+                    self.psd1 &= ~psd_bit
+                mask >>= 1
+                psd_bit >>= 1
+
+    def _LCF(self):
+        byte = self.readB(self.p)
+        if self.r & 2:
+            self.cc = (byte >> 4) & 0xf
+            self.ff = byte & 0x7
+        self.p = self.q << 2
+
+    def _CB(self):
+        self.d = self.readB(self.p)
+        self.cc &= 8
+        if self.a & self.d:
+            self.cc |= 4
+        s = self.a - self.d
+        self.a = s
+        self.testa()
+        self.p = self.q << 2
+
+    def _LB(self):
+        self.a = self.readB(self.p)
+        self.rr[self.r] = self.a
+        self.testa()
+        self.p = self.q << 2
+
+    def _MTB(self):
+        self.a = self.r
+        if self.a & 0x8:
+            self.a |= 0xf0
+        self.d = self.readB(self.p)
+        s = self.a + self.d
+        self.a = s & 0xff
+        self.writeB(self.p, self.a)
+        self.cc &= 3
+        if s & 0x100:
+            self.cc |= 8
+        self.testa()
+        self.p = self.q << 2
+
+    def _STFC(self):
+        self.writeB(self.p, (self.cc << 4) | self.ff)
+        self.p = self.q << 2
+
+    def _STB(self):
+        self.writeB(self.p, self.a)
+        self.p = self.q << 2
+
     def trap(self, addr):
-        # for ia, c in self.ia_trace[-10:]:
-        #     print(f'0x{ia:x}: 0x{c:08x} {OPCODES[(c >> 24) & 0x7f]}')
+        if self.dump_on_trap:
+            print(f'Trap 0x{addr:02x}:')
+            self.ia_trace.dump(self.trace_dump)
         # raise Exception(f'Trap 0x{addr:02x} - q: 0x{self.q-1:x}, {OPCODES[self.o]} 0x{self.iword:08x}')
         self.doTrap(0x40)
 
@@ -693,7 +613,18 @@ class CPU(object):
         print(result)
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Sigma 7 instruction set simulator')
+    parser.add_argument('deck', nargs='?', default='../programs/sighcp', help='binary card deck')
+    parser.add_argument('--trace-depth', type=int, default=1024, help='IA trace ring entries')
+    parser.add_argument('--trace-file', help='stream the full IA trace to this file')
+    args = parser.parse_args()
+    if args.trace_depth < 1:
+        parser.error('--trace-depth must be at least 1')
     memory = Memory()
-    iops = [None, CardReader(memory, '../programs/sighcp')]
-    cpu = CPU(memory, iops)
-    cpu.run()
+    iops = [None, CardReader(memory, args.deck)]
+    cpu = CPU(memory, iops, args.trace_depth, args.trace_file)
+    try:
+        cpu.run()
+    finally:
+        cpu.ia_trace.close()
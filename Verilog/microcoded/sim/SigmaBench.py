@@ -0,0 +1,39 @@
+import argparse
+import os
+import time
+
+from Sigma import OPCODES, CPU, CardReader, Memory
+
+DECK = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '..', 'SigmaFiles', 'sighcp')
+
+def boot(deck):
+    memory = Memory()
+    iops = [None, CardReader(memory, deck)]
+    return CPU(memory, iops)
+
+def timed_run(deck, max_instructions, op_counts=None):
+    cpu = boot(deck)
+    start = time.perf_counter()
+    try:
+        cpu.run(max_instructions, op_counts)
+    except SystemExit:
+        # Double trap ends the run
+        pass
+    return cpu.icount, time.perf_counter() - start
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Boot a card deck and report instructions per second')
+    parser.add_argument('deck', nargs='?', default=DECK, help='binary card deck (default SigmaFiles/sighcp)')
+    parser.add_argument('-n', '--max-instructions', type=int, default=2000000)
+    parser.add_argument('-t', '--top', type=int, default=20, help='opcodes to show in the mix')
+    args = parser.parse_args()
+
+    n, dt = timed_run(args.deck, args.max_instructions)
+    print(f'{n} instructions in {dt:.3f} s: {n/dt:,.0f} instructions/s')
+
+    op_counts = [0]*128
+    total, _ = timed_run(args.deck, args.max_instructions, op_counts)
+    print(f'Opcode mix ({total} instructions):')
+    for op in sorted(range(128), key=lambda op: -op_counts[op])[:args.top]:
+        if op_counts[op]:
+            print(f'  0x{op:02x} {OPCODES[op]:<5} {op_counts[op]:10d} {100.0*op_counts[op]/total:6.2f}%')
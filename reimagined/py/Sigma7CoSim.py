@@ -0,0 +1,241 @@
+"""
+SDS/Xerox Sigma 7 lockstep co-simulation
+Runs one instruction stream on sigma7_sim.Sigma7CPU and on the RTL
+(cocotb + Icarus Verilog) and compares RR, CC, P and Q at every ENDE.
+
+The Python model runs first and records its state after each
+instruction.  The RTL side then waits only for instruction boundaries
+(a rising edge on cpu.ende), never for individual clock cycles in
+between, and checks each boundary against the recorded trace.  The
+first divergence is reported with the instructions leading up to it.
+
+Usage (from reimagined/):
+  python py/Sigma7CoSim.py [-n INSTRUCTIONS] [-s SEED] [-f RR,CC,P,Q]
+"""
+
+import argparse
+import os
+import random
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, First, ReadOnly, RisingEdge
+from cocotb_tools.runner import get_runner
+
+from sigma7_sim import Sigma7CPU, mask32, word_addr
+from Sigma7TB import OP_LCFI, load_program, reset_cpu, rr
+
+C = Sigma7CPU
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+CODE      = 0x098     # reset starts fetching here
+DATA      = 0x10000   # operand window (byte address), above any program
+DATA_SIZE = 0x400
+POINTERS  = 8         # words at DATA holding indirect pointers into the window
+
+FIELDS = ('RR', 'CC', 'P', 'Q')
+
+# Instructions implemented by both the model and the RTL
+MEMORY_OPS = (C.OP_LW, C.OP_STW, C.OP_AW, C.OP_SW, C.OP_CW,
+              C.OP_AND, C.OP_OR, C.OP_EOR,
+              C.OP_LH, C.OP_STH, C.OP_LB, C.OP_STB)
+IMMEDIATE_OPS = (C.OP_LI, C.OP_AI, C.OP_CI)
+BRANCH_OPS = (C.OP_BCR, C.OP_BCS)
+
+OP_NAMES = {getattr(C, k): k[3:] for k in dir(C) if k.startswith('OP_')}
+
+
+def disasm(instr):
+    i, op, r, x, addr = C.decode(instr)
+    name = OP_NAMES.get(op, f"0x{op:02X}")
+    if op in IMMEDIATE_OPS:
+        imm = (x << 17) | addr
+        return f"{name},{r} {imm - 0x100000 if imm & 0x80000 else imm}"
+    return f"{name},{r} {'*' if i else ''}{addr:#x}{f',{x}' if x else ''}"
+
+
+# ---------------------------------------------------------------------------
+# Random programs
+# ---------------------------------------------------------------------------
+def random_program(rng, length):
+    """
+    A straight-line program with forward conditional skips.
+    Operands stay inside the DATA window (never in the EA 0-15 register
+    space), R1 is only ever an index register, and stores stay above the
+    pointer words used by indirect references.
+    """
+    if CODE + 4 * (length + 1) > DATA:
+        raise ValueError(f"program of {length} instructions overlaps DATA")
+    first = word_addr(DATA) + POINTERS
+    last  = word_addr(DATA + DATA_SIZE) - 64
+    program = []
+    for k in range(length):
+        kind = rng.random()
+        r = rng.choice([n for n in range(16) if n != 1])
+        if kind < 0.25:
+            op = rng.choice(IMMEDIATE_OPS)
+            program.append(C.encode_imm(op, r=r, imm=rng.randint(-0x80000, 0x7FFFF)))
+        elif kind < 0.30 and k + 2 < length:
+            op = rng.choice(BRANCH_OPS)
+            skip = word_addr(CODE) + k + 2          # over the next instruction
+            program.append(C.encode(op, r=rng.randint(0, 15), addr=skip))
+        else:
+            op = rng.choice(MEMORY_OPS)
+            x = rng.choice((0, 0, 1))
+            if rng.random() < 0.2:
+                i, addr = 1, word_addr(DATA) + rng.randint(0, POINTERS - 1)
+            else:
+                i, addr = 0, rng.randint(first, last)
+            program.append(C.encode(op, r=r, x=x, i=i, addr=addr))
+    return program
+
+
+def random_data(rng):
+    """Initial contents of the DATA window and R1 (the index register)."""
+    first = word_addr(DATA) + POINTERS
+    words = [rng.randint(first, first + 32) for _ in range(POINTERS)]
+    words += [rng.getrandbits(32) for _ in range(DATA_SIZE // 4 - POINTERS)]
+    return words, rng.randint(0, 63)
+
+
+# ---------------------------------------------------------------------------
+# Golden trace
+# ---------------------------------------------------------------------------
+def golden_trace(program, data, index):
+    """Run the program on Sigma7CPU; return one state per instruction."""
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, program + [C.encode(OP_LCFI)])
+    cpu.mem.load(DATA, data)
+    cpu.RR[1] = index
+    cpu.P = CODE
+    end = CODE + 4 * len(program)
+    trace = []
+    while cpu.P < end:
+        ia = cpu.P
+        cpu.step()
+        trace.append((ia, snapshot(cpu)))
+    return trace
+
+
+def snapshot(cpu):
+    return {'RR': tuple(mask32(v) for v in cpu.RR), 'CC': cpu.cc,
+            'P': cpu.P, 'Q': cpu.Q}
+
+
+def divergence(expected, got, fields):
+    """Names and values of the fields that differ, or [] if none."""
+    diffs = []
+    for f in fields:
+        if expected[f] == got[f]:
+            continue
+        if f == 'RR':
+            for n, (e, g) in enumerate(zip(expected[f], got[f])):
+                if e != g:
+                    diffs.append(f"R{n}: model 0x{e:08X}, RTL 0x{g:08X}")
+        else:
+            diffs.append(f"{f}: model 0x{expected[f]:X}, RTL 0x{got[f]:X}")
+    return diffs
+
+
+# ---------------------------------------------------------------------------
+# RTL side
+# ---------------------------------------------------------------------------
+async def next_boundary(dut, limit):
+    """
+    Wait for the next ENDE.  Returns False if none arrives within limit
+    clocks.  Leaves the simulator in the ReadOnly phase of the ENDE cycle.
+    """
+    cpu = dut.sys.cpu
+    while True:
+        trig = await First(RisingEdge(cpu.ende), ClockCycles(dut.clock, limit))
+        if not isinstance(trig, RisingEdge):
+            return False
+        await ReadOnly()
+        if int(cpu.ende.value):      # ignore combinational glitches
+            return True
+
+
+async def rtl_state(dut):
+    """
+    P and Q are read in the ENDE cycle; RR and CC after the clock edge
+    that ends it, since EX2 write-backs commit on that edge.
+    """
+    cpu = dut.sys.cpu
+    P = int(cpu.P.value); Q = int(cpu.Q.value)
+    await RisingEdge(dut.clock)
+    await ReadOnly()
+    return {'RR': tuple(int(rr(dut, n).value) for n in range(16)),
+            'CC': int(cpu.CC.value), 'P': P, 'Q': Q}
+
+
+@cocotb.test()
+async def test_lockstep(dut):
+    """Random program: RTL state at each ENDE against sigma7_sim."""
+    length = int(os.environ.get('COSIM_LENGTH', 200))
+    seed   = int(os.environ.get('COSIM_SEED', 1))
+    fields = tuple(os.environ.get('COSIM_FIELDS', ','.join(FIELDS)).split(','))
+    rng = random.Random(seed)
+    program = random_program(rng, length)
+    data, index = random_data(rng)
+    trace = golden_trace(program, data, index)
+    cocotb.log.info(f"\n=== Lockstep: {len(trace)} instructions, seed {seed} ===")
+
+    cocotb.start_soon(Clock(dut.clock, 10, unit="ns").start())
+    await load_program(dut, CODE, program + [C.encode(OP_LCFI)])
+    await load_program(dut, DATA, data)
+    await reset_cpu(dut)
+    # R1 is the index register; set it before the first instruction's PREP
+    rr(dut, 1).value = index
+
+    if not await next_boundary(dut, 16):                # boot ENDE (PCP5)
+        raise AssertionError("RTL never reached the boot ENDE")
+
+    for k, (ia, expected) in enumerate(trace):
+        if not await next_boundary(dut, 64):
+            raise AssertionError(f"RTL hung in instruction {k} at 0x{ia:05X}")
+        got = await rtl_state(dut)
+        diffs = divergence(expected, got, fields)
+        if diffs:
+            for j in range(max(0, k - 4), k + 1):
+                at = trace[j][0]
+                cocotb.log.info(f"  {j:6d} 0x{at:05X}  "
+                                f"{disasm(program[(at - CODE) >> 2])}")
+            for d in diffs:
+                cocotb.log.error(f"  DIVERGE  {d}")
+            raise AssertionError(f"first divergence after instruction {k} "
+                                 f"at 0x{ia:05X}")
+    cocotb.log.info(f"  --- lockstep: {len(trace)} instructions agree ---")
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Sigma 7 model/RTL lockstep co-simulation')
+    parser.add_argument('-n', '--length', type=int, default=200,
+                        help='random program length (default 200)')
+    parser.add_argument('-s', '--seed', type=int, default=1)
+    parser.add_argument('-f', '--fields', default=','.join(FIELDS),
+                        help='state compared at each ENDE (default RR,CC,P,Q)')
+    args = parser.parse_args()
+
+    proj_dir = os.getcwd().replace('\\', '/')
+    os.makedirs("vcd", exist_ok=True)
+    files = ["Sigma7TB.v", "Sigma7System.v", "Sigma7CPU.v", "Memory.v", "Console.v", "BusArbiter.v", "IOProcessor.v"]
+    sources = [f"verilog/{f}" for f in files]
+
+    runner = get_runner("icarus")
+    runner.build(
+        sources=sources,
+        hdl_toplevel="Sigma7TB",
+        build_dir="vcd",
+        always=True,
+        defines={"PROJ_DIR": proj_dir},
+    )
+    runner.test(hdl_toplevel="Sigma7TB", test_module="Sigma7CoSim,",
+                test_dir=os.path.dirname(os.path.abspath(__file__)),
+                extra_env={"COSIM_LENGTH": str(args.length),
+                           "COSIM_SEED":   str(args.seed),
+                           "COSIM_FIELDS": args.fields})
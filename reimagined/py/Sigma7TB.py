@@ -9,6 +9,8 @@ from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge
 from cocotb_tools.runner import get_runner
 
+from sigma7_sim import Sigma7CPU, word_addr
+
 
 # ---------------------------------------------------------------------------
 # Opcodes
@@ -41,21 +43,9 @@ OP_WD   = 0x6D
 # ---------------------------------------------------------------------------
 # Instruction encoding helpers
 # ---------------------------------------------------------------------------
-def encode(op, r=0, x=0, addr=0, i=0):
-    return ((i  & 0x1)  << 31) | \
-           ((op & 0x7F) << 24) | \
-           ((r  & 0x0F) << 20) | \
-           ((x  & 0x07) << 17) | \
-           (addr & 0x1FFFF)
-
-def encode_imm(op, r=0, imm=0):
-    imm20 = imm & 0xFFFFF
-    return ((op & 0x7F) << 24) | \
-           ((r  & 0x0F) << 20) | \
-           imm20
-
-def word_addr(byte_addr):
-    return (byte_addr >> 2) & 0x1FFFF
+# Shared with sigma7_sim so the testbench and the model always agree.
+encode     = Sigma7CPU.encode
+encode_imm = Sigma7CPU.encode_imm
 
 
 # ---------------------------------------------------------------------------
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Batched Sigma 7 CPU: N independent register files, condition codes and
+memories stepped through the same instruction stream with NumPy.
+
+Intended for fuzzing and differential testing: each lane starts from its
+own random state and every lane result is bit-exact with a scalar
+Sigma7CPU given the same state and instructions.  Only architectural
+state is modelled (RR, CC, carry, memory); the internal A/C/D/P/Q
+latches are not.
+
+Each lane owns a small memory window of mem_size bytes.  Effective
+addresses are formed exactly as in Sigma7CPU (19-bit, word/halfword/byte
+indexing, indirect pointers) and must fall inside the window.
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from sigma7_sim import Sigma7CPU, TestRunner, WORD_MASK, mask32, sext
+
+C = Sigma7CPU
+
+_M = np.uint64(WORD_MASK)
+
+
+def _cc_result(v):
+    """CC3/CC4 bits of uint32 results: 1 if negative, 2 if positive, else 0."""
+    return np.where(v >> np.uint32(31), 1, np.where(v != 0, 2, 0)).astype(np.uint8)
+
+
+class Sigma7CPUBatch:
+    """N Sigma 7 register files and memories executing in lockstep."""
+
+    # Operand size of each memory-reference opcode
+    SIZES = {
+        C.OP_AW: 'word', C.OP_SW: 'word', C.OP_CW: 'word', C.OP_LW: 'word',
+        C.OP_STW: 'word', C.OP_AND: 'word', C.OP_OR: 'word', C.OP_EOR: 'word',
+        C.OP_AH: 'halfword', C.OP_SH: 'halfword', C.OP_CH: 'halfword',
+        C.OP_LH: 'halfword', C.OP_STH: 'halfword',
+        C.OP_LB: 'byte', C.OP_STB: 'byte', C.OP_CB: 'byte',
+    }
+    IMMEDIATES = (C.OP_AI, C.OP_CI, C.OP_LI)
+
+    def __init__(self, n, mem_size=4096):
+        self.n     = n
+        self.RR    = np.zeros((n, 16), dtype=np.uint32)
+        self.cc    = np.zeros(n, dtype=np.uint8)     # packed as Sigma7CPU.cc
+        self.carry = np.zeros(n, dtype=np.uint8)
+        self.mem   = np.zeros((n, mem_size // 4), dtype=np.uint32)
+        self.lanes = np.arange(n)
+
+    # ------------------------------------------------------------------
+    # Conversion to and from scalar CPUs
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_cpus(cls, cpus, mem_size=4096):
+        """Build a batch from scalar CPUs (first mem_size bytes of memory)."""
+        batch = cls(len(cpus), mem_size)
+        nwords = mem_size // 4
+        for k, cpu in enumerate(cpus):
+            batch.RR[k] = [mask32(v) for v in cpu.RR]
+            batch.cc[k] = cpu.cc
+            batch.carry[k] = cpu.carry
+            batch.mem[k] = np.asarray(cpu.mem.words[:nwords], dtype=np.uint32)
+        return batch
+
+    def lane(self, k):
+        """Return lane k as a scalar Sigma7CPU."""
+        cpu = Sigma7CPU()
+        cpu.RR = [int(v) for v in self.RR[k]]
+        cpu.cc = int(self.cc[k])
+        cpu.carry = int(self.carry[k])
+        cpu.mem.load(0, [int(w) for w in self.mem[k]])
+        return cpu
+
+    # ------------------------------------------------------------------
+    # Memory access (per-lane addresses)
+    # ------------------------------------------------------------------
+    def _read_word(self, ea):
+        return self.mem[self.lanes, ea >> 2]
+
+    def _read_halfword(self, ea):
+        w = self._read_word(ea)
+        return np.where(ea & 2, w & np.uint32(0xFFFF), w >> np.uint32(16))
+
+    def _read_byte(self, ea):
+        shift = (np.uint32(24) - ((ea & 3) << 3)).astype(np.uint32)
+        return (self._read_word(ea) >> shift) & np.uint32(0xFF)
+
+    def _write_word(self, ea, val):
+        self.mem[self.lanes, ea >> 2] = val
+
+    def _write_halfword(self, ea, val):
+        w = self._read_word(ea)
+        val = val & np.uint32(0xFFFF)
+        self._write_word(ea, np.where(ea & 2, (w & np.uint32(0xFFFF0000)) | val,
+                                      (w & np.uint32(0xFFFF)) | (val << np.uint32(16))))
+
+    def _write_byte(self, ea, val):
+        shift = (np.uint32(24) - ((ea & 3) << 3)).astype(np.uint32)
+        w = self._read_word(ea)
+        keep = ~(np.uint32(0xFF) << shift)
+        self._write_word(ea, (w & keep) | ((val & np.uint32(0xFF)) << shift))
+
+    # ------------------------------------------------------------------
+    # Effective address (as Sigma7CPU._prep, vectorised over lanes)
+    # ------------------------------------------------------------------
+    def _ea(self, i, x, addr, size):
+        """Per-lane effective byte address as a uint32 array."""
+        if x == 0:
+            index = np.zeros(self.n, dtype=np.uint32)
+            off   = np.zeros(self.n, dtype=np.uint32)
+        else:
+            rx = self.RR[:, x]
+            if size == 'byte':
+                index, off = rx >> np.uint32(2), rx & np.uint32(3)
+            elif size == 'halfword':
+                index, off = rx >> np.uint32(1), (rx & np.uint32(1)) << np.uint32(1)
+            else:
+                index, off = rx & np.uint32(0x1FFFF), np.zeros(self.n, dtype=np.uint32)
+        if i:
+            ptr = self.mem[:, addr] & np.uint32(0x1FFFF)
+        else:
+            ptr = np.uint32(addr)
+        return (((index + ptr) & np.uint32(0x1FFFF)) << np.uint32(2)) | off
+
+    # ------------------------------------------------------------------
+    # ALU
+    # ------------------------------------------------------------------
+    def _add(self, r, b, subtract=False, store=True):
+        """alu_add/alu_sub of RR[:, r] and b; CC as set_cc_arith."""
+        a = self.RR[:, r].astype(np.uint64)
+        b = b.astype(np.uint64) & _M
+        if subtract:
+            b = ~b & _M
+        t = a + b + np.uint64(1 if subtract else 0)
+        v = (t & _M).astype(np.uint32)
+        carry = (t >> np.uint64(32)).astype(np.uint8)
+        ov = ((((a ^ v) & (b ^ v)) >> np.uint64(29)) & np.uint64(4)).astype(np.uint8)
+        self.carry = carry
+        self.cc = (carry << np.uint8(3)) | ov | _cc_result(v)
+        if store:
+            self.RR[:, r] = v
+
+    def _compare(self, r, b, a=None):
+        """Carry of alu_sub(a, b), a defaulting to RR[:, r]; CC as set_cc_compare(RR[:, r], b)."""
+        reg = self.RR[:, r].astype(np.uint64)
+        a = reg if a is None else a.astype(np.uint64)
+        b = b.astype(np.uint64) & _M
+        self.carry = ((a + (~b & _M) + np.uint64(1)) >> np.uint64(32)).astype(np.uint8)
+        d = (reg ^ np.uint64(0x80000000)).astype(np.int64) - \
+            (b   ^ np.uint64(0x80000000)).astype(np.int64)
+        self.cc = (np.where((reg & b) != 0, 4, 0) |
+                   np.where(d > 0, 2, np.where(d < 0, 1, 0))).astype(np.uint8)
+
+    def _set_cc(self, v):
+        self.cc = _cc_result(v)
+
+    # ------------------------------------------------------------------
+    # Execute
+    # ------------------------------------------------------------------
+    def execute(self, instr):
+        """Execute one instruction word in every lane."""
+        i, op, r, x, addr = C.decode(instr)
+        if op in self.IMMEDIATES:
+            imm = np.full(self.n, mask32(sext((x << 17) | addr, 20)), dtype=np.uint32)
+            if op == C.OP_AI:
+                self._add(r, imm)
+            elif op == C.OP_CI:
+                self._compare(r, imm)
+            else:
+                self.RR[:, r] = imm
+                self._set_cc(imm)
+            return
+
+        size = self.SIZES.get(op)
+        if size is None:
+            raise ValueError(f"Unimplemented batch opcode: 0x{op:02X}")
+        ea = self._ea(i, x, addr, size)
+
+        if op == C.OP_LW:
+            v = self._read_word(ea)
+            self.RR[:, r] = v
+            self.cc = (np.where(self.carry != 0, 8, 0) | (self.cc & 4) |
+                       _cc_result(v)).astype(np.uint8)
+        elif op == C.OP_STW:
+            self._write_word(ea, self.RR[:, r])
+        elif op == C.OP_AW:
+            self._add(r, self._read_word(ea))
+        elif op == C.OP_SW:
+            self._add(r, self._read_word(ea), subtract=True)
+        elif op == C.OP_CW:
+            self._compare(r, self._read_word(ea))
+        elif op in (C.OP_AND, C.OP_OR, C.OP_EOR):
+            d = self._read_word(ea)
+            a = self.RR[:, r]
+            v = a & d if op == C.OP_AND else a | d if op == C.OP_OR else a ^ d
+            self.RR[:, r] = v
+            self._set_cc(v)
+        elif op in (C.OP_AH, C.OP_SH, C.OP_CH, C.OP_LH):
+            hw = self._read_halfword(ea)
+            d = np.where(hw & np.uint32(0x8000), hw | np.uint32(0xFFFF0000), hw).astype(np.uint32)
+            if op == C.OP_LH:
+                self.RR[:, r] = d
+                self._set_cc(d)
+            elif op == C.OP_CH:
+                self._compare(r, d)
+            else:
+                self._add(r, d, subtract=(op == C.OP_SH))
+        elif op == C.OP_STH:
+            self._write_halfword(ea, self.RR[:, r])
+        elif op == C.OP_LB:
+            b = self._read_byte(ea)
+            self.RR[:, r] = b
+            self.cc = np.where(b != 0, 2, 0).astype(np.uint8)
+        elif op == C.OP_STB:
+            self._write_byte(ea, self.RR[:, r])
+        elif op == C.OP_CB:
+            # A is the low byte of RR[r]; the compare uses the full register
+            self._compare(r, self._read_byte(ea), a=self.RR[:, r] & np.uint32(0xFF))
+
+    def run(self, program):
+        """Execute a sequence of instruction words in every lane."""
+        for instr in program:
+            self.execute(instr)
+
+
+# ---------------------------------------------------------------------------
+# Tests: batch lanes against scalar Sigma7CPU
+# ---------------------------------------------------------------------------
+POINTERS = 16     # words at the bottom of the window holding indirect pointers
+
+
+def random_program(rng, length, mem_size=4096):
+    """Random instruction stream whose addresses stay inside the window."""
+    ops = list(Sigma7CPUBatch.SIZES) + list(Sigma7CPUBatch.IMMEDIATES)
+    words = mem_size // 4
+    program = []
+    for _ in range(length):
+        op = rng.choice(ops)
+        r = rng.choice((0, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 13, 14, 15))
+        if op in Sigma7CPUBatch.IMMEDIATES:
+            program.append(C.encode_imm(op, r=r, imm=rng.randint(-0x80000, 0x7FFFF)))
+        else:
+            x = rng.choice((0, 0, 1))   # R1 is never a destination, so indexing stays in range
+            if rng.random() < 0.2:      # indirect through the pointer words
+                i, addr = 1, rng.randint(0, POINTERS - 1)
+            else:
+                i, addr = 0, rng.randint(POINTERS, words // 2 - 1)
+            program.append(C.encode(op, r=r, x=x, i=i, addr=addr))
+    return program
+
+
+def random_cpu(rng, mem_size=4096):
+    """Scalar CPU with random registers/CC and a random memory window."""
+    cpu = Sigma7CPU()
+    cpu.RR = [rng.getrandbits(32) for _ in range(16)]
+    cpu.RR[1] = rng.randint(0, 255)   # index register used by random_program
+    cpu.cc = rng.getrandbits(4)
+    cpu.carry = rng.getrandbits(1)
+    # the first POINTERS words are indirect pointers back into the window;
+    # random_program never stores below them
+    words = [(rng.getrandbits(15) << 17) | rng.randint(POINTERS, mem_size // 8 - 1)
+             for _ in range(POINTERS)]
+    words += [rng.getrandbits(32) for _ in range(mem_size // 4 - POINTERS)]
+    cpu.mem.load(0, words)
+    return cpu
+
+
+def test_batch(tr, lanes=64, length=200, seed=11):
+    import random
+    rng = random.Random(seed)
+    cpus = [random_cpu(rng) for _ in range(lanes)]
+    batch = Sigma7CPUBatch.from_cpus(cpus)
+    program = random_program(rng, length)
+    cc_diffs = [0] * lanes          # steps at which a lane's CC/carry differed
+    for instr in program:
+        batch.execute(instr)
+        for k, cpu in enumerate(cpus):
+            cpu.execute(instr)
+            if batch.cc[k] != cpu.cc or batch.carry[k] != cpu.carry:
+                cc_diffs[k] += 1
+    nwords = batch.mem.shape[1]
+    for k, cpu in enumerate(cpus):
+        rr = np.array([mask32(v) for v in cpu.RR], dtype=np.uint32)
+        mem = np.asarray(cpu.mem.words[:nwords], dtype=np.uint32)
+        tr.check(f"Batch lane {k} RR mismatches", int(np.count_nonzero(batch.RR[k] != rr)), 0)
+        tr.check(f"Batch lane {k} CC/carry mismatches", cc_diffs[k], 0)
+        tr.check(f"Batch lane {k} memory mismatches", int(np.count_nonzero(batch.mem[k] != mem)), 0)
+    tr.check("Batch lane 0 round trip", int(np.count_nonzero(
+        Sigma7CPUBatch.from_cpus([batch.lane(0)]).mem[0] != batch.mem[0])), 0)
+
+if __name__ == '__main__':
+    tr = TestRunner()
+    print("Running batch vs scalar tests...")
+    test_batch(tr)
+    tr.summary()
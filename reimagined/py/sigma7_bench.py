@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Sigma 7 Python simulator benchmarks.
+Reports instructions per second for the sigma7_sim execution paths.
+
+Usage:
+  python sigma7_bench.py [-n COUNT]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from sigma7_sim import MEM_SIZE, Memory, Sigma7CPU, mask32, word_addr
+
+C = Sigma7CPU
+
+CODE = 0x4000     # byte address of the benchmark program
+DATA = 0x1000     # byte address of the operand area
+
+
+# ---------------------------------------------------------------------------
+# Workload
+# ---------------------------------------------------------------------------
+def straight_line_program():
+    """A mixed block of word/halfword/byte/doubleword instructions."""
+    return [
+        C.encode(C.OP_LW,  r=1, addr=word_addr(DATA)),
+        C.encode(C.OP_AW,  r=1, addr=word_addr(DATA + 4)),
+        C.encode_imm(C.OP_AI, r=1, imm=-3),
+        C.encode(C.OP_STW, r=1, addr=word_addr(DATA + 8)),
+        C.encode(C.OP_CW,  r=1, addr=word_addr(DATA + 4)),
+        C.encode(C.OP_LH,  r=2, addr=word_addr(DATA)),
+        C.encode(C.OP_AH,  r=2, addr=word_addr(DATA + 4)),
+        C.encode(C.OP_STH, r=2, addr=word_addr(DATA + 12)),
+        C.encode(C.OP_LB,  r=3, addr=word_addr(DATA)),
+        C.encode(C.OP_STB, r=3, addr=word_addr(DATA + 16)),
+        C.encode(C.OP_AND, r=1, addr=word_addr(DATA + 4)),
+        C.encode(C.OP_EOR, r=1, addr=word_addr(DATA)),
+        C.encode(C.OP_LD,  r=4, addr=word_addr(DATA)),
+        C.encode(C.OP_AD,  r=4, addr=word_addr(DATA)),
+        C.encode(C.OP_STD, r=4, addr=word_addr(DATA + 24)),
+        C.encode(C.OP_LW,  r=5, x=6, addr=word_addr(DATA)),
+    ]
+
+
+def make_cpu(program):
+    cpu = Sigma7CPU()
+    cpu.mem.write_word(DATA,     0x12345678)
+    cpu.mem.write_word(DATA + 4, mask32(-17))
+    cpu.RR[6] = 1
+    cpu.mem.load(CODE, program)
+    return cpu
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+def bench_execute(count):
+    """execute(instr) on pre-fetched words (decode every time)."""
+    program = straight_line_program()
+    cpu = make_cpu(program)
+    loops = max(1, count // len(program))
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        for w in program:
+            cpu.execute(w)
+    return loops * len(program), time.perf_counter() - t0
+
+
+def bench_execute_at(count, icache):
+    """execute_at(addr) with the pre-decoded instruction cache on or off."""
+    program = straight_line_program()
+    cpu = make_cpu(program)
+    cpu.icache_enabled = icache
+    addrs = [CODE + 4 * k for k in range(len(program))]
+    loops = max(1, count // len(program))
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        for a in addrs:
+            cpu.execute_at(a)
+    return loops * len(program), time.perf_counter() - t0
+
+
+def loop_program(iterations):
+    """The straight-line block wrapped in a BDR loop, ending in WAIT."""
+    body = straight_line_program()
+    loop = word_addr(CODE) + 1
+    return ([C.encode_imm(C.OP_LI, r=7, imm=iterations)] + body +
+            [C.encode(C.OP_BDR, r=7, addr=loop), C.encode(C.OP_WAIT)])
+
+
+def bench_run(count, translate=False):
+    """run() fetch/ENDE loop over a BDR-controlled loop."""
+    iterations = max(1, count // (len(straight_line_program()) + 1))
+    cpu = make_cpu(loop_program(iterations))
+    cpu.translate = translate
+    t0 = time.perf_counter()
+    cpu.run(CODE)
+    return cpu.icount, time.perf_counter() - t0
+
+
+def bench_cc(count):
+    """Per-instruction cost of the CC-heavy handlers (execute_at, icache on)."""
+    cases = [
+        ("AW",  C.encode(C.OP_AW,  r=1, addr=word_addr(DATA + 4))),
+        ("CW",  C.encode(C.OP_CW,  r=1, addr=word_addr(DATA + 4))),
+        ("AI",  C.encode_imm(C.OP_AI, r=1, imm=-3)),
+        ("LW",  C.encode(C.OP_LW,  r=1, addr=word_addr(DATA))),
+        ("LCW", C.encode(C.OP_LCW, r=1, addr=word_addr(DATA + 4))),
+        ("AD",  C.encode(C.OP_AD,  r=4, addr=word_addr(DATA))),
+        ("CD",  C.encode(C.OP_CD,  r=4, addr=word_addr(DATA))),
+        ("LAD", C.encode(C.OP_LAD, r=4, addr=word_addr(DATA))),
+    ]
+    results = []
+    for name, word in cases:
+        cpu = make_cpu([word])
+        t0 = time.perf_counter()
+        for _ in range(count):
+            cpu.execute_at(CODE)
+        results.append((name, (time.perf_counter() - t0) / count))
+    return results
+
+
+def bench_image_load():
+    """Loading a full core image: per word, bulk slice, and mmap."""
+    image = bytes(range(256)) * (MEM_SIZE // 256)
+    words = [int.from_bytes(image[a:a + 4], 'big') for a in range(0, MEM_SIZE, 4)]
+    results = []
+
+    mem = Memory()
+    t0 = time.perf_counter()
+    for k, w in enumerate(words):
+        mem.write_word(k << 2, w)
+    results.append(("write_word loop", time.perf_counter() - t0))
+
+    mem = Memory()
+    t0 = time.perf_counter()
+    mem.load_bytes(0, image)
+    results.append(("load_bytes", time.perf_counter() - t0))
+
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'core.img')
+        mem.save_image(path)
+        t0 = time.perf_counter()
+        mapped = Memory(image=path)
+        results.append(("Memory(image=...) mmap", time.perf_counter() - t0))
+        del mapped
+    return results
+
+
+def bench_batch(count, lanes=1024):
+    """Sigma7CPUBatch lane-instructions against the scalar execute path."""
+    from sigma7_batch import Sigma7CPUBatch
+    program = [w for w in straight_line_program()
+               if (w >> 24) & 0x7F in Sigma7CPUBatch.SIZES or
+                  (w >> 24) & 0x7F in Sigma7CPUBatch.IMMEDIATES]
+    batch = Sigma7CPUBatch.from_cpus([make_cpu(program)] * lanes, mem_size=DATA + 64)
+    loops = max(1, count // (len(program) * lanes))
+    t0 = time.perf_counter()
+    for _ in range(loops):
+        batch.run(program)
+    return loops * len(program) * lanes, time.perf_counter() - t0
+
+
+def report(name, n, dt):
+    print(f"  {name:<28s} {n:>10d} instr  {dt:8.3f} s  {n / dt:12,.0f} instr/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sigma 7 simulator benchmarks')
+    parser.add_argument('-n', '--count', type=int, default=200000,
+                        help='instructions per benchmark (default 200000)')
+    args = parser.parse_args()
+
+    print("Instruction dispatch:")
+    report("execute(instr)",        *bench_execute(args.count))
+    report("execute_at, icache off", *bench_execute_at(args.count, False))
+    report("execute_at, icache on",  *bench_execute_at(args.count, True))
+
+    print("Run loop:")
+    report("run(), interpreted",     *bench_run(args.count))
+    report("run(), translated",      *bench_run(args.count, True))
+
+    try:
+        report("Sigma7CPUBatch, 1024 lanes", *bench_batch(args.count * 10))
+    except ImportError:
+        print("  Sigma7CPUBatch              skipped (NumPy not installed)")
+
+    print("Condition-code instructions:")
+    for name, dt in bench_cc(max(1, args.count // 10)):
+        print(f"  {name:<28s} {dt * 1e9:10.0f} ns/instr")
+
+    print(f"Core image load ({MEM_SIZE // 1024} KB):")
+    for name, dt in bench_image_load():
+        print(f"  {name:<28s} {dt * 1e3:10.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
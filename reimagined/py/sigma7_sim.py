@@ -4,6 +4,13 @@ SDS/Xerox Sigma 7 CPU Simulator
 Implements RTL for all documented instructions and runs automated test cases.
 """
 
+import argparse
+import importlib.util
+import mmap
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+
 # ---------------------------------------------------------------------------
 # Constants
 # ---------------------------------------------------------------------------
@@ -33,6 +40,11 @@ def upward_align_halfword(v):
     h = v & HALF_MASK
     return mask32((h << 16) | h)
 
+# CC3/CC4 of a nonzero result, indexed by its sign bit
+_CC_SIGN = (2, 1)
+# CC3/CC4 of a doubleword result, indexed by sign | (hi == 0 and AWZ) << 1
+_CC_DW = (2, 1, 0, 1)
+
 def signed32(v):
     v = mask32(v)
     return v - (1 << 32) if v & 0x80000000 else v
@@ -42,42 +54,120 @@ def signed32(v):
 # Memory
 # ---------------------------------------------------------------------------
 class Memory:
-    def __init__(self, size=MEM_SIZE):
-        self.data = bytearray(size)
+    """
+    Byte-addressed, big-endian Sigma memory held as 32-bit words.
+
+    Words live in host order in self.words (an array('I'), or a memoryview
+    cast over an mmap), so word access is a single index; halfword and
+    byte access shift and mask within the containing word.
+
+    image: path of a host-order word image written by save_image().  It
+    is mapped copy-on-write, so loading is constant time and the file is
+    never modified.
+    """
+    def __init__(self, size=MEM_SIZE, image=None):
+        self._map = None
+        if image is None:
+            self.words = array('I', bytes(size))
+        else:
+            with open(image, 'rb') as f:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+            self.words = memoryview(self._map).cast('I')
 
     def read_word(self, addr):
-        addr &= 0x7FFFC   # word-align, 19-bit space
-        d = self.data
-        return (d[addr] << 24) | (d[addr+1] << 16) | (d[addr+2] << 8) | d[addr+3]
+        return self.words[(addr >> 2) & 0x1FFFF]   # word-align, 19-bit space
 
     def write_word(self, addr, val):
-        addr &= 0x7FFFC
-        val   = mask32(val)
-        self.data[addr]   = (val >> 24) & 0xFF
-        self.data[addr+1] = (val >> 16) & 0xFF
-        self.data[addr+2] = (val >>  8) & 0xFF
-        self.data[addr+3] =  val        & 0xFF
+        self.words[(addr >> 2) & 0x1FFFF] = val & WORD_MASK
 
     def read_halfword(self, addr):
-        addr &= 0x7FFFE   # halfword-align
-        return (self.data[addr] << 8) | self.data[addr+1]
+        w = self.words[(addr >> 2) & 0x1FFFF]
+        return w & HALF_MASK if addr & 2 else w >> 16
 
     def write_halfword(self, addr, val):
-        addr &= 0x7FFFE
-        val   = mask16(val)
-        self.data[addr]   = (val >> 8) & 0xFF
-        self.data[addr+1] =  val       & 0xFF
+        k = (addr >> 2) & 0x1FFFF
+        w = self.words[k]
+        if addr & 2:
+            self.words[k] = (w & 0xFFFF0000) | (val & HALF_MASK)
+        else:
+            self.words[k] = (w & HALF_MASK) | ((val & HALF_MASK) << 16)
 
     def read_byte(self, addr):
-        return self.data[addr & 0x7FFFF]
+        return (self.words[(addr >> 2) & 0x1FFFF] >> (24 - ((addr & 3) << 3))) & BYTE_MASK
 
     def write_byte(self, addr, val):
-        self.data[addr & 0x7FFFF] = mask8(val)
+        k = (addr >> 2) & 0x1FFFF
+        sh = 24 - ((addr & 3) << 3)
+        self.words[k] = (self.words[k] & ~(BYTE_MASK << sh) & WORD_MASK) | \
+                        ((val & BYTE_MASK) << sh)
 
     def load(self, byte_addr, words):
         """Write a list of 32-bit words to memory starting at byte_addr."""
-        for i, w in enumerate(words):
-            self.write_word(byte_addr + i * 4, w)
+        k = (byte_addr >> 2) & 0x1FFFF
+        if k + len(words) <= len(self.words):
+            self.words[k:k + len(words)] = array('I', [w & WORD_MASK for w in words])
+        else:   # wraps the 19-bit address space
+            for i, w in enumerate(words):
+                self.write_word(byte_addr + i * 4, w)
+
+    def load_bytes(self, byte_addr, data):
+        """
+        Copy a big-endian byte image into memory starting at byte_addr.
+        Whole words are converted and stored with one slice assignment;
+        only a ragged head or tail is written byte by byte.
+        """
+        data = memoryview(data).cast('B')
+        addr = byte_addr & 0x7FFFF
+        head = min((-addr) & 3, len(data))
+        for b in data[:head]:
+            self.write_byte(addr, b)
+            addr += 1
+        body = (len(data) - head) & ~3
+        if body:
+            chunk = array('I', data[head:head + body].tobytes())
+            if sys.byteorder == 'little':
+                chunk.byteswap()
+            k = addr >> 2
+            if k + len(chunk) > len(self.words):
+                raise ValueError(f"Image of {len(data)} bytes does not fit at 0x{byte_addr:05X}")
+            self.words[k:k + len(chunk)] = chunk
+            addr += body
+        for b in data[head + body:]:
+            self.write_byte(addr, b)
+            addr += 1
+
+    def load_file(self, path, byte_addr=0):
+        """Load a raw big-endian core image file at byte_addr."""
+        with open(path, 'rb') as f:
+            self.load_bytes(byte_addr, f.read())
+
+    def to_bytes(self):
+        """Return memory as a big-endian byte image."""
+        image = array('I', self.words)
+        if sys.byteorder == 'little':
+            image.byteswap()
+        return image.tobytes()
+
+    def save_image(self, path):
+        """Write a host-order word image that Memory(image=path) can map."""
+        with open(path, 'wb') as f:
+            f.write(self.words.tobytes())
+
+    def load_hex(self, path):
+        """Load a $readmemh file (word addressed, as written by sigma7asm)."""
+        addr, run = 0, []
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('//'):
+                    continue
+                if line.startswith('@'):
+                    self.load((addr - len(run)) << 2, run)
+                    addr, run = int(line[1:], 16), []
+                else:
+                    run.append(int(line, 16))
+                    addr += 1
+        self.load((addr - len(run)) << 2, run)
 
 
 # ---------------------------------------------------------------------------
@@ -113,6 +203,9 @@ class Sigma7CPU:
     OP_SH  = 0x58; OP_LCH = 0x5A; OP_LAH = 0x5B
     OP_AND = 0x4B; OP_CB  = 0x71; OP_LB  = 0x72; OP_MTB = 0x73
     OP_STB = 0x75
+    OP_WAIT = 0x2E
+    OP_BDR = 0x64; OP_BIR = 0x65
+    OP_BCR = 0x68; OP_BCS = 0x69; OP_BAL = 0x6A
 
     def __init__(self, memory=None):
         self.mem  = memory or Memory()
@@ -128,106 +221,141 @@ class Sigma7CPU:
         self.Q    = 0           # next instruction word address (17-bit)
         self.AWZ  = False       # A-Was-Zero flip-flop (doubleword zero detection)
         self.carry = 0
-        self.CC1  = False      # carry
-        self.CC2  = False      # overflow
-        self.CC3  = False      # positive
-        self.CC4  = False      # negative
+        self.cc   = 0           # CC1-CC4 packed, CC1 = 8 … CC4 = 1
+
+        # Opcode → handler table, built once per CPU (bound methods)
+        self.dispatch = {
+            self.OP_AW:  self._AW,  self.OP_SW:  self._SW,  self.OP_CW:  self._CW,
+            self.OP_AI:  self._AI,  self.OP_CI:  self._CI,  self.OP_LI:  self._LI,
+            self.OP_LW:  self._LW,  self.OP_STW: self._STW, self.OP_LCW: self._LCW,
+            self.OP_LAW: self._LAW,
+            self.OP_AH:  self._AH,  self.OP_SH:  self._SH,  self.OP_CH:  self._CH,
+            self.OP_LH:  self._LH,  self.OP_STH: self._STH, self.OP_LCH: self._LCH,
+            self.OP_LAH: self._LAH, self.OP_MTH: self._MTH,
+            self.OP_LB:  self._LB,  self.OP_STB: self._STB, self.OP_CB:  self._CB,
+            self.OP_MTB: self._MTB,
+            self.OP_AND: self._AND, self.OP_OR:  self._OR,  self.OP_EOR: self._EOR,
+            self.OP_LD:  self._LD,  self.OP_STD: self._STD, self.OP_AD:  self._AD,
+            self.OP_SD:  self._SD,  self.OP_CD:  self._CD,  self.OP_LCD: self._LCD,
+            self.OP_LAD: self._LAD,
+            self.OP_BCR: self._BCR, self.OP_BCS: self._BCS, self.OP_BAL: self._BAL,
+            self.OP_BDR: self._BDR, self.OP_BIR: self._BIR, self.OP_WAIT: self._WAIT,
+        }
+
+        # Pre-decoded instruction cache: word address → (handler, i, op, r, x, addr)
+        self.icache = {}
+        self.icache_enabled = True
+
+        self.waiting = False    # set by WAIT; ends run()
+        self.icount  = 0        # instructions executed by run()
+
+        # Basic-block translation tier (see translate_block)
+        self.translate   = False
+        self.blocks      = {}   # start word address → Block
+        self.block_index = {}   # word address → set of block starts covering it
+        self.block_heat  = {}   # block-leader word address → times reached
+        self.smc         = False  # a store dropped a translated block
 
     # ------------------------------------------------------------------
     # Helpers
     # ------------------------------------------------------------------
+    # Condition codes are held packed in self.cc: CC1 = 8 (carry),
+    # CC2 = 4 (overflow), CC3 = 2 (positive), CC4 = 1 (negative).
+    # CC3/CC4 for a 32-bit result come from _CC_SIGN[result >> 31] with
+    # the zero case folded in, so each setter is a single store.
+
     def set_cc_arith(self, result, carry=0, overflow=False):
         """CC for arithmetic/load/logical instructions."""
-        result = mask32(result)
-        self.CC1 = bool(carry)
-        self.CC2 = bool(overflow)
-        self.CC3 = (result != 0) and not bool(result & 0x80000000)
-        self.CC4 = bool(result & 0x80000000)
+        result &= WORD_MASK
+        self.cc = (8 if carry else 0) | (4 if overflow else 0) | \
+                  (_CC_SIGN[result >> 31] if result else 0)
 
     def set_cc_arith_dw(self, hi, awz, carry=0, overflow=False):
         """CC for doubleword arithmetic/load instructions."""
-        hi = mask32(hi)
-        self.CC1 = bool(carry)
-        self.CC2 = bool(overflow)
-        self.CC4 = bool(hi & 0x80000000)
-        self.CC3 = (not self.CC4) and (not (hi == 0 and awz))
+        hi &= WORD_MASK
+        self.cc = (8 if carry else 0) | (4 if overflow else 0) | \
+                  _CC_DW[(hi >> 31) | (hi == 0 and awz) << 1]
 
     def set_cc_compare(self, reg, operand):
         """CC for compare instructions."""
-        self.CC1 = False
-        self.CC2 = bool(mask32(reg) & mask32(operand))   # bitwise AND non-zero
-        s_reg = signed32(reg)
-        s_op  = signed32(operand)
-        self.CC3 = s_reg > s_op
-        self.CC4 = s_reg < s_op
+        reg &= WORD_MASK; operand &= WORD_MASK
+        d = (reg ^ 0x80000000) - (operand ^ 0x80000000)   # signed order
+        self.cc = (4 if reg & operand else 0) | \
+                  (2 if d > 0 else 1 if d < 0 else 0)
 
     def set_cc_compare_dw(self, reg_hi, reg_lo, op_hi, op_lo):
         """CC for doubleword compare instructions."""
-        self.CC1 = False
-        self.CC2 = bool((mask32(reg_hi) & mask32(op_hi)) or
-                        (mask32(reg_lo) & mask32(op_lo)))
-        r64 = (mask32(reg_hi) << 32) | mask32(reg_lo)
-        o64 = (mask32(op_hi)  << 32) | mask32(op_lo)
-        # treat as signed 64-bit
-        if r64 & (1 << 63): r64 -= (1 << 64)
-        if o64 & (1 << 63): o64 -= (1 << 64)
-        self.CC3 = r64 > o64
-        self.CC4 = r64 < o64
+        reg_hi &= WORD_MASK; reg_lo &= WORD_MASK
+        op_hi  &= WORD_MASK; op_lo  &= WORD_MASK
+        # signed 64-bit order via the flipped sign bit of the high word
+        d = (((reg_hi ^ 0x80000000) << 32) | reg_lo) - \
+            (((op_hi  ^ 0x80000000) << 32) | op_lo)
+        self.cc = (4 if (reg_hi & op_hi) or (reg_lo & op_lo) else 0) | \
+                  (2 if d > 0 else 1 if d < 0 else 0)
 
     def set_cc_abs(self, result, overflow=False):
         """CC for load absolute instructions (LAW, LAH, LAD)."""
-        result = mask32(result)
-        self.CC1 = False
-        self.CC2 = bool(overflow)
-        self.CC3 = result != 0 and not overflow
-        self.CC4 = bool(overflow)   # only set on overflow
+        if overflow:
+            self.cc = 4 | 1                       # CC4 only set on overflow
+        else:
+            self.cc = 2 if result & WORD_MASK else 0
 
     def set_cc_abs_dw(self, hi, awz, overflow=False):
         """CC for doubleword load absolute."""
-        hi = mask32(hi)
-        self.CC1 = False
-        self.CC2 = bool(overflow)
-        self.CC3 = not overflow and not (hi == 0 and awz)
-        self.CC4 = bool(overflow)
+        if overflow:
+            self.cc = 4 | 1
+        else:
+            self.cc = 0 if (hi & WORD_MASK) == 0 and awz else 2
 
     def set_cc_complement(self, result, carry=0, overflow=False):
         """CC for load complement instructions (LCW, LCH, LCD)."""
-        result = mask32(result)
-        self.CC1 = bool(carry)
-        self.CC2 = bool(overflow)
-        self.CC3 = (result != 0) and not bool(result & 0x80000000) and not overflow
-        self.CC4 = bool(result & 0x80000000) or bool(overflow)
+        result &= WORD_MASK
+        self.cc = (8 if carry else 0) | \
+                  ((4 | 1) if overflow else
+                   (_CC_SIGN[result >> 31] if result else 0))
 
     def set_cc_complement_dw(self, hi, awz, carry=0, overflow=False):
         """CC for doubleword load complement."""
-        hi = mask32(hi)
-        self.CC1 = bool(carry)
-        self.CC2 = bool(overflow)
-        self.CC4 = bool(hi & 0x80000000) or bool(overflow)
-        self.CC3 = not self.CC4 and not (hi == 0 and awz)
+        hi &= WORD_MASK
+        self.cc = (8 if carry else 0) | \
+                  ((4 | 1) if overflow else
+                   _CC_DW[(hi >> 31) | (hi == 0 and awz) << 1])
 
     def set_cc_byte(self, result):
         """CC for LB and MTB — CC3 only, CC4 never set."""
-        self.CC1 = False
-        self.CC2 = False
-        self.CC3 = mask8(result) != 0
-        self.CC4 = False
+        self.cc = 2 if result & BYTE_MASK else 0
+
+    CC1 = property(lambda self: bool(self.cc & 8),
+                   lambda self, v: self._set_cc_bit(8, v), doc="carry")
+    CC2 = property(lambda self: bool(self.cc & 4),
+                   lambda self, v: self._set_cc_bit(4, v), doc="overflow")
+    CC3 = property(lambda self: bool(self.cc & 2),
+                   lambda self, v: self._set_cc_bit(2, v), doc="positive")
+    CC4 = property(lambda self: bool(self.cc & 1),
+                   lambda self, v: self._set_cc_bit(1, v), doc="negative")
+
+    def _set_cc_bit(self, bit, value):
+        self.cc = (self.cc | bit) if value else (self.cc & ~bit)
+
+    def cc_value(self):
+        """CC as a 4-bit value, CC1 = MSB (matches the R-field branch mask)."""
+        return self.cc
 
     def cc_dict(self):
-        return {'CC1': self.CC1, 'CC2': self.CC2,
-                'CC3': self.CC3, 'CC4': self.CC4}
+        cc = self.cc
+        return {'CC1': bool(cc & 8), 'CC2': bool(cc & 4),
+                'CC3': bool(cc & 2), 'CC4': bool(cc & 1)}
 
     def alu_add(self, a, b, cin=0):
-        """32-bit add; updates carry and overflow."""
-        a = mask32(a); b = mask32(b)
-        result = a + b + cin
-        self.carry = 1 if result > WORD_MASK else 0
-        sa = bool(a      & 0x80000000)
-        sb = bool(b      & 0x80000000)
-        sr = bool(result & 0x80000000)
-        self.CC2 = (sa == sb) and (sa != sr)
-        self.CC1 = bool(self.carry)
-        return mask32(result)
+        """32-bit add; updates carry and overflow (CC1, CC2)."""
+        a &= WORD_MASK; b &= WORD_MASK
+        t = a + b + cin
+        result = t & WORD_MASK
+        self.carry = t >> 32
+        # overflow: operands agree in sign and the result does not
+        self.cc = (self.cc & 3) | (self.carry << 3) | \
+                  ((((a ^ result) & (b ^ result)) >> 29) & 4)
+        return result
 
     def alu_sub(self, a, b):
         """32-bit subtract a − b via two's complement."""
@@ -321,24 +449,151 @@ class Sigma7CPU:
         self.O = op
         self.R = r
 
-        dispatch = {
-            self.OP_AW:  self._AW,  self.OP_SW:  self._SW,  self.OP_CW:  self._CW,
-            self.OP_AI:  self._AI,  self.OP_CI:  self._CI,  self.OP_LI:  self._LI,
-            self.OP_LW:  self._LW,  self.OP_STW: self._STW, self.OP_LCW: self._LCW,
-            self.OP_LAW: self._LAW,
-            self.OP_AH:  self._AH,  self.OP_SH:  self._SH,  self.OP_CH:  self._CH,
-            self.OP_LH:  self._LH,  self.OP_STH: self._STH, self.OP_LCH: self._LCH,
-            self.OP_LAH: self._LAH, self.OP_MTH: self._MTH,
-            self.OP_LB:  self._LB,  self.OP_STB: self._STB, self.OP_CB:  self._CB,
-            self.OP_MTB: self._MTB,
-            self.OP_AND: self._AND, self.OP_OR:  self._OR,  self.OP_EOR: self._EOR,
-            self.OP_LD:  self._LD,  self.OP_STD: self._STD, self.OP_AD:  self._AD,
-            self.OP_SD:  self._SD,  self.OP_CD:  self._CD,  self.OP_LCD: self._LCD,
-            self.OP_LAD: self._LAD,
-        }
-        if op not in dispatch:
+        handler = self.dispatch.get(op)
+        if handler is None:
             raise ValueError(f"Unimplemented opcode: 0x{op:02X}")
-        dispatch[op](i, r, x, addr)
+        handler(i, r, x, addr)
+
+    def execute_at(self, byte_addr):
+        """
+        Fetch and execute the instruction word at byte_addr.
+        Decoded fields and handler are cached per word address, so repeated
+        execution of the same location skips decode and dispatch lookup.
+        """
+        wa = (byte_addr >> 2) & 0x1FFFF
+        entry = self.icache.get(wa)
+        if entry is None:
+            entry = self.predecode(wa)
+            if self.icache_enabled:
+                self.icache[wa] = entry
+        handler, i, op, r, x, addr = entry
+        self.O = op
+        self.R = r
+        handler(i, r, x, addr)
+
+    def predecode(self, wa):
+        """Decode the word at word address wa into a cache entry."""
+        i, op, r, x, addr = self.decode(self.mem.read_word(wa << 2))
+        handler = self.dispatch.get(op)
+        if handler is None:
+            raise ValueError(f"Unimplemented opcode: 0x{op:02X} at 0x{wa:05X}")
+        return handler, i, op, r, x, addr
+
+    def invalidate(self, byte_addr):
+        """Drop any cached decode or translated block holding byte_addr."""
+        wa = (byte_addr >> 2) & 0x1FFFF
+        if self.icache:
+            self.icache.pop(wa, None)
+        if self.block_index:
+            starts = self.block_index.pop(wa, None)
+            if starts:
+                for start in starts:
+                    self._drop_block(start)
+                self.smc = True
+
+    def _drop_block(self, start):
+        block = self.blocks.pop(start, None)
+        if block is not None:
+            for wa in range(block.start, block.end + 1):
+                covering = self.block_index.get(wa)
+                if covering:
+                    covering.discard(start)
+
+    def flush_icache(self):
+        """Drop all cached decodes and blocks (call after loading memory directly)."""
+        self.icache.clear()
+        self.blocks.clear()
+        self.block_index.clear()
+        self.block_heat.clear()
+
+    def _block_at(self, wa, n, limit, breaks):
+        """Translated block starting at wa, if one is usable for this step."""
+        block = self.blocks.get(wa)
+        if block is None:
+            heat = self.block_heat.get(wa, 0) + 1
+            self.block_heat[wa] = heat
+            if heat < BLOCK_HOT:
+                return None
+            block = translate_block(self, wa)
+            if block is None:
+                return None
+            self.blocks[wa] = block
+            for w in range(block.start, block.end + 1):
+                self.block_index.setdefault(w, set()).add(wa)
+        if limit is not None and n + block.count > limit:
+            return None
+        if breaks and any(block.start < (b >> 2) <= block.end for b in breaks):
+            return None
+        return block
+
+    # ------------------------------------------------------------------
+    # Fetch / ENDE loop
+    # ------------------------------------------------------------------
+    def run(self, start=None, max_instructions=None, stop_on=()):
+        """
+        Fetch and execute instructions from memory.
+
+        start            byte address of the first instruction (default: P)
+        max_instructions stop after this many instructions (None = no limit)
+        stop_on          byte addresses to break at; the instruction at a
+                         breakpoint is not executed (except as the very
+                         first instruction of the run, so run() resumes)
+
+        Each instruction follows the hardware sequence: ENDE fetches the
+        word at P and advances P to IA+4, PREP1 copies that into Q, and the
+        instruction leaves the next instruction word address in Q (branch
+        handlers replace it with the target).  EX(n-1) then restores
+        P ← Q << 2 for the next fetch.
+
+        With translate set, hot basic blocks run as translated code (see
+        translate_block); a block is skipped in favour of the interpreter
+        when it holds a breakpoint or would overrun max_instructions.
+
+        Returns 'wait', 'breakpoint' or 'limit'.  P is left at the next
+        instruction to execute.  An unimplemented opcode raises ValueError
+        with P at the offending instruction.
+        """
+        if start is not None:
+            self.P = start & 0x7FFFC
+        breaks = frozenset(a & 0x7FFFC for a in stop_on)
+        execute_at = self.execute_at
+        translate = self.translate
+        leader = True
+        self.waiting = False
+        n = 0
+        try:
+            while max_instructions is None or n < max_instructions:
+                ia = self.P & 0x7FFFC
+                if n and ia in breaks:
+                    return 'breakpoint'
+                if translate and leader:
+                    block = self._block_at(ia >> 2, n, max_instructions, breaks)
+                    if block is not None:
+                        self.smc = False
+                        n += block.fn(self)
+                        self.P = self.Q << 2
+                        if self.waiting:
+                            return 'wait'
+                        continue
+                self.P = (ia + 4) & 0x7FFFF     # ENDE: P ← P + 4
+                self.Q = self.P >> 2            # PREP1 / EX1: Q ← P[15:31]
+                try:
+                    execute_at(ia)
+                except ValueError:
+                    self.P = ia                 # leave P at the faulting IA
+                    raise
+                n += 1
+                self.P = self.Q << 2            # EX(n-1): P ← {Q, 2'b00}
+                if self.waiting:
+                    return 'wait'
+                leader = self.O in BLOCK_END
+            return 'limit'
+        finally:
+            self.icount += n
+
+    def step(self):
+        """Execute the single instruction at P."""
+        return self.run(max_instructions=1)
 
     # ------------------------------------------------------------------
     # Word arithmetic
@@ -349,7 +604,7 @@ class Sigma7CPU:
         self.C = self.mem.read_word(ea); self.D = self.C
         s = self.alu_add(self.A, self.D)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _SW(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'word')
@@ -357,7 +612,7 @@ class Sigma7CPU:
         self.C = self.mem.read_word(ea); self.D = self.C
         s = self.alu_sub(self.A, self.D)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _CW(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'word')
@@ -376,7 +631,7 @@ class Sigma7CPU:
         self.A = self.RR[r]; self.D = imm
         s = self.alu_add(self.A, self.D)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _CI(self, i, r, x, addr):
         imm = self._imm20(x, addr)
@@ -398,19 +653,20 @@ class Sigma7CPU:
         ea = self._prep(i, x, addr, 'word')
         self.C = self.mem.read_word(ea); self.A = self.C
         self.RR[r] = self.A
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _STW(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'word')
         self.A = self.RR[r]
         self.mem.write_word(ea, self.A)
+        self.invalidate(ea)
 
     def _LCW(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'word')
         self.C = self.mem.read_word(ea); self.D = self.C
         s = self.alu_add(mask32(~self.D), 0, 1)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _LAW(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'word')
@@ -420,7 +676,7 @@ class Sigma7CPU:
         else:
             s = self.D
         self.A = s; self.RR[r] = s
-        self.set_cc_abs(self.A, self.CC2)
+        self.set_cc_abs(self.A, self.cc & 4)
 
     # ------------------------------------------------------------------
     # Halfword arithmetic
@@ -432,7 +688,7 @@ class Sigma7CPU:
         self.C = hw; self.D = sext(hw, 16)
         s = self.alu_add(self.A, self.D)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _SH(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'halfword')
@@ -441,7 +697,7 @@ class Sigma7CPU:
         self.C = hw; self.D = sext(hw, 16)
         s = self.alu_sub(self.A, self.D)
         self.A = s; self.RR[r] = s
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     def _CH(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'halfword')
@@ -466,6 +722,7 @@ class Sigma7CPU:
         ea = self._prep(i, x, addr, 'halfword')
         self.A = self.RR[r]
         self.mem.write_halfword(ea, self.A & HALF_MASK)
+        self.invalidate(ea)
 
     def _LCH(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'halfword')
@@ -473,7 +730,7 @@ class Sigma7CPU:
         self.C = hw; self.D = sext(hw, 16)
         s = self.alu_add(mask32(~self.D), 0, 1)
         self.A = s; self.RR[r] = s
-        self.set_cc_complement(self.A, self.carry, self.CC2)
+        self.set_cc_complement(self.A, self.carry, self.cc & 4)
 
     def _LAH(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'halfword')
@@ -484,7 +741,7 @@ class Sigma7CPU:
         else:
             s = self.D
         self.A = s; self.RR[r] = s
-        self.set_cc_abs(self.A, self.CC2)
+        self.set_cc_abs(self.A, self.cc & 4)
 
     def _MTH(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'halfword')
@@ -494,7 +751,8 @@ class Sigma7CPU:
         s = self.alu_add(self.A, self.D)
         self.A = s
         self.mem.write_halfword(ea, s & HALF_MASK)
-        self.set_cc_arith(self.A, self.carry, self.CC2)
+        self.invalidate(ea)
+        self.set_cc_arith(self.A, self.carry, self.cc & 4)
 
     # ------------------------------------------------------------------
     # Byte load / store
@@ -510,6 +768,7 @@ class Sigma7CPU:
         ea = self._prep(i, x, addr, 'byte')
         self.A = self.RR[r]
         self.mem.write_byte(ea, self.A & BYTE_MASK)
+        self.invalidate(ea)
 
     def _CB(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'byte')
@@ -528,6 +787,7 @@ class Sigma7CPU:
         s = self.alu_add(self.A, self.D)
         self.A = s
         self.mem.write_byte(ea, s & BYTE_MASK)
+        self.invalidate(ea)
         self.set_cc_byte(self.A)
 
     # ------------------------------------------------------------------
@@ -574,6 +834,7 @@ class Sigma7CPU:
         ea = self._prep(i, x, addr, 'doubleword')
         self.A = self.RR[r];   self.mem.write_word(ea,     self.A)
         self.A = self.RR[r+1]; self.mem.write_word(ea + 4, self.A)
+        self.invalidate(ea); self.invalidate(ea + 4)
 
     def _AD(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'doubleword')
@@ -586,7 +847,7 @@ class Sigma7CPU:
         self.C = self.mem.read_word(ea); self.D = self.C
         hi_s = self.alu_add(self.A, self.D, lo_carry)
         self.A = hi_s; self.RR[r] = hi_s
-        self.set_cc_arith_dw(self.A, self.AWZ, self.carry, self.CC2)
+        self.set_cc_arith_dw(self.A, self.AWZ, self.carry, self.cc & 4)
 
     def _SD(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'doubleword')
@@ -599,7 +860,7 @@ class Sigma7CPU:
         self.C = self.mem.read_word(ea); self.D = self.C
         hi_s = self.alu_add(self.A, mask32(~self.D), lo_carry)
         self.A = hi_s; self.RR[r] = hi_s
-        self.set_cc_arith_dw(self.A, self.AWZ, self.carry, self.CC2)
+        self.set_cc_arith_dw(self.A, self.AWZ, self.carry, self.cc & 4)
 
     def _CD(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'doubleword')
@@ -625,7 +886,7 @@ class Sigma7CPU:
         self.C = self.mem.read_word(ea); self.D = self.C
         hi_s = self.alu_add(mask32(~self.D), 0, lo_carry)
         self.A = hi_s; self.RR[r] = hi_s
-        self.set_cc_complement_dw(self.A, self.AWZ, self.carry, self.CC2)
+        self.set_cc_complement_dw(self.A, self.AWZ, self.carry, self.cc & 4)
 
     def _LAD(self, i, r, x, addr):
         ea = self._prep(i, x, addr, 'doubleword')
@@ -647,7 +908,229 @@ class Sigma7CPU:
             hi_mem = self.mem.read_word(ea)
             self.C = hi_mem; self.A = hi_mem
             self.RR[r] = hi_mem
-        self.set_cc_abs_dw(self.A, self.AWZ, self.CC2)
+        self.set_cc_abs_dw(self.A, self.AWZ, self.cc & 4)
+
+    # ------------------------------------------------------------------
+    # Branch / control
+    # Taken branches leave the target word address in Q, which run()
+    # uses as the next instruction address.
+    # ------------------------------------------------------------------
+    def _BCR(self, i, r, x, addr):
+        ea = self._prep(i, x, addr, 'word')
+        if (self.cc & r) == 0:      # R=0 → unconditional
+            self.Q = ea >> 2
+
+    def _BCS(self, i, r, x, addr):
+        ea = self._prep(i, x, addr, 'word')
+        if (self.cc & r) != 0:      # R=0 → no-op
+            self.Q = ea >> 2
+
+    def _BAL(self, i, r, x, addr):
+        ea = self._prep(i, x, addr, 'word')
+        self.RR[r] = self.Q                 # return word address
+        self.Q = ea >> 2
+
+    def _BDR(self, i, r, x, addr):
+        ea = self._prep(i, x, addr, 'word')
+        self.A = mask32(self.RR[r] - 1)
+        self.RR[r] = self.A
+        if self.A != 0 and not (self.A & 0x80000000):   # positive
+            self.Q = ea >> 2
+
+    def _BIR(self, i, r, x, addr):
+        ea = self._prep(i, x, addr, 'word')
+        self.A = mask32(self.RR[r] + 1)
+        self.RR[r] = self.A
+        if self.A & 0x80000000:                          # negative
+            self.Q = ea >> 2
+
+    def _WAIT(self, i, r, x, addr):
+        self._prep(i, x, addr, 'word')
+        self.waiting = True
+
+
+# ---------------------------------------------------------------------------
+# Basic-block translation
+# ---------------------------------------------------------------------------
+# A basic block runs from a branch target (a "leader") up to and including
+# the next branch or WAIT.  Each block is compiled once into a Python
+# function whose body is straight-line code specialised to the decoded
+# fields: constant effective addresses, immediates and CC outcomes are
+# folded in, and the common word/halfword/byte operations are emitted
+# inline.  Everything else (indirect forms, doubleword, branches) calls the
+# normal handler with its operands as constants.
+#
+# Translated code keeps RR, memory, CC, carry, P and Q identical to
+# the interpreter; the internal A/C/D latches are only updated by the
+# handler calls.  A store that lands in a translated block drops it (and
+# sets cpu.smc, which makes the running block return early).
+
+BLOCK_HOT = 8      # leader visits before a block is translated
+BLOCK_MAX = 64     # maximum instructions per block
+
+C7 = Sigma7CPU
+BLOCK_END = frozenset((C7.OP_BCR, C7.OP_BCS, C7.OP_BAL,
+                       C7.OP_BDR, C7.OP_BIR, C7.OP_WAIT))
+BLOCK_STORES = frozenset((C7.OP_STW, C7.OP_STH, C7.OP_STB, C7.OP_STD,
+                          C7.OP_MTH, C7.OP_MTB))
+
+_INLINE_SIZE = {
+    C7.OP_LW: 'word', C7.OP_STW: 'word', C7.OP_AW: 'word', C7.OP_SW: 'word',
+    C7.OP_CW: 'word', C7.OP_AND: 'word', C7.OP_OR: 'word', C7.OP_EOR: 'word',
+    C7.OP_LH: 'halfword', C7.OP_STH: 'halfword',
+    C7.OP_LB: 'byte', C7.OP_STB: 'byte',
+}
+
+
+class Block:
+    """A translated basic block: fn(cpu) runs it and returns its length."""
+    def __init__(self, fn, start, end, source):
+        self.fn     = fn
+        self.start  = start        # first word address
+        self.end    = end          # last word address (inclusive)
+        self.count  = end - start + 1
+        self.source = source
+
+
+def _ea_expr(size, x, addr):
+    """Python expression for the effective byte address (direct forms)."""
+    if x == 0:
+        return str(addr << 2)
+    if size == 'byte':
+        return (f"(((((RR[{x}] & M) >> 2) + {addr}) & 0x1FFFF) << 2"
+                f" | (RR[{x}] & 3))")
+    if size == 'halfword':
+        return (f"(((((RR[{x}] & M) >> 1) + {addr}) & 0x1FFFF) << 2"
+                f" | ((RR[{x}] & 1) << 1))")
+    return f"((((RR[{x}] & 0x1FFFF) + {addr}) & 0x1FFFF) << 2)"
+
+
+def _cc_result(v):
+    """Expression for the CC3/CC4 bits of a 32-bit result held in local v."""
+    return f"(1 if {v} > 0x7FFFFFFF else 2 if {v} else 0)"
+
+
+def _emit_add(out, r, b, subtract=False, store=True):
+    """Emit alu_add/alu_sub of RR[r] and operand expression b, then CC."""
+    out.append(f"a = RR[{r}] & M")
+    if subtract:
+        out.append(f"b = ~({b}) & M")
+        out.append("t = a + b + 1")
+    else:
+        out.append(f"b = {b}")
+        out.append("t = a + b")
+    out.append("v = t & M")
+    if store:
+        out.append(f"RR[{r}] = v")
+    out.append("s.carry = c = t >> 32")
+    out.append("s.cc = (c << 3) | ((((a ^ v) & (b ^ v)) >> 29) & 4) | "
+               + _cc_result("v"))
+
+
+def _emit_compare(out, r, b):
+    """Emit CW/CI: carry from the subtraction, then CC_COMPARE."""
+    out.append(f"a = RR[{r}] & M")
+    out.append(f"b = {b}")
+    out.append("s.carry = (a + (~b & M) + 1) >> 32")
+    out.append("d = (a ^ 0x80000000) - (b ^ 0x80000000)")   # signed order
+    out.append("s.cc = (4 if a & b else 0) | (2 if d > 0 else 1 if d < 0 else 0)")
+
+
+def _emit_inline(out, op, r, x, addr):
+    """Emit inline code for op; return False if op needs its handler."""
+    C = C7
+    if op == C.OP_LI:
+        v = sext((x << 17) | addr, 20)
+        out.append(f"RR[{r}] = {v}")
+        out.append(f"s.cc = {1 if v > 0x7FFFFFFF else 2 if v else 0}")
+        return True
+    if op == C.OP_AI:
+        _emit_add(out, r, str(sext((x << 17) | addr, 20)))
+        return True
+    if op == C.OP_CI:
+        _emit_compare(out, r, str(sext((x << 17) | addr, 20)))
+        return True
+
+    size = _INLINE_SIZE.get(op)
+    if size is None:
+        return False
+    out.append(f"e = {_ea_expr(size, x, addr)}")
+    if op == C.OP_LW:
+        out.append(f"v = RR[{r}] = rw(e)")
+        out.append("s.cc = (8 if s.carry else 0) | (s.cc & 4) | " + _cc_result("v"))
+    elif op == C.OP_AW:
+        _emit_add(out, r, "rw(e)")
+    elif op == C.OP_SW:
+        _emit_add(out, r, "rw(e)", subtract=True)
+    elif op == C.OP_CW:
+        _emit_compare(out, r, "rw(e)")
+    elif op in (C.OP_AND, C.OP_OR, C.OP_EOR):
+        sym = {C.OP_AND: '&', C.OP_OR: '|', C.OP_EOR: '^'}[op]
+        out.append(f"v = RR[{r}] = (RR[{r}] {sym} rw(e)) & M")
+        out.append("s.cc = " + _cc_result("v"))
+    elif op == C.OP_LH:
+        out.append("v = rh(e)")
+        out.append("if v & 0x8000: v |= 0xFFFF0000")
+        out.append(f"RR[{r}] = v")
+        out.append("s.cc = " + _cc_result("v"))
+    elif op == C.OP_LB:
+        out.append(f"v = RR[{r}] = rb(e)")
+        out.append("s.cc = 2 if v else 0")
+    elif op == C.OP_STW:
+        out.append(f"ww(e, RR[{r}]); inv(e)")
+    elif op == C.OP_STH:
+        out.append(f"wh(e, RR[{r}] & 0xFFFF); inv(e)")
+    elif op == C.OP_STB:
+        out.append(f"wb(e, RR[{r}] & 0xFF); inv(e)")
+    return True
+
+
+def translate_block(cpu, start):
+    """
+    Translate the basic block at word address start into a Block.
+    Returns None if the first instruction is not implemented.
+    """
+    mem = cpu.mem
+    env = {'M': WORD_MASK,
+           'rw': mem.read_word,     'ww': mem.write_word,
+           'rh': mem.read_halfword, 'wh': mem.write_halfword,
+           'rb': mem.read_byte,     'wb': mem.write_byte,
+           'inv': cpu.invalidate}
+    body = []
+    wa = start
+    while True:
+        try:
+            handler, i, op, r, x, addr = cpu.predecode(wa)
+        except ValueError:
+            break                       # leave it to the interpreter to raise
+        k = wa - start
+        nxt = (wa + 1) & 0x1FFFF
+        body.append(f"# 0x{wa:05X}: {op:02X} r={r} x={x} addr=0x{addr:05X} i={i}")
+        if i or not _emit_inline(body, op, r, x, addr):
+            env[f'h{k}'] = handler
+            body.append(f"s.P = {nxt << 2}; s.Q = {nxt}; s.O = {op}; s.R = {r}")
+            body.append(f"h{k}({i}, {r}, {x}, {addr})")
+        if op in BLOCK_END:
+            body.append(f"return {k + 1}")
+            break
+        if op in BLOCK_STORES:
+            body.append(f"if s.smc: s.Q = {nxt}; return {k + 1}")
+        if k + 1 >= BLOCK_MAX or nxt == 0:
+            body.append(f"s.Q = {nxt}")
+            body.append(f"return {k + 1}")
+            break
+        wa = nxt
+    if not body:
+        return None
+    if not body[-1].startswith('return'):
+        # stopped in front of an unimplemented opcode
+        wa -= 1
+        body.append(f"s.Q = {wa + 1}")
+        body.append(f"return {wa - start + 1}")
+    source = "def block(s):\n    RR = s.RR\n" + \
+             "".join(f"    {line}\n" for line in body)
+    exec(compile(source, f"<block 0x{start:05X}>", "exec"), env)
+    return Block(env['block'], start, wa, source)
 
 
 # ---------------------------------------------------------------------------
@@ -673,6 +1156,12 @@ class TestRunner:
             self.failed += 1
             self.failures.append(f"FAIL  {name}: got {bool(got)}, expected {bool(expected)}")
 
+    def merge(self, other):
+        """Fold another runner's counts and failures into this one."""
+        self.passed += other.passed
+        self.failed += other.failed
+        self.failures.extend(other.failures)
+
     def summary(self):
         total = self.passed + self.failed
         print(f"\n{'='*60}")
@@ -697,6 +1186,37 @@ def word_addr(byte_addr):
     return (byte_addr >> 2) & 0x1FFFF
 
 
+# ---------------------------------------------------------------------------
+# Suite registry
+# ---------------------------------------------------------------------------
+# Suites register themselves as they are defined, so an earlier definition
+# is still collected after a later one of the same name shadows it.
+SUITES = []
+SKIPPED = []    # (title, reason) of suites whose required module is missing
+
+
+def suite(title, requires=None):
+    def register(fn):
+        if requires is not None and importlib.util.find_spec(requires) is None:
+            SKIPPED.append((title, f"{requires} not installed"))
+        else:
+            SUITES.append((title, fn))
+        return fn
+    return register
+
+
+def run_suite(index):
+    """Run SUITES[index] with a fresh TestRunner (process pool worker)."""
+    title, fn = SUITES[index]
+    tr = TestRunner()
+    try:
+        fn(tr)
+    except Exception as e:
+        tr.failed += 1
+        tr.failures.append(f"ERROR {title} tests: {e!r}")
+    return tr
+
+
 # ---------------------------------------------------------------------------
 # CC helpers for tests
 # ---------------------------------------------------------------------------
@@ -711,6 +1231,7 @@ def cc_lt(cpu):     return cpu.CC4                       # compare less
 # ---------------------------------------------------------------------------
 # Tests: Word Arithmetic
 # ---------------------------------------------------------------------------
+@suite("word arithmetic")
 def test_word_arithmetic(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -815,6 +1336,7 @@ def test_word_arithmetic(tr):
 # ---------------------------------------------------------------------------
 # Tests: Word Load / Store
 # ---------------------------------------------------------------------------
+@suite("word load/store")
 def test_word_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -893,6 +1415,7 @@ def test_word_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Halfword Arithmetic
 # ---------------------------------------------------------------------------
+@suite("halfword arithmetic")
 def test_halfword_arithmetic(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -937,6 +1460,7 @@ def test_halfword_arithmetic(tr):
 # ---------------------------------------------------------------------------
 # Tests: Halfword Load / Store
 # ---------------------------------------------------------------------------
+@suite("halfword load/store")
 def test_halfword_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -968,11 +1492,12 @@ def test_halfword_load_store(tr):
     tr.check("LCH neg→pos",       cpu.RR[2],  0x00000001)
     tr.check_bool("LCH CC3",      cc_pos(cpu),   True)
 
-    # LCH overflow: negate most-negative halfword
+    # LCH of the most-negative halfword: the 32-bit result cannot overflow
     cpu.mem.write_halfword(0x1000, 0x8000)
     cpu.execute(C.encode(C.OP_LCH, r=2, addr=word_addr(0x1000)))
-    tr.check_bool("LCH OVF CC2",  cpu.CC2,       True)
-    tr.check_bool("LCH OVF CC4",  cpu.CC4,       True)
+    tr.check("LCH -2^15",         cpu.RR[2],  0x00008000)
+    tr.check_bool("LCH -2^15 CC2", cpu.CC2,      False)
+    tr.check_bool("LCH -2^15 CC3", cc_pos(cpu),  True)
 
     # --- LAH ---
     cpu.mem.write_halfword(0x1000, 0xFFFB)   # -5 in 16-bit
@@ -998,6 +1523,7 @@ def test_halfword_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Byte Load / Store
 # ---------------------------------------------------------------------------
+@suite("byte load/store")
 def test_byte_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1057,6 +1583,7 @@ def test_byte_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Logical
 # ---------------------------------------------------------------------------
+@suite("logical")
 def test_logical(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1108,6 +1635,7 @@ def test_logical(tr):
 # ---------------------------------------------------------------------------
 # Tests: Doubleword
 # ---------------------------------------------------------------------------
+@suite("doubleword")
 def test_doubleword(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1238,6 +1766,7 @@ def test_doubleword(tr):
 # ---------------------------------------------------------------------------
 # Tests: Addressing modes (using LW as the vehicle)
 # ---------------------------------------------------------------------------
+@suite("addressing mode")
 def test_addressing_modes(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1264,6 +1793,7 @@ def test_addressing_modes(tr):
 
 
 
+@suite("word arithmetic")
 def test_word_arithmetic(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1352,6 +1882,7 @@ def test_word_arithmetic(tr):
 # ---------------------------------------------------------------------------
 # Tests: Word Load / Store
 # ---------------------------------------------------------------------------
+@suite("word load/store")
 def test_word_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1412,6 +1943,7 @@ def test_word_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Halfword Arithmetic
 # ---------------------------------------------------------------------------
+@suite("halfword arithmetic")
 def test_halfword_arithmetic(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1450,6 +1982,7 @@ def test_halfword_arithmetic(tr):
 # ---------------------------------------------------------------------------
 # Tests: Halfword Load / Store
 # ---------------------------------------------------------------------------
+@suite("halfword load/store")
 def test_halfword_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1501,6 +2034,7 @@ def test_halfword_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Byte Load / Store
 # ---------------------------------------------------------------------------
+@suite("byte load/store")
 def test_byte_load_store(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1550,6 +2084,7 @@ def test_byte_load_store(tr):
 # ---------------------------------------------------------------------------
 # Tests: Logical
 # ---------------------------------------------------------------------------
+@suite("logical")
 def test_logical(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1594,6 +2129,7 @@ def test_logical(tr):
 # ---------------------------------------------------------------------------
 # Tests: Doubleword
 # ---------------------------------------------------------------------------
+@suite("doubleword")
 def test_doubleword(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1708,6 +2244,7 @@ def test_doubleword(tr):
 # ---------------------------------------------------------------------------
 # Tests: Addressing modes (using LW as the vehicle)
 # ---------------------------------------------------------------------------
+@suite("addressing mode")
 def test_addressing_modes(tr):
     cpu = Sigma7CPU()
     C = Sigma7CPU
@@ -1738,37 +2275,442 @@ def test_addressing_modes(tr):
 
 
 # ---------------------------------------------------------------------------
-# Main
+# Tests: Packed condition codes against the per-flag definitions
 # ---------------------------------------------------------------------------
-def run_all_tests():
-    tr = TestRunner()
+@suite("condition code")
+def test_condition_codes(tr):
+    import random
+    cpu = Sigma7CPU()
+    rng = random.Random(3)
+    edges = [0, 1, 2, 0x7FFFFFFE, 0x7FFFFFFF, 0x80000000, 0x80000001,
+             0xFFFFFFFE, 0xFFFFFFFF]
+    values = edges + [rng.getrandbits(32) for _ in range(40)]
+
+    def flags(cc1, cc2, cc3, cc4):
+        return (bool(cc1) << 3) | (bool(cc2) << 2) | (bool(cc3) << 1) | bool(cc4)
+
+    bad = 0
+    for a in values:
+        for b in values[:20]:
+            for cin in (0, 1):
+                # alu_add: carry/overflow
+                s = a + b + cin
+                r = s & WORD_MASK
+                sa, sb, sr = a >> 31, b >> 31, r >> 31
+                cpu.cc = 0
+                got = cpu.alu_add(a, b, cin)
+                want = flags(s > WORD_MASK, sa == sb and sa != sr, 0, 0)
+                bad += got != r or cpu.cc != want or cpu.carry != (s > WORD_MASK)
+
+            # set_cc_arith / set_cc_complement
+            for ov in (False, True):
+                cpu.set_cc_arith(a, b & 1, ov)
+                bad += cpu.cc != flags(b & 1, ov, a != 0 and not a >> 31, a >> 31)
+                cpu.set_cc_complement(a, b & 1, ov)
+                bad += cpu.cc != flags(b & 1, ov, a != 0 and not a >> 31 and not ov,
+                                       a >> 31 or ov)
+                cpu.set_cc_abs(a, ov)
+                bad += cpu.cc != flags(0, ov, a != 0 and not ov, ov)
+                for awz in (False, True):
+                    z = a == 0 and awz
+                    cpu.set_cc_arith_dw(a, awz, b & 1, ov)
+                    bad += cpu.cc != flags(b & 1, ov, not a >> 31 and not z, a >> 31)
+                    cpu.set_cc_complement_dw(a, awz, b & 1, ov)
+                    neg = a >> 31 or ov
+                    bad += cpu.cc != flags(b & 1, ov, not neg and not z, neg)
+                    cpu.set_cc_abs_dw(a, awz, ov)
+                    bad += cpu.cc != flags(0, ov, not ov and not z, ov)
+
+            # set_cc_compare / set_cc_compare_dw
+            cpu.set_cc_compare(a, b)
+            bad += cpu.cc != flags(0, a & b, signed32(a) > signed32(b),
+                                   signed32(a) < signed32(b))
+            lo = values[(a ^ b) % len(values)]
+            r64 = (signed32(a) << 32) | lo
+            o64 = (signed32(b) << 32) | b
+            cpu.set_cc_compare_dw(a, lo, b, b)
+            bad += cpu.cc != flags(0, (a & b) or (lo & b), r64 > o64, r64 < o64)
+        cpu.set_cc_byte(a)
+        bad += cpu.cc != flags(0, 0, a & 0xFF, 0)
+    tr.check("CC packed vs flags", bad, 0)
+
+    # CC1-CC4 are read-through views of the packed field, and assignable
+    cpu.cc = 0b1010
+    tr.check_bool("CC view CC1", cpu.CC1, True)
+    tr.check_bool("CC view CC2", cpu.CC2, False)
+    tr.check_bool("CC view CC3", cpu.CC3, True)
+    tr.check_bool("CC view CC4", cpu.CC4, False)
+    cpu.CC4 = True; cpu.CC1 = False
+    tr.check("CC view set",      cpu.cc,       0b0011)
+    tr.check_bool("CC dict",     cpu.cc_dict() == {'CC1': False, 'CC2': False,
+                                                   'CC3': True,  'CC4': True}, True)
 
-    print("Running word arithmetic tests...")
-    test_word_arithmetic(tr)
 
-    print("Running word load/store tests...")
-    test_word_load_store(tr)
+# ---------------------------------------------------------------------------
+# Tests: Memory backend
+# ---------------------------------------------------------------------------
+@suite("memory")
+def test_memory(tr):
+    import os
+    import tempfile
+    mem = Memory()
+
+    # Big-endian byte/halfword/word views of the same word
+    mem.write_word(0x100, 0x11223344)
+    tr.check("Mem byte 0",        mem.read_byte(0x100),      0x11)
+    tr.check("Mem byte 3",        mem.read_byte(0x103),      0x44)
+    tr.check("Mem half 0",        mem.read_halfword(0x100),  0x1122)
+    tr.check("Mem half 2",        mem.read_halfword(0x103),  0x3344)
+    tr.check("Mem word unalign",  mem.read_word(0x102),      0x11223344)
+
+    # Masks on store
+    mem.write_byte(0x101, 0x1AB)
+    tr.check("Mem write byte",    mem.read_word(0x100),      0x11AB3344)
+    mem.write_halfword(0x102, 0x12345)
+    tr.check("Mem write half",    mem.read_word(0x100),      0x11AB2345)
+    mem.write_word(0x100, -1)
+    tr.check("Mem write word",    mem.read_word(0x100),      0xFFFFFFFF)
+    mem.write_byte(0x80103, 0)    # 19-bit wrap
+    tr.check("Mem addr wrap",     mem.read_word(0x100),      0xFFFFFF00)
+
+    # Bulk loads: word list, aligned and ragged byte images
+    mem.load(0x200, [0xDEADBEEF, -2])
+    tr.check("Mem load w0",       mem.read_word(0x200),      0xDEADBEEF)
+    tr.check("Mem load w1",       mem.read_word(0x204),      0xFFFFFFFE)
+    mem.load_bytes(0x300, bytes(range(1, 9)))
+    tr.check("Mem bytes w0",      mem.read_word(0x300),      0x01020304)
+    tr.check("Mem bytes w1",      mem.read_word(0x304),      0x05060708)
+    mem.load_bytes(0x401, bytes(range(1, 8)))
+    tr.check("Mem ragged w0",     mem.read_word(0x400),      0x00010203)
+    tr.check("Mem ragged w1",     mem.read_word(0x404),      0x04050607)
+    tr.check("Mem image bytes",   int.from_bytes(mem.to_bytes()[0x300:0x308], 'big'),
+             0x0102030405060708)
+
+    # Raw core file and mapped host-order image
+    with tempfile.TemporaryDirectory() as d:
+        raw = os.path.join(d, 'core.bin')
+        with open(raw, 'wb') as f:
+            f.write(bytes.fromhex('CAFEF00D 00000001'))
+        mem.load_file(raw, 0x500)
+        tr.check("Mem file w0",   mem.read_word(0x500),      0xCAFEF00D)
+        img = os.path.join(d, 'core.img')
+        mem.save_image(img)
+        mapped = Memory(image=img)
+        tr.check("Mem mmap w0",   mapped.read_word(0x500),   0xCAFEF00D)
+        tr.check("Mem mmap half", mapped.read_halfword(0x402), 0x0203)
+        mapped.write_word(0x500, 0)
+        tr.check("Mem mmap write", mapped.read_word(0x500),  0)
+        tr.check("Mem mmap private", Memory(image=img).read_word(0x500), 0xCAFEF00D)
+        del mapped
 
-    print("Running halfword arithmetic tests...")
-    test_halfword_arithmetic(tr)
 
-    print("Running halfword load/store tests...")
-    test_halfword_load_store(tr)
+# ---------------------------------------------------------------------------
+# Tests: Pre-decoded instruction cache
+# ---------------------------------------------------------------------------
+@suite("instruction cache")
+def test_icache(tr):
+    cpu = Sigma7CPU()
+    C = Sigma7CPU
+    CODE = 0x2000
+
+    # Cached execution matches execute() on the same word
+    cpu.mem.write_word(0x1000, 0x00000005)
+    cpu.mem.write_word(CODE, C.encode(C.OP_AW, r=2, addr=word_addr(0x1000)))
+    cpu.RR[2] = 3
+    cpu.execute_at(CODE)
+    cpu.execute_at(CODE)
+    tr.check("ICache AW twice",   cpu.RR[2],    0x0000000D)
+    tr.check_bool("ICache filled", (CODE >> 2) in cpu.icache, True)
+
+    # STW onto a cached word invalidates it
+    cpu.RR[4] = C.encode_imm(C.OP_LI, r=2, imm=7)
+    cpu.execute(C.encode(C.OP_STW, r=4, addr=word_addr(CODE)))
+    tr.check_bool("ICache STW inval", (CODE >> 2) in cpu.icache, False)
+    cpu.execute_at(CODE)
+    tr.check("ICache new instr",  cpu.RR[2],    0x00000007)
+
+    # STB into the low byte of a cached word invalidates it
+    cpu.execute_at(CODE)
+    cpu.RR[5] = 0x09
+    cpu.RR[6] = 3
+    cpu.execute(C.encode(C.OP_STB, r=5, x=6, addr=word_addr(CODE)))
+    tr.check_bool("ICache STB inval", (CODE >> 2) in cpu.icache, False)
+    cpu.execute_at(CODE)
+    tr.check("ICache patched imm", cpu.RR[2],   0x00000009)
+
+    # STD invalidates both words of the doubleword
+    cpu.execute_at(CODE)
+    cpu.mem.write_word(CODE + 4, C.encode_imm(C.OP_LI, r=3, imm=1))
+    cpu.execute_at(CODE + 4)
+    cpu.RR[8] = C.encode_imm(C.OP_LI, r=2, imm=2)
+    cpu.RR[9] = C.encode_imm(C.OP_LI, r=3, imm=4)
+    cpu.execute(C.encode(C.OP_STD, r=8, addr=word_addr(CODE)))
+    tr.check_bool("ICache STD inval", not cpu.icache, True)
+    cpu.execute_at(CODE); cpu.execute_at(CODE + 4)
+    tr.check("ICache STD hi",     cpu.RR[2],    0x00000002)
+    tr.check("ICache STD lo",     cpu.RR[3],    0x00000004)
+
+    # Cache disabled: nothing retained, same results
+    cpu = Sigma7CPU()
+    cpu.icache_enabled = False
+    cpu.mem.write_word(CODE, C.encode_imm(C.OP_AI, r=1, imm=1))
+    cpu.execute_at(CODE); cpu.execute_at(CODE)
+    tr.check("ICache off AI",     cpu.RR[1],    0x00000002)
+    tr.check_bool("ICache off empty", not cpu.icache, True)
 
-    print("Running byte load/store tests...")
-    test_byte_load_store(tr)
 
-    print("Running logical tests...")
-    test_logical(tr)
+# ---------------------------------------------------------------------------
+# Tests: Run loop and branches
+# ---------------------------------------------------------------------------
+@suite("run loop")
+def test_run(tr):
+    C = Sigma7CPU
+    CODE = 0x2000
+    WA = word_addr(CODE)
+
+    # BDR loop: sum 5+4+3+2+1 into R1, then WAIT
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, [
+        C.encode_imm(C.OP_LI, r=1, imm=0),          # +0
+        C.encode_imm(C.OP_LI, r=2, imm=5),          # +1
+        C.encode(C.OP_STW, r=2, addr=word_addr(0x1000)),   # +2 LOOP
+        C.encode(C.OP_AW,  r=1, addr=word_addr(0x1000)),   # +3
+        C.encode(C.OP_BDR, r=2, addr=WA + 2),       # +4
+        C.encode(C.OP_WAIT),                        # +5
+    ])
+    why = cpu.run(CODE)
+    tr.check("Run BDR sum",       cpu.RR[1],    15)
+    tr.check("Run BDR R2",        cpu.RR[2],    0)
+    tr.check_bool("Run WAIT",     why == 'wait', True)
+    tr.check("Run WAIT P",        cpu.P,        CODE + 24)
+    tr.check("Run icount",        cpu.icount,   2 + 5 * 3 + 1)
+
+    # BAL / return through BCR indexed by the link register
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, [
+        C.encode(C.OP_BAL, r=7, addr=WA + 3),       # +0 call SUB
+        C.encode_imm(C.OP_AI, r=1, imm=1),          # +1 return here
+        C.encode(C.OP_WAIT),                        # +2
+        C.encode_imm(C.OP_LI, r=1, imm=10),         # +3 SUB
+        C.encode(C.OP_BCR, r=0, x=7, addr=0),       # +4 return
+    ])
+    cpu.run(CODE)
+    tr.check("Run BAL link",      cpu.RR[7],    WA + 1)
+    tr.check("Run BAL result",    cpu.RR[1],    11)
+
+    # BCS / BCR on CC: CI sets CC4 (less) → BCS 1 taken, BCR 1 not taken
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, [
+        C.encode_imm(C.OP_LI, r=1, imm=3),          # +0
+        C.encode_imm(C.OP_CI, r=1, imm=5),          # +1
+        C.encode(C.OP_BCR, r=1, addr=WA + 6),       # +2 not taken (CC4 set)
+        C.encode(C.OP_BCS, r=1, addr=WA + 5),       # +3 taken
+        C.encode_imm(C.OP_LI, r=2, imm=1),          # +4 skipped
+        C.encode(C.OP_BCS, r=0, addr=WA + 6),       # +5 R=0 → no-op
+        C.encode(C.OP_WAIT),                        # +6
+    ])
+    cpu.run(CODE)
+    tr.check("Run BCS taken",     cpu.RR[2],    0)
+    tr.check("Run BCS R=0 P",     cpu.P,        CODE + 28)
+
+    # BIR counts a negative register up to zero
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, [
+        C.encode_imm(C.OP_LI, r=3, imm=-3),         # +0
+        C.encode(C.OP_BIR, r=3, addr=WA + 1),       # +1
+        C.encode(C.OP_WAIT),                        # +2
+    ])
+    cpu.run(CODE)
+    tr.check("Run BIR R3",        cpu.RR[3],    0)
+    tr.check("Run BIR icount",    cpu.icount,   1 + 3 + 1)
+
+    # Breakpoints and instruction limit
+    cpu = Sigma7CPU()
+    cpu.mem.load(CODE, [
+        C.encode_imm(C.OP_AI, r=1, imm=1),          # +0
+        C.encode_imm(C.OP_AI, r=1, imm=1),          # +1
+        C.encode(C.OP_BCR, r=0, addr=WA),           # +2 loop forever
+    ])
+    why = cpu.run(CODE, stop_on={CODE + 8})
+    tr.check_bool("Run breakpoint", why == 'breakpoint', True)
+    tr.check("Run break P",       cpu.P,        CODE + 8)
+    tr.check("Run break R1",      cpu.RR[1],    2)
+    why = cpu.run(max_instructions=2, stop_on={CODE + 8})
+    tr.check_bool("Run resume limit", why == 'limit', True)
+    tr.check("Run limit R1",      cpu.RR[1],    3)
+    tr.check("Run limit P",       cpu.P,        CODE + 4)
+    cpu.step()
+    tr.check("Run step R1",       cpu.RR[1],    4)
+    tr.check("Run step P",        cpu.P,        CODE + 8)
 
-    print("Running doubleword tests...")
-    test_doubleword(tr)
 
-    print("Running addressing mode tests...")
-    test_addressing_modes(tr)
+# ---------------------------------------------------------------------------
+# Tests: Basic-block translation
+# ---------------------------------------------------------------------------
+def _run_both(program, code, setup=None, **kw):
+    """Run program interpreted and translated; return both CPUs."""
+    cpus = []
+    for translate in (False, True):
+        cpu = Sigma7CPU()
+        cpu.translate = translate
+        cpu.mem.load(code, program)
+        if setup:
+            setup(cpu)
+        cpu.run(code, **kw)
+        cpus.append(cpu)
+    return cpus
+
+
+def _same_state(tr, name, a, b):
+    tr.check_bool(f"{name} RR",  a.RR == b.RR, True)
+    tr.check_bool(f"{name} CC",  a.cc_dict() == b.cc_dict(), True)
+    tr.check(f"{name} P",        b.P,      a.P)
+    tr.check(f"{name} Q",        b.Q,      a.Q)
+    tr.check(f"{name} carry",    b.carry,  a.carry)
+    tr.check(f"{name} icount",   b.icount, a.icount)
+    tr.check_bool(f"{name} mem", a.mem.words == b.mem.words, True)
+
+
+@suite("block translation")
+def test_translate(tr):
+    import random
+    C = Sigma7CPU
+    CODE = 0x4000
+    DATA = 0x1000
+    WA = word_addr(CODE)
+
+    # Mixed loop body: direct, indexed and indirect word/halfword/byte forms
+    body = [
+        C.encode(C.OP_LW,  r=1, addr=word_addr(DATA)),
+        C.encode(C.OP_AW,  r=1, x=7, addr=word_addr(DATA)),
+        C.encode(C.OP_SW,  r=2, addr=word_addr(DATA + 4)),
+        C.encode(C.OP_CW,  r=1, addr=word_addr(DATA + 4)),
+        C.encode(C.OP_STW, r=1, x=7, addr=word_addr(DATA + 0x40)),
+        C.encode(C.OP_LH,  r=3, x=7, addr=word_addr(DATA)),
+        C.encode(C.OP_STH, r=3, x=7, addr=word_addr(DATA + 0x80)),
+        C.encode(C.OP_LB,  r=4, x=7, addr=word_addr(DATA)),
+        C.encode(C.OP_STB, r=4, x=7, addr=word_addr(DATA + 0xC0)),
+        C.encode_imm(C.OP_AI, r=5, imm=-7),
+        C.encode_imm(C.OP_CI, r=5, imm=3),
+        C.encode(C.OP_EOR, r=5, addr=word_addr(DATA)),
+        C.encode(C.OP_MTH, r=1, x=7, addr=word_addr(DATA + 0x100)),
+        C.encode(C.OP_LW,  r=6, addr=word_addr(DATA + 8), i=1),
+        C.encode(C.OP_AD,  r=8, addr=word_addr(DATA)),
+    ]
+    program = ([C.encode_imm(C.OP_LI, r=7, imm=40)] + body +
+               [C.encode(C.OP_BDR, r=7, addr=WA + 1), C.encode(C.OP_WAIT)])
+
+    def setup(cpu):
+        for k in range(64):
+            cpu.mem.write_word(DATA + 4 * k, mask32(0x9E3779B9 * (k + 1)))
+        cpu.mem.write_word(DATA + 8, word_addr(DATA + 12))
+
+    a, b = _run_both(program, CODE, setup)
+    _same_state(tr, "Xlate loop", a, b)
+    tr.check_bool("Xlate blocks built", bool(b.blocks), True)
+
+    # Self-modifying: the loop patches an AI inside its own block
+    program = [
+        C.encode_imm(C.OP_LI, r=7, imm=20),                 # +0
+        C.encode_imm(C.OP_AI, r=1, imm=1),                  # +1 LOOP
+        C.encode(C.OP_STW, r=2, addr=WA + 4),               # +2 patch +4
+        C.encode_imm(C.OP_AI, r=2, imm=1),                  # +3
+        C.encode_imm(C.OP_AI, r=3, imm=1),                  # +4 patched
+        C.encode(C.OP_BDR, r=7, addr=WA + 1),               # +5
+        C.encode(C.OP_WAIT),                                # +6
+    ]
+
+    def setup_smc(cpu):
+        cpu.RR[2] = C.encode_imm(C.OP_AI, r=3, imm=100)
+
+    a, b = _run_both(program, CODE, setup_smc)
+    _same_state(tr, "Xlate SMC", a, b)
+
+    # Breakpoint inside a hot block and an instruction limit
+    program = [
+        C.encode_imm(C.OP_AI, r=1, imm=1),                  # +0
+        C.encode_imm(C.OP_AI, r=2, imm=1),                  # +1
+        C.encode_imm(C.OP_AI, r=3, imm=1),                  # +2
+        C.encode(C.OP_BCR, r=0, addr=WA),                   # +3
+    ]
+    a, b = _run_both(program, CODE, max_instructions=1001)
+    _same_state(tr, "Xlate limit", a, b)
+    b.run(stop_on={CODE + 8})
+    tr.check("Xlate break P",    b.P,      CODE + 8)
+    tr.check("Xlate break R3",   b.RR[3],  b.RR[1] - 1)
+
+    # Randomized straight-line blocks in a BDR loop
+    rng = random.Random(7)
+    ops = [C.OP_LW, C.OP_AW, C.OP_SW, C.OP_CW, C.OP_AND, C.OP_OR, C.OP_EOR,
+           C.OP_LH, C.OP_LB, C.OP_STW, C.OP_STH, C.OP_STB]
+    for trial in range(10):
+        body = []
+        for _ in range(rng.randint(1, 80)):
+            kind = rng.random()
+            r = rng.randint(1, 6)
+            if kind < 0.2:
+                op = rng.choice((C.OP_LI, C.OP_AI, C.OP_CI))
+                body.append(C.encode_imm(op, r=r, imm=rng.randint(-0x80000, 0x7FFFF)))
+            else:
+                x = rng.choice((0, 0, 7))
+                body.append(C.encode(rng.choice(ops), r=r, x=x,
+                                     addr=word_addr(DATA) + rng.randint(0, 15)))
+        program = ([C.encode_imm(C.OP_LI, r=7, imm=12)] + body +
+                   [C.encode(C.OP_BDR, r=7, addr=WA + 1), C.encode(C.OP_WAIT)])
+        a, b = _run_both(program, CODE, setup)
+        _same_state(tr, f"Xlate random {trial}", a, b)
+
+
+# ---------------------------------------------------------------------------
+# Tests: NumPy batch lanes (sigma7_batch.py)
+# ---------------------------------------------------------------------------
+@suite("batch lanes", requires='numpy')
+def test_batch_lanes(tr):
+    """Sigma7CPUBatch lanes against scalar CPUs on one random program."""
+    from sigma7_batch import test_batch
+    test_batch(tr)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def run_all_tests(jobs=None):
+    """
+    Run every registered suite, spread across a process pool.
+    jobs = worker count (None = one per core, 1 = in this process).
+    Returns the process exit code: 0 if everything passed, else 1.
+    """
+    seen = {}
+    names = []
+    for title, fn in SUITES:
+        seen[title] = seen.get(title, 0) + 1
+        names.append(f"{title} (#{seen[title]})" if seen[title] > 1 else title)
+
+    tr = TestRunner()
+    if jobs == 1:
+        results = map(run_suite, range(len(SUITES)))
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(run_suite, range(len(SUITES)))
+    try:
+        for name, result in zip(names, results):
+            status = f"{result.failed} failed" if result.failed else "ok"
+            print(f"Running {name} tests... {result.passed + result.failed} checks, {status}")
+            tr.merge(result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    for title, reason in SKIPPED:
+        print(f"Skipping {title} tests ({reason})")
 
     tr.summary()
+    return 1 if tr.failed else 0
 
 
 if __name__ == '__main__':
-    run_all_tests()
+    parser = argparse.ArgumentParser(description='Sigma 7 simulator test suites')
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help='worker processes (default: one per core; 1 = serial)')
+    args = parser.parse_args()
+    sys.exit(run_all_tests(args.jobs))